@@ -45,6 +45,12 @@ def create_app():
 
     # ✅ Initiera extensions
     db.init_app(app)
+
+    from app.utils.db_router import db_router
+    db_router.init_app(app)
+
+    from app.utils.profiling import profiler
+    profiler.init_app(app)
     migrate.init_app(app, db)
     babel.init_app(app, locale_selector=lambda: 'sv', timezone_selector=lambda: 'Europe/Stockholm')
     login_manager.init_app(app)
@@ -52,6 +58,54 @@ def create_app():
     csrf.init_app(app)
     Bootstrap5(app)
 
+    from app.utils.view_buffer import view_buffer
+    view_buffer.init_app(app)
+
+    from app.utils.visitor_dedupe import visitor_dedupe
+    visitor_dedupe.init_app(app)
+
+    from app.utils.user_agents import ua_classifier
+    ua_classifier.init_app(app)
+
+    from app.utils.search import register_search_index
+    register_search_index(app)
+
+    from app.utils.page_cache import page_cache
+    page_cache.init_app(app)
+
+    from app.utils.principal_cache import principal_cache
+    principal_cache.init_app(app)
+
+    from app.utils.portfolio_order import portfolio_order
+    portfolio_order.init_app(app)
+
+    from app.utils.conditional import conditional_get
+    conditional_get.init_app(app)
+
+    from app.utils.dashboard_metrics import dashboard_metrics
+    dashboard_metrics.init_app(app)
+
+    from app.utils.sitemap import sitemap_generator
+    sitemap_generator.init_app(app)
+
+    from app.utils.mail_outbox import mail_outbox
+    mail_outbox.init_app(app)
+
+    from app.scheduler import scheduler
+    scheduler.init_app(app)
+
+    from app.utils.image_pipeline import image_pipeline
+    image_pipeline.init_app(app)
+
+    from app.utils.media_library import media_library
+    media_library.init_app(app)
+
+    from app.utils.image_cleanup import image_cleanup
+    image_cleanup.init_app(app)
+
+    from app.utils.backup import backup_manager
+    backup_manager.init_app(app)
+
     # ✅ Registrera Blueprints
     from app.admin.admin import admin_bp
     from app.auth.routes import auth_bp
@@ -66,14 +120,31 @@ def create_app():
     app.register_blueprint(portfolio_bp, url_prefix='/portfolio')
 
     # ✅ Registrera CLI-kommandon
-    from app.cli import create_admin, reset_stats, aggregate_stats
+    from app.cli import (
+        create_admin, reset_stats, aggregate_stats, backfill_stats, flush_views, rebuild_search_index,
+        clear_page_cache, backfill_excerpts, build_image_derivatives, reconcile_media,
+        cleanup_images, backup, restore, db_audit, seed
+    )
     app.cli.add_command(create_admin)
     app.cli.add_command(reset_stats)
     app.cli.add_command(aggregate_stats)
+    app.cli.add_command(backfill_stats)
+    app.cli.add_command(flush_views)
+    app.cli.add_command(rebuild_search_index)
+    app.cli.add_command(clear_page_cache)
+    app.cli.add_command(backfill_excerpts)
+    app.cli.add_command(build_image_derivatives)
+    app.cli.add_command(reconcile_media)
+    app.cli.add_command(cleanup_images)
+    app.cli.add_command(backup)
+    app.cli.add_command(restore)
+    app.cli.add_command(db_audit)
+    app.cli.add_command(seed)
     
     # ✅ Registrera CLI-kommandon från app/blog/cli.py
-    from app.blog.cli import send_blog_mails
+    from app.blog.cli import send_blog_mails, mail_worker
     app.cli.add_command(send_blog_mails)
+    app.cli.add_command(mail_worker)
     
     # ✅ Jinja-filter (globala)
     app.jinja_env.filters['strip_and_truncate'] = strip_and_truncate
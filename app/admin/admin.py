@@ -1,8 +1,7 @@
 # app/admin/admin.py
 import os
-import re
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from flask import Blueprint, render_template, current_app, flash, request, redirect, url_for, abort
@@ -16,11 +15,22 @@ from PIL import Image
 
 from app.decorators import roles_required
 from app.extensions import db, mail
-from app.utils.helpers import log_info
+from app.utils.pagination import paginate_keyset, keyset_requested
+from app.utils.conditional import conditional_get
+from app.utils.dashboard_metrics import dashboard_metrics
+from app.utils.page_cache import page_cache
+from app.utils.loading import load_profile
+from app.utils.profiling import profiler
+from app.utils.db_router import db_router
 from app.blog.utils import check_and_send_blog_emails
+from app.utils.mail_outbox import mail_outbox
+from app.utils.image_cleanup import image_cleanup
+from app.utils.image_pipeline import image_pipeline
+from app.utils.media_library import SORTS as MEDIA_SORTS, media_library
+from app.scheduler import scheduler
 from app.models import (
     User, BlogPost, Comment, BlogCategory, Category,
-    PortfolioItem, PageView, Role
+    PortfolioItem, Role
 )
 from app.forms.auth_forms import AdminCreateUserForm
 from app.forms.blog_forms import BlogCategoryForm
@@ -53,18 +63,28 @@ def generate_reset_token(email):
 @login_required
 @roles_required("admin")
 def admin_dashboard():
-    """Visa en översikt av användare, inlägg, kommentarer och statistik."""
-    log_info("🛠 Adminpanelen laddades")
-    user_count = User.query.count()
-    post_count = BlogPost.query.count()
-    comment_count = Comment.query.count()
+    """
+    Visa en översikt av användare, inlägg, kommentarer och statistik.
+    Nyckeltalen läses från dashboard_metrics (inga COUNT/SUM över tabellerna)
+    och flaggade kommentarer visas en sida i taget, högst DASHBOARD_FLAGGED_MAX_PAGES sidor.
+    """
+    metrics = dashboard_metrics.snapshot()
     delete_form = DeleteForm()
     mail_form = EmptyForm()
 
-    flagged_comments = Comment.query.filter_by(flagged=True).all()
-
-    total_post_views = db.session.query(db.func.sum(BlogPost.views)).scalar() or 0
-    total_page_views = db.session.query(db.func.sum(PageView.views)).scalar() or 0
+    # 🚩 Flaggade kommentarer: nyast först, en sida i taget (index på flagged + id)
+    per_page = current_app.config.get("DASHBOARD_FLAGGED_PER_PAGE", 5)
+    max_pages = current_app.config.get("DASHBOARD_FLAGGED_MAX_PAGES", 10)
+    flagged_page = min(max(request.args.get("flagged_page", 1, type=int), 1), max_pages)
+    flagged_comments = (Comment.query
+                        .filter(Comment.flagged.is_(True))
+                        .options(*load_profile("flagged_comment"))
+                        .order_by(Comment.id.desc())
+                        .offset((flagged_page - 1) * per_page)
+                        .limit(per_page + 1)  # En extra rad avgör om det finns en nästa sida
+                        .all())
+    flagged_has_next = len(flagged_comments) > per_page and flagged_page < max_pages
+    flagged_comments = flagged_comments[:per_page]
 
     # Sektioner för dashboard-länkar
     dashboard_sections = [
@@ -104,20 +124,34 @@ def admin_dashboard():
                 {"label": "Rensa oanvända bilder", "endpoint": "admin.cleanup_unused_images", "icon": "bi bi-trash"},
             ]
         },
+        {
+            "title": "System",
+            "links": [
+                {"label": "Prestanda & långsamma queries", "endpoint": "admin.performance", "icon": "bi bi-speedometer2"},
+            ]
+        },
     ]
 
     return render_template(
         "admin/dashboard.html",
-        user_count=user_count,
-        post_count=post_count,
-        comment_count=comment_count,
+        metrics=metrics,
+        user_count=metrics["users"],
+        post_count=metrics["posts"],
+        comment_count=metrics["comments"],
         flagged_comments=flagged_comments,
+        flagged_page=flagged_page,
+        flagged_has_next=flagged_has_next,
         dashboard_sections=dashboard_sections,
         delete_form = delete_form,
         mail_form=mail_form,
         form=delete_form,
-        total_post_views=total_post_views,
-        total_page_views=total_page_views
+        total_post_views=metrics["post_views"],
+        total_page_views=metrics["page_views"],
+        total_portfolio_views=metrics["portfolio_views"],
+        page_cache_stats=page_cache.stats(),
+        conditional_stats=conditional_get.stats(),
+        scheduler_jobs=scheduler.status(),
+        scheduler_leader=scheduler.leader()
     )
 
 # ======================
@@ -359,37 +393,52 @@ def manage_posts():
     page = request.args.get("page", 1, type=int)
     status = request.args.get("status", "").strip()
 
-    posts_query = BlogPost.query
+    posts_query = BlogPost.query.options(*load_profile("admin_post_row"))
 
     # 🔎 Filtrering
     if search_query:
         posts_query = posts_query.filter(BlogPost.title.ilike(f"%{search_query}%"))
     if category_filter:
         posts_query = posts_query.filter(BlogPost.category_id == int(category_filter))
+    # Publicerad = publiceringsdatum har passerat, utkast/planerad = framtida datum
     if status == "published":
-        posts_query = posts_query.filter(BlogPost.is_published.is_(True))
+        posts_query = posts_query.filter(BlogPost.created_at <= datetime.now(timezone.utc))
     elif status == "draft":
-        posts_query = posts_query.filter(BlogPost.is_published.is_(False))
-
-    # ↕️ Sortering
-    if sort_by == "date_asc":
-        posts_query = posts_query.order_by(BlogPost.created_at.asc())
-    elif sort_by == "title_asc":
-        posts_query = posts_query.order_by(BlogPost.title.asc())
-    elif sort_by == "title_desc":
-        posts_query = posts_query.order_by(BlogPost.title.desc())
-    else:  # default date_desc
-        posts_query = posts_query.order_by(BlogPost.created_at.desc())
-
-    pagination = posts_query.paginate(page=page, per_page=10)
+        posts_query = posts_query.filter(BlogPost.created_at > datetime.now(timezone.utc))
+
+    # ⏩ Keyset-paginering (cursor) vid datumsortering
+    keyset = pagination = None
+    if sort_by in ("date_asc", "date_desc") and keyset_requested():
+        keyset = paginate_keyset(
+            posts_query, BlogPost.created_at, BlogPost.id,
+            cursor=request.args.get("cursor"),
+            per_page=10,
+            descending=sort_by != "date_asc",
+            count_key=("admin.manage_posts", search_query, category_filter, status)
+        )
+        posts = keyset.items
+    else:
+        # ↕️ Sortering
+        if sort_by == "date_asc":
+            posts_query = posts_query.order_by(BlogPost.created_at.asc())
+        elif sort_by == "title_asc":
+            posts_query = posts_query.order_by(BlogPost.title.asc())
+        elif sort_by == "title_desc":
+            posts_query = posts_query.order_by(BlogPost.title.desc())
+        else:  # default date_desc
+            posts_query = posts_query.order_by(BlogPost.created_at.desc())
+
+        pagination = posts_query.paginate(page=page, per_page=10)
+        posts = pagination.items
 
     delete_form = DeleteForm()
     all_cats = BlogCategory.query.order_by(BlogCategory.title).all()
 
     return render_template(
         "admin/manage_posts.html",
-        posts=pagination.items,
+        posts=posts,
         pagination=pagination,
+        keyset=keyset,
         delete_form=delete_form,
         search=search_query,
         selected_category=category_filter,
@@ -445,6 +494,7 @@ def manage_blog_categories():
                 img_path = os.path.join(current_app.static_folder, editing.image)
                 if os.path.exists(img_path):
                     os.remove(img_path)
+                media_library.forget(editing.image)
                 editing.image = None
 
             # 🔄 Ersätt befintlig bild
@@ -453,6 +503,7 @@ def manage_blog_categories():
                     old_path = os.path.join(current_app.static_folder, editing.image)
                     if os.path.exists(old_path):
                         os.remove(old_path)
+                    media_library.forget(editing.image)
                 # Generera unikt namn
                 filename = f"{uuid.uuid4().hex}.webp"
                 img_path = os.path.join(img_folder, filename)
@@ -463,6 +514,7 @@ def manage_blog_categories():
 
                 # Spara webbadress till databasen
                 editing.image = f"blog_category_images/{filename}"
+                media_library.register(editing.image)
 
             # ➕ Ny bild om ingen tidigare fanns
             if not editing.image and form.image.data:
@@ -476,6 +528,7 @@ def manage_blog_categories():
 
                 # Spara webbadress till databasen
                 editing.image = f"blog_category_images/{filename}"
+                media_library.register(editing.image)
 
             db.session.commit()
             flash("Kategorin har uppdaterats.", "success")
@@ -492,6 +545,7 @@ def manage_blog_categories():
                 path = os.path.join(img_folder, filename)
                 form.image.data.save(path)
                 new_cat.image = f"blog_category_images/{filename}"
+                media_library.register(new_cat.image)
             db.session.add(new_cat)
             db.session.commit()
             flash("Kategori skapad.", "success")
@@ -537,7 +591,11 @@ def manage_comments():
     per_page = 10
 
     # 🔗 Join för att kunna söka på användarnamn och blogginläggstitlar
-    query = Comment.query.join(BlogPost).join(User)
+    # (samma join fyller comment.post och comment.comment_author, se profilen admin_comment_row)
+    query = (Comment.query
+             .join(Comment.post)
+             .join(Comment.comment_author)
+             .options(*load_profile("admin_comment_row")))
 
     # 🔎 Filtrering
     if search:
@@ -550,8 +608,18 @@ def manage_comments():
     if post_filter:
         query = query.filter(BlogPost.title == post_filter)
 
-    pagination = query.order_by(Comment.id.desc()).paginate(page=page, per_page=per_page)
-    comments = pagination.items
+    keyset = pagination = None
+    if keyset_requested():
+        keyset = paginate_keyset(
+            query, Comment.id, Comment.id,
+            cursor=request.args.get("cursor"),
+            per_page=per_page,
+            count_key=("admin.manage_comments", search, post_filter)
+        )
+        comments = keyset.items
+    else:
+        pagination = query.order_by(Comment.id.desc()).paginate(page=page, per_page=per_page)
+        comments = pagination.items
     delete_form = DeleteForm()
 
     # 🟢 Formulär för att avflagga markerade kommentarer
@@ -576,6 +644,7 @@ def manage_comments():
         unflag_forms=unflag_forms,
         unique_posts=unique_posts,
         pagination=pagination,
+        keyset=keyset,
         search=search,
         post_filter=post_filter,
         edit_forms=edit_forms # Fortfarande viktigt att skicka denna
@@ -675,7 +744,6 @@ def delete_comment(comment_id):
     return redirect(url_for('admin.admin_dashboard'))
 
 
-from math import ceil
 # ======================
 # ✅ ADMIN – VISA OCH HANTERA UPPLADDADE BILDER
 # ======================
@@ -685,81 +753,43 @@ from math import ceil
 def manage_uploads():
     """
     Visa alla uppladdade bilder (blogg, portfolio, kategorier).
-    Stöd för sortering, filtrering och sidvisning.
+    Läser mediabiblioteket (media_assets): filtrering, sortering och sidvisning
+    sker i SQL. Nya filer utanför appen syns efter `flask reconcile-media`.
     """
-    static_path = current_app.static_folder
     page = request.args.get("page", 1, type=int)
     if page < 1:
         abort(404)
     per_page = 12
-    selected_folder = request.args.get("folder")
+    selected_folder = request.args.get("folder") or None
     sort_by = request.args.get("sort", "name_asc")
+    if sort_by not in MEDIA_SORTS:
+        sort_by = "name_asc"
+    unused_only = request.args.get("unused") == "1"
 
-    # ✅ Mappstruktur för olika bildkategorier
-    image_dirs = {
-        "blog_category_images": os.path.join(static_path, "blog_category_images"),
-        "portfolio_category_images": os.path.join(static_path, "portfolio_category_images"),
-        "uploads/blog": os.path.join(static_path, "uploads", "blog"),
-        "uploads/portfolio": os.path.join(static_path, "uploads", "portfolio"),
-    }
-
-    all_images = []
-    for label, path in image_dirs.items():
-        if os.path.exists(path):
-            for filename in os.listdir(path):
-                if filename.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
-                    display_name = filename if len(filename) <= 25 else filename[:22] + "..."
-                    all_images.append({
-                        "folder": label,
-                        "filename": filename,
-                        "url": f"{label}/{filename}",
-                        "name": display_name
-                    })
-
-    # ✅ Filtrera på vald mapp
-    if selected_folder:
-        filtered_images = [img for img in all_images if img["folder"] == selected_folder]
-    else:
-        filtered_images = all_images
-
-    # ✅ Sortering
-    if sort_by == "name_asc":
-        filtered_images.sort(key=lambda x: x["filename"].lower())
-    elif sort_by == "name_desc":
-        filtered_images.sort(key=lambda x: x["filename"].lower(), reverse=True)
-
-    # ✅ Paginering
-    total = len(filtered_images)
-    total_pages = ceil(total / per_page)
-    start = (page - 1) * per_page
-    end = start + per_page
-    images = filtered_images[start:end]
-
-    # ✅ Lista alla unika mappar för dropdown i UI
-    folders = sorted(set(img["folder"] for img in all_images))
+    pagination = media_library.page(folder=selected_folder, sort=sort_by, page=page,
+                                    per_page=per_page, unused=unused_only)
+    images = pagination.items
 
     # ✅ Skapa delete-formulär per bild
     delete_forms = {
-        f"{img['folder']}/{img['filename']}": ImageDeleteForm(folder=img["folder"], filename=img["filename"])
-        for img in images
-    }
-
-    # ✅ Mappning för att visa kategori utifrån filnamn (portfolio)
-    category_mapping = {
-        c.image: c.name for c in Category.query.all() if c.image
+        image.static_path: ImageDeleteForm(folder=image.folder, filename=image.filename)
+        for image in images
     }
 
     return render_template(
         "admin/manage_uploads.html",
         images=images,
-        folders=folders,
+        pagination=pagination,
+        folders=media_library.folders(),
+        sorts=MEDIA_SORTS,
         selected_folder=selected_folder,
         sort_by=sort_by,
+        unused_only=unused_only,
         delete_forms=delete_forms,
         page=page,
-        total_pages=total_pages,
-        total_images=total,
-        category_mapping=category_mapping  # Skickas till mallen
+        total_pages=pagination.pages,
+        total_images=pagination.total,
+        category_mapping=media_library.category_labels(images)  # Kategorinamn för kategoribilder på sidan
     )
 
 # ======================
@@ -782,9 +812,12 @@ def delete_upload():
 
         if os.path.exists(full_path):
             os.remove(full_path)
+            image_pipeline.delete_derivatives(f"{folder}/{filename}")
             flash(f"{filename} raderades från {folder}.", "success")
         else:
             flash(f"Filen {filename} hittades inte i {folder}.", "danger")
+        media_library.forget(f"{folder}/{filename}")
+        db.session.commit()
 
         return redirect(url_for("admin.manage_uploads"))
     else:
@@ -792,47 +825,35 @@ def delete_upload():
         return redirect(url_for("admin.manage_uploads"))
 
 # ======================
-# ✅ ADMIN – RENSNING AV OANVÄNDA BILDER (BLOGG)
+# ✅ ADMIN – RENSNING AV OANVÄNDA BILDER
 # ======================
-@admin_bp.route("/cleanup-images")
+@admin_bp.route("/cleanup-images", methods=["GET", "POST"])
 @login_required
 @roles_required("admin")
 def cleanup_unused_images():
     """
-    Rensa bort oanvända bilder i blogg-mappen.
-    Jämför mot bilder som används i inlägg (img_url och Quill-body).
+    Visa och starta rensningar av oanvända bilder (blogg, portfolio och kategorier).
+    Jobbet körs i bakgrunden; sidan visar förlopp och rapport för de senaste körningarna.
     """
-    upload_folder = os.path.join(current_app.static_folder, "uploads", "blog")
-    removed = []
-
-    if not os.path.exists(upload_folder):
-        flash("Uppladdningsmappen för blogg finns inte.", "warning")
-        return redirect(url_for("admin.manage_posts"))
-
-    # Samla alla använda bilder från img_url och Quill
-    used_images = set()
-
-    # 1. Från img_url (huvudbild på inlägget)
-    for post in BlogPost.query.all():
-        if post.img_url:
-            used_images.add(post.img_url.replace("uploads/blog/", ""))
-
-        # 2. Från Quill-body: plocka ut img src från HTML
-        if post.body:
-            matches = re.findall(r'src="/static/uploads/blog/([^"]+)"', post.body)
-            used_images.update(matches)
-
-    # 3. Jämför med filerna i mappen och rensa bort bilder som inte används
-    for filename in os.listdir(upload_folder):
-        if filename not in used_images:
-            try:
-                os.remove(os.path.join(upload_folder, filename))
-                removed.append(filename)
-            except Exception as e:
-                current_app.logger.warning(f"Kunde inte radera {filename}: {e}")
-
-    flash(f"{len(removed)} oanvända bilder raderades.", "info")
-    return redirect(url_for("admin.manage_posts"))
+    form = EmptyForm()
+    if form.validate_on_submit():
+        dry_run = request.form.get("mode") != "delete"
+        active = image_cleanup.active_run()
+        if active is not None:
+            flash("En rensning pågår redan.", "warning")
+        else:
+            image_cleanup.start(dry_run=dry_run, requested_by=current_user.email)
+            flash("Provkörning startad – inget raderas." if dry_run else "Rensning startad.", "info")
+        return redirect(url_for("admin.cleanup_unused_images"))
+
+    runs = image_cleanup.recent_runs()
+    return render_template(
+        "admin/image_cleanup.html",
+        form=form,
+        runs=runs,
+        active=next((run for run in runs if run.status in ("queued", "running")), None),
+        grace_hours=image_cleanup.grace_hours,
+    )
 
 # ======================
 # ✅ ADMIN – HANTERA PORTFOLIO-KATEGORIER
@@ -884,6 +905,7 @@ def manage_portfolio_categories():
                 img_path = os.path.join(current_app.static_folder, editing.image)
                 if os.path.exists(img_path):
                     os.remove(img_path)
+                media_library.forget(editing.image)
                 editing.image = None
 
             # ✅ Byt ut tidigare bild om en ny laddas upp
@@ -892,10 +914,12 @@ def manage_portfolio_categories():
                     old_path = os.path.join(current_app.static_folder, editing.image)
                     if os.path.exists(old_path):
                         os.remove(old_path)
+                    media_library.forget(editing.image)
                 filename = secure_filename(form.image.data.filename)
                 img_path = os.path.join(img_folder, filename)
                 form.image.data.save(img_path)
                 editing.image = f"portfolio_category_images/{filename}"
+                media_library.register(editing.image)
 
             # ✅ Tillåt ny uppladdning om ingen bild fanns innan
             if not editing.image and form.image.data:
@@ -903,6 +927,7 @@ def manage_portfolio_categories():
                 img_path = os.path.join(img_folder, filename)
                 form.image.data.save(img_path)
                 editing.image = f"portfolio_category_images/{filename}"
+                media_library.register(editing.image)
 
             db.session.commit()
             flash("Kategorin har uppdaterats.", "success")
@@ -919,6 +944,7 @@ def manage_portfolio_categories():
                 path = os.path.join(img_folder, filename)
                 form.image.data.save(path)
                 new_cat.image = f"portfolio_category_images/{filename}"
+                media_library.register(new_cat.image)
 
             db.session.add(new_cat)
             db.session.commit()
@@ -959,6 +985,7 @@ def delete_portfolio_category(category_id):
             if os.path.exists(img_path):
                 os.remove(img_path)
                 current_app.logger.info(f"Raderade kategoribild: {img_path}")  # Lägg till loggning
+            media_library.forget(category.image)
 
         db.session.delete(category)
         db.session.commit()
@@ -1007,10 +1034,20 @@ def manage_portfolio_item():
         "title_asc": asc(PortfolioItem.title),
         "title_desc": desc(PortfolioItem.title),
     }
-    query = query.order_by(sort_options.get(sort_by, PortfolioItem.date.desc()))
-
-    pagination = query.paginate(page=page, per_page=10)
-    items = pagination.items
+    keyset = pagination = None
+    if sort_by in ("date_desc", "date_asc") and keyset_requested():
+        keyset = paginate_keyset(
+            query, PortfolioItem.date, PortfolioItem.id,
+            cursor=request.args.get("cursor"),
+            per_page=10,
+            descending=sort_by != "date_asc",
+            count_key=("admin.manage_portfolio_item", search, selected_category, status)
+        )
+        items = keyset.items
+    else:
+        query = query.order_by(sort_options.get(sort_by, PortfolioItem.date.desc()))
+        pagination = query.paginate(page=page, per_page=10)
+        items = pagination.items
 
     # ✅ Hämta unika kategorier för filter-dropdown
     categories = Category.query.order_by(Category.title).all()
@@ -1019,6 +1056,7 @@ def manage_portfolio_item():
         "admin/manage_portfolio_item.html",
         items=items,
         pagination=pagination,
+        keyset=keyset,
         search=search,
         selected_category=selected_category,
         selected_status=status,
@@ -1081,13 +1119,15 @@ def bulk_delete_posts():
 @roles_required("admin")
 def trigger_blog_mail():
     """
-    Manuell körning av schemalagda bloggmails (max 10 åt gången).
-    Använder samma funktion som schemalagd automatisk körning.
+    Manuell körning av schemalagda bloggmails.
+    Köar väntande inlägg (samma funktion som schemalagd körning) och
+    tömmer utskickskön i bakgrunden så att requesten inte blockeras.
     """
     current_app.logger.info("🖱️ MANUELL mailkörning startad av admin (knappen klickad)")
     try:
-        check_and_send_blog_emails()  # ✅ Kallar på funktionen i utils.py
-        flash("✅ Bloggmail har skickats (max 10 blogginlägg).", "success")
+        queued = check_and_send_blog_emails()  # ✅ Kallar på funktionen i utils.py
+        mail_outbox.drain_in_background()
+        flash(f"✅ Bloggmail för {queued} inlägg köades – utskicket pågår i bakgrunden.", "success")
     except Exception as e:
         current_app.logger.error(f"❌ Manuell mailkörning misslyckades: {e}")
         flash("❌ Ett fel uppstod vid försök att skicka mail.", "danger")
@@ -1102,29 +1142,18 @@ def trigger_blog_mail():
 def view_statistics():
     """
     Visa statistik för visningar av:
-    - Blogginlägg (sorterade efter flest visningar)
-    - Vanliga sidor (sorterade efter flest visningar)
-    - Portfolio (inklusive totalantal för portfolio)
+    - Blogginlägg, vanliga sidor och portfolio (topplistor + totaler)
+    - Trend per dag/vecka/månad från daily_stats
+    ?days=7|30|90|all väljer period, ?bucket=day|week|month trendens upplösning.
+    Queries: se app/utils/stats_queries.py (bara id, titel och visningar).
     """
+    from app.utils import stats_queries as sq
 
-    # ✅ Hämta alla blogginlägg sorterade efter visningar (högst först)
-    blog_posts = BlogPost.query.order_by(BlogPost.views.desc()).all()
-
-    # ✅ Hämta alla vanliga sidor (exkluderar portfolio)
-    pages = PageView.query.filter(PageView.page.notlike("portfolio_%")).order_by(PageView.views.desc()).all()
-
-    portfolio_views = PageView.query.filter(PageView.page.like("portfolio_%")).order_by(PageView.views.desc()).all()
-    portfolio_data = []          # Lista med {"title": ..., "views": ...}
-    total_portfolio_views = 0    # Summerar alla visningar på portfolio
-
-    # ✅ Loopar genom portfolio-sidor och hämtar titlar
-    for view in portfolio_views:
-        item_id = view.page.split("_")[1]                           # Exempel: "portfolio_5" → ID = 5
-        item = PortfolioItem.query.get(item_id)
-        if item:
-            portfolio_data.append({"title": item.title,             # Namn på portfolio-inlägget
-                                   "views": view.views})            # Antal visningar
-            total_portfolio_views += view.views                     # ✅ Addera till totalen
+    period = sq.resolve_period(request.args.get("days"))
+    limit = current_app.config.get("STATS_TOP_N", 25)
+    bucket = request.args.get("bucket")
+    if bucket not in sq.BUCKETS:
+        bucket = sq.auto_bucket(period, sq.first_stats_date() if period.start is None else None)
 
     # ✅ Mappning för att visa svenska namn på sidor
     page_name_map = {
@@ -1146,12 +1175,54 @@ def view_statistics():
         "blog": url_for("blog.index"),
     }
 
+    from app.utils.user_agents import ua_classifier
+
     return render_template(
         "admin/view_statistics.html",
-        blog_posts=blog_posts,
-        pages=pages,
-        portfolio_data=portfolio_data,
-        total_portfolio_views=total_portfolio_views,
+        bot_stats=ua_classifier.stats(),  # ✅ Bottrafik sedan omstart (per process)
+        blog_posts=sq.top_posts(period, limit),
+        pages=sq.top_pages(period, limit),
+        portfolio_data=sq.top_portfolio(period, limit),
+        summaries=sq.summaries(period),
+        trend=sq.trend(period, bucket),
+        bucket=bucket,
+        top_n=limit,
+        period_label=period.label,
+        selected_days=period.key,
         page_name_map=page_name_map,      # ✅ Skickar mappning av sidnamn
         page_url_map=page_url_map         # ✅ Skickar URL-mappning
-    )
\ No newline at end of file
+    )
+
+# ======================
+# ✅ ADMIN – PRESTANDA (QUERIES & SVARSTIDER)
+# ======================
+@admin_bp.route("/performance")
+@login_required
+@roles_required("admin")
+def performance():
+    """
+    Visa svarstider (p50/p95/p99), databastid och antal queries per endpoint,
+    de senaste långsamma queries samt anslutningspooler och repliker.
+    Mäts per process sedan senaste omstart.
+    """
+    return render_template(
+        "admin/performance.html",
+        endpoints=profiler.endpoint_report(),
+        slow_queries=list(profiler.recent_slow),
+        slow_query_ms=profiler.slow_query_ms,
+        pools=db_router.pool_stats(),
+        router=db_router,
+        reset_form=EmptyForm()
+    )
+
+
+@admin_bp.route("/performance/reset", methods=["POST"])
+@login_required
+@roles_required("admin")
+def reset_performance():
+    """Nollställ mätningarna (t.ex. efter en deploy)."""
+    form = EmptyForm()
+    if form.validate_on_submit():
+        profiler.reset()
+        flash("✅ Prestandamätningarna är nollställda.", "success")
+    return redirect(url_for("admin.performance"))
@@ -11,6 +11,7 @@ from app.extensions import db, login_manager, mail
 from app.models import User, Comment, BlogPost
 from app.forms import RegisterForm, LoginForm, RequestResetForm, ResetPasswordForm, DeleteForm
 from app.forms.auth_forms import SetPasswordForm
+from app.utils.principal_cache import principal_cache
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -37,8 +38,8 @@ def verify_token(token, expiration=3600):
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Ladda en användare baserat på användar-ID (för Flask-Login)."""
-    return User.query.get(int(user_id))
+    """Ladda en användare baserat på användar-ID (för Flask-Login), via principal-cachen."""
+    return principal_cache.load(int(user_id))
 
 
 # ======================
@@ -151,8 +152,8 @@ def delete_account():
     """Radera kontot permanent (GDPR)."""
     user = current_user
 
-    # ✅ Ta bort kommentarer och användare
-    Comment.query.filter_by(author_id=user.id).delete()
+    # ✅ Ta bort användaren – kommentarer och inlägg raderas via kaskaden på User
+    # (som objekt, så att adminpanelens nyckeltal räknas ned i samma commit)
     db.session.delete(user)
     db.session.commit()
 
@@ -2,17 +2,15 @@
 # ================================================
 # ✅ IMPORTER & KONFIGURATION
 # ================================================
-import os
-import uuid
 import logging
 import pytz
 from math import ceil
-from PIL import Image
 from datetime import datetime, timezone
 
 from flask import Blueprint, render_template, redirect, url_for, current_app, flash, request, abort, jsonify
 from flask_login import login_required, current_user
 from babel.dates import format_datetime
+from sqlalchemy import case
 
 from app.blog.utils import notify_subscribers
 from app.decorators import roles_required
@@ -21,8 +19,15 @@ from app.forms import BlogPostForm, CommentForm, DeleteForm, CategorySelectForm,
 from app.models import BlogPost, Comment, User, BlogCategory, Role
 from app.utils.time import get_local_now, DEFAULT_TZ
 from app.utils.image_utils import save_image, delete_existing_image, _handle_quill_upload
-from app.utils.helpers import sanitize_html
-from app.utils.views import increment_post_views
+from app.utils.image_pipeline import image_pipeline
+from app.utils.media_library import media_library
+from app.utils.helpers import sanitize_html, make_excerpt
+from app.utils.conditional import blog_index_validators, conditional_get, post_validators
+from app.utils.views import increment_post_views, register_post_view
+from app.utils.page_cache import page_cache
+from app.utils.search import MAX_HITS, search_ranking
+from app.utils.pagination import paginate_keyset, keyset_requested
+from app.utils.loading import load_profile
 
 # ✅ Flask Blueprint för bloggen
 blog_bp = Blueprint('blog', __name__, url_prefix='/blog')
@@ -47,6 +52,8 @@ def allowed_file(filename):
 # ================================================
 @blog_bp.route("/")
 @blog_bp.route("/page/<int:page>")
+@conditional_get.conditional(blog_index_validators)
+@page_cache.cached("blog")
 def index(page=1):
     """
     Lista alla publicerade blogginlägg:
@@ -55,13 +62,15 @@ def index(page=1):
     """
     POSTS_PER_PAGE = 12
 
-    sort_order = request.args.get("sort", "desc")
     search_term = request.args.get("search", "").strip()
+    sort_order = request.args.get("sort", "relevance" if search_term else "desc")
     category_filter = request.args.get("category", type=int)
 
     # Bas‐query: bara publicerade inlägg
     now = get_local_now()
-    base_q = BlogPost.query.filter(BlogPost.created_at <= now)
+    base_q = (BlogPost.query
+              .filter(BlogPost.created_at <= now)
+              .options(*load_profile("post_card")))  # Kategori i samma query, ingen body
 
     # Hämta alla riktiga kategorier ur blog_categories
     cats = BlogCategory.query.order_by(BlogCategory.title).all()
@@ -79,27 +88,41 @@ def index(page=1):
     if category_filter:
         base_q = base_q.filter(BlogPost.category_id == category_filter)
 
-    # Applicera sök-filter om satt
+    # Applicera sök-filter om satt (rankat fulltextindex, se app/utils/search.py)
+    ranking, search_truncated = {}, False
     if search_term:
-        base_q = base_q.filter(
-            db.or_(
-                BlogPost.title.ilike(f"%{search_term}%"),
-                BlogPost.subtitle.ilike(f"%{search_term}%"),
-                BlogPost.body.ilike(f"%{search_term}%"),
-            )
+        ranking, search_truncated = search_ranking("post", search_term)
+        base_q = base_q.filter(BlogPost.id.in_(list(ranking) or [-1]))
+
+    # Keyset-paginering (cursor) för datumsortering, se app/utils/pagination.py
+    keyset = None
+    by_relevance = sort_order == "relevance" and ranking
+    if not by_relevance and keyset_requested():
+        keyset = paginate_keyset(
+            base_q, BlogPost.created_at, BlogPost.id,
+            cursor=request.args.get("cursor"),
+            per_page=POSTS_PER_PAGE,
+            descending=sort_order != "asc",
+            count_key=("blog.index", category_filter, search_term)
         )
+        posts, total_pages = keyset.items, keyset.total_pages
+    else:
+        # Sortering
+        if by_relevance:
+            order_func = case(ranking, value=BlogPost.id)
+        elif sort_order == "asc":
+            order_func = BlogPost.created_at.asc()
+        else:
+            order_func = BlogPost.created_at.desc()
+        base_q = base_q.order_by(order_func)
 
-    # Sortering
-    order_func = BlogPost.created_at.asc() if sort_order == "asc" else BlogPost.created_at.desc()
-    base_q = base_q.order_by(order_func)
-
-    # Paginering
-    total_posts = base_q.count()
-    posts = (base_q
-             .offset((page - 1) * POSTS_PER_PAGE)
-             .limit(POSTS_PER_PAGE)
-             .all())
-    total_pages = (total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+        # Paginering
+        total_posts = base_q.count()
+        posts = (base_q
+                 .offset((page - 1) * POSTS_PER_PAGE)
+                 .limit(POSTS_PER_PAGE)
+                 .all())
+        total_pages = (total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
 
     # Radera‐formulär
     delete_form = DeleteForm()
@@ -110,13 +133,18 @@ def index(page=1):
         posts=posts,
         page=page,
         total_pages=total_pages,
+        keyset=keyset,
         sort_order=sort_order,
         category_form=category_form,
         current_category=category_filter,
-        delete_form=delete_form
+        delete_form=delete_form,
+        search_truncated=search_truncated,
+        max_hits=MAX_HITS
     )
 
 @blog_bp.route("/post/<int:post_id>", methods=["GET", "POST"])
+@conditional_get.conditional(post_validators, on_hit=lambda post_id: register_post_view(post_id))
+@page_cache.cached("blog", on_hit=lambda post_id: register_post_view(post_id))
 def show_post(post_id):
     """
     Visa ett specifikt blogginlägg:
@@ -124,7 +152,10 @@ def show_post(post_id):
     - Låt användare skriva nya kommentarer
     - Visa relaterade senaste inlägg
     """
-    post = BlogPost.query.get_or_404(post_id)
+    post = (BlogPost.query
+            .options(*load_profile("post_detail"))
+            .filter_by(id=post_id)
+            .first_or_404())
     now = get_local_now()
 
     # ✅ Databastiderna är redan i UTC (inget behov av manuell konvertering här)
@@ -132,6 +163,7 @@ def show_post(post_id):
 
     # Ladda senaste inlägg för sidfoten
     recent_query = (BlogPost.query
+                    .options(*load_profile("post_teaser"))
                     .filter(BlogPost.id != post_id)
                     .filter(BlogPost.created_at <= now)
                     .order_by(BlogPost.created_at.desc()))
@@ -212,10 +244,12 @@ def new_post():
             return render_template("blog/new_post.html", form=form)
 
         # --- Skapa nytt inlägg ---
+        body = sanitize_html(form.body.data)
         new_post = BlogPost(
             title=form.title.data,
             subtitle=form.subtitle.data,
-            body=sanitize_html(form.body.data),
+            body=body,
+            excerpt=make_excerpt(body),  # ✅ Förberäknat utdrag för listorna
             created_at=post_created_at_utc,  # ✅ Sparar i UTC
             updated_at=None,
             img_url=img_url,
@@ -305,6 +339,7 @@ def edit_post(post_id):
         post.title = form.title.data
         post.subtitle = form.subtitle.data
         post.body = sanitize_html(form.body.data)
+        post.excerpt = make_excerpt(post.body)
         post.category_id = form.category.data
         
         # Sätt alltid updated_at när man redigerar
@@ -352,8 +387,8 @@ def delete_post(post_id):
 def upload_image():
     """
     Ladda upp en bild via editor (t.ex. Quill):
-    - Konverterar alltid till WEBP
-    - Sätter unik fil med timestamp
+    - Sparas via bildpipelinen: WEBP + mindre storlekar för srcset
+    - Filnamnet är en hash av innehållet (samma bild sparas en gång)
     """
     file = request.files.get("image")
 
@@ -367,19 +402,9 @@ def upload_image():
         return jsonify({'error': 'Filen är för stor'}), 400
 
     try:
-        from io import BytesIO
-        from datetime import datetime
-        image = Image.open(BytesIO(file_content)).convert("RGB")
-
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{uuid.uuid4().hex}.webp"
-
-        upload_dir = os.path.join(current_app.static_folder, "uploads", "blog")
-        os.makedirs(upload_dir, exist_ok=True)
-
-        full_path = os.path.join(upload_dir, filename)
-        image.save(full_path, "WEBP", quality=85)
-
+        filename = image_pipeline.save(file_content, folder="uploads/blog")
+        media_library.register(f"uploads/blog/{filename}")
+        db.session.commit()
         image_url = url_for('static', filename=f"uploads/blog/{filename}")
         logger.info(f"Bild uppladdad och konverterad: {image_url}")
         return jsonify({'url': image_url})
@@ -396,28 +421,42 @@ def upload_image():
 def posts_by_category(slug, page=1):
     """
     Visa blogginlägg filtrerade på en specifik kategori:
-    - Filtrerar via kategori-slug
-    - Stöd för paginering
+    - Filtrerar via kategorins URL-namn (BlogCategory.name)
+    - Stöd för paginering (sidnummer eller keyset-cursor)
     - Sorteringsval (asc/desc)
     """
-    # --- Hämta kategori baserat på slug ---
-    category = BlogCategory.query.filter_by(slug=slug).first_or_404()
+    # --- Hämta kategori baserat på URL-namnet ---
+    category = BlogCategory.query.filter_by(name=slug).first_or_404()
 
     # --- Hämta sorteringsordning (default: senaste först) ---
     sort_order = request.args.get('sort', 'desc')  # 'desc' som standard
 
-    # --- Filtrera inlägg på kategori ---
-    query = BlogPost.query.filter_by(category=category)
-    query = query.order_by(
-        BlogPost.created_at.asc() if sort_order == 'asc' else BlogPost.created_at.desc()
-    )
+    # --- Filtrera publicerade inlägg på kategori ---
+    query = (BlogPost.query
+             .options(*load_profile("post_card"))
+             .filter_by(category=category)
+             .filter(BlogPost.created_at <= get_local_now()))
 
     # --- Paginering ---
-    total_posts = query.count()
-    start = (page - 1) * POSTS_PER_PAGE
-    posts = query.slice(start, start + POSTS_PER_PAGE).all()
-    total_pages = (total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
+    keyset = None
+    if keyset_requested():
+        keyset = paginate_keyset(
+            query, BlogPost.created_at, BlogPost.id,
+            cursor=request.args.get("cursor"),
+            per_page=POSTS_PER_PAGE,
+            descending=sort_order != 'asc',
+            count_key=("blog.posts_by_category", category.id)
+        )
+        posts, total_pages = keyset.items, keyset.total_pages
+    else:
+        query = query.order_by(
+            BlogPost.created_at.asc() if sort_order == 'asc' else BlogPost.created_at.desc()
+        )
+        total_posts = query.count()
+        start = (page - 1) * POSTS_PER_PAGE
+        posts = query.slice(start, start + POSTS_PER_PAGE).all()
+        total_pages = (total_posts + POSTS_PER_PAGE - 1) // POSTS_PER_PAGE
 
     # --- Rendera kategorisida ---
-    return render_template("blog/layout.html", posts=posts, category=category,
-                           page=page, total_pages=total_pages, sort_order=sort_order)
\ No newline at end of file
+    return render_template("blog/posts_by_category.html", posts=posts, category=category,
+                           page=page, total_pages=total_pages, keyset=keyset, sort_order=sort_order)
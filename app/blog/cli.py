@@ -1,14 +1,63 @@
 # app/blog/cli.py
+import time
+
 import click
 from flask.cli import with_appcontext
 from app.blog.utils import check_and_send_blog_emails
+from app.utils.mail_outbox import mail_outbox
+
+
+def _print_stats(stats):
+    click.echo(
+        f"📧 {stats['sent']} skickade ({stats['per_second']}/s), "
+        f"{stats['retried']} försöks igen, {stats['failed']} misslyckades"
+    )
+
 
 @click.command("send-blog-mails")
 @with_appcontext
 def send_blog_mails():
-    """Skicka e-post om nya blogginlägg (max 10 åt gången)."""
+    """Köa mail för nya blogginlägg och skicka allt som väntar i utskickskön."""
     try:
-        check_and_send_blog_emails()
-        click.echo("✅ Blog emails checked and sent")
+        queued = check_and_send_blog_emails()
+        click.echo(f"✅ Köade mail för {queued} inlägg")
+        _print_stats(mail_outbox.drain())
     except Exception as e:
-        click.echo(f"❌ Error: {e}")
\ No newline at end of file
+        click.echo(f"❌ Error: {e}")
+
+
+@click.command("mail-worker")
+@click.option("--once", is_flag=True, help="Töm kön en gång och avsluta")
+@click.option("--connections", type=int, help="Antal SMTP-anslutningar (default: MAIL_OUTBOX_CONNECTIONS)")
+@click.option("--interval", default=10.0, show_default=True, help="Sekunder mellan varven")
+@click.option("--status", "show_status", is_flag=True, help="Visa antal leveranser per status")
+@click.option("--requeue-unknown", is_flag=True, help="Lägg avbrutna (unknown) leveranser i kön igen")
+@with_appcontext
+def mail_worker(once, connections, interval, show_status, requeue_unknown):
+    """
+    Kör utskickskön för bloggmail.
+
+    ✅ Användning:
+        flask mail-worker                 # Körs tills den stoppas (t.ex. som systemd-tjänst)
+        flask mail-worker --once          # Töm kön och avsluta
+        flask mail-worker --status
+    """
+    from app.extensions import db
+
+    if show_status:
+        for status, n in sorted(mail_outbox.status().items()):
+            click.echo(f"{status:>8}: {n}")
+        return
+    if requeue_unknown:
+        click.echo(f"↩️  {mail_outbox.requeue_unknown()} leveranser lagda i kön igen")
+        return
+
+    while True:
+        mail_outbox.enqueue_due_posts()
+        stats = mail_outbox.drain(connections=connections)
+        if stats["sent"] or stats["failed"] or stats["retried"]:
+            _print_stats(stats)
+        if once:
+            return
+        db.session.remove()
+        time.sleep(interval)
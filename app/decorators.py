@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import abort
+from flask import abort, current_app
 from flask_login import current_user
 
 
@@ -22,22 +22,26 @@ def roles_required(*role_names):
     Funktion:
     ---------
     - Kontrollerar att användaren är inloggad (`current_user.is_authenticated`).
-    - Kontrollerar att användaren har minst en av de angivna rollerna.
+    - Kontrollerar att användaren har minst en av de angivna rollerna
+      (mängdoperation på `current_user.role_names`, inga queries).
     - Returnerar **403 Forbidden** om användaren saknar rättigheter.
 
     Debug:
     ------
-    - Skriver ut användarens e-post och alla roller i konsolen (för felsökning).
+    - Nekade användare loggas med e-post och roller på debug-nivå.
     """
 
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # 🔍 DEBUG: Visar vem som försöker nå sidan och vilka roller den har
-            print("DEBUG USER:", current_user.email, [r.name for r in current_user.roles])
-
             # ❌ Om användaren inte är inloggad eller saknar nödvändig roll → avbryt
-            if not current_user.is_authenticated or not any(current_user.has_role(r) for r in role_names):
+            if not current_user.is_authenticated or current_user.role_names.isdisjoint(role_names):
+                # 🔍 Loggas på debug-nivå: vem som nekades och vilka roller den har
+                if current_user.is_authenticated:
+                    current_app.logger.debug(
+                        f"403 för {current_user.email}: roller {sorted(current_user.role_names)}, "
+                        f"kräver {list(role_names)}"
+                    )
                 return abort(403)
 
             # ✅ Annars körs den faktiska funktionen
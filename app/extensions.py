@@ -5,6 +5,7 @@ from flask_mail import Mail
 from flask_wtf import CSRFProtect
 from flask_migrate import Migrate
 from flask_babel import Babel
+from app.utils.db_router import RoutingSession
 
 # ===================================================
 # ✅ Flask-extensions initieras här
@@ -16,7 +17,8 @@ from flask_babel import Babel
 csrf = CSRFProtect()
 
 # 🗄️ Databashantering via SQLAlchemy
-db = SQLAlchemy()
+# Sessionen skickar publika läsningar till en replika om sådana är konfigurerade (se app/utils/db_router.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # 🔑 Inloggningshantering för Flask-login
 login_manager = LoginManager()
@@ -1,12 +1,18 @@
 # app/models.py
 from flask_login import UserMixin
-from sqlalchemy import DateTime, Column, String, Text, Integer, ForeignKey, Boolean
+from sqlalchemy import DateTime, Column, String, Text, Integer, ForeignKey, Boolean, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.mysql import LONGTEXT
 from app.extensions import db
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
+# LONGTEXT i MySQL, vanlig TEXT i övriga databaser (t.ex. SQLite i tester)
+LongText = Text().with_variant(LONGTEXT(), "mysql")
+
+# Max längd på förberäknade textutdrag (BlogPost.excerpt)
+EXCERPT_LENGTH = 300
+
 
 # ================================================
 # ✅ KOPPLINGSTABELL MELLAN ANVÄNDARE OCH ROLLER
@@ -63,14 +69,31 @@ class User(UserMixin, db.Model):
         self._is_active = value
 
     # === Rollhantering ===
+    @property
+    def role_names(self):
+        """
+        Rollnamnen som frozenset. Sätts direkt av principal-cachen vid inloggning,
+        annars byggs den en gång från `roles` (och nollställs när rollerna ändras).
+        """
+        names = self.__dict__.get("_role_names")
+        if names is None:
+            names = self._role_names = frozenset(role.name for role in self.roles)
+        return names
+
     def has_role(self, role_name):
         """Kolla om användaren har en viss roll."""
-        return any(role.name == role_name for role in self.roles)
+        return role_name in self.role_names
 
     def add_role(self, role_name):
         """Lägg till en roll om den inte finns."""
-        role = Role.query.filter_by(name=role_name).first()
-        if role and role not in self.roles:
+        if role_name in self.role_names:
+            return
+        # 🗂️ Rolltabellen är liten – läs alla en gång per session istället för en query per anrop
+        roles = db.session.info.get("roles_by_name")
+        if roles is None:
+            roles = db.session.info["roles_by_name"] = {role.name: role for role in Role.query.all()}
+        role = roles.get(role_name)
+        if role is not None:
             self.roles.append(role)
 
     def remove_role(self, role_name):
@@ -93,6 +116,14 @@ class User(UserMixin, db.Model):
             db.session.delete(post)
         db.session.delete(self)
 
+
+@event.listens_for(User.roles, "append")
+@event.listens_for(User.roles, "remove")
+@event.listens_for(User.roles, "bulk_replace")
+def _reset_role_names(user, *args):
+    """Rollerna ändrades → bygg om User.role_names vid nästa anrop."""
+    user.__dict__.pop("_role_names", None)
+
 # ================================================
 # ✅ BLOGGINLÄGG
 # ================================================
@@ -106,7 +137,8 @@ class BlogPost(db.Model):
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), nullable=True)  # Viktigt: nullable=True för CLI-kommandon
     views = db.Column(db.Integer, default=0, nullable=False)
-    body = Column(LONGTEXT, nullable=False)
+    body = Column(LongText, nullable=False)
+    excerpt = Column(String(EXCERPT_LENGTH), nullable=True)  # Ren text från body, sätts vid sparande
     img_url = Column(String(250), nullable=False)
     email_sent = Column(Boolean, default=False)
 
@@ -117,6 +149,14 @@ class BlogPost(db.Model):
     author = relationship("User", back_populates="posts")
     comments = db.relationship("Comment", back_populates="post", cascade="all, delete-orphan")
 
+    # Publika listor filtrerar created_at <= nu och sorterar på (created_at, id); se `flask db-audit`
+    __table_args__ = (
+        db.Index("ix_blog_posts_created_id", "created_at", "id"),
+        db.Index("ix_blog_posts_category_created", "category_id", "created_at"),
+        db.Index("ix_blog_posts_email_sent_created", "email_sent", "created_at"),
+        db.Index("ix_blog_posts_author", "author_id"),
+    )
+
 # ================================================
 # ✅ BLOGGKATEGORIER
 # ================================================
@@ -129,6 +169,7 @@ class BlogCategory(db.Model):
     title = db.Column(db.String(100), nullable=False)             # Visningsnamn
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.String(250), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag/Last-Modified
 
     # Relation
     posts = db.relationship("BlogPost", back_populates="category", cascade="all, delete")
@@ -156,6 +197,13 @@ class Comment(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey("users.id"))
     comment_author = db.relationship("User")
 
+    # Flaggade kommentarer på adminpanelen hämtas nyast först, en sida i taget
+    __table_args__ = (
+        db.Index("ix_comments_flagged_id", "flagged", "id"),
+        db.Index("ix_comments_post_created", "post_id", "date_created"),
+        db.Index("ix_comments_author", "author_id"),
+    )
+
 # ================================================
 # ✅ PORTFOLIO-KATEGORIER
 # ================================================
@@ -168,6 +216,7 @@ class Category(db.Model):
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.String(100), nullable=True)  # Genrebild för kategorin
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag/Last-Modified
 
     # Relation
     items = db.relationship('PortfolioItem', back_populates='category_obj', lazy=True)
@@ -181,14 +230,21 @@ class PortfolioItem(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    description = db.Column(LONGTEXT, nullable=False)
+    description = db.Column(LongText, nullable=False)
     image = db.Column(db.String(100))  # Unik bild för varje projekt
     date = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # ETag/Last-Modified
 
     # Relation
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
     category_obj = db.relationship('Category', back_populates='items')
 
+    # Listor sorteras på (date, id), kategorisidor filtrerar först på kategori
+    __table_args__ = (
+        db.Index("ix_portfolio_items_date_id", "date", "id"),
+        db.Index("ix_portfolio_items_category_date", "category_id", "date"),
+    )
+
 # ================================================
 # ✅ CV-INNEHÅLL
 # ================================================
@@ -230,4 +286,213 @@ class DailyStats(db.Model):
     views = db.Column(db.Integer, default=0, nullable=False)
     
     # Unik constraint: bara en rad per dag per sida
-    __table_args__ = (db.UniqueConstraint('date', 'page', name='_date_page_uc'),)
\ No newline at end of file
+    __table_args__ = (db.UniqueConstraint('date', 'page', name='_date_page_uc'),)
+
+
+class HourlyStats(db.Model):
+    """Visningar per timme och sida (UTC), byggs från view_events."""
+    __tablename__ = "hourly_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False, index=True)  # UTC, hel timme
+    page = db.Column(db.String(255), nullable=False)
+    views = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('hour', 'page', name='_hour_page_uc'),)
+
+
+class ViewEvent(db.Model):
+    """
+    Append-only logg över visningar: en rad per sida och buffert-flush.
+    Skrivs i samma transaktion som räknarna (se app/utils/view_buffer.py).
+    """
+    __tablename__ = "view_events"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # UTC, avrundad nedåt till hel timme
+    page = db.Column(db.String(255), nullable=False)
+    views = db.Column(db.Integer, default=1, nullable=False)
+
+    __table_args__ = (db.Index('ix_view_events_hour_page', 'hour', 'page'),)
+
+
+# ================================================
+# ✅ SÖKINDEX (INVERTERAT INDEX)
+# ================================================
+class SearchDocument(db.Model):
+    """Ett indexerat dokument (blogginlägg eller portfolio-projekt) och dess längd i termer."""
+    __tablename__ = "search_documents"
+
+    doc_type = db.Column(db.String(20), primary_key=True)  # "post" eller "portfolio"
+    doc_id = db.Column(db.Integer, primary_key=True)
+    length = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SearchTerm(db.Model):
+    """En postning i det inverterade indexet: term → dokument med viktad termfrekvens."""
+    __tablename__ = "search_terms"
+
+    # PK-ordningen (doc_type, term) gör att prefixsökning blir en indexerad intervallsökning.
+    # Binär kollation på MySQL: "mat"/"mät" är olika termer (och intervallet jämför bytevis)
+    doc_type = db.Column(db.String(20), primary_key=True)
+    term = db.Column(db.String(64).with_variant(db.String(64, collation="utf8mb4_bin"), "mysql"),
+                     primary_key=True)
+    doc_id = db.Column(db.Integer, primary_key=True)
+    tf = db.Column(db.Integer, nullable=False)
+    doc_length = db.Column(db.Integer, nullable=False)  # Denormaliserad för BM25 utan join
+
+    __table_args__ = (db.Index("ix_search_terms_doc", "doc_type", "doc_id"),)
+
+
+# ================================================
+# ✅ UTSKICKSKÖ FÖR BLOGGMAIL (OUTBOX)
+# ================================================
+class MailJob(db.Model):
+    """Ett utskick av ett blogginlägg till alla prenumeranter (se app/utils/mail_outbox.py)."""
+    __tablename__ = "mail_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey("blog_posts.id", ondelete="SET NULL"), unique=True)
+    subject = db.Column(db.String(300), nullable=False)
+    post_title = db.Column(db.String(250), nullable=False)
+    post_subtitle = db.Column(db.String(250), nullable=True)
+    post_url = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending → done
+    total = db.Column(db.Integer, nullable=False, default=0)
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+
+class MailDelivery(db.Model):
+    """
+    Leveransstatus per mottagare och utskick.
+    pending → sending → sent | pending (nytt försök) | failed | unknown (avbrutet mitt i sändning)
+    """
+    __tablename__ = "mail_deliveries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("mail_jobs.id", ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    email = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(1000), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    claim_token = db.Column(db.String(32), nullable=True)
+    claimed_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    sent_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("job_id", "user_id", name="_job_user_uc"),  # Samma mottagare köas aldrig två gånger
+        db.Index("ix_mail_deliveries_status_next", "status", "next_attempt_at"),
+        db.Index("ix_mail_deliveries_claim", "claim_token"),
+    )
+
+# ================================================
+# ✅ SCHEMALAGDA JOBB (SCHEDULER)
+# ================================================
+class SchedulerLock(db.Model):
+    """
+    Lås (lease) som avgör vilken process som kör schemalagda jobb.
+    Ägaren förnyar `expires_at` löpande – slutar den göra det tar en annan process över.
+    """
+    __tablename__ = "scheduler_locks"
+
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+
+class SchedulerJobRun(db.Model):
+    """Senaste körningen per schemalagt jobb (visas på adminpanelen)."""
+    __tablename__ = "scheduler_job_runs"
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    last_duration_ms = db.Column(db.Float, nullable=True)
+    last_status = db.Column(db.String(20), nullable=True)  # ok | error
+    last_result = db.Column(db.String(255), nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+    owner = db.Column(db.String(100), nullable=True)
+    runs = db.Column(db.Integer, nullable=False, default=0)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DashboardMetric(db.Model):
+    """Ett förberäknat nyckeltal för adminpanelen (se app/utils/dashboard_metrics.py)."""
+    __tablename__ = "dashboard_metrics"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime(timezone=True), nullable=False)  # Senaste fullständiga omräkning
+
+
+class MediaAsset(db.Model):
+    """En uppladdad bild (original, inte genererade storlekar) – se app/utils/media_library.py."""
+    __tablename__ = "media_assets"
+
+    id = db.Column(db.Integer, primary_key=True)
+    folder = db.Column(db.String(100), nullable=False)             # Relativt static, t.ex. "uploads/blog"
+    filename = db.Column(db.String(255), nullable=False)
+    size_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 av filen
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    reference_count = db.Column(db.Integer, nullable=False, default=0)  # Inlägg, projekt och kategorier som använder bilden
+
+    # Sortering inom en mapp och över alla mappar går via index
+    __table_args__ = (
+        db.UniqueConstraint("folder", "filename", name="_media_folder_filename_uc"),
+        db.Index("ix_media_assets_folder_created", "folder", "created_at"),
+        db.Index("ix_media_assets_folder_size", "folder", "size_bytes"),
+        db.Index("ix_media_assets_filename", "filename"),
+        db.Index("ix_media_assets_created_at", "created_at"),
+        db.Index("ix_media_assets_size_bytes", "size_bytes"),
+    )
+
+    @property
+    def static_path(self) -> str:
+        return f"{self.folder}/{self.filename}"
+
+
+class ImageReference(db.Model):
+    """En bild som används av ett inlägg, projekt, kategori eller CV (se app/utils/image_references.py)."""
+    __tablename__ = "image_references"
+
+    owner_type = db.Column(db.String(30), primary_key=True)   # "post", "portfolio", "category", "blog_category", "cv"
+    owner_id = db.Column(db.Integer, primary_key=True)
+    folder = db.Column(db.String(100), primary_key=True)
+    filename = db.Column(db.String(255), primary_key=True)
+
+    # Oanvända bilder hittas med NOT EXISTS på (folder, filename)
+    __table_args__ = (db.Index("ix_image_references_path", "folder", "filename"),)
+
+
+class ImageCleanupRun(db.Model):
+    """En körning av rensningen av oanvända bilder (visas med förlopp på adminsidan)."""
+    __tablename__ = "image_cleanup_runs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued | running | done | failed
+    dry_run = db.Column(db.Boolean, nullable=False, default=True)
+    grace_hours = db.Column(db.Integer, nullable=False, default=24)
+    requested_by = db.Column(db.String(100), nullable=True)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    total = db.Column(db.Integer, nullable=False, default=0)       # Oanvända bilder att gå igenom
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    freed_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    report = db.Column(db.Text, nullable=True)                     # En sökväg per rad (högst IMAGE_CLEANUP_REPORT_LIMIT)
+    error = db.Column(db.String(500), nullable=True)
+
+    @property
+    def progress(self) -> int:
+        """Förlopp i procent."""
+        if self.status == "done":
+            return 100
+        return round(100 * self.processed / self.total) if self.total else 0
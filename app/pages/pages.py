@@ -1,12 +1,10 @@
 # app/pages/pages.py
 from datetime import datetime
-# app/pages/pages.py
-from datetime import datetime
 
 import requests
 from flask import (
     Blueprint, render_template, flash, redirect, url_for,
-    request, current_app, Response
+    request, current_app, abort, send_file
 )
 from flask_login import current_user
 from flask_mail import Message
@@ -14,11 +12,11 @@ from flask_mail import Message
 from app.extensions import mail, db
 from app.forms import ContactForm
 from app.forms.shared_forms import CvEditForm
-from app.models import (
-    CVContent, BlogPost, PortfolioItem, Category, BlogCategory
-)
+from app.models import CVContent
 from app.utils.helpers import log_info
-from app.utils.views import increment_post_views, increment_page_view
+from app.utils.sitemap import sitemap_generator
+from app.utils.conditional import conditional_get, cv_validators
+from app.utils.views import increment_post_views
 
 pages_bp = Blueprint("pages", __name__)
 
@@ -89,6 +87,7 @@ def contact():
 
 
 @pages_bp.route("/cv", methods=["GET", "POST"])
+@conditional_get.conditional(cv_validators, on_hit=lambda: increment_post_views("cv"))
 def cv():
     user_email = getattr(current_user, "email", "anonymous")
     current_app.logger.info(f"Route /cv kördes av {user_email}")
@@ -147,71 +146,32 @@ def cv():
     })
 
 
+# ================================================
+# ✅ SITEMAP (genereras som fil, se app/utils/sitemap.py)
+# ================================================
+SITEMAP_MAX_AGE = 3600  # Crawlers frågar ändå om igen med If-None-Match
+
+
+def _send_sitemap(name):
+    """Skickar en fil ur aktuell version med ETag/Last-Modified (304 om oförändrad)."""
+    files = sitemap_generator.current()
+    path = files.path(name)
+    if path is None:
+        abort(404)
+    return send_file(path, mimetype="application/xml", etag=files.etag,
+                     last_modified=files.last_modified, conditional=True, max_age=SITEMAP_MAX_AGE)
+
+
 @pages_bp.route("/sitemap.xml")
 def sitemap():
-    increment_page_view()
-    pages = []
-    today = datetime.utcnow().date().isoformat()
-
-    # Statiska sidor
-    static_routes = [
-        ("pages.home", {}),
-        ("pages.about", {}),
-        ("pages.contact", {}),
-        ("pages.cv", {}),
-        ("portfolio.index", {}),
-        ("blog.index", {})
-    ]
-    for endpoint, values in static_routes:
-        pages.append({
-            "loc": url_for(endpoint, _external=True, **values),
-            "lastmod": today
-        })
-
-    # Blogginlägg
-    blog_posts = BlogPost.query.all()
-    for post in blog_posts:
-        lastmod = post.updated_at.date().isoformat() if post.updated_at else post.created_at.date().isoformat()
-        pages.append({
-            "loc": url_for("blog.show_post", post_id=post.id, _external=True),
-            "lastmod": lastmod
-        })
-
-    # Bloggkategorier
-    blog_categories = BlogCategory.query.all()
-    for cat in blog_categories:
-        pages.append({
-            "loc": url_for("blog.posts_by_category", category=cat.name, _external=True),
-            "lastmod": today
-        })
-
-    # Portfolio
-    portfolio_items = PortfolioItem.query.all()
-    for item in portfolio_items:
-        pages.append({
-            "loc": url_for("portfolio.item", item_id=item.id, _external=True),
-            "lastmod": item.date.date().isoformat()
-        })
-
-    # Portfoliokategorier
-    portfolio_categories = Category.query.all()
-    for cat in portfolio_categories:
-        pages.append({
-            "loc": url_for("portfolio.category_view", category=cat.name, _external=True),
-            "lastmod": today
-        })
-
-    sitemap_xml = render_sitemap(pages)
-    return Response(sitemap_xml, mimetype="application/xml")
-
-
-def render_sitemap(pages):
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>',
-           '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    for page in pages:
-        xml.append("  <url>")
-        xml.append(f"    <loc>{page['loc']}</loc>")
-        xml.append(f"    <lastmod>{page['lastmod']}</lastmod>")
-        xml.append("  </url>")
-    xml.append("</urlset>")
-    return "\n".join(xml)
\ No newline at end of file
+    """
+    Sitemap, eller sitemapindex när adresserna inte ryms i en fil.
+    - Räknas inte som sidvisning (besöks nästan bara av crawlers).
+    """
+    return _send_sitemap("sitemap.xml")
+
+
+@pages_bp.route("/sitemap-<int:part>.xml")
+def sitemap_part(part):
+    """Del av en uppdelad sitemap (listas i sitemapindex)."""
+    return _send_sitemap(f"sitemap-{part}.xml")
@@ -12,12 +12,18 @@ from app import db
 from app.decorators import roles_required
 from app.models import PortfolioItem, Category
 from app.forms import PortfolioForm, DeleteForm
-from app.utils.views import increment_post_views
+from app.utils.conditional import conditional_get, portfolio_category_validators, portfolio_item_validators
+from app.utils.views import increment_post_views, register_page_view
+from app.utils.page_cache import page_cache
+from app.utils.portfolio_order import portfolio_order
 from app.utils.image_utils import save_image, delete_existing_image, _handle_quill_upload
 from app.utils.time import get_local_now
+from app.utils.search import MAX_HITS, search_ranking
+from app.utils.pagination import paginate_keyset, keyset_requested
 from werkzeug.utils import secure_filename
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import or_, case
+from sqlalchemy.orm import joinedload
 from app.extensions import csrf
 
 # Skapa Blueprint för portfolio
@@ -31,6 +37,7 @@ POSTS_PER_PAGE = 12
 # ✅ INDEX – LISTA ALLA PORTFOLIO-PROJEKT
 # ================================================
 @portfolio_bp.route("/portfolio")
+@page_cache.cached("portfolio", on_hit=lambda **_: register_page_view("portfolio"))
 def index(page=1):
     """
     Visa en lista med alla portfolio-projekt:
@@ -41,6 +48,7 @@ def index(page=1):
     """
     increment_post_views("portfolio")
     PER_PAGE = 8
+    page = request.args.get("page", page, type=int)
 
     # --- Hämta filter & sökparametrar ---
     sort_order     = request.args.get('sort',   'desc')
@@ -53,33 +61,39 @@ def index(page=1):
     # --- Basquery ---
     q = PortfolioItem.query
 
-    # --- Fritextsökning (dela upp ord för bättre träffar) ---
+    # --- Fritextsökning (rankat fulltextindex, alla ord måste matcha) ---
+    ranking, search_truncated = {}, False
     if search:
-        # Dela upp på mellanslag så att alla ord måste matcha
-        words = search.split()
-        for w in words:
-            pattern = f"%{w}%"
-            q = q.filter(
-                or_(
-                    PortfolioItem.title.ilike(pattern),
-                    PortfolioItem.description.ilike(pattern)
-                )
-            )
+        ranking, search_truncated = search_ranking("portfolio", search)
+        q = q.filter(PortfolioItem.id.in_(list(ranking) or [-1]))
 
     # --- Filtrering på kategori ---
     if category_id:
         q = q.filter(PortfolioItem.category_id == category_id)
 
-    # --- Sortering ---
-    if sort_order == 'asc':
-        q = q.order_by(PortfolioItem.date.asc())
+    # --- Sortering & paginering (sökträffar sorteras på relevans om inget annat valts) ---
+    keyset = None
+    by_relevance = ranking and 'sort' not in request.args
+    if not by_relevance and keyset_requested():
+        keyset = paginate_keyset(
+            q, PortfolioItem.date, PortfolioItem.id,
+            cursor=request.args.get("cursor"),
+            per_page=PER_PAGE,
+            descending=sort_order != 'asc',
+            count_key=("portfolio.index", category_id, search)
+        )
+        posts, total_pages = keyset.items, keyset.total_pages
     else:
-        q = q.order_by(PortfolioItem.date.desc())
+        if by_relevance:
+            q = q.order_by(case(ranking, value=PortfolioItem.id))
+        elif sort_order == 'asc':
+            q = q.order_by(PortfolioItem.date.asc())
+        else:
+            q = q.order_by(PortfolioItem.date.desc())
 
-    # --- Paginering ---
-    total = q.count()
-    posts = q.offset((page - 1) * PER_PAGE).limit(PER_PAGE).all()
-    total_pages = (total + PER_PAGE - 1) // PER_PAGE
+        total = q.count()
+        posts = q.offset((page - 1) * PER_PAGE).limit(PER_PAGE).all()
+        total_pages = (total + PER_PAGE - 1) // PER_PAGE
 
     # --- Senaste projekt för sidokolumnen ---
     recent_posts = (
@@ -96,62 +110,42 @@ def index(page=1):
         recent_posts      = recent_posts,
         page              = page,
         total_pages       = total_pages,
+        keyset            = keyset,
         sort_order        = sort_order,
         search            = search,
-        current_category  = category_id
+        current_category  = category_id,
+        search_truncated  = search_truncated,
+        max_hits          = MAX_HITS
     )
 
 # ================================================
 # ✅ VISA EN ENDAST PORTFOLIO-PROJEKT
 # ================================================
 @portfolio_bp.route("/portfolio/<int:item_id>")
+@conditional_get.conditional(portfolio_item_validators,
+                             on_hit=lambda item_id: register_page_view(f"portfolio_{item_id}"))
+@page_cache.cached("portfolio", on_hit=lambda item_id: register_page_view(f"portfolio_{item_id}"))
 def show_portfolio_item(item_id):
     """
     Visa ett enskilt portfolio-projekt:
     - Räknar visningar
-    - Laddar föregående och nästa projekt
+    - Föregående och nästa projekt baserat på datum
     - Paginering av övriga projekt (högerkolumn)
+    Projektet (med kategori) är den enda queryn – ordningen kommer från portfolio_order.
     """
-    item = PortfolioItem.query.get_or_404(item_id)
+    item = db.session.get(PortfolioItem, item_id, options=[joinedload(PortfolioItem.category_obj)])
+    if item is None:
+        abort(404)
 
     # ✅ Räkna visningar
     increment_post_views(f"portfolio_{item_id}")
 
-    # ✅ Senaste projekt för högerkolumnen
-    recent_posts = (
-        PortfolioItem.query
-        .order_by(PortfolioItem.date.desc())
-        .limit(5)
-        .all()
-    )
-
     # ✅ Föregående och nästa baserat på datum
-    prev_item = (
-        PortfolioItem.query
-        .filter(PortfolioItem.date < item.date)
-        .order_by(PortfolioItem.date.desc())
-        .first()
-    )
-    next_item = (
-        PortfolioItem.query
-        .filter(PortfolioItem.date > item.date)
-        .order_by(PortfolioItem.date.asc())
-        .first()
-    )
+    prev_item, next_item = portfolio_order.neighbours(item.id)
 
     # ✅ Högerkolumn: Paginering (visa 10 st)
     page = request.args.get("page", 1, type=int)
-    PER_PAGE = 10
-    total_posts = PortfolioItem.query.count()
-    total_pages = (total_posts + PER_PAGE - 1) // PER_PAGE
-
-    posts = (
-        PortfolioItem.query
-        .order_by(PortfolioItem.date.desc())
-        .offset((page - 1) * PER_PAGE)
-        .limit(PER_PAGE)
-        .all()
-    )
+    posts, total_pages = portfolio_order.page(page, per_page=10)
 
     return render_template(
         "portfolio/portfolio_item.html",
@@ -233,7 +227,7 @@ def edit_portfolio(item_id):
             elif action == "replace" and form.image.data:
                 # Spara ny bild som .webp och ta bort tidigare (om finns)
                 new_filename = save_image(form.image.data, folder="uploads/portfolio")
-                if item.image:
+                if item.image and item.image != new_filename:  # Samma innehåll ger samma filnamn
                     delete_existing_image(item.image, folder="uploads/portfolio")
                 item.image = new_filename
 
@@ -332,6 +326,7 @@ def debug_item(item_id):
 # ================================================
 @portfolio_bp.route("/portfolio/category/<string:category>")
 @portfolio_bp.route("/portfolio/category/<string:category>/page/<int:page>")
+@conditional_get.conditional(portfolio_category_validators)
 def category_view(category, page=1):
     """
     Visa portfolio-projekt baserat på kategori:
@@ -347,14 +342,26 @@ def category_view(category, page=1):
     query = PortfolioItem.query.filter_by(category_id=category_obj.id)
     if search:
         query = query.filter(PortfolioItem.title.ilike(f"%{search}%"))
-    if sort_order == 'asc':
-        query = query.order_by(PortfolioItem.date.asc())
+
+    keyset = None
+    if keyset_requested():
+        keyset = paginate_keyset(
+            query, PortfolioItem.date, PortfolioItem.id,
+            cursor=request.args.get("cursor"),
+            per_page=PER_PAGE,
+            descending=sort_order != 'asc',
+            count_key=("portfolio.category_view", category_obj.id, search)
+        )
+        posts, total_pages = keyset.items, keyset.total_pages
     else:
-        query = query.order_by(PortfolioItem.date.desc())
+        if sort_order == 'asc':
+            query = query.order_by(PortfolioItem.date.asc())
+        else:
+            query = query.order_by(PortfolioItem.date.desc())
 
-    total = query.count()
-    posts = query.offset((page - 1) * PER_PAGE).limit(PER_PAGE).all()
-    total_pages = (total + PER_PAGE - 1) // PER_PAGE
+        total = query.count()
+        posts = query.offset((page - 1) * PER_PAGE).limit(PER_PAGE).all()
+        total_pages = (total + PER_PAGE - 1) // PER_PAGE
 
     return render_template(
         "portfolio/portfolio_category_view.html",
@@ -364,6 +371,7 @@ def category_view(category, page=1):
         posts=posts,
         page=page,
         total_pages=total_pages,
+        keyset=keyset,
         sort_order=sort_order,
         search=search,
         current_category_obj=category_obj  # tillagt här
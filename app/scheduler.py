@@ -0,0 +1,279 @@
+# app/scheduler.py
+"""
+Inbyggd schemaläggare för bakgrundsjobb (APScheduler).
+
+Jobb:
+    blog_mail       – köar publicerade inlägg och tömmer utskickskön
+    flush_views     – skriver buffrade visningar till databasen
+    aggregate_stats – rollup av igår och idag till hourly_stats/daily_stats, rensar gamla händelser
+    dashboard       – räknar om adminpanelens nyckeltal (rättar drift från massändringar)
+
+Flera gunicorn-workers:
+    Varje worker startar en scheduler, men bara den som håller låset
+    (en rad i scheduler_locks med utgångstid) kör jobben. Ledaren förnyar
+    låset löpande; dör den tar en annan worker över när låset gått ut.
+    `flush_views` körs i alla workers eftersom varje process har sin egen buffert.
+
+Schedulern startar vid första requesten (inte i CLI-kommandon, tester
+eller reloaderns huvudprocess). Senaste körningen per jobb sparas i
+scheduler_job_runs och visas på adminpanelen.
+
+Användning:
+    from app.scheduler import scheduler
+
+    scheduler.run_job("aggregate_stats", force=True)   # Kör direkt, utan lås
+"""
+
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from flask import current_app
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import SchedulerJobRun, SchedulerLock
+
+LOCK_NAME = "scheduler"
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+# ===================================================
+# ✅ JOBBEN
+# ===================================================
+
+def _blog_mail_job():
+    """Köar inlägg vars publiceringsdatum passerat och skickar köade mail."""
+    from app.blog.utils import check_and_send_blog_emails
+    from app.utils.mail_outbox import mail_outbox
+
+    queued = check_and_send_blog_emails()
+    interval = current_app.config.get("SCHEDULER_MAIL_INTERVAL", 300)
+    stats = mail_outbox.drain(max_seconds=interval * 0.8)  # Hinner klart före nästa körning
+    return f"{queued} inlägg köade, {stats['sent']} mail skickade, {stats['failed']} misslyckade"
+
+
+def _flush_views_job():
+    from app.utils.view_buffer import view_buffer
+
+    return f"{view_buffer.flush()} visningar skrivna"
+
+
+def _aggregate_stats_job():
+    from app.utils.stats import prune_events, rollup_recent
+
+    yesterday, today = rollup_recent()
+    pruned = prune_events()
+    result = f"{yesterday} sidor igår, {today} sidor idag"
+    return f"{result}, {pruned} gamla händelser rensade" if pruned else result
+
+
+def _dashboard_job():
+    from app.utils.dashboard_metrics import dashboard_metrics
+
+    values = dashboard_metrics.refresh()
+    return f"{len(values)} nyckeltal omräknade"
+
+
+# ===================================================
+# ✅ SCHEDULER
+# ===================================================
+
+class Job:
+    """Ett registrerat jobb: funktion, intervall och om det kräver låset."""
+
+    def __init__(self, name: str, func: Callable, seconds: int, leader_only: bool = True):
+        self.name = name
+        self.func = func
+        self.seconds = seconds
+        self.leader_only = leader_only
+
+
+class JobScheduler:
+    """
+    ✅ Kör bakgrundsjobb med intervall och leader-lås i databasen.
+    - SCHEDULER_ENABLED: av/på (standard på)
+    - SCHEDULER_LOCK_TTL: sekunder innan ett övergivet lås kan tas över
+    - SCHEDULER_MAIL_INTERVAL / _FLUSH_INTERVAL / _STATS_INTERVAL: intervall i sekunder
+    - DASHBOARD_REFRESH_INTERVAL: hur ofta adminpanelens nyckeltal räknas om
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.jobs: Dict[str, Job] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lock_ttl = 90
+        self._scheduler: Optional[BackgroundScheduler] = None
+        self._start_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.lock_ttl = app.config.get("SCHEDULER_LOCK_TTL", 90)
+        self.jobs = {}
+        self.add_job("blog_mail", _blog_mail_job, app.config.get("SCHEDULER_MAIL_INTERVAL", 300))
+        self.add_job("flush_views", _flush_views_job, app.config.get("SCHEDULER_FLUSH_INTERVAL", 60),
+                     leader_only=False)
+        self.add_job("aggregate_stats", _aggregate_stats_job, app.config.get("SCHEDULER_STATS_INTERVAL", 3600))
+        self.add_job("dashboard", _dashboard_job, app.config.get("DASHBOARD_REFRESH_INTERVAL", 900))
+        app.extensions["scheduler"] = self
+
+        if app.config.get("SCHEDULER_ENABLED", True):
+            @app.before_request
+            def _start_scheduler():
+                if not app.testing and self._scheduler is None:
+                    self.start()
+
+    def add_job(self, name: str, func: Callable, seconds: int, leader_only: bool = True):
+        """Registrerar ett jobb (måste göras innan schedulern startar)."""
+        self.jobs[name] = Job(name, func, seconds, leader_only)
+
+    # === Start & stopp ===
+    def start(self):
+        """Startar bakgrundstråden (en gång per process)."""
+        with self._start_lock:
+            if self._scheduler is not None:
+                return
+            self._scheduler = BackgroundScheduler(
+                timezone="Europe/Stockholm",
+                job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 60},
+            )
+            for job in self.jobs.values():
+                self._scheduler.add_job(self.run_job, IntervalTrigger(seconds=job.seconds),
+                                        args=[job.name], id=job.name, name=job.name)
+            self._scheduler.add_job(self._heartbeat, IntervalTrigger(seconds=max(5, self.lock_ttl // 3)),
+                                    id="_heartbeat", next_run_time=datetime.now(timezone.utc))
+            self._scheduler.start()
+            atexit.register(self.shutdown)
+            self.app.logger.info(f"⏰ Scheduler startad ({self.owner}): {', '.join(self.jobs)}")
+
+    def shutdown(self):
+        """Stoppar schedulern och lämnar ifrån sig låset så att en annan worker kan ta över direkt."""
+        if self._scheduler is None:
+            return
+        self._scheduler.shutdown(wait=False)
+        self._scheduler = None
+        with self.app.app_context():
+            self.release()
+
+    # === Leader-lås ===
+    def acquire(self) -> bool:
+        """
+        ✅ Tar eller förnyar låset. Returnerar True om den här processen är ledare.
+        - En villkorad UPDATE lyckas bara för nuvarande ägare eller om låset gått ut.
+        - Finns ingen rad än skapas den; förlorar vi racet ger primärnyckeln IntegrityError.
+        """
+        table = SchedulerLock.__table__
+        now = _utcnow()
+        values = {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lock_ttl)}
+        with db.engine.begin() as conn:
+            claimed = conn.execute(
+                update(table)
+                .where(table.c.name == LOCK_NAME, or_(table.c.owner == self.owner, table.c.expires_at < now))
+                .values(**values)
+            ).rowcount
+            if claimed:
+                return True
+            if conn.execute(select(table.c.name).where(table.c.name == LOCK_NAME)).first():
+                return False
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table).values(name=LOCK_NAME, **values))
+            return True
+        except IntegrityError:
+            return False
+
+    def release(self):
+        table = SchedulerLock.__table__
+        with db.engine.begin() as conn:
+            conn.execute(update(table)
+                         .where(table.c.name == LOCK_NAME, table.c.owner == self.owner)
+                         .values(expires_at=_utcnow() - timedelta(seconds=1)))
+
+    def _heartbeat(self):
+        with self.app.app_context():
+            try:
+                self.acquire()
+            except Exception as e:
+                self.app.logger.error(f"❌ Scheduler-låset kunde inte förnyas: {e}")
+
+    # === Körning ===
+    def run_job(self, name: str, force: bool = False):
+        """
+        ✅ Kör ett jobb och sparar tid, status och resultat i scheduler_job_runs.
+        - Jobb som kräver låset hoppas över om en annan process är ledare (om inte `force`).
+        - Returnerar jobbets resultat, eller None om det hoppades över eller misslyckades.
+        """
+        job = self.jobs[name]
+        with self.app.app_context():
+            if job.leader_only and not force and not self.acquire():
+                return None
+
+            started_at = _utcnow()
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = job.func()
+            except Exception as e:
+                db.session.rollback()
+                error = str(e)
+                self.app.logger.error(f"❌ Schemalagt jobb '{name}' misslyckades: {e}", exc_info=True)
+            finally:
+                db.session.remove()
+            duration_ms = (time.perf_counter() - started) * 1000
+            self._record(name, started_at, duration_ms, result, error)
+            return result
+
+    def _record(self, name, started_at, duration_ms, result, error):
+        table = SchedulerJobRun.__table__
+        values = {
+            "last_started_at": started_at,
+            "last_duration_ms": round(duration_ms, 1),
+            "last_status": "error" if error else "ok",
+            "last_result": None if result is None else str(result)[:255],
+            "last_error": error[:500] if error else None,
+            "owner": self.owner,
+        }
+        counters = {"runs": table.c.runs + 1, "failures": table.c.failures + (1 if error else 0)}
+        with db.engine.begin() as conn:
+            if conn.execute(update(table).where(table.c.name == name).values(**values, **counters)).rowcount:
+                return
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table).values(name=name, runs=1, failures=1 if error else 0, **values))
+        except IntegrityError:
+            pass  # En annan process registrerade jobbet samtidigt – nästa körning uppdaterar
+
+    # === Status för admin ===
+    def status(self) -> List[dict]:
+        """Senaste körningen per registrerat jobb, i registreringsordning."""
+        runs = {run.name: run for run in SchedulerJobRun.query.all()}
+        return [
+            {"name": job.name, "interval": job.seconds, "leader_only": job.leader_only, "run": runs.get(job.name)}
+            for job in self.jobs.values()
+        ]
+
+    @staticmethod
+    def leader() -> Optional[SchedulerLock]:
+        """Nuvarande låsrad (ägare och utgångstid), eller None."""
+        return db.session.get(SchedulerLock, LOCK_NAME)
+
+    @property
+    def running(self) -> bool:
+        return self._scheduler is not None
+
+
+# 🧮 Delad instans – initieras i create_app()
+scheduler = JobScheduler()
@@ -0,0 +1,461 @@
+# app/utils/backup.py
+"""
+Säkerhetskopiering och återställning av sajtens innehåll (flask backup / flask restore).
+
+En backup är en katalog i BACKUP_DIR:
+    20260301-031500-123456-full/
+        manifest.json               – tabeller, radantal, checksummor, bilder, föregående backup
+        blog_posts.ndjson.gz        – en JSON-rad per databasrad
+        blog_posts.keys.ndjson.gz   – (inkrementell) alla nuvarande id, så att raderingar syns
+    files/ab/ab12…                  – uppladdade bilder, lagrade på innehållets SHA-256
+                                      (delas av alla backuper – samma bild sparas en gång)
+
+✅ Rader strömmas i bitar om BACKUP_CHUNK_SIZE – ingenting läses in helt i minnet
+✅ Inkrementell backup: bara rader ändrade sedan förra backupen (updated_at/created_at).
+   Tabeller utan ändringstid (användare, roller, kommentarer …) tas med i sin helhet.
+✅ Bilder som används (image_references) kopieras bara om innehållet är nytt
+✅ Återställning: bulk-insert i batchar; batcharna för tabeller som inte beror på
+   varandra skrivs parallellt (RESTORE_WORKERS trådar, SQLite alltid en tråd)
+
+Manifestet skrivs sist och katalogen döps om från `.partial` – en avbruten
+backup syns aldrig som klar. Härledda tabeller (sökindex, bildreferenser,
+media_assets, nyckeltal) säkerhetskopieras inte utan byggs om efter återställningen.
+
+Användning:
+    from app.utils.backup import backup_manager
+
+    manifest = backup_manager.backup(incremental=True)
+    stats = backup_manager.restore("latest")
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, inspect, select, text
+
+from app.extensions import db
+from app.models import ImageReference, MediaAsset
+
+MANIFEST = "manifest.json"
+FORMAT = 1
+COMPRESSLEVEL = 1  # Nivå 6 tog mer än halva backuptiden; nivå 1 ger något större filer
+
+# 🗂️ Tabeller i backupen → kolumner som visar när en rad ändrats (None = alltid hela tabellen).
+# Ordningen är insättningsordningen (föräldrar före barn).
+TABLES = {
+    "roles": None,
+    "users": None,
+    "user_roles": None,
+    "blog_categories": ("updated_at",),
+    "blog_posts": ("updated_at", "created_at"),
+    "comments": None,  # Moderering (visible/flagged) har ingen ändringstid
+    "categories": ("updated_at",),
+    "portfolio_items": ("updated_at",),
+    "cv_content": ("updated_at",),
+    "page_views": None,
+    "daily_stats": ("date",),
+    "hourly_stats": ("hour",),
+}
+
+# Rörs inte vid --replace: driftstabeller som inte hör till innehållet
+KEEP_ON_REPLACE = {"scheduler_locks", "scheduler_job_runs", "image_cleanup_runs"}
+
+
+# ===================================================
+# ✅ HJÄLPFUNKTIONER
+# ===================================================
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Kan inte spara {type(value).__name__} i backupen")
+
+
+def _dumps(row) -> str:
+    return json.dumps(row, default=_encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decoders(table) -> Dict[str, callable]:
+    """Kolumner vars JSON-värde måste tolkas tillbaka (datum och tider)."""
+    decoders = {}
+    for column in table.columns:
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        if python_type is datetime:
+            decoders[column.name] = datetime.fromisoformat
+        elif python_type is date:
+            decoders[column.name] = date.fromisoformat
+    return decoders
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _levels() -> List[List[str]]:
+    """Delar TABLES i nivåer där ingen tabell beror på en annan i samma nivå."""
+    placed, levels = set(), []
+    remaining = list(TABLES)
+    while remaining:
+        level = [name for name in remaining
+                 if all(fk.column.table.name in placed or fk.column.table.name not in TABLES
+                        for fk in db.metadata.tables[name].foreign_keys)]
+        levels.append(level)
+        placed.update(level)
+        remaining = [name for name in remaining if name not in placed]
+    return levels
+
+
+class _Inline:
+    """Kör "parallella" jobb direkt i tråden (SQLite, eller RESTORE_WORKERS=1)."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class BackupManager:
+    """
+    ✅ Skapar och återställer backuper i BACKUP_DIR.
+    - backup(): full eller inkrementell export av TABLES + använda bilder
+    - restore(): full återställning av en backup (och dess föregångare)
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.chunk_size = 2000
+        self.workers = 4
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get("BACKUP_DIR") or os.path.join(app.instance_path, "backups")
+        self.chunk_size = app.config.get("BACKUP_CHUNK_SIZE", 2000)
+        self.workers = app.config.get("RESTORE_WORKERS", 4)
+        app.extensions["backup_manager"] = self
+
+    # === Katalogen ===
+    def _blob(self, digest: str) -> str:
+        return os.path.join(self.directory, "files", digest[:2], digest)
+
+    def list_backups(self) -> List[dict]:
+        """Alla färdiga backuper, äldst först."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory)
+                       if os.path.isfile(os.path.join(self.directory, n, MANIFEST)))
+        return [self.load(name) for name in names]
+
+    def latest(self) -> Optional[dict]:
+        backups = self.list_backups()
+        return backups[-1] if backups else None
+
+    def load(self, name: str) -> dict:
+        path = os.path.join(self.directory, name, MANIFEST)
+        if not os.path.isfile(path):
+            raise ValueError(f"Backupen {name} finns inte i {self.directory}")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def chain(self, name: str) -> List[dict]:
+        """Backupen och alla den bygger på, från senaste fullbackup till och med `name`."""
+        chain = []
+        while name:
+            manifest = self.load(name)
+            chain.append(manifest)
+            name = manifest["base"]
+        return chain[::-1]
+
+    # ===================================================
+    # ✅ BACKUP
+    # ===================================================
+    def backup(self, incremental: bool = False, include_files: bool = True) -> dict:
+        """
+        ✅ Skriver en ny backup och returnerar manifestet.
+        Inkrementell utan tidigare backup blir en fullbackup.
+        """
+        started = datetime.now(timezone.utc)
+        previous = self.latest() if incremental else None
+        mode = "incremental" if previous else "full"
+        name = f"{started:%Y%m%d-%H%M%S-%f}-{'incr' if previous else 'full'}"  # Sorteras i tidsordning
+        root = os.path.join(self.directory, name)
+        partial = root + ".partial"
+        os.makedirs(partial)
+
+        # Ändringar under förra backupen tas med igen hellre än att missas
+        since = datetime.fromisoformat(previous["started_at"]).replace(tzinfo=None) if previous else None
+        manifest = {
+            "format": FORMAT,
+            "name": name,
+            "mode": mode,
+            "base": previous["name"] if previous else None,
+            "started_at": started.isoformat(),
+            "tables": {},
+            "files": {},
+        }
+
+        # En transaktion för alla tabeller: InnoDB (REPEATABLE READ) ger en konsekvent ögonblicksbild
+        with db.engine.connect() as conn, conn.begin():
+            manifest["schema"] = self._schema_revision(conn)
+            for table_name, change_columns in TABLES.items():
+                table = db.metadata.tables[table_name]
+                changed_only = since is not None and change_columns is not None
+                manifest["tables"][table_name] = self._export_table(
+                    conn, table, partial, since if changed_only else None, change_columns)
+
+        new_files = 0
+        if include_files:
+            manifest["files"], new_files = self._backup_files()
+        manifest["new_files"] = new_files
+        manifest["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+        with open(os.path.join(partial, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.rename(partial, root)
+        return manifest
+
+    @staticmethod
+    def _schema_revision(conn) -> Optional[str]:
+        if not inspect(conn).has_table("alembic_version"):
+            return None
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+    def _changed_since(self, table, columns, since: datetime):
+        changed = func.coalesce(*[table.c[c] for c in columns]) if len(columns) > 1 else table.c[columns[0]]
+        if _decoders(table).get(columns[0]) is date.fromisoformat:
+            return changed >= since.date()
+        return changed >= since
+
+    def _stream(self, conn, query) -> Iterator[list]:
+        result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+        yield from result.mappings().partitions()
+
+    def _export_table(self, conn, table, root: str, since: Optional[datetime], change_columns) -> dict:
+        pk = list(table.primary_key.columns)
+        query = select(table).order_by(*pk)
+        if since is not None:
+            query = query.where(self._changed_since(table, change_columns, since))
+
+        entry = {"mode": "changed" if since is not None else "full", "file": f"{table.name}.ndjson.gz", "rows": 0}
+        path = os.path.join(root, entry["file"])
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=COMPRESSLEVEL) as f:
+            for part in self._stream(conn, query):
+                f.write("".join(_dumps(dict(row)) + "\n" for row in part))
+                entry["rows"] += len(part)
+        entry["sha256"] = _file_hash(path)
+
+        if since is not None:
+            # Alla id som finns nu – det som saknas vid återställningen har raderats
+            entry["keys"] = f"{table.name}.keys.ndjson.gz"
+            keys_path = os.path.join(root, entry["keys"])
+            with gzip.open(keys_path, "wt", encoding="utf-8", compresslevel=COMPRESSLEVEL) as f:
+                for part in self._stream(conn, select(pk[0]).order_by(pk[0])):
+                    f.write("".join(f"{row[pk[0].name]}\n" for row in part))
+            entry["keys_sha256"] = _file_hash(keys_path)
+        return entry
+
+    def _backup_files(self):
+        """Kopierar använda bilder till blob-lagret. Returnerar ({sökväg: sha256}, antal nya)."""
+        refs, assets = ImageReference.__table__, MediaAsset.__table__
+        query = (
+            select(refs.c.folder, refs.c.filename, assets.c.content_hash)
+            .select_from(refs.outerjoin(assets, and_(assets.c.folder == refs.c.folder,
+                                                     assets.c.filename == refs.c.filename)))
+            .distinct()
+        )
+        files, new = {}, 0
+        with db.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        for folder, filename, digest in rows:
+            source = os.path.join(current_app.static_folder, folder, filename)
+            if not os.path.isfile(source):
+                continue  # Referens till en bild som inte finns – inget att spara
+            digest = digest or _file_hash(source)
+            blob = self._blob(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                shutil.copyfile(source, blob + ".tmp")
+                os.replace(blob + ".tmp", blob)
+                new += 1
+            files[f"{folder}/{filename}"] = digest
+        return files, new
+
+    # ===================================================
+    # ✅ ÅTERSTÄLLNING
+    # ===================================================
+    def restore(self, name: str = "latest", replace: bool = False, workers: Optional[int] = None,
+                include_files: bool = True, rebuild: bool = True) -> dict:
+        """
+        ✅ Återställer backupen `name` ("latest" = senaste) till databasen och static/.
+        - Databasen måste vara tom (efter `flask db upgrade`) om inte `replace`.
+        - Inkrementella backuper läggs på i ordning ovanpå sin fullbackup.
+        - `rebuild` bygger om sökindex, bildreferenser, media_assets och nyckeltal.
+        Returnerar {"tables": {tabell: rader}, "files": n, "seconds": s, "schema_mismatch": bool}.
+        """
+        started = time.perf_counter()
+        target = self.latest() if name == "latest" else self.load(name)
+        if target is None:
+            raise ValueError(f"Det finns inga backuper i {self.directory}")
+        chain = self.chain(target["name"])
+        self._verify(chain)
+
+        engine = db.engine
+        with engine.connect() as conn:
+            schema = self._schema_revision(conn)
+            has_content = any(conn.execute(select(db.metadata.tables[t].c.id).limit(1)).first()
+                              for t in ("users", "blog_posts"))
+        if has_content and not replace:
+            raise ValueError("Databasen innehåller redan användare eller inlägg – använd --replace")
+        if replace:
+            self._clear(engine)
+
+        workers = 1 if engine.dialect.name == "sqlite" else (workers or self.workers)
+        stats = {"tables": {}, "files": 0, "schema_mismatch": bool(schema and target.get("schema")
+                                                                   and schema != target["schema"])}
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for level in _levels():
+                self._restore_level(engine, chain, level, executor or _Inline(), workers, stats)
+            if include_files:
+                stats["files"] = self._restore_files(target["files"], executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if rebuild:
+            self._rebuild_derived()
+        stats["seconds"] = time.perf_counter() - started
+        return stats
+
+    def _verify(self, chain: List[dict]):
+        """Kontrollerar checksummorna innan något i databasen rörs."""
+        for manifest in chain:
+            root = os.path.join(self.directory, manifest["name"])
+            for entry in manifest["tables"].values():
+                for key, checksum in (("file", "sha256"), ("keys", "keys_sha256")):
+                    if key in entry and _file_hash(os.path.join(root, entry[key])) != entry[checksum]:
+                        raise ValueError(f"Backupen {manifest['name']} är skadad: {entry[key]}")
+
+    @staticmethod
+    def _clear(engine):
+        with engine.begin() as conn:
+            for table in reversed(db.metadata.sorted_tables):
+                if table.name not in KEEP_ON_REPLACE:
+                    conn.execute(delete(table))
+
+    def _read(self, path: str, table) -> Iterator[List[dict]]:
+        """Läser en NDJSON-fil i batchar; okända kolumner (äldre schema) hoppas över."""
+        decoders = _decoders(table)
+        columns = set(table.columns.keys())
+        batch = []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = {k: v for k, v in json.loads(line).items() if k in columns}
+                for key, decode in decoders.items():
+                    if row.get(key) is not None:
+                        row[key] = decode(row[key])
+                batch.append(row)
+                if len(batch) >= self.chunk_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _insert(engine, table, rows: List[dict]):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+
+    def _restore_level(self, engine, chain, level, executor, workers, stats):
+        # 1. Fullexporterna: alla batchar för nivåns tabeller, parallellt
+        pending, deltas = set(), []
+        for table_name in level:
+            table = db.metadata.tables[table_name]
+            entries = [(m, m["tables"][table_name]) for m in chain if table_name in m["tables"]]
+            full = max((i for i, (_, e) in enumerate(entries) if e["mode"] == "full"), default=None)
+            if full is None:
+                continue
+            manifest, entry = entries[full]
+            stats["tables"][table_name] = entry["rows"]
+            for batch in self._read(os.path.join(self.directory, manifest["name"], entry["file"]), table):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                future = executor.submit(self._insert, engine, table, batch)
+                if future is not None:
+                    pending.add(future)
+            deltas.extend((table, m, e) for m, e in entries[full + 1:])
+        for future in pending:
+            future.result()
+
+        # 2. Inkrementella ändringar ovanpå, i backupordning
+        for table, manifest, entry in deltas:
+            self._apply_changes(engine, table, os.path.join(self.directory, manifest["name"]), entry)
+            with engine.connect() as conn:
+                stats["tables"][table.name] = conn.execute(select(func.count()).select_from(table)).scalar()
+
+    def _apply_changes(self, engine, table, root: str, entry: dict):
+        pk = list(table.primary_key.columns)[0]
+        with engine.begin() as conn:
+            for batch in self._read(os.path.join(root, entry["file"]), table):
+                conn.execute(delete(table).where(pk.in_([row[pk.name] for row in batch])))
+                conn.execute(table.insert(), batch)
+
+            with gzip.open(os.path.join(root, entry["keys"]), "rt", encoding="utf-8") as f:
+                keys = {int(line) for line in f}
+            gone = [key for key in conn.execute(select(pk)).scalars() if key not in keys]
+            for offset in range(0, len(gone), self.chunk_size):
+                conn.execute(delete(table).where(pk.in_(gone[offset:offset + self.chunk_size])))
+
+    def _restore_files(self, files: Dict[str, str], executor) -> int:
+        """Kopierar tillbaka bilder som saknas i static/. Returnerar antal kopierade."""
+        static = current_app.static_folder
+        missing = [(os.path.join(static, path), self._blob(digest)) for path, digest in files.items()
+                   if not os.path.exists(os.path.join(static, path))]
+
+        def copy(item):
+            dest, blob = item
+            if not os.path.exists(blob):
+                return 0
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            shutil.copyfile(blob, dest)
+            return 1
+
+        # Filkopiering är säker i trådar även när databasen skrivs i en
+        if executor is not None:
+            return sum(executor.map(copy, missing))
+        return sum(map(copy, missing))
+
+    @staticmethod
+    def _rebuild_derived():
+        from app.utils.dashboard_metrics import dashboard_metrics
+        from app.utils.media_library import media_library
+        from app.utils.page_cache import page_cache
+        from app.utils.portfolio_order import portfolio_order
+        from app.utils.principal_cache import principal_cache
+        from app.utils.search import rebuild_index
+
+        media_library.reconcile(rebuild_references=True)
+        rebuild_index()
+        dashboard_metrics.refresh()
+        page_cache.clear()
+        portfolio_order.invalidate()
+        principal_cache.clear()
+
+
+# 🧮 Delad instans – initieras i create_app()
+backup_manager = BackupManager()
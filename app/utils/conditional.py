@@ -0,0 +1,235 @@
+# app/utils/conditional.py
+"""
+Villkorade GET-svar (ETag / Last-Modified / 304 Not Modified).
+
+Besökare, feedläsare och crawlers som redan har sidan skickar
+If-None-Match / If-Modified-Since. Istället för att hämta allt innehåll och
+rendera mallen räknas validatorer fram ur en enda aggregat-query
+(tidsstämplar, antal och högsta id för raderna sidan visar). Har inget
+ändrats svarar vi 304 utan body – innan vyn körs.
+
+ETag = hash av validatorerna + sökväg med query-argument + kodversion
+(mallar och Python-filer), så en deploy med ändrade mallar ger nya ETags.
+
+Endast anonyma GET-requests utan flash-meddelanden (samma villkor som
+sidcachen) – inloggade ser adminknappar och får alltid fullt svar.
+
+Användning:
+    from app.utils.conditional import conditional_get, post_validators
+
+    @blog_bp.route("/post/<int:post_id>")
+    @conditional_get.conditional(post_validators, on_hit=lambda post_id: register_post_view(post_id))
+    @page_cache.cached("blog", ...)
+    def show_post(post_id):
+        ...
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from flask import current_app, request
+from sqlalchemy import func, select
+from werkzeug.http import is_resource_modified
+
+from app.extensions import db
+from app.models import BlogCategory, BlogPost, Category, Comment, CVContent, PortfolioItem
+from app.utils.time import as_utc, get_local_now
+
+# (delar som ingår i ETag, senaste ändring) – eller None om vyn ska svara själv (t.ex. 404)
+Validators = Optional[Tuple[tuple, Optional[datetime]]]
+
+
+def _code_version(app) -> str:
+    """Senaste ändringstid för mallar och Python-filer – samma i alla workers på servern."""
+    latest = 0.0
+    roots = {app.root_path, os.path.abspath(app.template_folder or "")}
+    for root in roots:
+        for dirpath, _dirs, files in os.walk(root):
+            for name in files:
+                if name.endswith((".html", ".py", ".xml")):
+                    latest = max(latest, os.path.getmtime(os.path.join(dirpath, name)))
+    return str(int(latest))
+
+
+# ===================================================
+# ✅ CONDITIONAL GET
+# ===================================================
+
+class ConditionalGet:
+    """
+    ✅ Dekorator som svarar 304 när validatorerna matchar requestens headers.
+    - CONDITIONAL_GET_ENABLED: av/på (standard på)
+    - CONDITIONAL_GET_VERSION: versionssträng i ETag (t.ex. git-sha vid deploy);
+      tom = senaste ändringstid för mallar och kod
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.version = ""
+        self.not_modified = 0
+        self.full = 0
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("CONDITIONAL_GET_ENABLED", True)
+        self.version = app.config.get("CONDITIONAL_GET_VERSION") or _code_version(app)
+        self.not_modified = self.full = 0
+        app.extensions["conditional_get"] = self
+
+    def make_etag(self, parts: tuple) -> str:
+        raw = "|".join(str(part) for part in (*parts, request.full_path, self.version))
+        return hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+    def conditional(self, validators: Callable[..., Validators], on_hit=None):
+        """
+        ✅ Svarar 304 om klientens kopia är aktuell, annars körs vyn och får ETag/Last-Modified.
+        - `validators(**view_args)` ska vara billig (en query, ingen rendering).
+        - `on_hit(**view_args)` körs vid 304, t.ex. för att räkna visningar.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                from app.utils.page_cache import page_cache
+
+                if not self.enabled or not page_cache.cacheable_request():
+                    return view(*args, **kwargs)
+                result = validators(**kwargs)
+                if result is None:
+                    return view(*args, **kwargs)
+
+                parts, last_modified = result
+                etag = self.make_etag(parts)
+                last_modified = as_utc(last_modified)
+                if last_modified is not None:
+                    last_modified = last_modified.replace(microsecond=0)
+
+                if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                    self._count(not_modified=True)
+                    if on_hit is not None:
+                        on_hit(**kwargs)
+                    response = current_app.response_class(status=304)
+                else:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    self._count(not_modified=False)
+
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                response.cache_control.no_cache = True  # Fråga alltid – svaret blir 304 om inget ändrats
+                response.vary.add("Cookie")
+                return response
+            return wrapper
+        return decorator
+
+    def _count(self, not_modified: bool):
+        with self._stats_lock:
+            if not_modified:
+                self.not_modified += 1
+            else:
+                self.full += 1
+
+    def stats(self) -> dict:
+        """Antal 304-svar och fulla svar för villkorade routes (per process)."""
+        return {"not_modified": self.not_modified, "full": self.full}
+
+
+# 🧮 Delad instans – initieras i create_app()
+conditional_get = ConditionalGet()
+
+
+# ===================================================
+# ✅ VALIDATORER PER ROUTE
+# ===================================================
+
+def _latest(*values) -> Optional[datetime]:
+    found = [as_utc(value) for value in values if value is not None]
+    return max(found) if found else None
+
+
+def _published():
+    return BlogPost.created_at <= get_local_now()
+
+
+_post_changed = func.coalesce(BlogPost.updated_at, BlogPost.created_at)
+_item_changed = func.coalesce(PortfolioItem.updated_at, PortfolioItem.date)
+
+
+def _aggregate(*columns, where=()):
+    """Fristående skalära subqueries (korreleras aldrig mot den yttre queryns rad)."""
+    return tuple(select(column).where(*where).correlate(None).scalar_subquery() for column in columns)
+
+
+def _published_posts():
+    """Antal, senaste ändring och högsta id bland publicerade inlägg (listor och "senaste inlägg")."""
+    return _aggregate(func.count(BlogPost.id), func.max(_post_changed), func.max(BlogPost.id),
+                      where=(_published(),))
+
+
+def _portfolio_items(*where):
+    return _aggregate(func.count(PortfolioItem.id), func.max(_item_changed), func.max(PortfolioItem.id),
+                      where=where)
+
+
+def blog_index_validators(page=1) -> Validators:
+    """Bloggens startsida: publicerade inlägg + kategorier (filtermenyn)."""
+    row = db.session.execute(select(
+        *_published_posts(),
+        *_aggregate(func.count(BlogCategory.id), func.max(BlogCategory.updated_at)),
+    )).one()
+    return tuple(row), _latest(row[1], row[4])
+
+
+def post_validators(post_id) -> Validators:
+    """Ett inlägg: inlägget, dess kategori, synliga kommentarer och "senaste inlägg"."""
+    visible = (Comment.post_id == post_id) & (Comment.visible.is_(True))
+    post = db.session.execute(
+        select(BlogPost.created_at, _post_changed, BlogCategory.updated_at,
+               *_aggregate(func.count(Comment.id), func.max(Comment.id), func.max(Comment.date_created),
+                           where=(visible,)),
+               *_published_posts())
+        .outerjoin(BlogCategory, BlogCategory.id == BlogPost.category_id)
+        .where(BlogPost.id == post_id)
+    ).first()
+    if post is None or as_utc(post[0]) > get_local_now():
+        return None  # Finns inte eller är inte publicerat – vyn svarar 404
+    return tuple(post[1:]), _latest(post[1], post[2], post[5], post[7])
+
+
+def portfolio_item_validators(item_id) -> Validators:
+    """Ett projekt: projektet, dess kategori och "senaste projekt"."""
+    row = db.session.execute(
+        select(_item_changed, Category.updated_at, *_portfolio_items())
+        .outerjoin(Category, Category.id == PortfolioItem.category_id)
+        .where(PortfolioItem.id == item_id)
+    ).first()
+    if row is None:
+        return None
+    return tuple(row), _latest(row[0], row[1], row[3])
+
+
+def portfolio_category_validators(category, page=1) -> Validators:
+    """En portfoliokategori: kategorin och dess projekt."""
+    category_id = select(Category.id).where(Category.name == category).scalar_subquery()
+    row = db.session.execute(
+        select(Category.id, Category.updated_at, *_portfolio_items(PortfolioItem.category_id == category_id))
+        .where(Category.name == category)
+    ).first()
+    if row is None:
+        return None
+    return tuple(row), _latest(row[1], row[3])
+
+
+def cv_validators() -> Validators:
+    """CV-sidan: den enda CV-raden."""
+    row = db.session.execute(select(CVContent.id, CVContent.updated_at).order_by(CVContent.id).limit(1)).first()
+    if row is None:
+        return None  # Vyn skapar raden
+    return tuple(row), row.updated_at
@@ -0,0 +1,225 @@
+# app/utils/dashboard_metrics.py
+"""
+Förberäknade nyckeltal för adminpanelen.
+
+Istället för COUNT(*) och SUM över hela tabellerna på varje sidladdning
+sparas nyckeltalen som rader i dashboard_metrics (en rad per nyckeltal).
+Adminpanelen läser alla rader med en query, oberoende av tabellernas storlek.
+
+Nyckeltal:
+    users, posts, comments, flagged_comments – antal rader
+    post_views                               – summan av blog_posts.views
+    page_views, portfolio_views              – summan av page_views (sidor resp. "portfolio_<id>")
+
+Underhåll:
+    - Inkrementellt: `after_flush` räknar ut skillnaden för nya, ändrade och
+      raderade objekt och uppdaterar raderna i samma transaktion (en rollback
+      tar bort även ändringen av nyckeltalen). Visningsbufferten gör samma sak
+      när den skriver sina räknare. Raderade objekt vars attribut gått ut efter
+      en commit laddas i `before_flush` (en SELECT per objekt).
+    - Fullständig omräkning: schemalagt jobb (DASHBOARD_REFRESH_INTERVAL) och
+      första gången panelen laddas. Det rättar till det som inte går via ORM:en,
+      t.ex. massraderingar med Query.delete().
+
+Användning:
+    from app.utils.dashboard_metrics import dashboard_metrics
+
+    snapshot = dashboard_metrics.snapshot()   # {"users": 12, ..., "refreshed_at": datetime}
+    dashboard_metrics.refresh()               # Räkna om allt
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Mapping
+
+from sqlalchemy import bindparam, case, delete, event, func, select, update
+from sqlalchemy.orm import Session, attributes
+
+from app.extensions import db
+from app.models import BlogPost, Comment, DashboardMetric, PageView, User
+from app.utils.view_buffer import PAGE_PREFIX, POST_PREFIX
+
+METRICS = ("users", "posts", "comments", "flagged_comments", "post_views", "page_views", "portfolio_views")
+PORTFOLIO_PAGE = "portfolio_"
+
+# Attribut som nyckeltalen läser – laddas för raderade objekt innan raden försvinner
+TRACKED_ATTRIBUTES = {
+    BlogPost: ("views",),
+    Comment: ("flagged",),
+    PageView: ("page", "views"),
+}
+
+
+def _is_portfolio(page: str) -> bool:
+    return page.startswith(PORTFOLIO_PAGE)
+
+
+# ===================================================
+# ✅ ÄNDRINGAR FRÅN ORM-OBJEKT
+# ===================================================
+
+def _persisted(obj, key: str):
+    """Värdet som fanns i databasen före flushen (None om det inte var laddat)."""
+    history = attributes.get_history(obj, key, passive=attributes.PASSIVE_NO_INITIALIZE)
+    values = history.deleted or history.unchanged
+    return values[0] if values else None
+
+
+def _pending(obj, key: str):
+    """Värdet som skrivs i flushen."""
+    history = attributes.get_history(obj, key, passive=attributes.PASSIVE_NO_INITIALIZE)
+    values = history.added or history.unchanged
+    return values[0] if values else None
+
+
+def _contribution(obj, value) -> Counter:
+    """Vad ett objekt bidrar med till nyckeltalen, givet ett sätt att läsa attribut."""
+    counts = Counter()
+    if isinstance(obj, User):
+        counts["users"] = 1
+    elif isinstance(obj, BlogPost):
+        counts["posts"] = 1
+        counts["post_views"] = value(obj, "views") or 0
+    elif isinstance(obj, Comment):
+        counts["comments"] = 1
+        counts["flagged_comments"] = int(bool(value(obj, "flagged")))
+    elif isinstance(obj, PageView):
+        page = value(obj, "page") or ""
+        counts["portfolio_views" if _is_portfolio(page) else "page_views"] = value(obj, "views") or 0
+    return counts
+
+
+def flush_deltas(session) -> Counter:
+    """Skillnaden i nyckeltal för en flush (nya, ändrade och raderade objekt)."""
+    deltas = Counter()
+    for obj in session.new:
+        deltas.update(_contribution(obj, _pending))
+    for obj in session.deleted:
+        deltas.subtract(_contribution(obj, _persisted))
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            deltas.update(_contribution(obj, _pending))
+            deltas.subtract(_contribution(obj, _persisted))
+    return Counter({name: n for name, n in deltas.items() if n})
+
+
+def view_deltas(counts: Mapping[str, int]) -> Counter:
+    """Skillnaden i nyckeltal för visningsbuffertens räknare ("post:12", "page:cv")."""
+    deltas = Counter()
+    for key, n in counts.items():
+        if key.startswith(POST_PREFIX):
+            deltas["post_views"] += n
+        elif key.startswith(PAGE_PREFIX):
+            deltas["portfolio_views" if _is_portfolio(key[len(PAGE_PREFIX):]) else "page_views"] += n
+    return deltas
+
+
+def apply_deltas(conn, deltas: Mapping[str, int]):
+    """
+    Räknar upp/ned nyckeltalen på anslutningen `conn` (samma transaktion som ändringen).
+    Saknas raderna (ingen omräkning gjord än) påverkas inget – nästa omräkning tar med allt.
+    """
+    params = [{"metric": name, "delta": n} for name, n in deltas.items() if n]
+    if params:
+        table = DashboardMetric.__table__
+        conn.execute(
+            update(table)
+            .where(table.c.name == bindparam("metric"))
+            .values(value=table.c.value + bindparam("delta")),
+            params
+        )
+
+
+# ===================================================
+# ✅ OMRÄKNING OCH LÄSNING
+# ===================================================
+
+class DashboardMetrics:
+    """
+    ✅ Nyckeltal för adminpanelen som hålls uppdaterade vid varje commit.
+    - snapshot() är en query mot en tabell med en rad per nyckeltal.
+    - refresh() räknar om allt med en aggregat-query (schemalagt jobb).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["dashboard_metrics"] = self
+        _register_listeners()
+
+    def compute(self, conn=None) -> Dict[str, int]:
+        """Räknar alla nyckeltal direkt från tabellerna (en SELECT med underfrågor)."""
+        def scalar(column, *where):
+            return select(func.coalesce(column, 0)).where(*where).scalar_subquery()
+
+        portfolio = PageView.page.like(PORTFOLIO_PAGE.replace("_", "\\_") + "%", escape="\\")
+        row = (conn or db.session).execute(select(
+            scalar(func.count(User.id)),
+            scalar(func.count(BlogPost.id)),
+            scalar(func.count(Comment.id)),
+            scalar(func.sum(case((Comment.flagged.is_(True), 1), else_=0))),
+            scalar(func.sum(BlogPost.views)),
+            scalar(func.sum(PageView.views), ~portfolio),
+            scalar(func.sum(PageView.views), portfolio),
+        )).one()
+        return {name: int(value) for name, value in zip(METRICS, row)}
+
+    def refresh(self) -> Dict[str, int]:
+        """Räknar om och ersätter alla rader i en transaktion."""
+        now = datetime.now(timezone.utc)
+        table = DashboardMetric.__table__
+        with db.engine.begin() as conn:
+            values = self.compute(conn)
+            conn.execute(delete(table))
+            conn.execute(table.insert(), [
+                {"name": name, "value": value, "refreshed_at": now} for name, value in values.items()
+            ])
+        return values
+
+    def snapshot(self) -> dict:
+        """
+        ✅ Alla nyckeltal + tidpunkt för senaste omräkning.
+        Räknar om direkt om något nyckeltal saknas (första laddningen efter deploy).
+        """
+        rows = db.session.execute(
+            select(DashboardMetric.name, DashboardMetric.value, DashboardMetric.refreshed_at)
+        ).all()
+        if {row.name for row in rows} != set(METRICS):
+            values = self.refresh()
+            return {**values, "refreshed_at": datetime.now(timezone.utc)}
+        snapshot = {row.name: int(row.value) for row in rows}
+        snapshot["refreshed_at"] = min(row.refreshed_at for row in rows)
+        return snapshot
+
+
+# 🧮 Delad instans – initieras i create_app()
+dashboard_metrics = DashboardMetrics()
+
+
+# ===================================================
+# ✅ UPPDATERING VID FLUSH
+# ===================================================
+_registered = False
+
+
+def _register_listeners():
+    """Räknar upp nyckeltalen i samma transaktion som ändringen (se page_cache för mönstret)."""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Session, "before_flush")
+    def _load_deleted(session, flush_context, instances):
+        # Efter commit är attributen utgångna; läs dem medan raden finns kvar
+        for obj in session.deleted:
+            for key in TRACKED_ATTRIBUTES.get(type(obj), ()):
+                getattr(obj, key)
+
+    @event.listens_for(Session, "after_flush")
+    def _apply(session, flush_context):
+        deltas = flush_deltas(session)
+        if deltas:
+            apply_deltas(session.connection(), deltas)
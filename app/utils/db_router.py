@@ -0,0 +1,330 @@
+# app/utils/db_router.py
+"""
+Läsrepliker för publika sidor: läsningar till en replika, skrivningar till primären.
+
+Konfiguration (config.py):
+    DATABASE_REPLICA_URLS=mysql+pymysql://…@replika1/db,mysql+pymysql://…@replika2/db
+blir binds "replica0", "replica1" … i SQLALCHEMY_BINDS. Utan repliker gör routern ingenting.
+
+Regler – en query går till en replika när:
+    ✅ requesten är GET/HEAD i en publik blueprint (DB_REPLICA_BLUEPRINTS)
+    ✅ den är en SELECT utan FOR UPDATE
+    ✅ sessionen inte har skrivit något i requesten (då läses resten från primären)
+    ✅ webbläsaren inte har skrivit nyligen (read-your-writes, se nedan)
+    ✅ minst en replika är frisk – annars används primären
+Allt annat (admin, POST, CLI, schemalagda jobb, db.engine direkt) går till primären.
+
+Read-your-writes:
+    En request som skrivit till databasen sätter cookien `db_primary` i
+    DB_REPLICA_STICKY_SECONDS sekunder. Så länge den finns läser webbläsaren
+    från primären – en admin ser sitt sparade inlägg direkt även om
+    replikeringen ligger efter. STICKY_SECONDS måste vara minst
+    DB_REPLICA_MAX_LAG (kontrolleras i init_app).
+
+Cachar efter en ändring:
+    En commit som ändrar publikt innehåll (inlägg, kommentarer, projekt,
+    kategorier, CV) invaliderar sidcachen, portfolioordningen och ETags. Under
+    DB_REPLICA_MAX_LAG sekunder därefter läser processens publika requests från
+    primären, så att cacharna inte fylls på igen med gammalt innehåll från en
+    replika som ligger efter.
+
+Hälsokontroll:
+    Varje replika kontrolleras högst var DB_REPLICA_HEALTH_INTERVAL sekund
+    (SELECT 1, på MySQL även replikeringsfördröjningen mot DB_REPLICA_MAX_LAG).
+    Ett anslutningsfel under en query markerar replikan som trasig direkt.
+    En request håller sig till samma replika hela vägen.
+
+Mätvärden per bind (queries, pool, hälsa) visas på /admin/performance.
+
+Användning:
+    from app.utils.db_router import db_router
+
+    db_router.init_app(app)   # I create_app(), efter db.init_app()
+    db_router.pool_stats()    # [{"bind": "primary", "queries": 120, "checked_out": 1, …}, …]
+"""
+
+import threading
+import time
+from itertools import count
+from typing import List, Optional
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_PREFIX = "replica"
+STICKY_COOKIE = "db_primary"
+WROTE = "db_router_wrote"  # session.info-nyckel: sessionen har skrivit i requesten
+
+
+class RoutingSession(FlaskSession):
+    """✅ Flask-SQLAlchemys session, men läsningar i publika requests kan gå till en replika."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and db_router.routes_to_replica(self, clause):
+            engine = db_router.replica_for_request()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    session.info[WROTE] = True
+    if has_request_context():
+        g._db_wrote = True
+
+
+class ReplicaState:
+    """✅ Hälsa och räknare för en replika."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.healthy = True
+        self.checked_at = 0.0  # time.monotonic() för senaste kontroll
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.lag: Optional[float] = None
+
+    def mark_failed(self, error: str):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+        self.failures += 1
+        self.last_error = error[:300]
+
+
+def _pool_value(pool, name: str):
+    """QueuePool har size()/checkedout()/overflow(); andra pooler (SQLite) saknar en del."""
+    method = getattr(pool, name, None)
+    return method() if callable(method) else None
+
+
+class DatabaseRouter:
+    """
+    ✅ Väljer replika per request och håller koll på repliker och pooler.
+    - Tom lista med repliker = allt går till primären som förut
+    """
+
+    def __init__(self, app=None):
+        self.replicas: List[ReplicaState] = []
+        self.blueprints = ("blog", "portfolio", "pages")
+        self.sticky_seconds = 30
+        self.health_interval = 30
+        self.max_lag = 30
+        self.queries = {}        # bind → antal queries sedan start
+        self.fallbacks = 0       # requests som ville läsa från replika men fick primären
+        self.sticky_reads = 0    # requests som läste från primären p.g.a. cookien
+        self.fresh_reads = 0     # requests som läste från primären efter en invalidering
+        self._primary_until = 0.0  # time.monotonic() – publika läsningar till primären fram till dess
+        self._cycle = count()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import db
+
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        self.replicas = [ReplicaState(key) for key in sorted(binds) if key.startswith(REPLICA_PREFIX)]
+        self.blueprints = tuple(app.config.get("DB_REPLICA_BLUEPRINTS", self.blueprints))
+        self.sticky_seconds = app.config.get("DB_REPLICA_STICKY_SECONDS", 30)
+        self.health_interval = app.config.get("DB_REPLICA_HEALTH_INTERVAL", 30)
+        self.max_lag = app.config.get("DB_REPLICA_MAX_LAG", 30)
+        if self.replicas and self.sticky_seconds < self.max_lag:
+            raise ValueError(f"DB_REPLICA_STICKY_SECONDS ({self.sticky_seconds}) måste vara minst "
+                             f"DB_REPLICA_MAX_LAG ({self.max_lag})")
+        self.queries = {}
+        self.fallbacks = self.sticky_reads = self.fresh_reads = 0
+        self._primary_until = 0.0
+        app.extensions["db_router"] = self
+
+        with app.app_context():
+            for key, engine in db.engines.items():
+                self._instrument(key or "primary", engine)
+
+        if self.replicas:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            _register_invalidation()
+
+    def _instrument(self, name: str, engine):
+        self.queries[name] = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            self.queries[name] += 1
+
+        state = self._state(name)
+        if state is not None:
+            @event.listens_for(engine, "handle_error")
+            def _failed(context):
+                if context.is_disconnect or context.connection is None:
+                    state.mark_failed(str(context.original_exception))
+
+    def _state(self, key: str) -> Optional[ReplicaState]:
+        return next((s for s in self.replicas if s.key == key), None)
+
+    # === Per request ===
+    def _before_request(self):
+        eligible = request.method in ("GET", "HEAD") and request.blueprint in self.blueprints
+        if eligible and request.cookies.get(STICKY_COOKIE):
+            self.sticky_reads += 1
+            eligible = False
+        elif eligible and time.monotonic() < self._primary_until:
+            self.fresh_reads += 1
+            eligible = False
+        g._db_replica = eligible
+
+    def _after_request(self, response):
+        if g.get("_db_wrote"):
+            response.set_cookie(STICKY_COOKIE, "1", max_age=self.sticky_seconds,
+                                httponly=True, samesite="Lax", secure=request.is_secure)
+        return response
+
+    def hold_primary(self):
+        """Publika läsningar i processen går till primären i DB_REPLICA_MAX_LAG sekunder (efter en invalidering)."""
+        window = self.max_lag or self.sticky_seconds
+        self._primary_until = max(self._primary_until, time.monotonic() + window)
+
+    def routes_to_replica(self, session, clause) -> bool:
+        """Får den här queryn läsas från en replika?"""
+        if not self.replicas or not has_request_context() or not g.get("_db_replica"):
+            return False
+        if session.info.get(WROTE):
+            return False
+        return (clause is not None and getattr(clause, "is_select", False)
+                and getattr(clause, "_for_update_arg", None) is None)
+
+    def replica_for_request(self):
+        """Samma replika för hela requesten; None = ingen frisk replika (läs från primären)."""
+        from app.extensions import db
+
+        key = g.get("_db_replica_key")
+        if key is None:
+            state = self._pick()
+            if state is None:
+                self.fallbacks += 1
+                g._db_replica = False
+                return None
+            key = g._db_replica_key = state.key
+        return db.engines[key]
+
+    # === Hälsa ===
+    def _pick(self) -> Optional[ReplicaState]:
+        start = next(self._cycle)
+        for offset in range(len(self.replicas)):
+            state = self.replicas[(start + offset) % len(self.replicas)]
+            if self._is_healthy(state):
+                return state
+        return None
+
+    def _is_healthy(self, state: ReplicaState) -> bool:
+        if time.monotonic() - state.checked_at < self.health_interval:
+            return state.healthy
+        if not self._lock.acquire(blocking=False):
+            return state.healthy  # En annan tråd kontrollerar just nu
+        try:
+            self.check(state)
+        finally:
+            self._lock.release()
+        return state.healthy
+
+    def check(self, state: ReplicaState):
+        """SELECT 1 (och fördröjning på MySQL) mot replikan; uppdaterar `state`."""
+        from app.extensions import db
+
+        failures = state.failures
+        try:
+            with db.engines[state.key].connect() as conn:
+                conn.execute(text("SELECT 1"))
+                state.lag = self._lag(conn) if conn.dialect.name == "mysql" else None
+        except DBAPIError as e:
+            if state.failures == failures:  # Anslutningsfel är redan registrerade av handle_error
+                state.mark_failed(str(e.orig))
+            return
+        if self.max_lag and state.lag is not None and state.lag > self.max_lag:
+            state.mark_failed(f"Replikeringen ligger {state.lag:.0f} s efter")
+            return
+        state.healthy = True
+        state.checked_at = time.monotonic()
+
+    @staticmethod
+    def _lag(conn) -> Optional[float]:
+        """Seconds_Behind_Source; inf om replikeringen står still, None om det inte går att läsa."""
+        for statement, column in (("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+                                  ("SHOW SLAVE STATUS", "Seconds_Behind_Master")):
+            try:
+                row = conn.execute(text(statement)).mappings().first()
+            except DBAPIError:
+                continue  # Äldre MySQL eller saknad behörighet (REPLICATION CLIENT)
+            if row is None:
+                return None  # Inte en replika (t.ex. en kopia i test)
+            return float("inf") if row[column] is None else float(row[column])
+        return None
+
+    # === Mätvärden ===
+    def pool_stats(self) -> List[dict]:
+        """✅ En rad per bind: queries, poolens storlek/utlånade/overflow och replikans hälsa."""
+        from app.extensions import db
+
+        rows = []
+        for key, engine in db.engines.items():
+            name = key or "primary"
+            state = self._state(name)
+            pool = engine.pool
+            rows.append({
+                "bind": name,
+                "url": engine.url.render_as_string(hide_password=True),
+                "queries": self.queries.get(name, 0),
+                "pool": type(pool).__name__,
+                "size": _pool_value(pool, "size"),
+                "checked_out": _pool_value(pool, "checkedout"),
+                "overflow": _pool_value(pool, "overflow"),
+                "healthy": state.healthy if state else None,
+                "lag": state.lag if state else None,
+                "failures": state.failures if state else 0,
+                "last_error": state.last_error if state else None,
+            })
+        return rows
+
+
+# 🧮 Delad instans – initieras i create_app()
+db_router = DatabaseRouter()
+
+
+# ===================================================
+# ✅ PRIMÄREN EFTER INVALIDERING
+# ===================================================
+_registered = False
+
+
+def _register_invalidation():
+    """
+    Noterar ändrat publikt innehåll i `after_flush` och håller läsningarna på
+    primären först efter commit (en rollback invaliderar inga cachar).
+    """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    from app.models import BlogCategory, BlogPost, Category, Comment, CVContent, PortfolioItem
+
+    # 🏷️ Modeller som sidcachen, portfolioordningen och ETags bygger på
+    cached_models = (BlogPost, BlogCategory, Comment, PortfolioItem, Category, CVContent)
+
+    @event.listens_for(RoutingSession, "after_flush")
+    def _collect(session, flush_context):
+        changed = list(session.new) + list(session.dirty) + list(session.deleted)
+        if any(isinstance(obj, cached_models) for obj in changed):
+            session.info["db_router_invalidated"] = True
+
+    @event.listens_for(RoutingSession, "after_commit")
+    def _hold(session):
+        if session.info.pop("db_router_invalidated", False):
+            db_router.hold_primary()
+
+    @event.listens_for(RoutingSession, "after_rollback")
+    def _discard(session):
+        session.info.pop("db_router_invalidated", None)
@@ -1,23 +1,60 @@
+import html
+import re
+
 import bleach
-from bs4 import BeautifulSoup
 from datetime import datetime
 from flask import current_app, request
 from flask_login import current_user
 from markupsafe import Markup, escape 
 from app.utils.time import get_local_now  # ✅ Importera från centraliserad modul
+from app.models import EXCERPT_LENGTH
+
+# Förkompilerade mönster för snabb taggrensning
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+_BLOCK_TAG_RE = re.compile(r"</?(p|br|div|li|h[1-6]|blockquote|pre|tr)\b[^>]*>", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
-def strip_and_truncate(html, length=100):
+def strip_and_truncate(value, length=100):
     """
     ✅ Tar bort HTML-taggar och trunkerar texten.
     - Används t.ex. för korta utdrag i listor.
+    - Tar emot HTML-text eller ett inlägg: då läses det förberäknade
+      `excerpt` (se make_excerpt) och body parsas bara om det saknas.
     """
-    if not html:
-        return ""
-    text = BeautifulSoup(html, "html.parser").get_text()
+    excerpt = getattr(value, "excerpt", None)
+    if excerpt is not None and length < EXCERPT_LENGTH:
+        text = excerpt
+    else:
+        text = html_to_text(getattr(value, "body", value))
     return text[:length] + ("..." if len(text) > length else "")
 
 
+def make_excerpt(html_text):
+    """
+    ✅ Förberäknar ett textutdrag (max EXCERPT_LENGTH tecken) att spara på inlägget.
+    - Anropas när ett inlägg skapas eller redigeras och av `flask backfill-excerpts`.
+    """
+    return html_to_text(html_text)[:EXCERPT_LENGTH]
+
+
+def html_to_text(html_text):
+    """
+    ✅ Snabb regex-baserad konvertering från HTML till ren text.
+    - Tar bort <script>/<style>, taggar och avkodar entiteter (&amp; → &).
+    - Blocktaggar (p, br, li ...) blir mellanslag så att ord inte klistras ihop.
+    - Används där BeautifulSoup vore för långsamt (t.ex. sökindex).
+    """
+    if not html_text:
+        return ""
+    text = _SCRIPT_STYLE_RE.sub(" ", html_text)
+    text = _BLOCK_TAG_RE.sub(" ", text)
+    text = _TAG_RE.sub("", text)
+    text = html.unescape(text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
 def pluralize(word, count):
     """
     ✅ En enkel pluralfunktion för svenska.
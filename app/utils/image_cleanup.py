@@ -0,0 +1,180 @@
+# app/utils/image_cleanup.py
+"""
+Rensning av oanvända bilder som bakgrundsjobb.
+
+Flöde per körning (en rad i image_cleanup_runs):
+    1. Synka media_assets med disken (nya/raderade filer, se media_library.py)
+    2. Oanvända bilder = media_assets utan rad i image_references
+       (NOT EXISTS – inga inläggstexter läses), äldre än respitiden
+    3. Gå igenom dem i batchar: radera fil + genererade storlekar + rad,
+       eller bara rapportera vid provkörning (dry run)
+
+Förloppet (processed/total) sparas efter varje batch och visas på
+adminsidan, som laddar om sig själv medan jobbet kör. Varje batch hämtas
+på nytt med samma villkor, så en bild som börjat användas under tiden
+raderas inte.
+
+Inställningar:
+    IMAGE_CLEANUP_GRACE_HOURS   – nya bilder rörs inte (t.ex. Quill-uppladdning i ett osparat inlägg)
+    IMAGE_CLEANUP_BACKGROUND    – kör i en bakgrundstråd (False = direkt, t.ex. i tester)
+    IMAGE_CLEANUP_REPORT_LIMIT  – max antal sökvägar i rapporten
+
+Användning:
+    from app.utils.image_cleanup import image_cleanup
+
+    run = image_cleanup.start(dry_run=True, requested_by="admin@example.com")
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import ImageCleanupRun, MediaAsset
+from app.utils import image_references
+from app.utils.image_pipeline import image_pipeline
+from app.utils.media_library import media_library
+
+BATCH = 50
+ACTIVE = ("queued", "running")
+
+
+class ImageCleanup:
+    """
+    ✅ Startar och kör rensningar av oanvända bilder.
+    - Bara en körning åt gången (en pågående körning äldre än en timme räknas som död).
+    - Provkörning rapporterar vad som skulle raderas utan att röra filerna.
+    """
+
+    def __init__(self, app=None):
+        self.grace_hours = 24
+        self.background = True
+        self.report_limit = 500
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.grace_hours = app.config.get("IMAGE_CLEANUP_GRACE_HOURS", 24)
+        self.background = app.config.get("IMAGE_CLEANUP_BACKGROUND", True)
+        self.report_limit = app.config.get("IMAGE_CLEANUP_REPORT_LIMIT", 500)
+        app.extensions["image_cleanup"] = self
+
+    # === Status ===
+    @staticmethod
+    def active_run() -> Optional[ImageCleanupRun]:
+        stale = datetime.now(timezone.utc) - timedelta(hours=1)
+        return (ImageCleanupRun.query
+                .filter(ImageCleanupRun.status.in_(ACTIVE), ImageCleanupRun.started_at >= stale)
+                .order_by(ImageCleanupRun.id.desc())
+                .first())
+
+    @staticmethod
+    def recent_runs(limit: int = 10):
+        return ImageCleanupRun.query.order_by(ImageCleanupRun.id.desc()).limit(limit).all()
+
+    # === Start ===
+    def start(self, dry_run: bool = True, requested_by: Optional[str] = None) -> ImageCleanupRun:
+        """
+        ✅ Skapar en körning och startar den (i bakgrunden om IMAGE_CLEANUP_BACKGROUND).
+        Returnerar den pågående körningen om en redan är igång.
+        """
+        active = self.active_run()
+        if active is not None:
+            return active
+
+        run = ImageCleanupRun(dry_run=dry_run, grace_hours=self.grace_hours, requested_by=requested_by)
+        db.session.add(run)
+        db.session.commit()
+
+        if self.background:
+            app = current_app._get_current_object()
+            threading.Thread(target=self._run_in_app, args=(app, run.id),
+                             name=f"image-cleanup-{run.id}", daemon=True).start()
+        else:
+            self.run(run.id)
+        return run
+
+    def _run_in_app(self, app, run_id: int):
+        with app.app_context():
+            try:
+                self.run(run_id)
+            finally:
+                db.session.remove()
+
+    # === Körning ===
+    def _candidates(self, cutoff: datetime, after_id: int):
+        """Nästa batch oanvända bilder äldre än `cutoff`, i id-ordning."""
+        return db.session.execute(
+            select(MediaAsset)
+            .where(image_references.unreferenced_condition(),
+                   MediaAsset.created_at < cutoff,
+                   MediaAsset.id > after_id)
+            .order_by(MediaAsset.id)
+            .limit(BATCH)
+        ).scalars().all()
+
+    def _count(self, cutoff: datetime) -> int:
+        return db.session.execute(
+            select(db.func.count()).select_from(MediaAsset)
+            .where(image_references.unreferenced_condition(), MediaAsset.created_at < cutoff)
+        ).scalar()
+
+    def _delete_files(self, asset: MediaAsset):
+        path = os.path.join(current_app.static_folder, asset.folder, asset.filename)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        image_pipeline.delete_derivatives(asset.static_path)
+
+    def run(self, run_id: int) -> ImageCleanupRun:
+        """Kör en skapad körning till slut och sparar resultat eller fel."""
+        run = db.session.get(ImageCleanupRun, run_id)
+        run.status = "running"
+        db.session.commit()
+        report = []
+        try:
+            media_library.reconcile()  # Filer som lagts till/tagits bort utanför appen
+            if not image_references.is_built():
+                image_references.rebuild()  # Första körningen efter migreringen
+
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=run.grace_hours)
+            run.total = self._count(cutoff)
+            db.session.commit()
+
+            last_id = 0
+            while True:
+                batch = self._candidates(cutoff, last_id)
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                for asset in batch:
+                    if len(report) < self.report_limit:
+                        report.append(asset.static_path)
+                    run.freed_bytes += asset.size_bytes or 0
+                    if not run.dry_run:
+                        self._delete_files(asset)
+                        db.session.delete(asset)
+                        run.deleted += 1
+                run.processed += len(batch)
+                db.session.commit()  # Förloppet syns på adminsidan
+
+            run.status = "done"
+        except Exception as e:
+            db.session.rollback()
+            run = db.session.get(ImageCleanupRun, run_id)
+            run.status = "failed"
+            run.error = str(e)[:500]
+            current_app.logger.exception(f"❌ Bildrensning {run_id} misslyckades")
+        run.report = "\n".join(report)
+        run.finished_at = datetime.now(timezone.utc)
+        db.session.commit()
+        return run
+
+
+# 🧮 Delad instans – initieras i create_app()
+image_cleanup = ImageCleanup()
@@ -0,0 +1,345 @@
+# app/utils/image_pipeline.py
+"""
+Bildpipeline: responsiva storlekar, AVIF/WEBP och avkodning utanför requesten.
+
+För varje uppladdad bild skapas:
+    <hash>.webp          – huvudbilden (max 1200 px, samma som tidigare; bilder i
+                           editorns texter behåller originalstorleken)
+    <hash>-320w.webp     – mindre bredder för srcset (IMAGE_WIDTHS)
+    <hash>-640w.webp
+    <hash>.avif, <hash>-320w.avif ...   – om AVIF stöds (IMAGE_AVIF + pillow-avif/Pillow med AVIF)
+
+Filnamnet är en hash av filinnehållet: laddas samma bild upp igen
+återanvänds de redan skapade filerna utan ny konvertering.
+
+Avkodning och kodning körs i en processpool (IMAGE_WORKERS, 0 = i requesten):
+requesten väntar bara på huvudbilden, de mindre storlekarna skapas i
+bakgrunden. Mallar använder `srcset` och listar bara filer som finns.
+
+Användning:
+    from app.utils.image_pipeline import image_pipeline
+
+    filename = image_pipeline.save(file_bytes, folder="uploads/blog")
+
+    {# I mallar #}
+    {% from "partials/_responsive_image.html" import responsive_image %}
+    {{ responsive_image(post.img_url, alt=post.title, sizes="(max-width: 768px) 100vw, 33vw") }}
+"""
+
+import glob
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app, url_for
+from PIL import Image, ImageOps, features
+
+try:  # Valfritt: AVIF-plugin för Pillow-versioner utan inbyggt stöd
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+# Känner igen genererade storlekar, t.ex. "abc123-640w.webp"
+DERIVATIVE_RE = re.compile(r"-\d+w\.(webp|avif)$")
+SOURCE_EXTENSIONS = (".webp", ".jpg", ".jpeg", ".png")
+
+
+def avif_supported() -> bool:
+    return pillow_avif is not None or features.check("avif")
+
+
+# ===================================================
+# ✅ ARBETSFUNKTIONER (körs i processpoolen)
+# ===================================================
+
+def _open(data: bytes) -> Image.Image:
+    image = Image.open(BytesIO(data))
+    return ImageOps.exif_transpose(image).convert("RGB")  # Rätt orientering från mobilkameror
+
+
+def _write(image: Image.Image, path: str, fmt: str, quality: int):
+    """Skriver atomiskt (tempfil + os.replace) så att halvfärdiga filer aldrig serveras."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        image.save(tmp, fmt.upper(), quality=quality)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def render_primary(data: bytes, directory: str, stem: str, max_size: Optional[Tuple[int, int]], quality: int) -> int:
+    """✅ Skapar huvudbilden <stem>.webp och returnerar dess bredd (max_size None = originalstorlek)."""
+    image = _open(data)
+    if max_size:
+        image.thumbnail(max_size)
+    _write(image, os.path.join(directory, f"{stem}.webp"), "webp", quality)
+    return image.width
+
+
+def render_derivatives(data: bytes, directory: str, stem: str, max_size: Optional[Tuple[int, int]],
+                       widths: Iterable[int], formats: Iterable[str], quality: int) -> List[str]:
+    """
+    ✅ Skapar mindre bredder (och AVIF av huvudbilden) som saknas.
+    Bredder som är lika stora som eller större än huvudbilden hoppas över.
+    """
+    image = _open(data)
+    if max_size:
+        image.thumbnail(max_size)
+    written = []
+    for fmt in formats:
+        primary = os.path.join(directory, f"{stem}.{fmt}")
+        if fmt != "webp" and not os.path.exists(primary):
+            _write(image, primary, fmt, quality)
+            written.append(primary)
+        for width in sorted(widths):
+            path = os.path.join(directory, f"{stem}-{width}w.{fmt}")
+            if width >= image.width or os.path.exists(path):
+                continue
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            _write(resized, path, fmt, quality)
+            written.append(path)
+    return written
+
+
+# ===================================================
+# ✅ PIPELINE
+# ===================================================
+
+class ImagePipeline:
+    """
+    ✅ Sparar uppladdade bilder i flera storlekar och format.
+    - IMAGE_WIDTHS: bredder för srcset (t.ex. 320, 640, 1200)
+    - IMAGE_AVIF: skapa även AVIF om Pillow stöder det
+    - IMAGE_QUALITY: kvalitet för WEBP/AVIF
+    - IMAGE_WORKERS: processer i poolen (0 = kör direkt i requesten, t.ex. i tester)
+    """
+
+    def __init__(self, app=None):
+        self.widths: Tuple[int, ...] = (320, 640, 1200)
+        self.max_size = (1200, 1200)
+        self.formats: Tuple[str, ...] = ("webp",)
+        self.quality = 85
+        self.workers = 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._srcset_cache: Dict[Tuple[str, str], str] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.widths = tuple(sorted(app.config.get("IMAGE_WIDTHS", (320, 640, 1200))))
+        self.max_size = (self.widths[-1], self.widths[-1])
+        self.formats = ("webp", "avif") if app.config.get("IMAGE_AVIF", True) and avif_supported() else ("webp",)
+        self.quality = app.config.get("IMAGE_QUALITY", 85)
+        self.workers = app.config.get("IMAGE_WORKERS", 2)
+        self._srcset_cache = {}
+        app.extensions["image_pipeline"] = self
+        app.jinja_env.filters["srcset"] = self.srcset
+
+    # === Processpool ===
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if not self.workers:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # "spawn" är säkert även när processen har trådar (scheduler, gunicorn-trådar)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _run(self, func, *args, wait: bool = True):
+        """
+        Kör `func` i poolen (eller direkt om IMAGE_WORKERS = 0).
+        Returnerar resultatet, eller en Future med `wait=False`.
+        Går poolen sönder (t.ex. en process som dött) körs jobbet direkt istället.
+        """
+        executor = self._executor()
+        if executor is not None:
+            try:
+                future = executor.submit(func, *args)
+                return future.result() if wait else future
+            except (BrokenProcessPool, RuntimeError):
+                with self._pool_lock:
+                    self._pool = None
+                current_app.logger.warning("⚠️ Bildpoolen var trasig – bearbetar bilden direkt")
+
+        if wait:
+            return func(*args)
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:  # Bakgrundsjobb: felet hanteras av anroparens callback
+            future.set_exception(e)
+        return future
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    # === Spara ===
+    def save(self, data: bytes, folder: str = "uploads/portfolio", full_size: bool = False) -> str:
+        """
+        ✅ Sparar en uppladdad bild och returnerar filnamnet (utan katalog).
+        - Identiskt innehåll ger samma filnamn och konverteras bara en gång.
+        - Huvudbilden finns när metoden returnerar; mindre storlekar skapas i bakgrunden.
+        - `full_size=True` behåller originalstorleken (bilder i editorns texter).
+        """
+        max_size = None if full_size else self.max_size
+        stem = hashlib.sha256(data).hexdigest()[:24]
+        directory = os.path.join(current_app.static_folder, folder)
+        os.makedirs(directory, exist_ok=True)
+        filename = f"{stem}.webp"
+
+        if os.path.exists(os.path.join(directory, filename)):
+            current_app.logger.info(f"🖼️ Bilden finns redan ({folder}/{filename}) – återanvänds")
+        else:
+            self._run(render_primary, data, directory, stem, max_size, self.quality)
+
+        self.build_derivatives(data, directory, stem, wait=False, max_size=max_size)
+        return filename
+
+    def build_derivatives(self, data: bytes, directory: str, stem: str, wait: bool = True,
+                          max_size: Optional[Tuple[int, int]] = None):
+        """
+        Skapar saknade storlekar/format. Med `wait=False` loggas fel i bakgrunden.
+        `max_size` ska vara samma som för huvudbilden (None = källans storlek).
+        """
+        args = (data, directory, stem, max_size, self.widths, self.formats, self.quality)
+        if wait:
+            return self._run(render_derivatives, *args)
+
+        logger = current_app.logger
+        future = self._run(render_derivatives, *args, wait=False)
+
+        def _done(f):
+            if f.exception() is not None:
+                logger.error(f"❌ Kunde inte skapa bildstorlekar för {stem}: {f.exception()}")
+            self._forget(stem)
+
+        future.add_done_callback(_done)
+        return future
+
+    def _forget(self, stem: str):
+        """Tömmer srcset-cachen för en bild (nya filer har skapats eller tagits bort)."""
+        for key in [k for k in self._srcset_cache if os.path.splitext(os.path.basename(k[0]))[0] == stem]:
+            self._srcset_cache.pop(key, None)
+
+    # === Filer per bild ===
+    @staticmethod
+    def _split(static_path: str) -> Tuple[str, str]:
+        folder, filename = os.path.split(static_path)
+        return folder, os.path.splitext(filename)[0]
+
+    def derivative_files(self, static_path: str) -> List[str]:
+        """Sökvägar (relativt static) till alla genererade filer för en bild, utom originalet."""
+        folder, stem = self._split(static_path)
+        directory = os.path.join(current_app.static_folder, folder)
+        found = glob.glob(os.path.join(directory, glob.escape(stem) + "-*w.*"))
+        found += glob.glob(os.path.join(directory, glob.escape(stem) + ".avif"))
+        return [os.path.relpath(p, current_app.static_folder).replace(os.sep, "/") for p in found]
+
+    def delete_derivatives(self, static_path: str) -> int:
+        removed = 0
+        for path in self.derivative_files(static_path):
+            try:
+                os.remove(os.path.join(current_app.static_folder, path))
+                removed += 1
+            except OSError:
+                pass
+        self._forget(self._split(static_path)[1])
+        return removed
+
+    # === Mallar ===
+    def srcset(self, static_path: Optional[str], fmt: str = "webp") -> str:
+        """
+        ✅ Jinja-filter: "url 320w, url 640w, url 1200w" för filer som finns.
+        - Tom sträng om det inte finns några alternativ (mallen visar då bara src).
+        - För "webp" räknas originalfilen som största storleken oavsett filändelse.
+        """
+        if not static_path or not static_path.startswith(("uploads/", "/uploads/")):
+            return ""
+        static_path = static_path.lstrip("/")
+        cached = self._srcset_cache.get((static_path, fmt))
+        if cached is not None:
+            return cached
+
+        folder, stem = self._split(static_path)
+        directory = os.path.join(current_app.static_folder, folder)
+        primary = static_path if fmt == "webp" else f"{folder}/{stem}.{fmt}"
+        primary_file = os.path.join(current_app.static_folder, primary)
+        if not os.path.exists(primary_file):
+            return ""
+        try:
+            with Image.open(primary_file) as image:
+                primary_width = image.width
+        except OSError:
+            return ""
+
+        entries = []
+        expected = [w for w in self.widths if w < primary_width]
+        for width in expected:
+            name = f"{stem}-{width}w.{fmt}"
+            if os.path.exists(os.path.join(directory, name)):
+                entries.append(f"{url_for('static', filename=f'{folder}/{name}')} {width}w")
+        entries.append(f"{url_for('static', filename=primary)} {primary_width}w")
+
+        if fmt == "webp" and len(entries) == 1:
+            result = ""  # Bara originalet – srcset tillför inget
+        else:
+            result = ", ".join(entries)
+        if len(entries) == len(expected) + 1:
+            self._srcset_cache[(static_path, fmt)] = result  # Komplett – ändras inte längre
+        return result
+
+    # === Befintliga bilder ===
+    def iter_sources(self, root: str = "uploads") -> Iterable[str]:
+        """Originalbilder (relativt static) under `root`, utan genererade storlekar."""
+        base = os.path.join(current_app.static_folder, root)
+        for dirpath, _dirs, files in os.walk(base):
+            for name in sorted(files):
+                if name.lower().endswith(SOURCE_EXTENSIONS) and not DERIVATIVE_RE.search(name):
+                    full = os.path.join(dirpath, name)
+                    yield os.path.relpath(full, current_app.static_folder).replace(os.sep, "/")
+
+    def backfill(self, root: str = "uploads", force: bool = False) -> Dict[str, int]:
+        """
+        ✅ Skapar saknade storlekar för befintliga bilder (filnamnen i databasen ändras inte).
+        Med `force` tas tidigare genererade filer bort först.
+        """
+        stats = {"images": 0, "files": 0, "errors": 0}
+        futures = []
+        for static_path in self.iter_sources(root):
+            if force:
+                self.delete_derivatives(static_path)
+            folder, stem = self._split(static_path)
+            directory = os.path.join(current_app.static_folder, folder)
+            with open(os.path.join(current_app.static_folder, static_path), "rb") as f:
+                data = f.read()
+            # Källan är redan huvudbilden – AVIF och bredder utgår från dess storlek
+            args = (data, directory, stem, None, self.widths, self.formats, self.quality)
+            futures.append((static_path, self._run(render_derivatives, *args, wait=False)))
+            stats["images"] += 1
+
+        for static_path, future in futures:
+            try:
+                stats["files"] += len(future.result())
+            except Exception as e:
+                stats["errors"] += 1
+                current_app.logger.error(f"❌ Kunde inte skapa storlekar för {static_path}: {e}")
+        self._srcset_cache.clear()
+        return stats
+
+
+# 🧮 Delad instans – initieras i create_app()
+image_pipeline = ImagePipeline()
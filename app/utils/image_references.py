@@ -0,0 +1,203 @@
+# app/utils/image_references.py
+"""
+Vilka bilder används, och av vad? En rad per (ägare, bild) i image_references.
+
+Ägare:
+    post           – BlogPost.img_url + <img src="/static/…"> i body
+    portfolio      – PortfolioItem.image (i uploads/portfolio) + bilder i description
+    category       – Category.image
+    blog_category  – BlogCategory.image
+    cv             – bilder i CV-texterna
+
+Referenserna skrivs om i `after_flush` när ett objekts bild- eller
+textkolumner ändras (samma transaktion som ändringen), och tas bort när
+objektet raderas. media_assets.reference_count räknas om för de bilder som
+påverkats. Oanvända bilder blir då en NOT EXISTS-query istället för en
+genomsökning av alla texter (se image_cleanup.py).
+
+`rebuild()` läser allt innehåll en gång – kör `flask reconcile-media
+--rebuild-references` efter migreringen.
+
+Användning:
+    from app.utils.image_references import references_for
+
+    references_for(post)   # {("uploads/blog", "abc.webp"), …}
+"""
+
+import re
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import and_, bindparam, delete, event, func, select, tuple_, update
+from sqlalchemy.orm import Session, attributes
+
+from app.extensions import db
+from app.models import BlogCategory, BlogPost, CVContent, Category, ImageReference, MediaAsset, PortfolioItem
+
+# Bilder i Quill-texter, t.ex. src="/static/uploads/blog/abc.webp"
+STATIC_SRC_RE = re.compile(r'src="/static/([^"]+)"')
+BATCH = 500
+
+Path = Tuple[str, str]  # (folder, filename)
+
+
+def _split(static_path: str) -> Path:
+    folder, _, filename = static_path.lstrip("/").rpartition("/")
+    return folder, filename
+
+
+def _paths(*static_paths, texts: Iterable[str] = ()) -> Set[Path]:
+    found = {p for p in static_paths if p}
+    for text in texts:
+        found.update(STATIC_SRC_RE.findall(text or ""))
+    paths = {_split(p) for p in found if "/" in p.lstrip("/")}
+    return {(f, n) for f, n in paths if len(f) <= 100 and len(n) <= 255}  # Kolumnlängderna i image_references
+
+
+# 🏷️ Modell → (ägartyp, kolumner som påverkar referenserna, extraktor)
+OWNERS = {
+    BlogPost: ("post", ("img_url", "body"),
+               lambda o: _paths(o.img_url, texts=[o.body])),
+    PortfolioItem: ("portfolio", ("image", "description"),
+                    lambda o: _paths(f"uploads/portfolio/{o.image}" if o.image else None, texts=[o.description])),
+    Category: ("category", ("image",), lambda o: _paths(o.image)),
+    BlogCategory: ("blog_category", ("image",), lambda o: _paths(o.image)),
+    CVContent: ("cv", ("about", "experience", "education", "awards", "skills", "interests"),
+                lambda o: _paths(texts=[o.about, o.experience, o.education, o.awards, o.skills, o.interests])),
+}
+
+
+def references_for(obj) -> Set[Path]:
+    """✅ Alla bilder (mapp, filnamn) som objektet använder."""
+    _owner_type, _columns, extract = OWNERS[type(obj)]
+    return extract(obj)
+
+
+def _changed(obj, columns) -> bool:
+    return any(attributes.get_history(obj, key).has_changes() for key in columns)
+
+
+# ===================================================
+# ✅ SKRIVNING
+# ===================================================
+
+def replace_references(conn, owners: Dict[Tuple[str, int], Set[Path]]):
+    """
+    Ersätter referenserna för ägarna och räknar om reference_count för
+    alla bilder som lagts till eller tagits bort.
+    """
+    if not owners:
+        return
+    table = ImageReference.__table__
+    keys = list(owners)
+    affected = set()
+    for chunk in range(0, len(keys), BATCH):
+        part = keys[chunk:chunk + BATCH]
+        owner_match = tuple_(table.c.owner_type, table.c.owner_id).in_(part)
+        affected.update(conn.execute(select(table.c.folder, table.c.filename).where(owner_match)).all())
+        conn.execute(delete(table).where(owner_match))
+
+    rows = [{"owner_type": t, "owner_id": i, "folder": f, "filename": n}
+            for (t, i), paths in owners.items() for f, n in paths]
+    if rows:
+        conn.execute(table.insert(), rows)
+    affected.update((row["folder"], row["filename"]) for row in rows)
+    update_counts(conn, affected)
+
+
+def update_counts(conn, paths: Iterable[Path]):
+    """Sätter media_assets.reference_count för bilderna (en UPDATE med underfråga per bild)."""
+    params = [{"f": folder, "n": filename} for folder, filename in paths]
+    if not params:
+        return
+    refs, assets = ImageReference.__table__, MediaAsset.__table__
+    count = (select(func.count()).select_from(refs)
+             .where(refs.c.folder == bindparam("f"), refs.c.filename == bindparam("n"))
+             .scalar_subquery())
+    conn.execute(
+        update(assets)
+        .where(assets.c.folder == bindparam("f"), assets.c.filename == bindparam("n"))
+        .values(reference_count=count),
+        params
+    )
+
+
+def rebuild() -> int:
+    """
+    ✅ Läser allt innehåll och skriver om image_references från grunden.
+    Returnerar antal referenser. Behövs en gång efter migreringen.
+    """
+    owners = {}
+    for model, (owner_type, columns, extract) in OWNERS.items():
+        # Bara id + bild/text-kolumnerna; extraktorn läser raden som ett objekt
+        query = select(model.id, *[getattr(model, c) for c in columns]).execution_options(yield_per=BATCH)
+        for row in db.session.execute(query):
+            owners[(owner_type, row.id)] = extract(row)
+
+    table = ImageReference.__table__
+    with db.engine.begin() as conn:
+        conn.execute(delete(table))
+        rows = [{"owner_type": t, "owner_id": i, "folder": f, "filename": n}
+                for (t, i), paths in owners.items() for f, n in paths]
+        for chunk in range(0, len(rows), BATCH):
+            conn.execute(table.insert(), rows[chunk:chunk + BATCH])
+        recount_all(conn)
+    return len(rows)
+
+
+def recount_all(conn):
+    """Sätter reference_count för alla bilder i media_assets (en UPDATE med korrelerad underfråga)."""
+    refs, assets = ImageReference.__table__, MediaAsset.__table__
+    counts = (select(func.count()).select_from(refs)
+              .where(refs.c.folder == assets.c.folder, refs.c.filename == assets.c.filename)
+              .scalar_subquery())
+    conn.execute(update(assets).values(reference_count=counts))
+
+
+def count(static_path: str) -> int:
+    """✅ Antal ägare som använder bilden (en indexerad query på folder + filename)."""
+    folder, filename = _split(static_path)
+    return db.session.execute(
+        select(func.count()).select_from(ImageReference)
+        .where(ImageReference.folder == folder, ImageReference.filename == filename)
+    ).scalar()
+
+
+def is_built() -> bool:
+    """Finns det några referenser alls? (Tom tabell = rebuild() har inte körts.)"""
+    return db.session.execute(select(ImageReference.owner_id).limit(1)).first() is not None
+
+
+def unreferenced_condition():
+    """WHERE-villkor för media_assets-rader som ingen använder (NOT EXISTS mot image_references)."""
+    refs = ImageReference.__table__
+    return ~select(refs.c.owner_id).where(
+        and_(refs.c.folder == MediaAsset.folder, refs.c.filename == MediaAsset.filename)
+    ).exists()
+
+
+# ===================================================
+# ✅ UPPDATERING VID FLUSH
+# ===================================================
+_registered = False
+
+
+def register_reference_tracking():
+    """Skriver om referenserna för ändrade ägare i samma transaktion (se page_cache för mönstret)."""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Session, "after_flush")
+    def _track(session, flush_context):
+        owners = {}
+        for obj in list(session.new) + list(session.dirty):
+            spec = OWNERS.get(type(obj))
+            if spec and (obj in session.new or _changed(obj, spec[1])):
+                owners[(spec[0], obj.id)] = spec[2](obj)
+        for obj in session.deleted:
+            spec = OWNERS.get(type(obj))
+            if spec:
+                owners[(spec[0], obj.id)] = set()
+        if owners:
+            replace_references(session.connection(), owners)
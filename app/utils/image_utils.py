@@ -1,42 +1,51 @@
 # app/utils/image_utils.py
 import os
-import uuid
-from datetime import datetime
-from PIL import Image
 from flask import current_app, request, url_for, jsonify
 
-def save_image(image_file, folder="uploads/portfolio", output_format="WEBP", max_size=(1200, 1200)):
+from app.extensions import db
+from app.utils import image_references
+from app.utils.image_pipeline import image_pipeline
+from app.utils.media_library import media_library
+
+def save_image(image_file, folder="uploads/portfolio"):
     """
-    ✅ Sparar en uppladdad bild som WEBP (eller annat angivet format).
-    - Lägger till tidsstämpel + UUID i filnamnet för att undvika krockar.
-    - Skalar ner bilden proportionerligt till max_size.
+    ✅ Sparar en uppladdad bild via bildpipelinen (se image_pipeline.py).
+    - Huvudbild som WEBP (max 1200 px) + mindre storlekar för srcset i bakgrunden.
+    - Filnamnet är en hash av innehållet, så samma bild sparas bara en gång.
+    - Registreras i mediabiblioteket (sparas med anroparens commit).
     - Returnerar det nya filnamnet (utan sökväg).
     """
     try:
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())
-        filename = f"{timestamp}_{unique_id}.{output_format.lower()}"
-
-        save_path = os.path.join(current_app.static_folder, folder, filename)
-
-        image = Image.open(image_file).convert("RGB")
-        image.thumbnail(max_size)
-        image.save(save_path, output_format)
-
+        filename = image_pipeline.save(image_file.read(), folder=folder)
+        media_library.register(f"{folder}/{filename}")
         return filename
     except Exception as e:
         current_app.logger.error(f"Misslyckades att spara bild: {e}", exc_info=True)
         raise
 
+
 def delete_existing_image(filename, folder="uploads/portfolio"):
     """
-    ✅ Tar bort en befintlig bild från servern.
+    ✅ Tar bort en befintlig bild (och dess genererade storlekar) från servern.
+    - Bilder sparas per innehåll, så samma fil kan användas av flera inlägg,
+      projekt, kategorier och CV:t: den tas bara bort om inget annat än
+      anroparens objekt refererar till den (räknas i image_references).
     - Loggar både lyckade borttagningar och varningar om filen inte finns.
     """
     try:
-        filepath = os.path.join(current_app.static_folder, folder, filename)
+        static_path = f"{folder}/{filename}" if folder else filename
+        filepath = os.path.join(current_app.static_folder, static_path)
+        references = image_references.count(static_path)
+        if references > 1:
+            current_app.logger.info(f"Bilden används fortfarande på andra ställen, behålls: {static_path}")
+            return
+        if references == 0 and not image_references.is_built():
+            current_app.logger.warning(f"image_references är tom (kör flask reconcile-media --rebuild-references), behålls: {static_path}")
+            return
         if os.path.exists(filepath):
             os.remove(filepath)
+            image_pipeline.delete_derivatives(static_path)
+            media_library.forget(static_path)
             current_app.logger.info(f"Bild raderad: {filepath}")
         else:
             current_app.logger.warning(f"Filen hittades inte för borttagning: {filepath}")
@@ -47,7 +56,7 @@ def _handle_quill_upload(folder="uploads/blog"):
     """
     ✅ Hanterar bilduppladdning från Quill-editorn.
     - Tar emot bilden via request.files["image"].
-    - Konverterar alltid till WEBP, kvalitet 85.
+    - Sparas via bildpipelinen: WEBP i originalstorlek (som tidigare) + mindre storlekar för srcset.
     - Returnerar en JSON med den publika URL:en för bilden.
     """
     file = request.files.get("image")
@@ -55,16 +64,9 @@ def _handle_quill_upload(folder="uploads/blog"):
         return jsonify({'error': 'Ingen bildfil mottagen'}), 400
 
     try:
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{uuid.uuid4().hex}.webp"
-
-        save_dir = os.path.join(current_app.static_folder, folder)
-        os.makedirs(save_dir, exist_ok=True)
-
-        img = Image.open(file).convert("RGB")
-        img.save(os.path.join(save_dir, filename), "WEBP", quality=85)
-
+        filename = image_pipeline.save(file.read(), folder=folder, full_size=True)
+        media_library.register(f"{folder}/{filename}")
+        db.session.commit()
         image_url = url_for('static', filename=f"{folder}/{filename}")
         return jsonify({'url': image_url})
     except Exception as e:
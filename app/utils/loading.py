@@ -0,0 +1,60 @@
+# app/utils/loading.py
+"""
+Namngivna laddningsprofiler för relationer (eager loading).
+
+Mallarna läser relationer som `post.category` och `comment.comment_author.name`.
+Med lat laddning blir det en extra query per kort eller kommentar (N+1).
+En profil talar om vilka relationer en vy behöver så att de hämtas i
+samma query (joinedload/contains_eager) eller i en extra batch (selectinload).
+
+Profiler:
+    post_card          – bloggkort: kategori, ingen body (kortet visar excerpt)
+    post_teaser        – "senaste inlägg": bara titel, bild och datum
+    post_detail        – inläggssida: kategori + kommentarer med författare
+    admin_post_row     – adminlistan för inlägg: kategori
+    admin_comment_row  – adminlistan för kommentarer: inlägg + författare
+                         (kräver att queryn joinar Comment.post och Comment.comment_author)
+    flagged_comment    – flaggade kommentarer på adminpanelen: författare
+
+Användning:
+    from app.utils.loading import load_profile
+
+    posts = BlogPost.query.options(*load_profile("post_card")).all()
+"""
+
+from typing import Tuple
+
+from sqlalchemy.orm import contains_eager, defer, joinedload, load_only, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models import BlogPost, Comment
+
+LOADER_PROFILES = {
+    "post_card": (
+        defer(BlogPost.body),
+        joinedload(BlogPost.category),
+    ),
+    "post_teaser": (
+        load_only(BlogPost.id, BlogPost.title, BlogPost.img_url, BlogPost.created_at),
+    ),
+    "post_detail": (
+        joinedload(BlogPost.category),
+        selectinload(BlogPost.comments).joinedload(Comment.comment_author),
+    ),
+    "admin_post_row": (
+        defer(BlogPost.body),
+        joinedload(BlogPost.category),
+    ),
+    "admin_comment_row": (
+        contains_eager(Comment.post),
+        contains_eager(Comment.comment_author),
+    ),
+    "flagged_comment": (
+        joinedload(Comment.comment_author),
+    ),
+}
+
+
+def load_profile(name: str) -> Tuple[LoaderOption, ...]:
+    """✅ Returnerar profilens loader-options (KeyError vid okänt namn)."""
+    return LOADER_PROFILES[name]
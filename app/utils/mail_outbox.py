@@ -0,0 +1,443 @@
+# app/utils/mail_outbox.py
+"""
+Utskickskö (outbox) för bloggmail till prenumeranter.
+
+Istället för att skicka alla mail i requesten läggs ett utskick i kön:
+    mail_jobs        – ett per blogginlägg (unikt på post_id)
+    mail_deliveries  – en rad per mottagare med egen status och antal försök
+
+Mottagarna kopieras med en enda INSERT ... SELECT, så prenumeranterna
+laddas aldrig in i Python. Workern hämtar sedan leveranser i små batchar,
+skickar dem över en pool av SMTP-anslutningar (en per tråd) med gemensam
+hastighetsbegränsning och sparar resultatet per mottagare.
+
+Garantier:
+    - Varje batch "claimas" med en unik token i en villkorad UPDATE, så två
+      trådar eller processer kan aldrig ta samma mottagare.
+    - Tillfälliga fel försöks igen med exponentiell backoff, permanenta
+      (mottagaren nekad) markeras direkt som failed.
+    - Kraschar workern mitt i en batch blir raderna kvar som "sending" och
+      markeras som "unknown" – de skickas inte om automatiskt (inga dubbletter)
+      och försvinner inte (syns i `flask mail-worker --status`).
+
+Användning:
+    from app.utils.mail_outbox import mail_outbox
+
+    mail_outbox.enqueue_post(post)   # I requesten – snabbt
+    mail_outbox.drain()              # I workern: `flask mail-worker`
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from smtplib import SMTPException, SMTPRecipientsRefused
+from typing import Dict, List, Optional
+
+from flask import current_app, has_request_context, url_for
+from flask_mail import Message
+from sqlalchemy import bindparam, func, insert, literal, or_, select, update
+
+from app.extensions import db, mail
+from app.models import BlogPost, MailDelivery, MailJob, Role, User, user_roles
+
+# Domäner som aldrig får mail (se README: Mailutskick & Dummy-adresser)
+DUMMY_DOMAINS = ("example.com", "example.net", "example.org")
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+# ===================================================
+# ✅ HASTIGHETSBEGRÄNSNING
+# ===================================================
+
+class RateLimiter:
+    """✅ Token bucket som delas av alla sändtrådar (0 = obegränsat)."""
+
+    def __init__(self, per_second: float):
+        self.per_second = per_second
+        self._lock = threading.Lock()
+        self._tokens = per_second
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        if not self.per_second:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.per_second, self._tokens + (now - self._updated) * self.per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.per_second
+            time.sleep(wait)
+
+
+# ===================================================
+# ✅ UTSKICKSKÖ
+# ===================================================
+
+class MailOutbox:
+    """
+    ✅ Köar och skickar bloggmail.
+    - MAIL_OUTBOX_CONNECTIONS: antal SMTP-anslutningar/trådar
+    - MAIL_OUTBOX_BATCH_SIZE: mottagare per claim (= max antal "unknown" vid krasch)
+    - MAIL_OUTBOX_RATE: max mail per sekund totalt (0 = obegränsat)
+    - MAIL_OUTBOX_MAX_ATTEMPTS / MAIL_OUTBOX_RETRY_BASE: backoff vid fel
+    """
+
+    def __init__(self, app=None):
+        self.connections = 4
+        self.batch_size = 20
+        self.rate = 10.0
+        self.max_attempts = 5
+        self.retry_base = 60
+        self.stale_after = 900
+        self._background = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.connections = app.config.get("MAIL_OUTBOX_CONNECTIONS", 4)
+        self.batch_size = app.config.get("MAIL_OUTBOX_BATCH_SIZE", 20)
+        self.rate = app.config.get("MAIL_OUTBOX_RATE", 10.0)
+        self.max_attempts = app.config.get("MAIL_OUTBOX_MAX_ATTEMPTS", 5)
+        self.retry_base = app.config.get("MAIL_OUTBOX_RETRY_BASE", 60)
+        self.stale_after = app.config.get("MAIL_OUTBOX_STALE_AFTER", 900)
+        app.extensions["mail_outbox"] = self
+
+    # === Köa ===
+    def enqueue_post(self, post) -> Optional[MailJob]:
+        """
+        ✅ Lägger ett utskick för inlägget i kön och markerar det som skickat.
+        - Alla aktiva prenumeranter kopieras till mail_deliveries i databasen.
+        - Returnerar None om inlägget redan köats.
+        """
+        if MailJob.query.filter_by(post_id=post.id).first():
+            post.email_sent = True
+            db.session.commit()
+            return None
+
+        job = MailJob(
+            post_id=post.id,
+            subject=f"Nytt blogginlägg: {post.title}",
+            post_title=post.title,
+            post_subtitle=post.subtitle,
+            post_url=_post_url(post.id),
+        )
+        db.session.add(job)
+        db.session.flush()
+
+        recipients = (
+            select(
+                literal(job.id), User.id, User.email, User.name, literal("pending"), literal(0)
+            )
+            .join(user_roles, user_roles.c.user_id == User.id)
+            .join(Role, Role.id == user_roles.c.role_id)
+            .where(
+                Role.name == "subscriber",
+                or_(User.is_deleted.is_(None), User.is_deleted.is_(False)),
+                or_(User._is_active.is_(None), User._is_active.is_(True)),
+                *[~User.email.like(f"%@{domain}") for domain in DUMMY_DOMAINS],
+                ~User.email.like("%.invalid"),
+            )
+        )
+        table = MailDelivery.__table__
+        result = db.session.execute(
+            insert(table).from_select(
+                ["job_id", "user_id", "email", "name", "status", "attempts"], recipients
+            )
+        )
+        job.total = result.rowcount
+        post.email_sent = True
+        db.session.commit()
+        current_app.logger.info(f"📧 Köade {job.total} mail för inlägg {post.id}")
+        return job
+
+    @staticmethod
+    def due_posts_query():
+        """Publicerade inlägg som ännu inte skickats, äldst först (index ix_blog_posts_email_sent_created)."""
+        return BlogPost.query.filter(
+            BlogPost.email_sent.is_(False),
+            BlogPost.created_at <= _utcnow()
+        ).order_by(BlogPost.created_at)
+
+    def enqueue_due_posts(self) -> int:
+        """Köar alla publicerade inlägg som ännu inte skickats. Returnerar antal utskick."""
+        posts = self.due_posts_query().all()
+
+        queued = 0
+        for post in posts:
+            try:
+                if self.enqueue_post(post):
+                    queued += 1
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"❌ Kunde inte köa mail för post {post.id}: {e}")
+        return queued
+
+    # === Skicka ===
+    def drain(self, connections: Optional[int] = None, max_seconds: Optional[float] = None) -> Dict[str, float]:
+        """
+        ✅ Skickar alla leveranser som är redo och returnerar statistik.
+        - Körs med `connections` trådar, var och en med egen SMTP-anslutning.
+        - Returnerar {"sent", "retried", "failed", "seconds", "per_second"}.
+        """
+        app = current_app._get_current_object()
+        connections = connections or self.connections
+        limiter = RateLimiter(self.rate)
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        stats = {"sent": 0, "retried": 0, "failed": 0}
+        stats_lock = threading.Lock()
+        jobs: Dict[int, object] = {}  # Cache av utskickens rader (Core, delas mellan trådar)
+
+        self.recover_stale()
+        started = time.perf_counter()
+
+        def worker():
+            with app.app_context():
+                conn_cm, conn = None, None
+                try:
+                    while deadline is None or time.monotonic() < deadline:
+                        batch = self._claim()
+                        if not batch:
+                            break
+                        if conn is None:
+                            conn_cm = mail.connect()
+                            conn = conn_cm.__enter__()
+                        results = []
+                        for row in batch:
+                            limiter.acquire()
+                            try:
+                                conn.send(self._message(row, jobs))
+                                results.append((row, None, False))
+                            except SMTPRecipientsRefused as e:
+                                results.append((row, str(e), True))
+                            except (SMTPException, OSError) as e:
+                                results.append((row, str(e), False))
+                                _close(conn_cm)  # Ny anslutning nästa batch
+                                conn_cm, conn = None, None
+                                break
+                        # Rader som inte hann skickas efter ett anslutningsfel lämnas tillbaka
+                        handled = {row.id for row, _, _ in results}
+                        self._release([row for row in batch if row.id not in handled])
+                        counts = self._record(results)
+                        with stats_lock:
+                            for key, n in counts.items():
+                                stats[key] += n
+                finally:
+                    _close(conn_cm)
+
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="mail-outbox") as pool:
+            for future in [pool.submit(worker) for _ in range(connections)]:
+                future.result()
+
+        self.finish_jobs()
+        seconds = time.perf_counter() - started
+        stats["seconds"] = round(seconds, 2)
+        stats["per_second"] = round(stats["sent"] / seconds, 1) if seconds else 0.0
+        if stats["sent"] or stats["failed"]:
+            current_app.logger.info(
+                f"📧 Skickade {stats['sent']} mail ({stats['per_second']}/s), "
+                f"{stats['retried']} försöks igen, {stats['failed']} misslyckades"
+            )
+        return stats
+
+    def drain_in_background(self) -> bool:
+        """
+        Tömmer kön i en bakgrundstråd (t.ex. från adminknappen) så att requesten inte väntar.
+        Returnerar False om en bakgrundskörning redan pågår.
+        """
+        if self._background is not None and self._background.is_alive():
+            return False
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    self.drain()
+                except Exception as e:
+                    app.logger.error(f"❌ Utskickskön misslyckades: {e}", exc_info=True)
+
+        self._background = threading.Thread(target=run, name="mail-outbox-drain", daemon=True)
+        self._background.start()
+        return True
+
+    # === Interna steg ===
+    def _claim(self) -> List:
+        """Tar en batch redo leveranser med en unik token (atomiskt mellan trådar/processer)."""
+        table = MailDelivery.__table__
+        now = _utcnow()
+        token = uuid.uuid4().hex
+        with db.engine.begin() as conn:
+            ids = conn.execute(
+                select(table.c.id)
+                .where(table.c.status == "pending",
+                       or_(table.c.next_attempt_at.is_(None), table.c.next_attempt_at <= now))
+                .order_by(table.c.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+            if not ids:
+                return []
+            conn.execute(
+                update(table)
+                .where(table.c.id.in_(ids), table.c.status == "pending")
+                .values(status="sending", claim_token=token, claimed_at=now)
+            )
+            return conn.execute(
+                select(table.c.id, table.c.job_id, table.c.email, table.c.name, table.c.attempts)
+                .where(table.c.claim_token == token)
+                .order_by(table.c.id)
+            ).all()
+
+    def _message(self, row, jobs: Dict[int, object]) -> Message:
+        job = jobs.get(row.job_id)
+        if job is None:
+            table = MailJob.__table__
+            job = jobs[row.job_id] = db.session.execute(
+                select(table).where(table.c.id == row.job_id)
+            ).first()
+        msg = Message(
+            subject=job.subject,
+            sender=current_app.config["MAIL_DEFAULT_SENDER"],
+            recipients=[row.email]
+        )
+        msg.body = f"""
+Hej {row.name},
+
+Ett nytt blogginlägg har publicerats: {job.post_title}
+
+{job.post_subtitle or ''}
+
+Läs mer här:
+{job.post_url}
+
+Hälsningar,
+Maria Tingvall
+"""
+        return msg
+
+    def _record(self, results) -> Dict[str, int]:
+        """Sparar utfallet för en batch i en transaktion (batchade UPDATEs)."""
+        table = MailDelivery.__table__
+        now = _utcnow()
+        sent, retry, failed = [], [], []
+        for row, error, permanent in results:
+            attempts = row.attempts + 1
+            if error is None:
+                sent.append({"d_id": row.id, "attempts": attempts})
+            elif permanent or attempts >= self.max_attempts:
+                failed.append({"d_id": row.id, "attempts": attempts, "error": error[:500]})
+            else:
+                delay = self.retry_base * 2 ** (attempts - 1)
+                retry.append({"d_id": row.id, "attempts": attempts, "error": error[:500],
+                              "next_at": now + timedelta(seconds=delay)})
+
+        with db.engine.begin() as conn:
+            by_id = table.c.id == bindparam("d_id")
+            if sent:
+                conn.execute(update(table).where(by_id).values(
+                    status="sent", attempts=bindparam("attempts"), sent_at=now, claim_token=None), sent)
+            if retry:
+                conn.execute(update(table).where(by_id).values(
+                    status="pending", attempts=bindparam("attempts"), last_error=bindparam("error"),
+                    next_attempt_at=bindparam("next_at"), claim_token=None), retry)
+            if failed:
+                conn.execute(update(table).where(by_id).values(
+                    status="failed", attempts=bindparam("attempts"), last_error=bindparam("error"),
+                    claim_token=None), failed)
+        return {"sent": len(sent), "retried": len(retry), "failed": len(failed)}
+
+    @staticmethod
+    def _release(rows):
+        """Lämnar tillbaka claimade rader som aldrig försökte skickas."""
+        if not rows:
+            return
+        table = MailDelivery.__table__
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(table).where(table.c.id.in_([row.id for row in rows]))
+                .values(status="pending", claim_token=None)
+            )
+
+    def recover_stale(self) -> int:
+        """Markerar leveranser som fastnat i "sending" (krasch) som "unknown"."""
+        table = MailDelivery.__table__
+        cutoff = _utcnow() - timedelta(seconds=self.stale_after)
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.status == "sending", table.c.claimed_at < cutoff)
+                .values(status="unknown", claim_token=None)
+            )
+        if result.rowcount:
+            current_app.logger.warning(f"⚠️ {result.rowcount} mail avbröts mitt i sändning (status unknown)")
+        return result.rowcount
+
+    def requeue_unknown(self) -> int:
+        """Lägger tillbaka "unknown"-leveranser i kön (kan ge dubbletter – admins beslut)."""
+        table = MailDelivery.__table__
+        with db.engine.begin() as conn:
+            return conn.execute(
+                update(table).where(table.c.status == "unknown").values(status="pending")
+            ).rowcount
+
+    def finish_jobs(self):
+        """Uppdaterar räknare per utskick och markerar färdiga utskick som done."""
+        deliveries = MailDelivery.__table__
+        jobs = MailJob.__table__
+        with db.engine.begin() as conn:
+            open_ids = conn.execute(select(jobs.c.id).where(jobs.c.status != "done")).scalars().all()
+            if not open_ids:
+                return
+            counts = {}
+            for job_id, status, n in conn.execute(
+                select(deliveries.c.job_id, deliveries.c.status, func.count())
+                .where(deliveries.c.job_id.in_(open_ids))
+                .group_by(deliveries.c.job_id, deliveries.c.status)
+            ):
+                counts.setdefault(job_id, {})[status] = n
+
+            now = _utcnow()
+            for job_id in open_ids:
+                by_status = counts.get(job_id, {})
+                values = {"sent": by_status.get("sent", 0), "failed": by_status.get("failed", 0)}
+                if not by_status.get("pending") and not by_status.get("sending"):
+                    values.update(status="done", finished_at=now)
+                conn.execute(update(jobs).where(jobs.c.id == job_id).values(**values))
+
+    def status(self) -> Dict[str, int]:
+        """Antal leveranser per status (för CLI och admin)."""
+        table = MailDelivery.__table__
+        rows = db.session.execute(
+            select(table.c.status, func.count()).group_by(table.c.status)
+        ).all()
+        return {status: n for status, n in rows}
+
+
+def _close(conn_cm):
+    """Stänger en SMTP-anslutning utan att ett redan trasigt uttag ger nytt fel."""
+    if conn_cm is None:
+        return
+    try:
+        conn_cm.__exit__(None, None, None)
+    except (SMTPException, OSError):
+        pass
+
+
+def _post_url(post_id: int) -> str:
+    """Absolut länk till inlägget – även utanför en request (CLI/worker) via SITE_URL."""
+    if has_request_context():
+        return url_for("blog.show_post", post_id=post_id, _external=True)
+    base_url = current_app.config.get("SITE_URL") or "http://localhost"
+    with current_app.test_request_context(base_url=base_url):
+        return url_for("blog.show_post", post_id=post_id, _external=True)
+
+
+# 🧮 Delad instans – initieras i create_app()
+mail_outbox = MailOutbox()
@@ -0,0 +1,222 @@
+# app/utils/media_library.py
+"""
+Mediabibliotek: en rad per uppladdad bild i media_assets.
+
+Adminsidan för uppladdade bilder läser tabellen istället för att lista
+katalogerna med os.listdir på varje request. Filtrering på mapp, sortering
+på namn, datum och storlek samt sidvisning blir indexerade SQL-queries.
+
+Tabellen hålls uppdaterad på två sätt:
+    - register()/forget() när en bild sparas eller tas bort (följer anroparens commit)
+    - reconcile() via `flask reconcile-media`: jämför katalogerna med tabellen
+      och lägger till och tar bort rader
+
+reference_count kommer från image_references (se image_references.py).
+
+Genererade storlekar (t.ex. "abc-640w.webp", "abc.avif") räknas inte som egna
+bilder – de hör till originalet (se image_pipeline.py).
+
+Användning:
+    from app.utils.media_library import media_library
+
+    media_library.register("uploads/blog/abc123.webp")
+    pagination = media_library.page(folder="uploads/blog", sort="largest", page=1, per_page=12)
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+from PIL import Image
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import BlogCategory, Category, MediaAsset
+from app.utils import image_references
+from app.utils.image_pipeline import DERIVATIVE_RE
+
+# 📂 Mappar (relativt static) som visas på adminsidan
+MEDIA_FOLDERS = ("blog_category_images", "portfolio_category_images", "uploads/blog", "uploads/portfolio")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# 🔀 Sortering: namn i URL:en → (etikett, ORDER BY)
+SORTS = OrderedDict([
+    ("name_asc", ("Namn A–Ö", (MediaAsset.filename.asc(), MediaAsset.id.asc()))),
+    ("name_desc", ("Namn Ö–A", (MediaAsset.filename.desc(), MediaAsset.id.desc()))),
+    ("newest", ("Nyast först", (MediaAsset.created_at.desc(), MediaAsset.id.desc()))),
+    ("oldest", ("Äldst först", (MediaAsset.created_at.asc(), MediaAsset.id.asc()))),
+    ("largest", ("Störst först", (MediaAsset.size_bytes.desc(), MediaAsset.id.desc()))),
+    ("smallest", ("Minst först", (MediaAsset.size_bytes.asc(), MediaAsset.id.asc()))),
+])
+
+BATCH = 500
+
+
+def split_path(static_path: str) -> Tuple[str, str]:
+    """"uploads/blog/abc.webp" → ("uploads/blog", "abc.webp")."""
+    folder, _, filename = static_path.lstrip("/").rpartition("/")
+    return folder, filename
+
+
+def is_source_image(filename: str) -> bool:
+    """Originalbilder, inte genererade storlekar eller tempfiler."""
+    return filename.lower().endswith(IMAGE_EXTENSIONS) and not DERIVATIVE_RE.search(filename)
+
+
+def describe_file(path: str) -> dict:
+    """✅ Storlek, bredd/höjd och SHA-256 för en fil på disk."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    try:
+        with Image.open(path) as image:  # Läser bara filhuvudet
+            width, height = image.size
+    except OSError:
+        width = height = None
+    return {"size_bytes": os.path.getsize(path), "width": width, "height": height,
+            "content_hash": digest.hexdigest()}
+
+
+# ===================================================
+# ✅ MEDIABIBLIOTEK
+# ===================================================
+
+class MediaLibrary:
+    """
+    ✅ Håller media_assets i synk med uppladdade bilder.
+    - register/forget ändrar bara sessionen – raden sparas med anroparens commit.
+    - reconcile skannar katalogerna och committar i batchar.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["media_library"] = self
+        image_references.register_reference_tracking()
+
+    def _full_path(self, folder: str, filename: str) -> str:
+        return os.path.join(current_app.static_folder, folder, filename)
+
+    # === Uppladdning & borttagning ===
+    def register(self, static_path: Optional[str]) -> Optional[MediaAsset]:
+        """
+        ✅ Lägger till eller uppdaterar raden för en nyss sparad bild.
+        Ignorerar sökvägar utanför MEDIA_FOLDERS och filer som inte finns.
+        """
+        if not static_path:
+            return None
+        folder, filename = split_path(static_path)
+        path = self._full_path(folder, filename)
+        if folder not in MEDIA_FOLDERS or not is_source_image(filename) or not os.path.exists(path):
+            return None
+
+        asset = MediaAsset.query.filter_by(folder=folder, filename=filename).first()
+        if asset is None:
+            asset = MediaAsset(folder=folder, filename=filename, created_at=datetime.now(timezone.utc))
+            db.session.add(asset)
+        for key, value in describe_file(path).items():
+            setattr(asset, key, value)
+        asset.reference_count = image_references.count(static_path)
+        return asset
+
+    def forget(self, static_path: Optional[str]):
+        """Tar bort raden för en bild som raderats från disk."""
+        if static_path:
+            folder, filename = split_path(static_path)
+            MediaAsset.query.filter_by(folder=folder, filename=filename).delete()
+
+    # === Adminsidan ===
+    def page(self, folder: Optional[str] = None, sort: str = "name_asc", page: int = 1,
+             per_page: int = 12, unused: bool = False):
+        """✅ En sida bilder (Flask-SQLAlchemy Pagination), filtrerad och sorterad i SQL."""
+        query = select(MediaAsset)
+        if folder:
+            query = query.where(MediaAsset.folder == folder)
+        if unused:
+            query = query.where(MediaAsset.reference_count == 0)
+        _label, order_by = SORTS.get(sort, SORTS["name_asc"])
+        return db.paginate(query.order_by(*order_by), page=page, per_page=per_page, error_out=False)
+
+    @staticmethod
+    def folders() -> list:
+        """Mappar som har bilder (för filtrets dropdown)."""
+        return list(db.session.execute(
+            select(MediaAsset.folder).distinct().order_by(MediaAsset.folder)
+        ).scalars())
+
+    @staticmethod
+    def category_labels(assets: Iterable[MediaAsset]) -> Dict[str, str]:
+        """{"portfolio_category_images/x.webp": "Webb", …} för bilderna på sidan."""
+        paths = [asset.static_path for asset in assets]
+        labels = {}
+        if paths:
+            for model in (Category, BlogCategory):
+                labels.update(db.session.execute(
+                    select(model.image, model.title).where(model.image.in_(paths))
+                ).all())
+        return labels
+
+    # === Avstämning mot disk ===
+    def reconcile(self, folders: Iterable[str] = MEDIA_FOLDERS, rehash: bool = False,
+                  rebuild_references: bool = False) -> Dict[str, int]:
+        """
+        ✅ Synkar media_assets med filerna på disk och räknar om reference_count.
+        - Nya filer läggs till (skapad = filens ändringstid), saknade filer tas bort.
+        - Befintliga filer läses bara om när storleken ändrats (eller med `rehash`).
+        - `rebuild_references` läser om allt innehåll till image_references först.
+        Returnerar {"added", "updated", "removed", "unchanged", "referenced"}.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "referenced": 0}
+        for folder in folders:
+            self._reconcile_folder(folder, rehash, stats)
+        if rebuild_references:
+            image_references.rebuild()
+        else:
+            with db.engine.begin() as conn:
+                image_references.recount_all(conn)
+        stats["referenced"] = db.session.execute(
+            select(func.count()).select_from(MediaAsset).where(MediaAsset.reference_count > 0)
+        ).scalar()
+        return stats
+
+    def _reconcile_folder(self, folder: str, rehash: bool, stats: Dict[str, int]):
+        directory = os.path.join(current_app.static_folder, folder)
+        known = {asset.filename: asset for asset in MediaAsset.query.filter_by(folder=folder)}
+        pending = 0
+
+        entries = os.scandir(directory) if os.path.isdir(directory) else ()
+        for entry in entries:
+            if not entry.is_file() or not is_source_image(entry.name):
+                continue
+            asset = known.pop(entry.name, None)
+            if asset is not None and not rehash and asset.size_bytes == entry.stat().st_size:
+                stats["unchanged"] += 1
+                continue
+            if asset is None:
+                created = datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc)
+                asset = MediaAsset(folder=folder, filename=entry.name, created_at=created)
+                db.session.add(asset)
+                stats["added"] += 1
+            else:
+                stats["updated"] += 1
+            for key, value in describe_file(entry.path).items():
+                setattr(asset, key, value)
+            pending += 1
+            if pending >= BATCH:
+                db.session.commit()
+                pending = 0
+
+        for asset in known.values():  # Finns i tabellen men inte på disk
+            db.session.delete(asset)
+            stats["removed"] += 1
+        db.session.commit()
+
+
+# 🧮 Delad instans – initieras i create_app()
+media_library = MediaLibrary()
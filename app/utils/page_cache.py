@@ -0,0 +1,362 @@
+# app/utils/page_cache.py
+"""
+Cache för färdigrenderade publika sidor (blogg och portfolio).
+
+Innehållet ändras bara när en admin sparar något, så istället för att köra
+queries och rendera Jinja på varje besök sparas den färdiga HTML:en.
+
+Nycklar:
+    "<tagg>:<generation>:<sökväg>?<sorterade query-argument>"
+
+Invalidering:
+    Varje tagg ("blog", "portfolio") har en generation. När en commit ändrar
+    inlägg, kommentarer, projekt eller kategorier räknas generationen upp och
+    alla gamla nycklar blir oåtkomliga – även sidor som renderades under tiden.
+
+Backends:
+    "memory"     – LRU med TTL per process (standard)
+    "filesystem" – delad katalog mellan gunicorn-workers (PAGE_CACHE_DIR)
+    "null"       – avstängd
+
+Användning:
+    from app.utils.page_cache import page_cache
+
+    @blog_bp.route("/post/<int:post_id>")
+    @page_cache.cached("blog", on_hit=lambda post_id: register_post_view(post_id))
+    def show_post(post_id):
+        ...
+
+Endast GET för anonyma besökare utan väntande flash-meddelanden cachas.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from hashlib import sha1
+from typing import Optional, Tuple
+
+from flask import current_app, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import BlogPost, BlogCategory, Comment, PortfolioItem, Category
+
+# 🏷️ Vilka modeller påverkar vilka cachade sidor
+MODEL_TAGS = {
+    BlogPost: ("blog",),
+    BlogCategory: ("blog",),
+    Comment: ("blog",),
+    PortfolioItem: ("portfolio",),
+    Category: ("portfolio",),
+}
+
+
+# ===================================================
+# ✅ BACKENDS
+# ===================================================
+
+class NullBackend:
+    """✅ Cachar ingenting (PAGE_CACHE_BACKEND = "null")."""
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value, ttl: int):
+        pass
+
+    def generation(self, tag: str) -> int:
+        return 0
+
+    def bump(self, tag: str):
+        pass
+
+    def size(self) -> int:
+        return 0
+
+    def clear(self):
+        pass
+
+
+class MemoryBackend:
+    """✅ LRU med TTL i processens minne (trådsäkert)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # nyckel → (utgångstid, värde)
+        self._generations = {}
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, tag: str) -> int:
+        with self._lock:
+            return self._generations.get(tag, 0)
+
+    def bump(self, tag: str):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            prefix = f"{tag}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileSystemBackend:
+    """
+    ✅ Delad cache i en katalog på servern.
+    - Alla workers läser och skriver samma filer, så en invalidering i en
+      worker gäller direkt i alla.
+    - Filer skrivs atomiskt (tempfil + os.replace).
+    - Struktur: <katalog>/<tagg>/<generation>/<sha1>.cache och <katalog>/<tagg>.gen
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        tag, generation, _rest = key.split(":", 2)
+        digest = sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, tag, generation, f"{digest}.cache")
+
+    def get(self, key: str):
+        try:
+            with open(self._file(key), "rb") as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value, ttl: int):
+        target = self._file(key)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((time.time() + ttl, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, target)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def generation(self, tag: str) -> int:
+        try:
+            with open(os.path.join(self.path, f"{tag}.gen")) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self, tag: str):
+        new_generation = self.generation(tag) + 1
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(new_generation))
+        os.replace(tmp, os.path.join(self.path, f"{tag}.gen"))
+
+        # 🧹 Städa bort äldre generationer (bästa försök)
+        tag_dir = os.path.join(self.path, tag)
+        if os.path.isdir(tag_dir):
+            for name in os.listdir(tag_dir):
+                if name != str(new_generation):
+                    shutil.rmtree(os.path.join(tag_dir, name), ignore_errors=True)
+
+    def size(self) -> int:
+        return sum(
+            len([f for f in files if f.endswith(".cache")])
+            for _root, _dirs, files in os.walk(self.path)
+        )
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            full = os.path.join(self.path, name)
+            if os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+
+
+# ===================================================
+# ✅ SIDCACHE
+# ===================================================
+
+class PageCache:
+    """
+    ✅ Cachar renderade sidor per tagg och invaliderar vid commit.
+    - TTL styrs av PAGE_CACHE_TTL (skyddar även mot schemalagda inlägg
+      som blir publicerade utan någon commit).
+    - Träffar/missar räknas per process och visas på adminpanelen.
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.ttl = 300
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get("PAGE_CACHE_BACKEND", "memory")
+        if backend == "filesystem":
+            path = app.config.get("PAGE_CACHE_DIR") or os.path.join(app.instance_path, "page_cache")
+            self.backend = FileSystemBackend(path)
+        elif backend == "null":
+            self.backend = NullBackend()
+        else:
+            self.backend = MemoryBackend(app.config.get("PAGE_CACHE_MAX_ENTRIES", 512))
+
+        self.ttl = app.config.get("PAGE_CACHE_TTL", 300)
+        self.hits = self.misses = 0
+        app.extensions["page_cache"] = self
+        _register_invalidation()
+
+    # === Nycklar & villkor ===
+    def make_key(self, tag: str) -> str:
+        """Taggens aktuella generation + sökväg + sorterade query-argument."""
+        args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        return f"{tag}:{self.backend.generation(tag)}:{request.path}?{args}"
+
+    @staticmethod
+    def cacheable_request() -> bool:
+        """Bara anonyma GET-requests utan flash-meddelanden som ska visas."""
+        if request.method != "GET":
+            return False
+        if current_user.is_authenticated:
+            return False
+        return not session.get("_flashes")
+
+    # === Dekorator ===
+    def cached(self, tag: str, on_hit=None):
+        """
+        ✅ Cachar vyns HTML under `tag`.
+        - `on_hit(**view_args)` körs vid träff, t.ex. för att räkna visningar.
+        - Endast svar med status 200 sparas.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.cacheable_request():
+                    return view(*args, **kwargs)
+
+                key = self.make_key(tag)
+                cached = self.backend.get(key)
+                if cached is not None:
+                    self._count(hit=True)
+                    if on_hit is not None:
+                        on_hit(**kwargs)
+                    body, mimetype = cached
+                    return current_app.response_class(body, mimetype=mimetype)
+
+                self._count(hit=False)
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.backend.set(key, (response.get_data(), response.mimetype), self.ttl)
+                return response
+            return wrapper
+        return decorator
+
+    # === Invalidering & statistik ===
+    def invalidate(self, *tags: str):
+        """Gör alla cachade sidor för taggarna ogiltiga."""
+        for tag in tags:
+            self.backend.bump(tag)
+
+    def clear(self):
+        self.backend.clear()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """Träffar, missar, träffkvot (%) och antal sparade sidor."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(100 * self.hits / total, 1) if total else 0.0,
+            "entries": self.backend.size(),
+        }
+
+
+# 🧮 Delad instans – initieras i create_app()
+page_cache = PageCache()
+
+
+# ===================================================
+# ✅ INVALIDERING VID COMMIT
+# ===================================================
+_registered = False
+
+
+def _tags_for(objects) -> Tuple[str, ...]:
+    tags = set()
+    for obj in objects:
+        for model, model_tags in MODEL_TAGS.items():
+            if isinstance(obj, model):
+                tags.update(model_tags)
+    return tuple(tags)
+
+
+def _register_invalidation():
+    """
+    Samlar taggar för ändrade objekt i `after_flush` och invaliderar först
+    efter commit (en rollback lämnar cachen orörd).
+    """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, flush_context):
+        tags = _tags_for(list(session.new) + list(session.dirty) + list(session.deleted))
+        if tags:
+            session.info.setdefault("page_cache_tags", set()).update(tags)
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate(session):
+        tags: Optional[set] = session.info.pop("page_cache_tags", None)
+        if tags:
+            page_cache.invalidate(*tags)
+            from app.utils.pagination import clear_count_cache
+            clear_count_cache()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("page_cache_tags", None)
@@ -23,10 +23,28 @@ Användning:
     {% if result.has_next %}
         <a href="{{ url_for('blog.index', page=result.page+1) }}">Nästa</a>
     {% endif %}
+
+Keyset-läge (utan OFFSET och utan COUNT(*) per sidvisning):
+    from app.utils.pagination import paginate_keyset
+
+    result = paginate_keyset(query, BlogPost.created_at, BlogPost.id,
+                             cursor=request.args.get("cursor"), per_page=12,
+                             count_key=("blog", category_id))
+
+    # I template (se partials/_keyset_pagination.html):
+    {{ keyset_pagination(result, 'blog.index', sort=sort_order) }}
 """
 
+import base64
+import json
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Any, Optional
+from datetime import date, datetime
+from typing import List, Any, Optional, Hashable, Tuple, Dict
+
+from flask import current_app, has_app_context, request
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Query
 
 
@@ -170,4 +188,274 @@ def get_page_range(
         return list(range(total_pages - max_pages + 1, total_pages + 1))
     else:
         # Mitt i listan
-        return list(range(current_page - half, current_page + half + 1))
\ No newline at end of file
+        return list(range(current_page - half, current_page + half + 1))
+
+
+# ===================================================
+# ✅ KEYSET-PAGINERING (seek)
+# ===================================================
+
+@dataclass
+class KeysetResult:
+    """
+    Resultat från keyset-paginering.
+
+    Attributes:
+        items: Lista med objekt för nuvarande sida
+        per_page: Antal objekt per sida
+        has_prev: True om det finns en föregående sida
+        has_next: True om det finns en nästa sida
+        prev_cursor: Opak cursor till föregående sida (None om första sidan)
+        next_cursor: Opak cursor till nästa sida (None om sista sidan)
+        total: Totalt antal objekt (None om det inte räknats)
+        total_pages: Totalt antal sidor (None om total saknas)
+    """
+    items: List[Any]
+    per_page: int
+    has_prev: bool
+    has_next: bool
+    prev_cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if set(value) == {"dt"} and isinstance(value["dt"], str):
+            return datetime.fromisoformat(value["dt"])
+        if set(value) == {"d"} and isinstance(value["d"], str):
+            return date.fromisoformat(value["d"])
+        raise ValueError("Okänt värde i cursor")
+    if isinstance(value, list):
+        raise ValueError("Okänt värde i cursor")
+    return value
+
+
+def _matches_column(value, column) -> bool:
+    """True om cursorvärdet har kolumnens typ (None bara för kolumner som tillåter NULL)."""
+    if value is None:
+        return _is_nullable(column)
+    try:
+        expected = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return isinstance(value, (str, int, float))
+    if expected is datetime:
+        return isinstance(value, datetime)
+    if expected is date:
+        return isinstance(value, date) and not isinstance(value, datetime)
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if expected is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+
+def _is_nullable(column) -> bool:
+    return bool(getattr(getattr(column, "expression", column), "nullable", False))
+
+
+def encode_cursor(sort_value, item_id, direction: str = "next") -> str:
+    """
+    Skapar en opak cursor av sorteringsvärdet och id:t för en rad.
+
+    Example:
+        >>> encode_cursor(5, 5)
+        'eyJrIjpbNSw1XSwiZCI6Im5leHQifQ'
+    """
+    payload = {"k": [_encode_value(sort_value), item_id], "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any, str]:
+    """
+    Tolkar en cursor från `encode_cursor`.
+
+    Returns:
+        (sorteringsvärde, id, riktning)
+
+    Raises:
+        ValueError: Om cursorn är trasig eller manipulerad
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        sort_value, item_id = payload["k"]
+        direction = payload.get("d", "next")
+        sort_value = _decode_value(sort_value)
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ValueError("Ogiltig cursor") from e
+    if direction not in ("next", "prev"):
+        raise ValueError("Ogiltig cursor")
+    return sort_value, item_id, direction
+
+
+# 🧮 Cachade totaler: nyckel → (utgångstid, antal)
+_count_cache: Dict[Hashable, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def cached_count(query: Query, key: Hashable, ttl: Optional[int] = None) -> int:
+    """
+    Räknar rader i `query` men återanvänder resultatet i `ttl` sekunder.
+
+    Nyckeln ska beskriva filtren (t.ex. ("blog", kategori, sökord)) – inte
+    tidsberoende parametrar som "publicerad före nu".
+    Standard-TTL läses från PAGINATION_COUNT_TTL.
+    """
+    if ttl is None:
+        ttl = current_app.config.get("PAGINATION_COUNT_TTL", 60) if has_app_context() else 60
+
+    now = time.monotonic()
+    with _count_cache_lock:
+        hit = _count_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    total = query.order_by(None).count()
+    with _count_cache_lock:
+        _count_cache[key] = (now + ttl, total)
+    return total
+
+
+def clear_count_cache():
+    """Töm cachade totaler (t.ex. efter att inlägg skapats eller raderats)."""
+    with _count_cache_lock:
+        _count_cache.clear()
+
+
+def keyset_requested() -> bool:
+    """
+    True om nuvarande request ska pagineras med keyset:
+    - när en `cursor` skickats med, eller
+    - när PAGINATION_MODE är "keyset".
+    """
+    return bool(request.args.get("cursor")) or current_app.config.get("PAGINATION_MODE") == "keyset"
+
+
+def paginate_keyset(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    per_page: int = 12,
+    descending: bool = True,
+    count_key: Optional[Hashable] = None,
+    error_out: bool = True
+) -> KeysetResult:
+    """
+    Paginerar med keyset (seek) på (sort_column, id_column) istället för OFFSET.
+
+    Varje sida hämtas med `WHERE (sort, id) < (:sort, :id) ORDER BY sort, id LIMIT n+1`,
+    så sida 1000 kostar lika lite som sida 1. Querien får inte ha egen sortering –
+    den sätts här så att den alltid matchar cursorn.
+
+    NULL i en sorteringskolumn som tillåter det räknas som minst (som MySQL
+    och SQLite sorterar): sist i fallande ordning, först i stigande.
+
+    Args:
+        query: SQLAlchemy query-objekt att paginera (filtrerat, osorterat)
+        sort_column: Kolumn att sortera på, t.ex. BlogPost.created_at
+        id_column: Unik kolumn som skiljer lika sorteringsvärden åt, t.ex. BlogPost.id
+        cursor: Opak cursor från ett tidigare resultat (None = första sidan)
+        per_page: Antal objekt per sida (default: 12)
+        descending: True för nyast först (default: True)
+        count_key: Om satt räknas totalen via `cached_count` med denna nyckel
+        error_out: Om True, raise 404 vid ogiltig cursor (default: True)
+
+    Returns:
+        KeysetResult med objekten och cursors till angränsande sidor
+
+    Raises:
+        werkzeug.exceptions.NotFound: Om cursorn är ogiltig och error_out=True
+
+    Example:
+        >>> result = paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id)
+        >>> result.has_prev, len(result.items)
+        (False, 12)
+        >>> paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id,
+        ...                 cursor=result.next_cursor).has_prev
+        True
+    """
+    direction = "next"
+    single_column = sort_column is id_column
+    if cursor:
+        try:
+            sort_value, last_id, direction = decode_cursor(cursor)
+            # ❌ Manipulerade cursors: fel typ för kolumnerna ska ge 404, inte SQL-fel
+            if last_id is None or not _matches_column(last_id, id_column) or \
+                    not (single_column or _matches_column(sort_value, sort_column)):
+                raise ValueError("Ogiltig cursor")
+        except ValueError:
+            if error_out:
+                from flask import abort
+                abort(404, description="Ogiltig sida")
+            cursor = None
+
+    base_query = query
+
+    # Bakåt = samma sak som framåt med omvänd sortering, vänds tillbaka efteråt
+    forward = descending if direction == "next" else not descending
+    if cursor:
+        if single_column:
+            condition = id_column < last_id if forward else id_column > last_id
+        elif sort_value is None:
+            # Cursorn står bland NULL-raderna (de minsta värdena)
+            if forward:
+                condition = and_(sort_column.is_(None), id_column < last_id)
+            else:
+                condition = or_(sort_column.isnot(None),
+                                and_(sort_column.is_(None), id_column > last_id))
+        elif forward:
+            condition = or_(sort_column < sort_value,
+                            and_(sort_column == sort_value, id_column < last_id))
+            if _is_nullable(sort_column):
+                condition = or_(condition, sort_column.is_(None))
+        else:
+            condition = or_(sort_column > sort_value,
+                            and_(sort_column == sort_value, id_column > last_id))
+        query = query.filter(condition)
+
+    order = [id_column.desc() if forward else id_column.asc()]
+    if not single_column:
+        order.insert(0, sort_column.desc() if forward else sort_column.asc())
+
+    rows = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+    more = len(rows) > per_page
+    items = rows[:per_page]
+
+    if direction == "prev":
+        items.reverse()
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = bool(cursor), more
+
+    def _cursor_for(item, cursor_direction):
+        item_id = getattr(item, id_column.key)
+        sort_value = item_id if single_column else getattr(item, sort_column.key)
+        return encode_cursor(sort_value, item_id, cursor_direction)
+
+    total = total_pages = None
+    if count_key is not None:
+        total = cached_count(base_query, count_key)
+        total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+
+    return KeysetResult(
+        items=items,
+        per_page=per_page,
+        has_prev=has_prev and bool(items),
+        has_next=has_next and bool(items),
+        prev_cursor=_cursor_for(items[0], "prev") if has_prev and items else None,
+        next_cursor=_cursor_for(items[-1], "next") if has_next and items else None,
+        total=total,
+        total_pages=total_pages
+    )
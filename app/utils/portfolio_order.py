@@ -0,0 +1,142 @@
+# app/utils/portfolio_order.py
+"""
+Portfolioprojekten i datumordning, cachad i minnet.
+
+Projektsidan visar föregående/nästa projekt och en paginerad högerkolumn –
+allt ur samma datumsorterade lista. Istället för en query per del hämtas
+listan en gång (id, titel, bild, datum – inte beskrivningen) och sparas per
+process:
+    [PortfolioEntry(id, title, image, date), …]   nyaste först, (date, id) desc
+
+Projektsidan gör då bara en primärnyckel-lookup för själva projektet.
+
+Invalidering:
+    ✅ En commit som skapar, ändrar eller raderar ett projekt gör listan
+       inaktuell; nästa läsning hämtar den på nytt (en query).
+    ✅ TTL (PORTFOLIO_ORDER_TTL) – listan är per process, så en ändring i en
+       annan gunicorn-worker syns här senast efter TTL sekunder.
+
+Användning:
+    from app.utils.portfolio_order import portfolio_order
+
+    older, newer = portfolio_order.neighbours(item.id)
+    posts, total_pages = portfolio_order.page(page, per_page=10)
+"""
+
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import PortfolioItem
+
+PortfolioEntry = namedtuple("PortfolioEntry", "id title image date")
+
+
+class PortfolioOrder:
+    """
+    ✅ Datumsorterad lista med alla projekt (trådsäker).
+    - PORTFOLIO_ORDER_TTL: sekunder innan listan läses om (0 = varje anrop)
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self._lock = threading.Lock()
+        self._snapshot = None  # (lista, {projekt-id: index i listan})
+        self._expires = 0.0
+        self._generation = 0  # Räknas upp vid invalidering – en pågående inläsning sparas då inte
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("PORTFOLIO_ORDER_TTL", 300)
+        self.invalidate()
+        app.extensions["portfolio_order"] = self
+        _register_invalidation()
+
+    # === Läsning ===
+    def _load(self) -> Tuple[List[PortfolioEntry], Dict[int, int]]:
+        with self._lock:
+            if self._snapshot is not None and self._expires > time.monotonic():
+                return self._snapshot
+            generation = self._generation
+
+        rows = db.session.execute(
+            select(PortfolioItem.id, PortfolioItem.title, PortfolioItem.image, PortfolioItem.date)
+            .order_by(PortfolioItem.date.desc(), PortfolioItem.id.desc())
+        ).all()
+        entries = [PortfolioEntry(*row) for row in rows]
+        snapshot = (entries, {entry.id: i for i, entry in enumerate(entries)})
+
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._expires = time.monotonic() + self.ttl
+        return snapshot
+
+    def entries(self) -> List[PortfolioEntry]:
+        """Alla projekt, nyaste först."""
+        return self._load()[0]
+
+    def neighbours(self, item_id: int) -> Tuple[Optional[PortfolioEntry], Optional[PortfolioEntry]]:
+        """(föregående = närmast äldre, nästa = närmast nyare) – None i ändarna."""
+        entries, positions = self._load()
+        position = positions.get(item_id)
+        if position is None:
+            return None, None
+        older = entries[position + 1] if position + 1 < len(entries) else None
+        newer = entries[position - 1] if position > 0 else None
+        return older, newer
+
+    def page(self, page: int, per_page: int = 10) -> Tuple[List[PortfolioEntry], int]:
+        """En sida ur listan och totalt antal sidor."""
+        entries = self.entries()
+        total_pages = (len(entries) + per_page - 1) // per_page
+        start = (max(page, 1) - 1) * per_page
+        return entries[start:start + per_page], total_pages
+
+    # === Invalidering ===
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+# 🧮 Delad instans – initieras i create_app()
+portfolio_order = PortfolioOrder()
+
+
+# ===================================================
+# ✅ INVALIDERING VID COMMIT
+# ===================================================
+_registered = False
+
+
+def _register_invalidation():
+    """
+    Noterar ändrade projekt i `after_flush` och invaliderar först efter
+    commit (en rollback lämnar listan orörd).
+    """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, flush_context):
+        changed = list(session.new) + list(session.dirty) + list(session.deleted)
+        if any(isinstance(obj, PortfolioItem) for obj in changed):
+            session.info["portfolio_order_changed"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate(session):
+        if session.info.pop("portfolio_order_changed", False):
+            portfolio_order.invalidate()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("portfolio_order_changed", None)
@@ -0,0 +1,165 @@
+# app/utils/principal_cache.py
+"""
+Cache för inloggade användare (Flask-Login:s user_loader).
+
+Varje inloggad request laddar användaren, och nästan varje sida kollar
+sedan rollerna (`has_role` i header.html, `roles_required` …). Utan cache blir
+det två queries per request: användaren och dess roller.
+
+Här laddas användaren och rollnamnen i en query (joinedload) och sparas en
+kort stund per användar-id:
+    användar-id → (kolumnvärden, frozenset med rollnamn)
+
+Vid en träff byggs en User upp från kolumnvärdena och kopplas till sessionen
+utan query (`merge(load=False)`), med rollnamnen färdiga för `has_role`.
+
+Invalidering:
+    ✅ När en commit ändrar, lägger till eller raderar en användare (roller,
+       aktiv/inaktiv, anonymisering …) tas dess post bort.
+    ✅ När en roll ändras töms hela cachen.
+    ✅ TTL (USER_CACHE_TTL) – cachen är per process, så en ändring som görs i
+       en annan gunicorn-worker syns här senast efter TTL sekunder.
+
+Användning:
+    from app.utils.principal_cache import principal_cache
+
+    @login_manager.user_loader
+    def load_user(user_id):
+        return principal_cache.load(int(user_id))
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect as sa_inspect, select
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+
+from app.extensions import db
+from app.models import Role, User
+
+
+class PrincipalCache:
+    """
+    ✅ LRU med TTL för användare + rollnamn (trådsäkert).
+    - USER_CACHE_TTL: sekunder (0 stänger av cachen, en query per request ändå)
+    - USER_CACHE_MAX_ENTRIES: max antal användare i minnet
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self.max_entries = 1024
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # användar-id → (utgångstid, (kolumnvärden, rollnamn))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("USER_CACHE_TTL", 30)
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", 1024)
+        self.clear()
+        app.extensions["principal_cache"] = self
+        _register_invalidation()
+
+    # === Läsning ===
+    def load(self, user_id: int) -> Optional[User]:
+        """Användaren med rollnamnen laddade, eller None om den inte finns."""
+        entry = self._get(user_id)
+        if entry is not None:
+            columns, role_names = entry
+            user = User(**columns)
+            make_transient_to_detached(user)
+            user = db.session.merge(user, load=False)
+            user._role_names = role_names
+            return user
+
+        user = db.session.execute(
+            select(User).options(joinedload(User.roles)).where(User.id == user_id)
+        ).unique().scalar_one_or_none()
+        if user is None:
+            return None
+        role_names = user.role_names
+        if self.ttl > 0:
+            columns = {attr.key: getattr(user, attr.key) for attr in sa_inspect(User).column_attrs}
+            self._set(user_id, (columns, role_names))
+        return user
+
+    def _get(self, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def _set(self, user_id: int, value):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # === Invalidering ===
+    def invalidate(self, *user_ids: int):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# 🧮 Delad instans – initieras i create_app()
+principal_cache = PrincipalCache()
+
+
+# ===================================================
+# ✅ INVALIDERING VID COMMIT
+# ===================================================
+_registered = False
+
+
+def _register_invalidation():
+    """
+    Samlar id för ändrade användare i `after_flush` och invaliderar först
+    efter commit (en rollback lämnar cachen orörd).
+    """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Session, "after_flush")
+    def _collect(session, flush_context):
+        changed = list(session.new) + list(session.dirty) + list(session.deleted)
+        if any(isinstance(obj, Role) for obj in changed):
+            session.info["principal_cache_all"] = True
+            session.info.pop("roles_by_name", None)  # Se User.add_role
+        user_ids = {obj.id for obj in changed if isinstance(obj, User) and obj.id is not None}
+        if user_ids:
+            session.info.setdefault("principal_cache_users", set()).update(user_ids)
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate(session):
+        user_ids = session.info.pop("principal_cache_users", None)
+        if session.info.pop("principal_cache_all", False):
+            principal_cache.clear()
+        elif user_ids:
+            principal_cache.invalidate(*user_ids)
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard(session):
+        session.info.pop("principal_cache_users", None)
+        session.info.pop("principal_cache_all", None)
+        session.info.pop("roles_by_name", None)
@@ -0,0 +1,282 @@
+# app/utils/profiling.py
+"""
+Mätning av SQL-queries och renderingstid per request.
+
+Per request:
+    - antal queries och total tid i databasen
+    - tid i Jinja-rendering
+    - de långsammaste queries (visas i adminpanelen)
+
+Resultatet skickas i headern `Server-Timing` (syns i webbläsarens devtools):
+    Server-Timing: db;dur=12.4;desc="7 queries", tpl;dur=3.1, total;dur=21.9
+
+Queries över PROFILING_SLOW_QUERY_MS loggas (apploggen och adminpanelen) och
+skrivs, om PROFILING_SLOW_LOG är satt, som en JSON-rad per query till den
+filen – oavsett om de körs i en request, ett CLI-kommando eller ett schemalagt
+jobb. Parametrarnas värden loggas aldrig (e-post, lösenordshashar, tokens),
+bara deras typer.
+
+Percentiler per endpoint sparas i minnet (per process) och visas på
+/admin/performance.
+
+Användning:
+    from app.utils.profiling import profiler
+
+    profiler.init_app(app)   # I create_app()
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def parameter_types(parameters):
+    """Parametrarnas typer istället för värden, t.ex. ["str", "int"] eller {"email": "str"}."""
+    if isinstance(parameters, dict):
+        return {str(key): type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and all(isinstance(row, (list, tuple, dict)) for row in parameters):
+            return {"rows": len(parameters), "types": parameter_types(parameters[0])}  # executemany
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__ if parameters is not None else None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Närmaste-rang-percentil (0 för tom lista)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered)))) - 1
+    return ordered[index]
+
+
+# ===================================================
+# ✅ MÄTDATA
+# ===================================================
+
+class RequestProfile:
+    """✅ Mätvärden för en request (lagras i `g`)."""
+
+    def __init__(self, keep_slowest: int = 3):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.keep_slowest = keep_slowest
+        self.slowest: List[tuple] = []  # (ms, statement)
+        self._template_started: Optional[float] = None
+
+    def add_query(self, statement: str, ms: float):
+        self.queries += 1
+        self.db_ms += ms
+        if len(self.slowest) < self.keep_slowest or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.keep_slowest:]
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+class EndpointStats:
+    """✅ De senaste N mätningarna för en endpoint (för percentiler)."""
+
+    def __init__(self, sample_size: int, keep_slowest: int = 3):
+        self.count = 0
+        self.keep_slowest = keep_slowest
+        self.slowest: List[tuple] = []  # (ms, statement) – långsammast sedan start
+        self.total_ms = deque(maxlen=sample_size)
+        self.db_ms = deque(maxlen=sample_size)
+        self.template_ms = deque(maxlen=sample_size)
+        self.queries = deque(maxlen=sample_size)
+
+    def add(self, profile: RequestProfile, total_ms: float):
+        self.count += 1
+        self.total_ms.append(total_ms)
+        self.db_ms.append(profile.db_ms)
+        self.template_ms.append(profile.template_ms)
+        self.queries.append(profile.queries)
+        if profile.slowest:
+            self.slowest = sorted(self.slowest + profile.slowest, key=lambda item: item[0], reverse=True)
+            del self.slowest[self.keep_slowest:]
+
+
+# ===================================================
+# ✅ PROFILERARE
+# ===================================================
+
+class RequestProfiler:
+    """
+    ✅ Kopplar SQLAlchemy- och Jinja-händelser till mätningar per request.
+    - PROFILING_ENABLED: av/på (standard på)
+    - PROFILING_SLOW_QUERY_MS: gräns för långsamma queries
+    - PROFILING_SLOW_LOG: fil för långsamma queries (tom = bara apploggen, standard)
+    - PROFILING_SAMPLE_SIZE: antal mätningar per endpoint för percentiler
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.slow_query_ms = 200.0
+        self.slow_log_path: Optional[str] = None
+        self.sample_size = 500
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self.recent_slow = deque(maxlen=50)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.slow_query_ms = app.config.get("PROFILING_SLOW_QUERY_MS", 200)
+        self.slow_log_path = app.config.get("PROFILING_SLOW_LOG")
+        self.sample_size = app.config.get("PROFILING_SAMPLE_SIZE", 500)
+        self.reset()
+        app.extensions["profiler"] = self
+
+        if not app.config.get("PROFILING_ENABLED", True):
+            return
+
+        _register_engine_listeners(self)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # === Request ===
+    @staticmethod
+    def _start_request():
+        g._profile = RequestProfile()
+
+    def _finish_request(self, response):
+        profile: Optional[RequestProfile] = g.pop("_profile", None)
+        if profile is None:
+            return response
+        total_ms = profile.total_ms
+        response.headers["Server-Timing"] = (
+            f'db;dur={profile.db_ms:.1f};desc="{profile.queries} queries", '
+            f"tpl;dur={profile.template_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+        endpoint = request.endpoint or "(ingen endpoint)"
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(self.sample_size)
+            stats.add(profile, total_ms)
+        return response
+
+    @staticmethod
+    def _template_started(sender, template, context, **extra):
+        profile = g.get("_profile")
+        if profile is not None:
+            profile._template_started = time.perf_counter()
+
+    @staticmethod
+    def _template_finished(sender, template, context, **extra):
+        profile = g.get("_profile")
+        if profile is not None and profile._template_started is not None:
+            profile.template_ms += (time.perf_counter() - profile._template_started) * 1000
+            profile._template_started = None
+
+    # === Queries ===
+    def record_query(self, statement: str, parameters, ms: float):
+        """Anropas efter varje query (se _register_engine_listeners)."""
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            profile = g.get("_profile")
+            if profile is not None:
+                profile.add_query(statement, ms)
+        if ms >= self.slow_query_ms:
+            self._log_slow(statement, parameters, ms, endpoint)
+
+    def _log_slow(self, statement, parameters, ms, endpoint):
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "duration_ms": round(ms, 1),
+            "endpoint": endpoint,
+            "path": request.path if has_request_context() else None,
+            "statement": " ".join(statement.split()),
+            "parameters": parameter_types(parameters),
+        }
+        self.recent_slow.appendleft(entry)
+        if self.app is not None:
+            self.app.logger.warning(f"🐢 Långsam query ({entry['duration_ms']} ms) i {endpoint}")
+        if self.slow_log_path:
+            line = json.dumps(entry, ensure_ascii=False)
+            with self._log_lock, open(self.slow_log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    # === Rapport ===
+    def endpoint_report(self) -> List[dict]:
+        """Percentiler per endpoint, sorterat på p95 (långsammast först)."""
+        with self._lock:
+            snapshot = {name: (stats.count, list(stats.total_ms), list(stats.db_ms),
+                               list(stats.template_ms), list(stats.queries), list(stats.slowest))
+                        for name, stats in self._endpoints.items()}
+        report = []
+        for name, (count, total, db_ms, tpl, queries, slowest) in snapshot.items():
+            report.append({
+                "endpoint": name,
+                "requests": count,
+                "p50": percentile(total, 50),
+                "p95": percentile(total, 95),
+                "p99": percentile(total, 99),
+                "db_p95": percentile(db_ms, 95),
+                "template_p95": percentile(tpl, 95),
+                "queries_avg": sum(queries) / len(queries) if queries else 0,
+                "queries_max": max(queries, default=0),
+                "slowest": [(ms, " ".join(statement.split())) for ms, statement in slowest],
+            })
+        return sorted(report, key=lambda row: row["p95"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+        self.recent_slow.clear()
+
+
+# 🧮 Delad instans – initieras i create_app()
+profiler = RequestProfiler()
+
+
+# ===================================================
+# ✅ SQLALCHEMY-LYSSNARE
+# ===================================================
+_registered = False
+
+
+def _register_engine_listeners(target: RequestProfiler):
+    """Lyssnar på alla engines (även extra, t.ex. läsrepliker). Registreras en gång per process."""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_profiling_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("_profiling_started")
+        if not started:
+            return
+        ms = (time.perf_counter() - started.pop()) * 1000
+        target.record_query(statement, parameters, ms)
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(exception_context):
+        # after_cursor_execute körs inte när en query misslyckas – håll stacken i balans
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_profiling_started"):
+            conn.info["_profiling_started"].pop()
@@ -0,0 +1,271 @@
+# app/utils/query_audit.py
+"""
+Granskning av frågeplaner: spelar upp sajtens viktigaste sidor och kör EXPLAIN
+på varje SELECT de gör (flask db-audit).
+
+Flöde:
+    1. Hämta exempel-id ur databasen (senaste inlägg, en kategori, ett projekt …)
+    2. Gör GET mot varje sida i AUDIT_ROUTES med testklienten (adminsidorna som
+       inloggad admin) och fånga SQL + parametrar på alla engines
+    3. Kör EXPLAIN (MySQL) / EXPLAIN QUERY PLAN (SQLite) på samma engine
+    4. Flagga hela tabellscanningar och sortering utan index (filesort/temp B-tree)
+
+Sidcachen är avstängd under granskningen och requesterna skickas som en bot,
+så inga visningar räknas. Små uppslagstabeller (SMALL_TABLES) flaggas inte.
+
+Användning:
+    from app.utils.query_audit import run_audit
+
+    for route in run_audit():
+        print(route.name, route.flagged)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from flask import current_app, url_for
+from sqlalchemy import event, select
+
+from app.extensions import db
+from app.models import BlogCategory, BlogPost, Category, PortfolioItem, Role, User, user_roles
+
+AUDIT_USER_AGENT = "MajaTingWorks-DbAuditBot/1.0"
+
+# Tabeller som alltid är små – en scanning eller sortering av dem är billigare än ett index
+SMALL_TABLES = {"roles", "user_roles", "blog_categories", "categories", "cv_content",
+                "dashboard_metrics", "scheduler_locks", "scheduler_job_runs", "alembic_version"}
+
+_SQLITE_TABLE = re.compile(r"^(?:SCAN|SEARCH) (\w+)")
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_SQLITE_SORT = re.compile(r"USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)")
+
+
+@dataclass
+class Sample:
+    """Exempel-id att bygga adresserna av (None = tabellen är tom)."""
+    post_id: Optional[int] = None
+    blog_category_id: Optional[int] = None
+    blog_category: Optional[str] = None
+    portfolio_category: Optional[str] = None
+    item_id: Optional[int] = None
+    admin_id: Optional[int] = None
+
+
+# 🗺️ (namn, endpoint, argument, kräver admin). Argumenten byggs av Sample; None = hoppa över.
+AUDIT_ROUTES: List[tuple] = [
+    ("Startsidan", "pages.home", lambda s: {}, False),
+    ("Blogg", "blog.index", lambda s: {}, False),
+    ("Blogg, äldst först", "blog.index", lambda s: {"sort": "asc"}, False),
+    ("Blogg, sida 3", "blog.index", lambda s: {"page": 3}, False),
+    ("Blogg, filtrerad kategori", "blog.index",
+     lambda s: {"category": s.blog_category_id} if s.blog_category_id else None, False),
+    ("Bloggkategori", "blog.posts_by_category",
+     lambda s: {"slug": s.blog_category} if s.blog_category else None, False),
+    ("Blogginlägg", "blog.show_post", lambda s: {"post_id": s.post_id} if s.post_id else None, False),
+    ("Portfolio", "portfolio.index", lambda s: {}, False),
+    ("Portfoliokategori", "portfolio.category_view",
+     lambda s: {"category": s.portfolio_category} if s.portfolio_category else None, False),
+    ("Portfolioprojekt", "portfolio.show_portfolio_item",
+     lambda s: {"item_id": s.item_id} if s.item_id else None, False),
+    ("CV", "pages.cv", lambda s: {}, False),
+    ("Sitemap", "pages.sitemap", lambda s: {}, False),
+    ("Admin: panel", "admin.admin_dashboard", lambda s: {}, True),
+    ("Admin: inlägg", "admin.manage_posts", lambda s: {}, True),
+    ("Admin: kommentarer", "admin.manage_comments", lambda s: {}, True),
+    ("Admin: portfolio", "admin.manage_portfolio_item", lambda s: {}, True),
+    ("Admin: användare", "admin.manage_users", lambda s: {}, True),
+    ("Admin: bilder", "admin.manage_uploads", lambda s: {}, True),
+    ("Admin: statistik", "admin.view_statistics", lambda s: {}, True),
+]
+
+
+def _due_mail_posts():
+    from app.utils.mail_outbox import mail_outbox
+    mail_outbox.due_posts_query().all()
+
+
+# 🕑 Bakgrundsjobb vars queries granskas (körs direkt, bara läsningar)
+AUDIT_JOBS: Dict[str, Callable] = {
+    "Jobb: bloggmail att köa": _due_mail_posts,
+}
+
+
+@dataclass
+class QueryPlan:
+    """✅ En unik SELECT, dess plan och flaggor."""
+    statement: str
+    parameters: tuple
+    engine: object
+    calls: int = 1
+    plan: List[str] = field(default_factory=list)
+    flags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RouteAudit:
+    """✅ En sida (eller ett jobb) och de queries den gjorde."""
+    name: str
+    url: str
+    status: Optional[int] = None
+    queries: List[QueryPlan] = field(default_factory=list)
+    skipped: Optional[str] = None
+
+    @property
+    def flagged(self) -> List[QueryPlan]:
+        return [q for q in self.queries if q.flags]
+
+
+# ===================================================
+# ✅ EXPLAIN
+# ===================================================
+
+def explain(engine, statement: str, parameters) -> (List[str], List[str]):
+    """Kör EXPLAIN för en SELECT på `engine`. Returnerar (planrader, flaggor)."""
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            return _sqlite_plan([row[-1] for row in rows])
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        return _mysql_plan(rows)
+
+
+def _is_small(table: str) -> bool:
+    """Små uppslagstabeller och härledda tabeller (subqueries: anon_1, <derived2>)."""
+    return table in SMALL_TABLES or table.startswith(("anon_", "<"))
+
+
+def _sqlite_plan(details: List[str]):
+    flags, tables = [], []
+    for detail in details:
+        table = _SQLITE_TABLE.match(detail)
+        if table:
+            tables.append(table.group(1))
+        scan = _SQLITE_SCAN.match(detail)
+        if scan and not _is_small(scan.group(1)):
+            flags.append(f"full scan: {scan.group(1)}")
+        sort = _SQLITE_SORT.search(detail)
+        if sort and not all(_is_small(t) for t in tables):
+            flags.append(f"filesort ({sort.group(1)})")
+    return details, flags
+
+
+def _mysql_plan(rows):
+    plan, flags = [], []
+    for row in rows:
+        table, extra = row.get("table") or "", row.get("Extra") or ""
+        plan.append(f"{table}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} {extra}".strip())
+        if _is_small(table):
+            continue
+        if row.get("type") == "ALL":
+            flags.append(f"full scan: {table}")
+        if "Using filesort" in extra:
+            flags.append(f"filesort: {table}")
+        if "Using temporary" in extra:
+            flags.append(f"temporary: {table}")
+    return plan, flags
+
+
+# ===================================================
+# ✅ UPPSPELNING
+# ===================================================
+
+def sample_ids() -> Sample:
+    """Senaste publicerade inlägg m.m. – de sidor som besöks mest."""
+    def first(query):
+        return db.session.execute(query.limit(1)).first()
+
+    post = first(select(BlogPost.id, BlogPost.category_id).order_by(BlogPost.created_at.desc()))
+    blog_category = first(select(BlogCategory.id, BlogCategory.name).order_by(BlogCategory.id))
+    if post and post.category_id:
+        blog_category = first(select(BlogCategory.id, BlogCategory.name).where(BlogCategory.id == post.category_id))
+    item = first(select(PortfolioItem.id, Category.name)
+                 .join(Category, Category.id == PortfolioItem.category_id)
+                 .order_by(PortfolioItem.date.desc()))
+    admin = first(select(User.id).join(user_roles).join(Role).where(Role.name == "admin"))
+    return Sample(
+        post_id=post.id if post else None,
+        blog_category_id=blog_category.id if blog_category else None,
+        blog_category=blog_category.name if blog_category else None,
+        portfolio_category=item.name if item else None,
+        item_id=item.id if item else None,
+        admin_id=admin.id if admin else None,
+    )
+
+
+class _Capture:
+    """Samlar unika SELECT-satser från alla engines medan den är aktiv."""
+
+    def __init__(self):
+        self.queries: Dict[tuple, QueryPlan] = {}
+        self.engines = list(db.engines.values())
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        params = tuple(parameters) if isinstance(parameters, (list, tuple)) else parameters
+        key = (conn.engine.url, statement, repr(params))
+        if key in self.queries:
+            self.queries[key].calls += 1
+        else:
+            self.queries[key] = QueryPlan(statement, params, conn.engine)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+
+def run_audit(include_admin: bool = True, explain_queries: bool = True) -> List[RouteAudit]:
+    """
+    ✅ Spelar upp AUDIT_ROUTES och AUDIT_JOBS och returnerar en RouteAudit per sida.
+    - `explain_queries=False` samlar bara satserna (t.ex. för tidsmätning).
+    """
+    from app.utils.page_cache import NullBackend, page_cache
+
+    app = current_app._get_current_object()
+    sample = sample_ids()
+    results = []
+
+    client = app.test_client()
+    if include_admin and sample.admin_id:
+        with client.session_transaction() as session:
+            session["_user_id"] = str(sample.admin_id)
+            session["_fresh"] = True
+
+    backend, page_cache.backend = page_cache.backend, NullBackend()
+    try:
+        for name, endpoint, build_args, admin_only in AUDIT_ROUTES:
+            if admin_only and not (include_admin and sample.admin_id):
+                continue
+            args = build_args(sample)
+            if args is None:
+                results.append(RouteAudit(name, "", skipped="ingen data"))
+                continue
+            with app.test_request_context():
+                url = url_for(endpoint, **args)
+            route = RouteAudit(name, url)
+            with _Capture() as capture:
+                route.status = client.get(url, headers={"User-Agent": AUDIT_USER_AGENT}).status_code
+            route.queries = list(capture.queries.values())
+            results.append(route)
+
+        for name, job in AUDIT_JOBS.items():
+            route = RouteAudit(name, "")
+            with _Capture() as capture:
+                job()
+            route.queries = list(capture.queries.values())
+            results.append(route)
+    finally:
+        page_cache.backend = backend
+        db.session.rollback()
+
+    if explain_queries:
+        for route in results:
+            for query in route.queries:
+                query.plan, query.flags = explain(query.engine, query.statement, query.parameters)
+    return results
@@ -16,10 +16,20 @@ Användning:
         match_all_words=True
     )
     query = apply_search_filter(query, BlogPost, filters)
+
+    # Rankad fulltextsökning via inverterat index (BM25, svensk stemming):
+    hits = search_ids("post", "flaskapplikationer pyth")   # [(post_id, score), ...]
+
+    # Bygg om indexet från grunden:
+    flask rebuild-search-index
 """
 
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
 from sqlalchemy import or_, and_
-from typing import List, Optional, Type
+from typing import Dict, Iterable, List, Optional, Tuple, Type
 from dataclasses import dataclass
 
 
@@ -197,6 +207,349 @@ def highlight_search_terms(text: str, search_term: str,
     return Markup(safe_text)
 
 
+# ===================================================
+# ✅ FULLTEXTINDEX (inverterat index + BM25)
+# ===================================================
+#
+# Ersätter `ilike('%term%')` över LONGTEXT-kolumner (full tabellskanning och
+# träffar även i HTML-markup). Texten rensas från taggar, delas upp i ord,
+# stoppord tas bort och orden stemmas (svensk Snowball). Postningarna sparas i
+# `search_terms` och uppdateras automatiskt när inlägg skapas/ändras/raderas.
+#
+#     from app.utils.search import search_ids
+#     ids = search_ids("post", "flask python")   # [(doc_id, score), ...]
+
+# Fält som indexeras per dokumenttyp och deras vikt (titelträffar väger tyngre)
+INDEXED_FIELDS = {
+    "post": {"title": 3, "subtitle": 2, "body": 1},
+    "portfolio": {"title": 3, "description": 1},
+}
+
+# BM25-parametrar
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.5     # Prefixträffar ("pyth" → "python") väger hälften
+MAX_PREFIX_TERMS = 50   # Max antal termer ett prefix får expandera till
+MAX_HITS = 1000         # Max träffar som listas (vyernas IN-lista); fler visas som "kapad" i sidan
+MAX_TERM_LENGTH = 64
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+SWEDISH_STOPWORDS = frozenset("""
+och det att i en jag hon som han på den med var sig för så till är men ett om hade de
+av icke mig du henne då sin nu har inte hans honom skulle hennes där min man ej vid kunde
+något från ut när efter upp vi dem vara vad över än dig kan sina här ha mot alla under
+någon eller allt mycket sedan ju denna själv detta åt utan varit hur ingen mitt ni bli
+blev oss din dessa några deras blir mina samma vilken er sådan vår blivit dess inom mellan
+sådant varför varje vilka ditt vem vilket sitt sådana vart dina vars vårt våra ert era vilkas
+the a an and or of to in is it for on with as at by be this that are was from
+""".split())
+
+
+# --- Svensk stemmer (Snowball) ---
+_SV_VOWELS = "aeiouyäåö"
+_SV_STEP1_SUFFIXES = sorted("""
+heterna hetens anden andes andet arens arnas ernas heten heter ornas ande ades aste
+arna arne aren erna erns orna ade are ast ens ern het ad ar as at en er es or a e
+""".split(), key=len, reverse=True)
+_SV_S_ENDING = set("bcdfghjklmnoprtvy")
+_SV_STEP2_SUFFIXES = ("dd", "gd", "nn", "dt", "gt", "kt", "tt")
+
+
+def _sv_r1(word: str) -> int:
+    """Startposition för region R1 (minst 3)."""
+    for i in range(1, len(word)):
+        if word[i] not in _SV_VOWELS and word[i - 1] in _SV_VOWELS:
+            return max(i + 1, 3)
+    return len(word)
+
+
+@lru_cache(maxsize=50_000)
+def stem_sv(word: str) -> str:
+    """
+    ✅ Stemmar ett svenskt ord enligt Snowball-algoritmen.
+
+    Example:
+        >>> stem_sv("bilarna"), stem_sv("programmering"), stem_sv("hundens")
+        ('bil', 'programmering', 'hund')
+    """
+    r1 = _sv_r1(word)
+
+    # Steg 1: vanliga böjningsändelser
+    for suffix in _SV_STEP1_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= r1:
+            word = word[:-len(suffix)]
+            break
+    else:
+        if (word.endswith("s") and len(word) - 1 >= r1
+                and len(word) > 1 and word[-2] in _SV_S_ENDING):
+            word = word[:-1]
+
+    # Steg 2: dubbelkonsonant i slutet
+    if word[r1:].endswith(_SV_STEP2_SUFFIXES):
+        word = word[:-1]
+
+    # Steg 3: avledningsändelser
+    region = word[r1:]
+    if region.endswith("fullt"):
+        word = word[:-1]
+    elif region.endswith("löst"):
+        word = word[:-1]
+    else:
+        for suffix in ("lig", "els", "ig"):
+            if region.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+    return word
+
+
+def analyze(text: str) -> list:
+    """
+    ✅ Gör om ren text till en lista med stemmade termer.
+    - Gemener, ord = bokstäver/siffror (å/ä/ö ingår), stoppord bort.
+    """
+    if not text:
+        return []
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in SWEDISH_STOPWORDS or len(token) > MAX_TERM_LENGTH:
+            continue
+        terms.append(stem_sv(token) if not token.isdigit() else token)
+    return terms
+
+
+def document_terms(doc_type: str, fields: Dict[str, str]) -> Tuple[Counter, int]:
+    """
+    ✅ Bygger viktade termfrekvenser för ett dokument.
+    - HTML tas bort innan analys så att markup aldrig ger träffar.
+    Returnerar (Counter med term → viktad tf, dokumentlängd).
+    """
+    from app.utils.helpers import html_to_text
+
+    counts = Counter()
+    length = 0
+    for field, weight in INDEXED_FIELDS[doc_type].items():
+        terms = analyze(html_to_text(fields.get(field) or ""))
+        length += len(terms)
+        for term in terms:
+            counts[term] += weight
+    return counts, length
+
+
+def _index_model(doc_type: str):
+    from app.models import BlogPost, PortfolioItem
+    return {"post": BlogPost, "portfolio": PortfolioItem}[doc_type]
+
+
+# --- Skrivning till index ---
+def remove_document(conn, doc_type: str, doc_id: int):
+    """Tar bort ett dokument ur indexet (körs på given connection/transaktion)."""
+    from app.models import SearchDocument, SearchTerm
+
+    conn.execute(SearchTerm.__table__.delete().where(
+        SearchTerm.__table__.c.doc_type == doc_type,
+        SearchTerm.__table__.c.doc_id == doc_id
+    ))
+    conn.execute(SearchDocument.__table__.delete().where(
+        SearchDocument.__table__.c.doc_type == doc_type,
+        SearchDocument.__table__.c.doc_id == doc_id
+    ))
+
+
+def _document_rows(doc_type: str, doc_id: int, fields: Dict[str, str]):
+    counts, length = document_terms(doc_type, fields)
+    doc_row = {"doc_type": doc_type, "doc_id": doc_id, "length": length}
+    term_rows = [
+        {"term": term, "doc_type": doc_type, "doc_id": doc_id, "tf": tf, "doc_length": length}
+        for term, tf in counts.items()
+    ]
+    return doc_row, term_rows
+
+
+def index_document(conn, doc_type: str, doc_id: int, fields: Dict[str, str]):
+    """✅ (Om)indexerar ett dokument: gamla postningar ersätts helt."""
+    from app.models import SearchDocument, SearchTerm
+
+    remove_document(conn, doc_type, doc_id)
+    doc_row, term_rows = _document_rows(doc_type, doc_id, fields)
+    conn.execute(SearchDocument.__table__.insert(), doc_row)
+    if term_rows:
+        conn.execute(SearchTerm.__table__.insert(), term_rows)
+
+
+def rebuild_index(doc_types: Iterable[str] = ("post", "portfolio"), chunk_size: int = 500) -> Dict[str, int]:
+    """
+    ✅ Bygger om hela indexet från databasen.
+    - Läser endast de indexerade kolumnerna, i bitar om `chunk_size` rader.
+    - Skriver postningarna med bulk-insert per bit.
+    Returnerar antal indexerade dokument per typ.
+    """
+    from sqlalchemy import select
+    from app.extensions import db
+    from app.models import SearchDocument, SearchTerm
+
+    result = {}
+    for doc_type in doc_types:
+        model = _index_model(doc_type)
+        field_names = list(INDEXED_FIELDS[doc_type])
+        columns = [model.id] + [getattr(model, f) for f in field_names]
+
+        with db.engine.begin() as conn:
+            conn.execute(SearchTerm.__table__.delete().where(SearchTerm.__table__.c.doc_type == doc_type))
+            conn.execute(SearchDocument.__table__.delete().where(SearchDocument.__table__.c.doc_type == doc_type))
+
+        count = 0
+        last_id = 0
+        while True:
+            with db.engine.begin() as conn:
+                # Nyckelbaserad bläddring (id > senaste) – ingen långlivad cursor
+                chunk = conn.execute(
+                    select(*columns).where(model.id > last_id).order_by(model.id).limit(chunk_size)
+                ).all()
+                if not chunk:
+                    break
+                doc_rows, term_rows = [], []
+                for row in chunk:
+                    doc_row, rows_for_doc = _document_rows(doc_type, row[0], dict(zip(field_names, row[1:])))
+                    doc_rows.append(doc_row)
+                    term_rows.extend(rows_for_doc)
+                conn.execute(SearchDocument.__table__.insert(), doc_rows)
+                if term_rows:
+                    conn.execute(SearchTerm.__table__.insert(), term_rows)
+            count += len(chunk)
+            last_id = chunk[-1][0]
+        result[doc_type] = count
+    return result
+
+
+# --- Sökning ---
+def search_ids(doc_type: str, query_text: str, limit: Optional[int] = MAX_HITS, match_all_words: bool = True):
+    """
+    ✅ Rankad sökning i indexet (BM25).
+    - Varje sökord matchar sin stam exakt; sista ordet även som prefix (kan vara ofullständigt).
+    - match_all_words=True: dokumentet måste innehålla alla sökord.
+    - limit: max antal träffar (None = alla), se search_ranking för list-vyerna.
+
+    Returns:
+        Lista med (doc_id, score), bäst först.
+    """
+    from sqlalchemy import func, select
+    from app.extensions import db
+    from app.models import SearchDocument, SearchTerm
+
+    query_terms = list(dict.fromkeys(analyze(query_text)))
+    if not query_terms:
+        return []
+
+    docs = SearchDocument.__table__.c
+    total_docs, avg_length = db.session.execute(
+        select(func.count(), func.avg(docs.length)).where(docs.doc_type == doc_type)
+    ).one()
+    if not total_docs:
+        return []
+    avg_length = float(avg_length or 1) or 1.0
+
+    terms = SearchTerm.__table__.c
+    scores = defaultdict(float)
+    matched_words = defaultdict(set)
+
+    for position, query_term in enumerate(query_terms):
+        candidate_terms = [query_term]
+        if position == len(query_terms) - 1 and len(query_term) >= 2:
+            # Bara sista ordet kan vara ofullständigt: prefix som intervall
+            # (term >= "pyth" AND term < "pyti") – använder PK-indexet
+            upper = query_term[:-1] + chr(ord(query_term[-1]) + 1)
+            # Begränsa prefix-expansionen till de vanligaste termerna
+            candidate_terms = db.session.execute(
+                select(terms.term)
+                .where(terms.doc_type == doc_type, terms.term >= query_term, terms.term < upper)
+                .group_by(terms.term)
+                .order_by(func.count().desc())
+                .limit(MAX_PREFIX_TERMS)
+            ).scalars().all()
+
+        postings = defaultdict(list)
+        if candidate_terms:
+            for term, doc_id, tf, doc_length in db.session.execute(
+                select(terms.term, terms.doc_id, terms.tf, terms.doc_length)
+                .where(terms.doc_type == doc_type, terms.term.in_(candidate_terms))
+            ):
+                postings[term].append((doc_id, tf, doc_length))
+        if not postings:
+            if match_all_words:
+                return []
+            continue
+
+        for term, term_postings in postings.items():
+            df = len(term_postings)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            weight = 1.0 if term == query_term else PREFIX_WEIGHT
+            for doc_id, tf, doc_length in term_postings:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_length / avg_length)
+                scores[doc_id] += weight * idf * tf * (BM25_K1 + 1) / norm
+                matched_words[doc_id].add(position)
+
+    if match_all_words:
+        needed = len(query_terms)
+        scores = {d: s for d, s in scores.items() if len(matched_words[d]) == needed}
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked[:limit]
+
+
+def search_ranking(doc_type: str, query_text: str) -> Tuple[Dict[int, int], bool]:
+    """
+    ✅ Sökträffar för list-vyerna: {doc_id: rang} (0 = bäst) och om listan kapats.
+    - Högst MAX_HITS träffar; True betyder att det fanns fler (visas i sidan).
+    """
+    hits = search_ids(doc_type, query_text, limit=MAX_HITS + 1)
+    ranking = {doc_id: rank for rank, (doc_id, _score) in enumerate(hits[:MAX_HITS])}
+    return ranking, len(hits) > MAX_HITS
+
+
+def register_search_index(app):
+    """
+    ✅ Håller indexet uppdaterat automatiskt.
+    - Lyssnar på SQLAlchemy-sessionens `after_flush`.
+    - Nya/ändrade BlogPost/PortfolioItem indexeras, raderade tas bort,
+      i samma transaktion som själva ändringen.
+    """
+    from sqlalchemy import event, inspect
+    from sqlalchemy.orm import Session
+    from app.models import BlogPost, PortfolioItem
+
+    doc_types = {BlogPost: "post", PortfolioItem: "portfolio"}
+
+    if getattr(register_search_index, "_registered", False):
+        return
+
+    @event.listens_for(Session, "after_flush")
+    def _update_search_index(session, flush_context):
+        changed = []
+        for obj in list(session.new) + list(session.dirty):
+            doc_type = doc_types.get(type(obj))
+            if not doc_type:
+                continue
+            state = inspect(obj)
+            if obj in session.new or any(
+                state.attrs[f].history.has_changes() for f in INDEXED_FIELDS[doc_type]
+            ):
+                changed.append((doc_type, obj))
+
+        deleted = [(doc_types[type(o)], o.id) for o in session.deleted if type(o) in doc_types]
+        if not changed and not deleted:
+            return
+
+        conn = session.connection()
+        for doc_type, obj in changed:
+            fields = {f: getattr(obj, f) for f in INDEXED_FIELDS[doc_type]}
+            index_document(conn, doc_type, obj.id, fields)
+        for doc_type, doc_id in deleted:
+            remove_document(conn, doc_type, doc_id)
+
+    register_search_index._registered = True
+
+
 # Exempel på användning i en view:
 """
 from app.utils.search import search_posts, SearchFilter
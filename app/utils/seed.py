@@ -0,0 +1,234 @@
+# app/utils/seed.py
+"""
+Syntetisk testdata för utveckling och prestandamätning (flask seed).
+
+Skapar på några sekunder:
+    ✅ användare med roller (användare 1 är admin, ~10 % prenumeranter)
+    ✅ bloggkategorier, inlägg med långa HTML-texter och förberäknade utdrag
+    ✅ kommentarer (några flaggade), portfoliokategorier och projekt
+    ✅ sidvisningar (page_views) och daglig historik (daily_stats)
+
+Allt skrivs med bulk-insert i batchar direkt mot tabellerna (ingen ORM per rad),
+med förbestämda id så att relationerna kan byggas utan att läsa tillbaka något.
+Samma `seed` ger samma data. Ett fåtal inlägg ligger i framtiden (schemalagda).
+
+Användning:
+    from app.utils.seed import seed_database
+
+    counts = seed_database(posts=100_000, comments=300_000, reset=True)
+"""
+
+import random
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (BlogCategory, BlogPost, Category, Comment, DailyStats, PageView, PortfolioItem,
+                        Role, User, user_roles)
+from app.utils.helpers import make_excerpt
+
+BATCH = 5000
+BODY_POOL = 64      # Olika inläggstexter att välja bland
+TEXT_POOL = 1000    # Olika titlar, underrubriker och kommentarer (slumptext per rad är det som tar tid)
+FIXED_PAGES = ("home", "about", "cv", "contact", "portfolio")
+
+WORDS = ("garn stickning virkning mönster ull bomull lin alpacka färg nystan maskor varv tröja mössa "
+         "vante sjal filt kofta sommar vinter höst vår skog trädgård kaffe bulle katt hund sjö bok "
+         "tråd nål sticka ändra prova planera fotografera visa skapa enkel mjuk varm ljus").split()
+BLOG_CATEGORIES = ("stickning", "virkning", "sömnad", "broderi", "mönster", "garn", "tips", "resor",
+                   "trädgård", "bakning", "inspiration", "nyheter")
+PORTFOLIO_CATEGORIES = ("tröjor", "mössor", "vantar", "sjalar", "filtar", "kuddar", "väskor", "övrigt")
+
+
+def _sentence(rnd, n_min=6, n_max=16) -> str:
+    words = rnd.choices(WORDS, k=rnd.randint(n_min, n_max))
+    return " ".join(words).capitalize() + "."
+
+
+def _body(rnd) -> str:
+    """En lång HTML-text som från editorn: stycken, rubriker, listor och en bild."""
+    parts = []
+    for section in range(rnd.randint(3, 6)):
+        parts.append(f"<h2>{_sentence(rnd, 2, 5)[:-1]}</h2>")
+        for _ in range(rnd.randint(2, 4)):
+            text = " ".join(_sentence(rnd) for _ in range(rnd.randint(3, 7)))
+            parts.append(f"<p>{text.replace('garn', '<strong>garn</strong>', 1)}</p>")
+        if section % 2:
+            parts.append("<ul>" + "".join(f"<li>{_sentence(rnd, 3, 8)}</li>" for _ in range(4)) + "</ul>")
+        if section == 1:
+            parts.append(f'<p><img src="/static/uploads/blog/seed-{rnd.randint(1, 50)}.webp" alt=""></p>')
+    return "\n".join(parts)
+
+
+def _batches(rows, size=BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _clear():
+    from app.utils.backup import KEEP_ON_REPLACE
+
+    with db.engine.begin() as conn:
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name not in KEEP_ON_REPLACE:
+                conn.execute(delete(table))
+
+
+def seed_database(users: int = 200, posts: int = 10_000, comments: Optional[int] = None, items: int = 500,
+                  days: int = 365, seed: int = 42, reset: bool = False,
+                  admin_email: str = "admin@example.se", admin_password: Optional[str] = None,
+                  search_index: bool = False) -> Dict[str, int]:
+    """
+    ✅ Fyller databasen med syntetisk data. Returnerar antal rader per tabell.
+    - `comments` default: 3 per inlägg
+    - `days`: inläggen och statistiken sprids över så många dagar bakåt
+    - `reset=True` tömmer tabellerna först (som `flask restore --replace`), annars
+      måste databasen sakna användare och inlägg
+    - `search_index=True` bygger även sökindexet (tar längst tid)
+    - `admin_password` None = slumpat lösenord (ange ett för att kunna logga in)
+    """
+    rnd = random.Random(seed)
+    comments = posts * 3 if comments is None else comments
+    users = max(users, 1)
+    admin_password = admin_password or secrets.token_urlsafe(12)
+
+    if reset:
+        _clear()
+    elif db.session.execute(select(func.count()).select_from(User)).scalar() or \
+            db.session.execute(select(func.count()).select_from(BlogPost)).scalar():
+        raise ValueError("Databasen innehåller redan användare eller inlägg – använd reset")
+    db.session.remove()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    start = now - timedelta(days=days)
+    span = (now - start).total_seconds()
+    bodies = [_body(rnd) for _ in range(BODY_POOL)]
+    excerpts = [make_excerpt(body) for body in bodies]
+    titles = [_sentence(rnd, 3, 8)[:-1][:100] for _ in range(TEXT_POOL)]
+    subtitles = [_sentence(rnd, 5, 12)[:250] for _ in range(TEXT_POOL)]
+    texts = [_sentence(rnd, 4, 30) for _ in range(TEXT_POOL)]
+    password = generate_password_hash("password")  # En hash för alla – hashning är medvetet långsam
+    counts = {}
+
+    with db.engine.begin() as conn:
+        # === Roller och användare ===
+        conn.execute(Role.__table__.insert(), [{"id": i + 1, "name": name}
+                                               for i, name in enumerate(("admin", "user", "subscriber"))])
+        for batch in _batches({
+            "id": i + 1,
+            "email": admin_email if i == 0 else f"user{i}@example.se",
+            "name": "Admin" if i == 0 else f"Användare {i}",
+            "password": generate_password_hash(admin_password) if i == 0 else password,
+            "is_active": True, "is_deleted": False, "is_password_set": True,
+        } for i in range(users)):
+            conn.execute(User.__table__.insert(), batch)
+        memberships = [{"user_id": 1, "role_id": 1}] + [{"user_id": i + 1, "role_id": 2} for i in range(users)]
+        memberships += [{"user_id": i + 1, "role_id": 3} for i in range(1, users) if rnd.random() < 0.1]
+        for batch in _batches(memberships):
+            conn.execute(user_roles.insert(), batch)
+        counts["users"], counts["user_roles"] = users, len(memberships)
+
+        # === Kategorier ===
+        conn.execute(BlogCategory.__table__.insert(), [
+            {"id": i + 1, "name": name, "title": name.capitalize(), "description": _sentence(rnd),
+             "updated_at": now.replace(tzinfo=None)} for i, name in enumerate(BLOG_CATEGORIES)
+        ])
+        conn.execute(Category.__table__.insert(), [
+            {"id": i + 1, "name": name, "title": name.capitalize(), "description": _sentence(rnd),
+             "updated_at": now.replace(tzinfo=None)} for i, name in enumerate(PORTFOLIO_CATEGORIES)
+        ])
+        counts["blog_categories"], counts["categories"] = len(BLOG_CATEGORIES), len(PORTFOLIO_CATEGORIES)
+
+        # === Inlägg: i id-ordning över perioden, ~0,5 % schemalagda i framtiden ===
+        created = []
+        for i in range(posts):
+            when = start + timedelta(seconds=span * (i + rnd.random()) / max(posts, 1))
+            if rnd.random() < 0.005:
+                when = now + timedelta(days=rnd.randint(1, 30))
+            created.append(when)
+        for batch in _batches({
+            "id": i + 1,
+            "title": titles[i % TEXT_POOL],
+            "subtitle": subtitles[(i * 7) % TEXT_POOL],
+            "body": bodies[i % BODY_POOL],
+            "excerpt": excerpts[i % BODY_POOL],
+            "img_url": f"uploads/blog/seed-{i % 50 + 1}.webp",
+            "created_at": created[i],
+            "updated_at": min(created[i] + timedelta(days=rnd.randint(1, 30)), now) if rnd.random() < 0.2 else None,
+            "views": int(rnd.paretovariate(1.2) * 20),
+            "email_sent": created[i] <= now,
+            "category_id": i % len(BLOG_CATEGORIES) + 1,
+            "author_id": 1 if rnd.random() < 0.8 else int(rnd.random() * users) + 1,
+        } for i in range(posts)):
+            conn.execute(BlogPost.__table__.insert(), batch)
+        counts["blog_posts"] = posts
+
+        # === Kommentarer på publicerade inlägg ===
+        published = [i + 1 for i, when in enumerate(created) if when <= now]
+        if published:
+            def comment(n):
+                post_id = published[int(rnd.random() * len(published))]
+                posted = created[post_id - 1] + timedelta(minutes=5 + rnd.random() * 60 * 24 * 30)
+                return {"id": n + 1, "text": texts[n % TEXT_POOL], "date_created": min(posted, now),
+                        "visible": True, "flagged": rnd.random() < 0.02,
+                        "post_id": post_id, "author_id": int(rnd.random() * users) + 1}
+            for batch in _batches(comment(n) for n in range(comments)):
+                conn.execute(Comment.__table__.insert(), batch)
+        counts["comments"] = comments if published else 0
+
+        # === Portfolio ===
+        for batch in _batches({
+            "id": i + 1,
+            "title": titles[(i * 13) % TEXT_POOL],
+            "description": bodies[(i * 7) % BODY_POOL],
+            "image": f"seed-{i % 40 + 1}.webp",  # Bara filnamnet, som save_image – mappen läggs till i mallarna
+            "date": (start + timedelta(seconds=span * i / max(items, 1))).replace(tzinfo=None),
+            "updated_at": now.replace(tzinfo=None),
+            "category_id": rnd.randint(1, len(PORTFOLIO_CATEGORIES)),
+        } for i in range(items)):
+            conn.execute(PortfolioItem.__table__.insert(), batch)
+        counts["portfolio_items"] = items
+
+        # === Statistik: totaler per sida och en rad per dag och besökt sida ===
+        pages = list(FIXED_PAGES) + [f"portfolio_{i + 1}" for i in range(items)]
+        conn.execute(PageView.__table__.insert(), [{"page": page, "views": rnd.randint(10, 20_000)}
+                                                   for page in pages])
+        counts["page_views"] = len(pages)
+
+        def daily():
+            for offset in range(days):
+                day = (now - timedelta(days=offset)).date()
+                visited = set(FIXED_PAGES)
+                visited.update(f"post_{rnd.choice(published)}" for _ in range(min(len(published), 150)))
+                visited.update(f"portfolio_{rnd.randint(1, items)}" for _ in range(min(items, 30)))
+                for page in visited:
+                    yield {"date": day, "page": page, "views": rnd.randint(1, 200)}
+        counts["daily_stats"] = 0
+        for batch in _batches(daily()):
+            conn.execute(DailyStats.__table__.insert(), batch)
+            counts["daily_stats"] += len(batch)
+
+    # === Härledda tabeller ===
+    from app.utils.dashboard_metrics import dashboard_metrics
+    from app.utils.page_cache import page_cache
+    from app.utils.portfolio_order import portfolio_order
+    from app.utils.principal_cache import principal_cache
+
+    if search_index:
+        from app.utils.search import rebuild_index
+        rebuild_index()
+    dashboard_metrics.refresh()
+    page_cache.clear()
+    portfolio_order.invalidate()
+    principal_cache.clear()
+    return counts
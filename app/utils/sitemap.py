@@ -0,0 +1,278 @@
+# app/utils/sitemap.py
+"""
+Sitemap för sökmotorer, genererad som fil och cachad tills innehållet ändras.
+
+Generering:
+    - Queries hämtar bara id, namn och tidsstämplar (aldrig body/description).
+    - Raderna läses i batchar och XML skrivs direkt till fil, så minnet är
+      konstant oavsett antal inlägg.
+    - Över SITEMAP_MAX_URLS adresser (protokollets gräns är 50 000) delas den
+      i sitemap-1.xml, sitemap-2.xml … och sitemap.xml blir ett sitemapindex.
+
+Cache:
+    Ett fingeravtryck (antal och senaste ändring per tabell, en query) avgör
+    om filerna är aktuella. Det blir också ETag, och senaste ändringen blir
+    Last-Modified – crawlers som skickar If-None-Match/If-Modified-Since får 304.
+    Filerna ligger i SITEMAP_CACHE_DIR/<fingeravtryck>/ och delas mellan
+    workers. Föregående version sparas också (KEEP_VERSIONS) så att en worker
+    som just skickar den inte får filen bortplockad.
+
+Adresser:
+    Alla adresser byggs på SITE_URL (t.ex. https://majatingworks.se), inte på
+    requestens Host-header – en sitemap oavsett vilket värdnamn som frågar
+    (www/utan www), och en okänd Host kan inte ge nya byggen eller kataloger.
+
+Användning:
+    from app.utils.sitemap import sitemap_generator
+
+    files = sitemap_generator.current()   # Bygger om vid behov
+    send_file(files.path("sitemap.xml"), etag=files.etag, ...)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from flask import current_app, url_for
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import BlogCategory, BlogPost, Category, PortfolioItem
+from app.utils.time import as_utc, get_local_now
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+BATCH_SIZE = 1000
+KEEP_VERSIONS = 2  # Aktuell + föregående version
+
+# Statiska sidor (utan lastmod – de ändras inte med innehållet)
+STATIC_ENDPOINTS = ("pages.home", "pages.about", "pages.contact", "pages.cv")
+
+
+def _lastmod(value: Optional[datetime]) -> Optional[str]:
+    value = as_utc(value)
+    return value.date().isoformat() if value else None
+
+
+# ===================================================
+# ✅ GENERERADE FILER
+# ===================================================
+
+class SitemapFiles:
+    """✅ En genererad version: katalog, filnamn, ETag och senaste ändring."""
+
+    def __init__(self, directory: str, etag: str, last_modified: Optional[datetime], names: List[str]):
+        self.directory = directory
+        self.etag = etag
+        self.last_modified = last_modified
+        self.names = names
+
+    def path(self, name: str) -> Optional[str]:
+        """Full sökväg till en fil i versionen, eller None om den inte finns."""
+        return os.path.join(self.directory, name) if name in self.names else None
+
+
+# ===================================================
+# ✅ GENERATOR
+# ===================================================
+
+class SitemapGenerator:
+    """
+    ✅ Bygger sitemap-filer när innehållet ändrats och återanvänder dem annars.
+    - SITEMAP_MAX_URLS: adresser per fil innan den delas upp (max 50 000)
+    - SITEMAP_CACHE_DIR: katalog för genererade filer (default instance/sitemap)
+    - SITE_URL: bas-URL för adresserna (default http://localhost)
+    """
+
+    def __init__(self, app=None):
+        self.max_urls = 50_000
+        self.cache_dir = None
+        self.base_url = "http://localhost"
+        self._build_lock = threading.Lock()
+        self._current: Optional[SitemapFiles] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_urls = min(app.config.get("SITEMAP_MAX_URLS", 50_000), 50_000)
+        self.cache_dir = app.config.get("SITEMAP_CACHE_DIR") or os.path.join(app.instance_path, "sitemap")
+        self.base_url = (app.config.get("SITE_URL") or "http://localhost").rstrip("/")
+        self._current = None
+        app.extensions["sitemap"] = self
+
+    def _url(self, endpoint: str, **values) -> str:
+        """Absolut adress på SITE_URL (requestens Host-header används aldrig)."""
+        return f"{self.base_url}{url_for(endpoint, **values)}"
+
+    # === Fingeravtryck ===
+    @staticmethod
+    def _published():
+        return BlogPost.created_at <= get_local_now()
+
+    def fingerprint(self) -> Tuple[str, Optional[datetime]]:
+        """
+        ✅ (ETag, senaste ändring) från en enda aggregat-query.
+        - Antalet publicerade inlägg ändras när ett schemalagt inlägg går live,
+          även utan commit.
+        """
+        post_changed = func.coalesce(BlogPost.updated_at, BlogPost.created_at)
+        item_changed = func.coalesce(PortfolioItem.updated_at, PortfolioItem.date)
+        row = db.session.execute(select(
+            select(func.count()).select_from(BlogPost).where(self._published()).scalar_subquery(),
+            select(func.max(post_changed)).where(self._published()).scalar_subquery(),
+            select(func.max(BlogPost.id)).where(self._published()).scalar_subquery(),
+            select(func.count()).select_from(BlogCategory).scalar_subquery(),
+            select(func.max(BlogCategory.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(PortfolioItem).scalar_subquery(),
+            select(func.max(item_changed)).scalar_subquery(),
+            select(func.max(PortfolioItem.id)).scalar_subquery(),
+            select(func.count()).select_from(Category).scalar_subquery(),
+            select(func.max(Category.updated_at)).scalar_subquery(),
+        )).one()
+
+        # Adresserna är absoluta – olika värdnamn (www/utan www) får egna filer
+        raw = "|".join(str(value) for value in (*row, self.base_url, self.max_urls))
+        etag = hashlib.sha1(raw.encode()).hexdigest()[:20]
+        changed = [as_utc(value) for value in (row[1], row[6]) if value is not None]
+        return etag, max(changed) if changed else None
+
+    # === Adresser ===
+    def iter_urls(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """(loc, lastmod) för alla publika sidor – en batch i taget."""
+        for endpoint in STATIC_ENDPOINTS:
+            yield self._url(endpoint), None
+
+        post_changed = func.coalesce(BlogPost.updated_at, BlogPost.created_at)
+        latest_post = db.session.execute(select(func.max(post_changed)).where(self._published())).scalar()
+        latest_item = db.session.execute(select(func.max(PortfolioItem.date))).scalar()
+        yield self._url("blog.index"), _lastmod(latest_post)
+        yield self._url("portfolio.index"), _lastmod(latest_item)
+
+        posts = (select(BlogPost.id, post_changed)
+                 .where(self._published())
+                 .order_by(BlogPost.id)
+                 .execution_options(yield_per=BATCH_SIZE))
+        for post_id, changed in db.session.execute(posts):
+            yield self._url("blog.show_post", post_id=post_id), _lastmod(changed)
+
+        blog_categories = (select(BlogCategory.name, func.max(post_changed))
+                           .outerjoin(BlogPost, (BlogPost.category_id == BlogCategory.id) & self._published())
+                           .group_by(BlogCategory.id, BlogCategory.name)
+                           .order_by(BlogCategory.id))
+        for name, changed in db.session.execute(blog_categories):
+            yield self._url("blog.posts_by_category", slug=name), _lastmod(changed)
+
+        items = (select(PortfolioItem.id, PortfolioItem.date)
+                 .order_by(PortfolioItem.id)
+                 .execution_options(yield_per=BATCH_SIZE))
+        for item_id, date in db.session.execute(items):
+            yield self._url("portfolio.item", item_id=item_id), _lastmod(date)
+
+        portfolio_categories = (select(Category.name, func.max(PortfolioItem.date))
+                                .outerjoin(PortfolioItem, PortfolioItem.category_id == Category.id)
+                                .group_by(Category.id, Category.name)
+                                .order_by(Category.id))
+        for name, changed in db.session.execute(portfolio_categories):
+            yield self._url("portfolio.category_view", category=name), _lastmod(changed)
+
+    # === Bygge ===
+    def current(self) -> SitemapFiles:
+        """✅ Aktuell version – byggs bara om fingeravtrycket ändrats."""
+        etag, last_modified = self.fingerprint()
+        current = self._current
+        if current is not None and current.etag == etag and os.path.isdir(current.directory):
+            return current
+
+        with self._build_lock:
+            directory = os.path.join(self.cache_dir, etag)
+            if not os.path.isdir(directory):  # En annan worker kan redan ha byggt den
+                self._build(directory)
+                self._remove_old(keep=etag)
+            self._current = SitemapFiles(directory, etag, last_modified, sorted(os.listdir(directory)))
+            return self._current
+
+    def _build(self, directory: str):
+        """Skriver filerna i en temporär katalog och byter in den när allt är klart."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".build-")
+        try:
+            parts = self._write_urlsets(tmp_dir)
+            if len(parts) == 1:
+                os.replace(os.path.join(tmp_dir, parts[0]), os.path.join(tmp_dir, "sitemap.xml"))
+            else:
+                self._write_index(tmp_dir, parts)
+            try:
+                os.rename(tmp_dir, directory)
+            except OSError:
+                shutil.rmtree(tmp_dir, ignore_errors=True)  # Samma version byggdes parallellt
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        current_app.logger.info(f"🗺️ Sitemap byggd ({len(parts)} fil(er)) i {directory}")
+
+    def _write_urlsets(self, directory: str) -> List[str]:
+        """Skriver sitemap-1.xml, sitemap-2.xml … med högst max_urls adresser var."""
+        parts, f, count = [], None, 0
+        try:
+            for loc, lastmod in self.iter_urls():
+                if f is None or count >= self.max_urls:
+                    if f is not None:
+                        f.write("</urlset>\n")
+                        f.close()
+                    parts.append(f"sitemap-{len(parts) + 1}.xml")
+                    f = open(os.path.join(directory, parts[-1]), "w", encoding="utf-8")
+                    f.write(XML_HEADER + URLSET_OPEN)
+                    count = 0
+                f.write(f"  <url><loc>{escape(loc)}</loc>")
+                f.write(f"<lastmod>{lastmod}</lastmod></url>\n" if lastmod else "</url>\n")
+                count += 1
+            if f is None:  # Inga adresser alls
+                parts.append("sitemap-1.xml")
+                f = open(os.path.join(directory, parts[-1]), "w", encoding="utf-8")
+                f.write(XML_HEADER + URLSET_OPEN)
+            f.write("</urlset>\n")
+        finally:
+            if f is not None:
+                f.close()
+        return parts
+
+    def _write_index(self, directory: str, parts: List[str]):
+        with open(os.path.join(directory, "sitemap.xml"), "w", encoding="utf-8") as f:
+            f.write(XML_HEADER + INDEX_OPEN)
+            for name in parts:
+                loc = self._url("pages.sitemap_part", part=int(name[len("sitemap-"):-len(".xml")]))
+                f.write(f"  <sitemap><loc>{escape(loc)}</loc></sitemap>\n")
+            f.write("</sitemapindex>\n")
+
+    def _remove_old(self, keep: str):
+        """
+        Tar bort äldre versioner, men behåller de KEEP_VERSIONS senaste (en
+        annan worker kan mitt i ett svar fortfarande läsa den förra).
+        """
+        versions = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name != keep and not name.startswith(".") and os.path.isdir(path):
+                try:
+                    versions.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue  # Redan borttagen av en annan worker
+        versions.sort(reverse=True)
+        for _mtime, path in versions[KEEP_VERSIONS - 1:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def invalidate(self):
+        """Tvinga ombyggnad vid nästa anrop (t.ex. efter ändrad SITE_URL)."""
+        self._current = None
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# 🧮 Delad instans – initieras i create_app()
+sitemap_generator = SitemapGenerator()
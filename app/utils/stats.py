@@ -0,0 +1,195 @@
+# app/utils/stats.py
+"""
+Visningsstatistik: händelselogg → timmar → dagar.
+
+Flöde:
+    1. view_buffer.flush() skriver räknarna (blog_posts.views / page_views)
+       och lägger i samma transaktion till en rad per sida i view_events
+       (append-only, batchad INSERT). Loggen och räknarna stämmer alltid.
+    2. rollup_day(datum) bygger hourly_stats och daily_stats för datumet med
+       set-baserade INSERT ... SELECT ... GROUP BY – inga rader läses in i Python.
+       Datumets gamla rader tas bort i samma transaktion, så en rollup kan
+       köras om hur många gånger som helst med samma resultat.
+    3. Datum före den äldsta händelsen (första körningen efter driftsättning,
+       eller dagar från den gamla räknar-diffen) byggs inte om – de skulle
+       annars skrivas över med noll. `force=True` kör ändå.
+
+Dagar räknas i svensk tid (DEFAULT_TZ), timmar sparas i UTC.
+Sidnamn i statistiken: "post_<id>" för blogginlägg, annars sidans namn ("cv", "portfolio_12" …).
+
+Används av `flask aggregate-stats`, `flask backfill-stats` och jobbet i app/scheduler.py.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, literal, select
+
+from app.extensions import db
+from app.models import DailyStats, HourlyStats, ViewEvent
+from app.utils.time import DEFAULT_TZ, UTC_TZ, get_display_time
+from app.utils.view_buffer import PAGE_PREFIX, POST_PREFIX, view_buffer
+
+
+def _stat_page(key: str) -> str:
+    """Buffertnyckel ("post:12", "page:cv") → sidnamn i statistiken ("post_12", "cv")."""
+    if key.startswith(POST_PREFIX):
+        return f"post_{key[len(POST_PREFIX):]}"
+    return key[len(PAGE_PREFIX):] if key.startswith(PAGE_PREFIX) else key
+
+
+def _current_hour() -> datetime:
+    return datetime.now(UTC_TZ).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def _day_bounds(target_date: date) -> Tuple[datetime, datetime]:
+    """Första och sista (exklusive) UTC-timmen för ett datum i svensk tid."""
+    def utc(day):
+        return datetime.combine(day, time.min, tzinfo=DEFAULT_TZ).astimezone(UTC_TZ).replace(tzinfo=None)
+    return utc(target_date), utc(target_date + timedelta(days=1))
+
+
+def local_today() -> date:
+    return get_display_time().date()
+
+
+def retained_since(today: Optional[date] = None) -> Optional[date]:
+    """Äldsta datum som fortfarande har händelser kvar (None = allt sparas)."""
+    keep_days = current_app.config.get("VIEW_EVENTS_RETENTION_DAYS", 0)
+    if keep_days <= 0:
+        return None
+    return (today or local_today()) - timedelta(days=keep_days)
+
+
+# ===================================================
+# ✅ HÄNDELSELOGG
+# ===================================================
+
+def append_view_events(conn, counts: Dict[str, int], hour: Optional[datetime] = None) -> int:
+    """
+    ✅ Lägger till en händelse per sida i view_events (en batchad INSERT).
+    - `conn` är buffertens transaktion, så händelserna skrivs med räknarna eller inte alls.
+    - Ökningar för samma sida slås ihop. Returnerar antal rader.
+    """
+    hour = hour or _current_hour()
+    pages: Dict[str, int] = {}
+    for key, n in counts.items():
+        if n > 0:
+            page = _stat_page(key)
+            pages[page] = pages.get(page, 0) + n
+    if pages:
+        conn.execute(insert(ViewEvent.__table__),
+                     [{"hour": hour, "page": page, "views": n} for page, n in pages.items()])
+    return len(pages)
+
+
+# ===================================================
+# ✅ ROLLUPS
+# ===================================================
+
+def rollup_day(target_date: date, flush: bool = True, force: bool = False) -> int:
+    """
+    ✅ Bygger om hourly_stats och daily_stats för `target_date` från view_events.
+    - Idempotent: datumets rader ersätts i en transaktion.
+    - Buffrade visningar skrivs först så att de finns med.
+    - ValueError för datum före äldsta händelsen (se first_event_date), om inte `force`.
+    Returnerar antal rader i daily_stats för datumet.
+    """
+    cutoff = retained_since()
+    if cutoff is not None and target_date < cutoff:
+        raise ValueError(f"Händelserna för {target_date} är rensade (VIEW_EVENTS_RETENTION_DAYS)")
+    if flush:
+        view_buffer.flush()
+    if not force and not _log_covers(target_date):
+        raise ValueError(f"Händelseloggen börjar efter {target_date} – kör med force för att ändå skriva över dagen")
+
+    start, end = _day_bounds(target_date)
+    events, hourly, daily = ViewEvent.__table__, HourlyStats.__table__, DailyStats.__table__
+
+    with db.engine.begin() as conn:
+        conn.execute(delete(hourly).where(hourly.c.hour >= start, hourly.c.hour < end))
+        conn.execute(insert(hourly).from_select(
+            ["hour", "page", "views"],
+            select(events.c.hour, events.c.page, func.sum(events.c.views))
+            .where(events.c.hour >= start, events.c.hour < end)
+            .group_by(events.c.hour, events.c.page)
+        ))
+
+        conn.execute(delete(daily).where(daily.c.date == target_date))
+        conn.execute(insert(daily).from_select(
+            ["date", "page", "views"],
+            select(literal(target_date, db.Date), hourly.c.page, func.sum(hourly.c.views))
+            .where(hourly.c.hour >= start, hourly.c.hour < end)
+            .group_by(hourly.c.page)
+        ))
+        return conn.execute(
+            select(func.count()).select_from(daily).where(daily.c.date == target_date)
+        ).scalar_one()
+
+
+def rollup_recent(today: Optional[date] = None) -> Tuple[int, int]:
+    """
+    ✅ Uppdaterar gårdagen och dagen hittills (schemalagt jobb).
+    Gårdagen körs om så att sena flushar från andra workers kommer med.
+    Dagar före äldsta händelsen hoppas över (0 rader) – första körningen
+    efter driftsättning rör alltså inte gårdagens daily_stats.
+    Returnerar (rader för igår, rader för idag).
+    """
+    today = today or local_today()
+    view_buffer.flush()
+    first = first_event_date()
+    return tuple(
+        rollup_day(day, flush=False, force=True) if first is not None and day >= first else 0
+        for day in (today - timedelta(days=1), today)
+    )
+
+
+def backfill(start: date, end: date, force: bool = False) -> Dict[date, int]:
+    """
+    ✅ Kör rollup för varje datum i [start, end] – samma resultat hur många gånger det än körs.
+    Datum vars händelser redan rensats, eller som ligger före äldsta händelsen, hoppas över
+    (med `force` körs de senare ändå).
+    """
+    cutoff = retained_since()
+    if cutoff is not None:
+        start = max(start, cutoff)
+    view_buffer.flush()
+    first = first_event_date()
+    if not force:
+        if first is None:
+            return {}
+        start = max(start, first)
+    result = {}
+    day = start
+    while day <= end:
+        result[day] = rollup_day(day, flush=False, force=True)  # start är redan kontrollerat
+        day += timedelta(days=1)
+    return result
+
+
+def _log_covers(target_date: date) -> bool:
+    """Börjar händelseloggen senast `target_date`? Annars finns inget att bygga dagen från."""
+    first = first_event_date()
+    return first is not None and first <= target_date
+
+
+def first_event_date() -> Optional[date]:
+    """Datum (svensk tid) för den äldsta händelsen i loggen."""
+    first = db.session.execute(select(func.min(ViewEvent.hour))).scalar()
+    if first is None:
+        return None
+    return first.replace(tzinfo=UTC_TZ).astimezone(DEFAULT_TZ).date()
+
+
+def prune_events(today: Optional[date] = None) -> int:
+    """
+    ✅ Tar bort händelser äldre än VIEW_EVENTS_RETENTION_DAYS dagar (0 = spara allt).
+    Dagarna finns kvar i hourly_stats/daily_stats men kan inte längre byggas om.
+    """
+    since = retained_since(today)
+    if since is None:
+        return 0
+    cutoff, _ = _day_bounds(since)
+    with db.engine.begin() as conn:
+        return conn.execute(delete(ViewEvent.__table__).where(ViewEvent.__table__.c.hour < cutoff)).rowcount
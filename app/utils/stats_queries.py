@@ -0,0 +1,249 @@
+# app/utils/stats_queries.py
+"""
+Queries för statistiksidan (/admin/views).
+
+Alla funktioner hämtar bara de kolumner som visas (id, titel, visningar).
+Titlar kopplas på med JOIN i databasen – inga ORM-objekt med body/description
+och ingen query per rad. Topplistor har LIMIT, och antal/summa per sektion
+räknas med en egen aggregat-query så att totalen stämmer även när bara
+topplistan hämtas.
+
+Period:
+    "all"        → kumulativa räknare (blog_posts.views, page_views)
+    "7"/"30"/"90" → summor från daily_stats för de senaste N dagarna (svensk tid)
+
+Trender:
+    daily_stats summeras per datum och sektion (blogg/sidor/portfolio) i SQL;
+    veckor och månader slås ihop i Python från de redan aggregerade dagarna
+    (högst tre rader per dag, oberoende av antal inlägg).
+
+Användning:
+    from app.utils import stats_queries as sq
+
+    period = sq.resolve_period(request.args.get("days"))
+    posts = sq.top_posts(period, limit=25)
+    series = sq.trend(period, bucket="week")
+"""
+
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import Integer, and_, case, cast, func, literal, select
+
+from app.extensions import db
+from app.models import BlogPost, DailyStats, PageView, PortfolioItem
+from app.utils.stats import local_today
+
+PERIODS = OrderedDict([
+    ("7", "Senaste 7 dagarna"),
+    ("30", "Senaste 30 dagarna"),
+    ("90", "Senaste 90 dagarna"),
+    ("all", "Totalt (sedan start)"),
+])
+BUCKETS = ("day", "week", "month")
+SECTIONS = ("blog", "pages", "portfolio")
+
+
+class Period(NamedTuple):
+    key: str                   # "7", "30", "90" eller "all"
+    label: str
+    start: Optional[date]      # None = sedan start (kumulativa räknare)
+    end: date
+
+
+class Row(NamedTuple):
+    key: str                   # id eller sidnamn
+    title: str
+    views: int
+
+
+class Summary(NamedTuple):
+    items: int                 # antal inlägg/sidor/projekt med visningar
+    views: int
+
+
+def resolve_period(days: Optional[str], today: Optional[date] = None) -> Period:
+    """Period från ?days=… (okända värden → "all")."""
+    key = days if days in PERIODS else "all"
+    end = today or local_today()
+    start = None if key == "all" else end - timedelta(days=int(key) - 1)
+    return Period(key, PERIODS[key], start, end)
+
+
+# ===================================================
+# ✅ KÄLLOR (räknare eller daily_stats)
+# ===================================================
+
+POST_KEY = "post_"
+PORTFOLIO_KEY = "portfolio_"
+
+
+def _key_id(page_column, prefix: str):
+    """"post_12" → 12, så att JOIN kan använda primärnyckeln istället för att bygga strängar per rad."""
+    return cast(func.substr(page_column, len(prefix) + 1), Integer)
+
+
+def _like_prefix(page_column, prefix: str):
+    return page_column.like(prefix.replace("_", "\\_") + "%", escape="\\")
+
+
+def _page_views(period: Period):
+    """
+    (page, views) per sida för perioden, som subquery.
+    Blogginlägg heter "post_<id>" i daily_stats men har egen kolumn i blog_posts.
+    """
+    if period.start is None:
+        return select(PageView.page.label("page"), PageView.views.label("views")).subquery()
+    return (
+        select(DailyStats.page.label("page"), func.sum(DailyStats.views).label("views"))
+        .where(DailyStats.date >= period.start, DailyStats.date <= period.end)
+        .group_by(DailyStats.page)
+        .subquery()
+    )
+
+
+def _post_views(period: Period):
+    """(id, title, views) per blogginlägg, som subquery."""
+    if period.start is None:
+        return select(BlogPost.id, BlogPost.title, BlogPost.views.label("views")).subquery()
+    daily = (
+        select(DailyStats.page, func.sum(DailyStats.views).label("views"))
+        .where(DailyStats.date >= period.start, DailyStats.date <= period.end, _like_prefix(DailyStats.page, POST_KEY))
+        .group_by(DailyStats.page)
+        .subquery()
+    )
+    return (
+        select(BlogPost.id, BlogPost.title, daily.c.views)
+        .select_from(daily)
+        .join(BlogPost, BlogPost.id == _key_id(daily.c.page, POST_KEY))
+        .subquery()
+    )
+
+
+def _portfolio_views(period: Period):
+    """(id, title, views) per portfolioprojekt (raderade projekt faller bort i JOIN)."""
+    pages = _page_views(period)
+    return (
+        select(PortfolioItem.id, PortfolioItem.title, pages.c.views)
+        .select_from(pages)
+        .join(PortfolioItem, PortfolioItem.id == _key_id(pages.c.page, PORTFOLIO_KEY))
+        .where(_like_prefix(pages.c.page, PORTFOLIO_KEY))
+        .subquery()
+    )
+
+
+def _plain_pages(period: Period):
+    """Vanliga sidor: allt som inte är blogginlägg eller portfolioprojekt."""
+    pages = _page_views(period)
+    return (
+        select(pages.c.page, pages.c.views)
+        .where(~_like_prefix(pages.c.page, PORTFOLIO_KEY), ~_like_prefix(pages.c.page, POST_KEY))
+        .subquery()
+    )
+
+
+# ===================================================
+# ✅ TOPPLISTOR OCH SUMMOR
+# ===================================================
+
+def _top(source, key, title, limit: int) -> List[Row]:
+    rows = db.session.execute(
+        select(key, title, source.c.views)
+        .where(source.c.views > 0)
+        .order_by(source.c.views.desc(), key)
+        .limit(limit)
+    )
+    return [Row(str(k), t, int(v)) for k, t, v in rows]
+
+
+def _summary(source) -> Summary:
+    items, views = db.session.execute(
+        select(func.count(), func.coalesce(func.sum(source.c.views), 0)).where(source.c.views > 0)
+    ).one()
+    return Summary(items, int(views))
+
+
+def top_posts(period: Period, limit: int) -> List[Row]:
+    """✅ Mest visade blogginlägg: id, titel, visningar (aldrig body)."""
+    source = _post_views(period)
+    return _top(source, source.c.id, source.c.title, limit)
+
+
+def top_pages(period: Period, limit: int) -> List[Row]:
+    """✅ Mest visade vanliga sidor (titel = sidnamnet, översätts i mallen)."""
+    source = _plain_pages(period)
+    return _top(source, source.c.page, source.c.page, limit)
+
+
+def top_portfolio(period: Period, limit: int) -> List[Row]:
+    """✅ Mest visade portfolioprojekt, med titel via JOIN istället för en query per rad."""
+    source = _portfolio_views(period)
+    return _top(source, source.c.id, source.c.title, limit)
+
+
+def summaries(period: Period) -> dict:
+    """✅ Antal och summa visningar per sektion (en aggregat-query per sektion)."""
+    return {
+        "blog": _summary(_post_views(period)),
+        "pages": _summary(_plain_pages(period)),
+        "portfolio": _summary(_portfolio_views(period)),
+    }
+
+
+# ===================================================
+# ✅ TRENDER
+# ===================================================
+
+def auto_bucket(period: Period, first_date: Optional[date] = None) -> str:
+    """Dag upp till en månad, vecka upp till ett halvår, annars månad."""
+    start = period.start or first_date or period.end
+    days = (period.end - start).days + 1
+    return "day" if days <= 31 else "week" if days <= 183 else "month"
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def first_stats_date() -> Optional[date]:
+    return db.session.execute(select(func.min(DailyStats.date))).scalar()
+
+
+def trend(period: Period, bucket: str = "day") -> List[dict]:
+    """
+    ✅ Visningar per dag/vecka/månad och sektion från daily_stats.
+    Returnerar [{"start": date, "blog": n, "pages": n, "portfolio": n, "total": n}, …]
+    sorterat på datum. Tomma perioder tas med som nollor så att serien är sammanhängande.
+    """
+    bucket = bucket if bucket in BUCKETS else "day"
+    section = case(
+        (_like_prefix(DailyStats.page, POST_KEY), literal("blog")),
+        (_like_prefix(DailyStats.page, PORTFOLIO_KEY), literal("portfolio")),
+        else_=literal("pages"),
+    )
+    conditions = [DailyStats.date <= period.end]
+    if period.start is not None:
+        conditions.append(DailyStats.date >= period.start)
+    rows = db.session.execute(
+        select(DailyStats.date, section, func.sum(DailyStats.views))
+        .where(and_(*conditions))
+        .group_by(DailyStats.date, section)
+    ).all()
+
+    start = period.start or min((row[0] for row in rows), default=period.end)
+    series = OrderedDict()
+    day = _bucket_start(start, bucket)
+    while day <= period.end:
+        series.setdefault(day, {"start": day, **{name: 0 for name in SECTIONS}, "total": 0})
+        day = _bucket_start(day + timedelta(days=32 if bucket == "month" else 7 if bucket == "week" else 1), bucket)
+
+    for day, name, views in rows:
+        point = series[_bucket_start(day, bucket)]
+        point[name] += int(views)
+        point["total"] += int(views)
+    return list(series.values())
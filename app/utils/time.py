@@ -18,6 +18,17 @@ def get_local_now() -> datetime:
     return datetime.now(UTC_TZ)
 
 
+def as_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """
+    ✅ Tid från databasen som UTC med tidszon (naiva värden är redan UTC).
+    """
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC_TZ)
+    return dt.astimezone(UTC_TZ)
+
+
 def get_display_time(dt: Optional[datetime] = None) -> datetime:
     """
     ✅ Konverterar UTC-tid från databas till Stockholmstid för visning.
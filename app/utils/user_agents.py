@@ -0,0 +1,194 @@
+# app/utils/user_agents.py
+"""
+Klassificering av User-Agent: webbläsare eller bot/crawler.
+
+Alla kända botnamn i BOT_PATTERNS kompileras till ett enda reguljärt uttryck
+byggt som ett prefixträd ("googlebot|googleother" → "google(?:bot|other)"),
+så motorn bara provar de namn som börjar med rätt tecken. Efter dem kommer
+generiska mönster (…bot, crawler, spider, URL i UA). Det matchade namnet ger
+familjen. Resultatet cachas per UA-sträng (LRU) – samma crawler skickar samma
+sträng tusentals gånger.
+
+Bottrafik räknas per familj (per process, sedan omstart) och visas på
+/admin/views, så att man ser hur mycket last crawlers står för.
+
+Lägg till nya botar i BOT_PATTERNS (familj → namn i gemener, som de står i UA).
+
+Användning:
+    from app.utils.user_agents import ua_classifier
+
+    ua_classifier.is_bot(request.headers.get("User-Agent", ""))
+    ua_classifier.family("Mozilla/5.0 (compatible; Googlebot/2.1)")   # "google"
+"""
+
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+from flask import request
+
+# ===================================================
+# ✅ MÖNSTER
+# ===================================================
+
+BOT_PATTERNS = {
+    # Sökmotorer
+    "google": ("googlebot", "google-inspectiontool", "googleother", "adsbot-google", "mediapartners-google",
+               "apis-google", "feedfetcher-google", "storebot-google", "google-read-aloud"),
+    "bing": ("bingbot", "bingpreview", "msnbot", "adidxbot"),
+    "yandex": ("yandexbot", "yandeximages", "yandexmetrika", "yandexmobilebot", "yandexaccessibilitybot",
+               "yandexrenderresourcesbot"),
+    "baidu": ("baiduspider",),
+    "duckduckgo": ("duckduckbot", "duckassistbot"),
+    "apple": ("applebot",),
+    "yahoo": ("slurp",),
+    "seznam": ("seznambot",),
+    "qwant": ("qwantify", "qwantbot"),
+    "mojeek": ("mojeekbot",),
+    "sogou": ("sogou",),
+    "petal": ("petalbot", "aspiegelbot"),
+    "archive": ("ia_archiver", "archive.org_bot"),
+    # AI-crawlers
+    "openai": ("gptbot", "chatgpt-user", "oai-searchbot"),
+    "anthropic": ("claudebot", "claude-web", "claude-user", "anthropic-ai"),
+    "perplexity": ("perplexitybot", "perplexity-user"),
+    "commoncrawl": ("ccbot",),
+    "bytedance": ("bytespider",),
+    "amazon": ("amazonbot",),
+    "meta": ("facebookexternalhit", "facebookcatalog", "meta-externalagent", "meta-externalfetcher"),
+    "ai-other": ("cohere-ai", "diffbot", "imagesiftbot", "omgili", "youbot", "timpibot"),
+    # SEO-verktyg
+    "ahrefs": ("ahrefsbot", "ahrefssiteaudit"),
+    "semrush": ("semrushbot", "siteauditbot", "splitsignalbot"),
+    "majestic": ("mj12bot",),
+    "moz": ("dotbot", "rogerbot"),
+    "seo-other": ("dataforseobot", "serpstatbot", "blexbot", "barkrowler", "megaindex", "zoominfobot", "seekport"),
+    # Länkförhandsvisningar
+    "social": ("twitterbot", "linkedinbot", "slackbot", "slack-imgproxy", "discordbot", "telegrambot", "whatsapp",
+               "pinterestbot", "redditbot", "skypeuripreview", "embedly", "iframely", "mastodon"),
+    # Övervakning
+    "monitoring": ("uptimerobot", "pingdom", "statuscake", "site24x7", "newrelicpinger", "betteruptime",
+                   "freshping", "chrome-lighthouse", "gtmetrix"),
+    # Skript och headless-webbläsare
+    "script": ("curl/", "wget/", "python-requests", "python-urllib", "python-httpx", "aiohttp", "go-http-client",
+               "okhttp", "java/", "libwww-perl", "apache-httpclient", "node-fetch", "axios/", "scrapy",
+               "guzzlehttp", "headlesschrome", "phantomjs"),
+}
+
+# Okända botar: "...bot" (men inte mobilmärket Cubot), crawler/spider och
+# kontakt-URL:er (webbläsare har aldrig en URL i sin UA)
+GENERIC_BOT_PATTERN = r"(?<!cu)bot\b|crawl|spider|scraper|https?://"
+
+
+def _trie_pattern(words) -> str:
+    """Regex för en mängd ord som prefixträd – längsta namnet vinner vid gemensamt prefix."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+def compile_patterns(patterns: dict, generic: str = GENERIC_BOT_PATTERN):
+    """Ett uttryck för alla namn (+ generiska mönster) och en uppslagstabell namn → familj."""
+    families = {word: family for family, words in patterns.items() for word in words}
+    regex = re.compile(f"(?P<known>{_trie_pattern(families)})|(?P<other>{generic})")
+    return regex, families
+
+
+BOT_RE, BOT_FAMILIES = compile_patterns(BOT_PATTERNS)
+
+
+def match_family(user_agent: str) -> Optional[str]:
+    """Botfamiljen för en UA-sträng, eller None för webbläsare (utan cache)."""
+    if not user_agent:
+        return None
+    match = BOT_RE.search(user_agent.lower())
+    if match is None:
+        return None
+    return BOT_FAMILIES[match.group()] if match.lastgroup == "known" else "other"
+
+
+# ===================================================
+# ✅ KLASSIFICERARE
+# ===================================================
+
+class UserAgentClassifier:
+    """
+    ✅ Cachad botklassificering och räknare för bottrafik.
+    - UA_CACHE_SIZE: antal UA-strängar i LRU-cachen
+    - UA_COUNT_REQUESTS: räkna alla requests (utom statiska filer) per botfamilj
+    """
+
+    def __init__(self, app=None):
+        self._family = lru_cache(maxsize=4096)(match_family)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bot_requests = Counter()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._family = lru_cache(maxsize=app.config.get("UA_CACHE_SIZE", 4096))(match_family)
+        self.reset()
+        app.extensions["ua_classifier"] = self
+
+        if app.config.get("UA_COUNT_REQUESTS", True):
+            @app.before_request
+            def _count_bot_traffic():
+                if request.endpoint != "static":
+                    self.record(request.headers.get("User-Agent", ""))
+
+    def family(self, user_agent: str) -> Optional[str]:
+        return self._family(user_agent or "")
+
+    def is_bot(self, user_agent: str) -> bool:
+        return self.family(user_agent) is not None
+
+    # === Räknare ===
+    def record(self, user_agent: str) -> Optional[str]:
+        """Räknar en request och returnerar botfamiljen (None för webbläsare)."""
+        family = self.family(user_agent)
+        with self._lock:
+            self.requests += 1
+            if family is not None:
+                self.bot_requests[family] += 1
+        return family
+
+    def stats(self) -> dict:
+        """Requests och bottrafik per familj sedan start/nollställning, plus cachestatistik."""
+        with self._lock:
+            requests, families = self.requests, self.bot_requests.most_common()
+        bots = sum(count for _, count in families)
+        cache = self._family.cache_info()
+        return {
+            "requests": requests,
+            "bot_requests": bots,
+            "bot_share": bots / requests if requests else 0.0,
+            "families": families,
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+            "cache_size": cache.currsize,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bot_requests = Counter()
+        self._family.cache_clear()
+
+
+# 🧮 Delad instans – initieras i create_app()
+ua_classifier = UserAgentClassifier()
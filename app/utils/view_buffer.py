@@ -0,0 +1,280 @@
+# app/utils/view_buffer.py
+"""
+Write-behind-buffert för visningsräknare.
+
+Istället för en UPDATE + commit per sidvisning samlas ökningarna per nyckel
+och skrivs till databasen i batchade `UPDATE ... SET views = views + :n`.
+
+Nycklar:
+    "post:<id>"   → blog_posts.views
+    "page:<namn>" → page_views.views (raden skapas vid behov)
+
+Varje flush lägger också till rader i händelseloggen view_events
+(se app/utils/stats.py), i samma transaktion som räknarna.
+
+Backends:
+    "memory" – per process (standard)
+    "sqlite" – delad fil mellan gunicorn-workers (VIEW_BUFFER_PATH)
+
+Användning:
+    from app.utils.view_buffer import view_buffer
+
+    view_buffer.add("post:12")
+    view_buffer.flush()   # Tvinga skrivning (görs även vid intervall/tröskel och nedstängning)
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+from flask import current_app
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import BlogPost, PageView
+
+POST_PREFIX = "post:"
+PAGE_PREFIX = "page:"
+
+
+# ===================================================
+# ✅ BACKENDS
+# ===================================================
+
+class MemoryBackend:
+    """✅ Håller väntande ökningar i processens minne (trådsäkert)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+
+    def add(self, key: str, n: int = 1) -> int:
+        with self._lock:
+            self._counts[key] += n
+            return len(self._counts)
+
+    def pending(self, key: str) -> int:
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def drain(self) -> Dict[str, int]:
+        with self._lock:
+            counts, self._counts = dict(self._counts), defaultdict(int)
+            return counts
+
+    def clear(self):
+        self.drain()
+
+
+class SQLiteBackend:
+    """
+    ✅ Delad buffert i en lokal SQLite-fil.
+    - Alla workers på samma server skriver till samma fil.
+    - `drain()` läser och tömmer i en och samma transaktion, så två workers
+      kan aldrig skriva samma ökning två gånger.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_views "
+                "(key TEXT PRIMARY KEY, n INTEGER NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add(self, key: str, n: int = 1) -> int:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO pending_views (key, n) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET n = n + excluded.n",
+                (key, n)
+            )
+            return conn.execute("SELECT COUNT(*) FROM pending_views").fetchone()[0]
+        finally:
+            conn.close()
+
+    def pending(self, key: str) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT n FROM pending_views WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def drain(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            counts = dict(conn.execute("SELECT key, n FROM pending_views").fetchall())
+            conn.execute("DELETE FROM pending_views")
+            conn.execute("COMMIT")
+            return counts
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def clear(self):
+        self.drain()
+
+
+# ===================================================
+# ✅ BUFFERT
+# ===================================================
+
+class ViewCounterBuffer:
+    """
+    ✅ Samlar visningar per nyckel och skriver dem i batch.
+    - Flush sker när VIEW_BUFFER_FLUSH_INTERVAL sekunder passerat
+      eller när fler än VIEW_BUFFER_MAX_PENDING nycklar väntar.
+    - Flush sker också vid nedstängning (atexit) och via `flask flush-views`.
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.flush_interval = 30
+        self.max_pending = 100
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get("VIEW_BUFFER_BACKEND", "memory")
+        if backend == "sqlite":
+            path = app.config.get("VIEW_BUFFER_PATH") or os.path.join(app.instance_path, "view_buffer.sqlite")
+            self.backend = SQLiteBackend(path)
+        else:
+            self.backend = MemoryBackend()
+
+        self.flush_interval = app.config.get("VIEW_BUFFER_FLUSH_INTERVAL", 30)
+        self.max_pending = app.config.get("VIEW_BUFFER_MAX_PENDING", 100)
+        app.extensions["view_buffer"] = self
+        atexit.register(self._flush_at_exit, app)
+
+    # === Registrering ===
+    def add(self, key: str, n: int = 1):
+        """Lägg till `n` visningar för nyckeln och flusha om tröskeln nåtts."""
+        pending_keys = self.backend.add(key, n)
+        due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due or pending_keys >= self.max_pending:
+            self.flush()
+
+    def add_post(self, post_id: int, n: int = 1):
+        self.add(f"{POST_PREFIX}{post_id}", n)
+
+    def add_page(self, page: str, n: int = 1):
+        self.add(f"{PAGE_PREFIX}{page}", n)
+
+    def pending(self, key: str) -> int:
+        """Antal visningar för nyckeln som ännu inte skrivits till databasen."""
+        return self.backend.pending(key)
+
+    def clear(self):
+        """Kasta alla väntande visningar (t.ex. vid `flask reset-stats`)."""
+        self.backend.clear()
+
+    # === Skrivning ===
+    def flush(self) -> int:
+        """
+        ✅ Skriver alla väntande ökningar till databasen.
+        - Körs i en egen transaktion (påverkar inte requestens db.session).
+        - Misslyckas skrivningen läggs ökningarna tillbaka i bufferten.
+        Returnerar antalet visningar som skrevs.
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            return 0  # En annan tråd flushar redan
+        try:
+            self._last_flush = time.monotonic()
+            counts = self.backend.drain()
+            if not counts:
+                return 0
+            try:
+                self._write(counts)
+            except Exception as e:
+                for key, n in counts.items():
+                    self.backend.add(key, n)
+                current_app.logger.error(f"Kunde inte skriva visningsbuffert: {e}", exc_info=True)
+                return 0
+            return sum(counts.values())
+        finally:
+            self._flush_lock.release()
+
+    def _write(self, counts: Dict[str, int]):
+        from app.utils.dashboard_metrics import apply_deltas, view_deltas
+        from app.utils.stats import append_view_events
+
+        post_params = [
+            {"post_id": int(key[len(POST_PREFIX):]), "n": n}
+            for key, n in counts.items() if key.startswith(POST_PREFIX)
+        ]
+        page_counts = {
+            key[len(PAGE_PREFIX):]: n
+            for key, n in counts.items() if key.startswith(PAGE_PREFIX)
+        }
+
+        with db.engine.begin() as conn:
+            if post_params:
+                conn.execute(
+                    update(BlogPost.__table__)
+                    .where(BlogPost.__table__.c.id == bindparam("post_id"))
+                    .values(views=BlogPost.__table__.c.views + bindparam("n")),
+                    post_params
+                )
+            if page_counts:
+                self._write_pages(conn, page_counts)
+            append_view_events(conn, counts)
+            apply_deltas(conn, view_deltas(counts))
+
+    @staticmethod
+    def _write_pages(conn, page_counts: Dict[str, int]):
+        table = PageView.__table__
+        existing = set(conn.execute(
+            select(table.c.page).where(table.c.page.in_(page_counts))
+        ).scalars())
+
+        missing = [{"page": p, "views": n} for p, n in page_counts.items() if p not in existing]
+        for row in missing:
+            try:
+                with conn.begin_nested():
+                    conn.execute(table.insert(), row)
+            except IntegrityError:
+                # En annan worker hann skapa raden – räkna upp istället
+                existing.add(row["page"])
+
+        updates = [{"p": p, "n": n} for p, n in page_counts.items() if p in existing]
+        if updates:
+            conn.execute(
+                update(table)
+                .where(table.c.page == bindparam("p"))
+                .values(views=table.c.views + bindparam("n")),
+                updates
+            )
+
+    def _flush_at_exit(self, app):
+        try:
+            with app.app_context():
+                self.flush()
+        except Exception:
+            pass  # Databasen kan redan vara nedstängd
+
+
+# 🧮 Delad instans – initieras i create_app()
+view_buffer = ViewCounterBuffer()
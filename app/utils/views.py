@@ -1,77 +1,72 @@
 # app/utils/views.py
-from flask import request, session
+from flask import request
 from app.models import db, PageView
+from app.utils.view_buffer import view_buffer, POST_PREFIX, PAGE_PREFIX
+from app.utils.user_agents import ua_classifier
+from app.utils.visitor_dedupe import visitor_dedupe
+
+
+def _stored_page_views(page_name: str) -> int:
+    """Hämtar redan sparade visningar för en sida (endast kolumnen, ingen ORM-rad)."""
+    return db.session.query(PageView.views).filter_by(page=page_name).scalar() or 0
+
+
+def _is_bot() -> bool:
+    """✅ Skippa botar/spindlar (se user_agents.py för mönstren)."""
+    return ua_classifier.is_bot(request.headers.get('User-Agent', ''))
+
+
+def register_post_view(post_id: int):
+    """
+    ✅ Räknar en visning av ett blogginlägg utan att läsa från databasen
+    (används även när sidan serveras från sidcachen).
+    """
+    if not _is_bot() and visitor_dedupe.first_view(f"{POST_PREFIX}{post_id}"):
+        view_buffer.add_post(post_id)
+
+
+def register_page_view(page_name: str):
+    """✅ Räknar en visning av en sida (t.ex. 'portfolio', 'portfolio_12') utan databasläsning."""
+    if not _is_bot() and visitor_dedupe.first_view(f"{PAGE_PREFIX}{page_name}"):
+        view_buffer.add_page(page_name)
+
 
 def increment_post_views(target):
     """
-    ✅ Räknar visningar (unika per session):
+    ✅ Räknar visningar (unika per besökare inom VIEW_DEDUPE_WINDOW):
     - Om `target` är ett BlogPost-objekt → Räknar visningar baserat på postens ID.
     - Om `target` är en sträng → Räknar visningar på sidnivå (t.ex. 'about', 'portfolio_12').
-    - Räknar endast en gång per session och sparar i `session["viewed_posts"]`.
+    - Sedda visningar hålls på servern (se visitor_dedupe.py), sessionen har bara ett besökar-ID.
     - Filtrerar bort botar/spindlar
+    - Ökningen läggs i visningsbufferten och skrivs i batch (se view_buffer.py).
 
-    Returnerar det uppdaterade antalet visningar (int).
+    Returnerar det uppdaterade antalet visningar (int), inklusive ej skrivna visningar.
     """
-    # ✅ Skippa botar/spindlar
-    user_agent = request.headers.get('User-Agent', '').lower()
-    bot_keywords = ['bot', 'crawl', 'spider', 'slurp', 'mediapartners']
-    if any(keyword in user_agent for keyword in bot_keywords):
+    if _is_bot():
         return 0
-    
-    if "viewed_posts" not in session:
-        session["viewed_posts"] = []
 
     # ✅ Bloggpost (target = BlogPost-objekt)
     if hasattr(target, "id"):
-        post_id = f"post_{target.id}"
-        if post_id not in session["viewed_posts"]:
-            target.views = (target.views or 0) + 1
-            db.session.commit()
-            session["viewed_posts"].append(post_id)
-        return target.views
+        register_post_view(target.id)
+        return (target.views or 0) + view_buffer.pending(f"{POST_PREFIX}{target.id}")
 
     # ✅ Vanliga sidor & portfolio (target = sträng)
     elif isinstance(target, str):
-        page_id = f"page_{target}"
-        if page_id not in session["viewed_posts"]:
-            page = PageView.query.filter_by(page=target).first()
-            if not page:
-                page = PageView(page=target, views=1)
-                db.session.add(page)
-            else:
-                page.views += 1
-            db.session.commit()
-            session["viewed_posts"].append(page_id)
-        
-        page = PageView.query.filter_by(page=target).first()
-        return page.views if page else 0
+        register_page_view(target)
+        return _stored_page_views(target) + view_buffer.pending(f"{PAGE_PREFIX}{target}")
 
     return 0
 
 def increment_page_view(page_name: str = None):
     """
-    ✅ Räknar unika sidvisningar (unika per session):
+    ✅ Räknar unika sidvisningar (unika per besökare inom VIEW_DEDUPE_WINDOW):
     - Tar emot sidans namn (`page_name`) eller hämtar från request.endpoint.
-    - Sparar unika visningar i `session["viewed_pages"]`.
+    - Ökningen läggs i visningsbufferten och skrivs i batch.
     - Returnerar det uppdaterade antalet visningar (int).
     """
-    if "viewed_pages" not in session:
-        session["viewed_pages"] = []
-
     if not page_name:
         page_name = request.endpoint.split(".")[-1]  # Exempel: 'about', 'cv'
 
-    if page_name not in session["viewed_pages"]:
-        page = PageView.query.filter_by(page=page_name).first()
-
-        if not page:
-            page = PageView(page=page_name, views=1)
-            db.session.add(page)
-        else:
-            page.views += 1
-
-        db.session.commit()
-        session["viewed_pages"].append(page_name)
+    register_page_view(page_name)
 
-    page = PageView.query.filter_by(page=page_name).first()
-    return page.views if page else 0
\ No newline at end of file
+    return _stored_page_views(page_name) + view_buffer.pending(f"{PAGE_PREFIX}{page_name}")
@@ -0,0 +1,188 @@
+# app/utils/visitor_dedupe.py
+"""
+Unika visningar per besökare utan växande listor i sessionscookien.
+
+Sessionen innehåller bara ett slumpat besökar-ID (16 tecken), så cookien har
+samma storlek oavsett hur många sidor besökaren läst. Servern sparar en
+8-byteshash av (besökar-ID, visningsnyckel) med utgångstid:
+    - samma besökare + samma sida inom VIEW_DEDUPE_WINDOW → räknas inte igen
+    - efter fönstret räknas visningen på nytt
+
+Backends:
+    "memory" – per process, högst VIEW_DEDUPE_MAX_ENTRIES hashar (äldst först ut)
+    "sqlite" – delad fil mellan gunicorn-workers (VIEW_DEDUPE_PATH)
+
+Med "memory" och flera workers kan en besökare räknas en gång per worker
+inom fönstret – använd "sqlite" om det spelar roll.
+
+Användning:
+    from app.utils.visitor_dedupe import visitor_dedupe
+
+    if visitor_dedupe.first_view("post:12"):
+        view_buffer.add("post:12")
+"""
+
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import session
+
+SESSION_KEY = "vid"
+LEGACY_SESSION_KEYS = ("viewed_posts", "viewed_pages")  # Gamla listor – tas bort vid nästa besök
+
+
+# ===================================================
+# ✅ BACKENDS
+# ===================================================
+
+class MemoryBackend:
+    """✅ Begränsat set av hashar med utgångstid i processens minne (trådsäkert)."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._seen = OrderedDict()  # hash → utgångstid
+
+    def claim(self, digest: int, now: float, window: float) -> bool:
+        with self._lock:
+            expires = self._seen.get(digest)
+            if expires is not None and expires > now:
+                self._seen.move_to_end(digest)
+                return False
+            self._seen[digest] = now + window
+            self._seen.move_to_end(digest)
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            return True
+
+    def __len__(self):
+        return len(self._seen)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+
+
+class SQLiteBackend:
+    """
+    ✅ Delat set i en lokal SQLite-fil.
+    - En upsert som bara skriver över utgångna rader avgör atomärt om visningen är ny.
+    - Utgångna rader rensas med jämna mellanrum.
+    """
+
+    PRUNE_EVERY = 60  # sekunder
+
+    def __init__(self, path: str):
+        self.path = path
+        self._last_prune = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_views "
+                "(digest INTEGER PRIMARY KEY, expires REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def claim(self, digest: int, now: float, window: float) -> bool:
+        conn = self._connect()
+        try:
+            claimed = conn.execute(
+                "INSERT INTO seen_views (digest, expires) VALUES (?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET expires = excluded.expires "
+                "WHERE seen_views.expires <= ?",
+                (digest, now + window, now)
+            ).rowcount
+            if now - self._last_prune >= self.PRUNE_EVERY:
+                self._last_prune = now
+                conn.execute("DELETE FROM seen_views WHERE expires <= ?", (now,))
+            return claimed == 1
+        finally:
+            conn.close()
+
+    def __len__(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM seen_views").fetchone()[0]
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM seen_views")
+        finally:
+            conn.close()
+
+
+# ===================================================
+# ✅ DEDUPE
+# ===================================================
+
+class VisitorDedupe:
+    """
+    ✅ Avgör om en besökare ser en sida för första gången inom fönstret.
+    - VIEW_DEDUPE_BACKEND: "memory" eller "sqlite"
+    - VIEW_DEDUPE_WINDOW: sekunder innan samma besökare räknas igen
+    - VIEW_DEDUPE_MAX_ENTRIES: tak för antal hashar ("memory")
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.window = 86400
+        self._key = b""
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get("VIEW_DEDUPE_BACKEND", "memory")
+        if backend == "sqlite":
+            path = app.config.get("VIEW_DEDUPE_PATH") or os.path.join(app.instance_path, "view_dedupe.sqlite")
+            self.backend = SQLiteBackend(path)
+        else:
+            self.backend = MemoryBackend(app.config.get("VIEW_DEDUPE_MAX_ENTRIES", 100_000))
+
+        self.window = app.config.get("VIEW_DEDUPE_WINDOW", 86400)
+        # Nyckeln gör att hasharna inte kan kopplas till ett besökar-ID utan appens hemlighet
+        self._key = hashlib.sha256(str(app.config.get("SECRET_KEY") or "").encode()).digest()
+        app.extensions["visitor_dedupe"] = self
+
+    @staticmethod
+    def visitor_id() -> str:
+        """Besökarens slumpade ID i sessionen (skapas vid första visningen)."""
+        for legacy in LEGACY_SESSION_KEYS:
+            if legacy in session:
+                session.pop(legacy)
+        vid = session.get(SESSION_KEY)
+        if vid is None:
+            vid = session[SESSION_KEY] = secrets.token_hex(8)
+        return vid
+
+    def _digest(self, visitor: str, view_key: str) -> int:
+        raw = hashlib.blake2b(f"{visitor}|{view_key}".encode(), digest_size=8, key=self._key).digest()
+        return int.from_bytes(raw, "big", signed=True)  # Ryms i SQLites INTEGER
+
+    def first_view(self, view_key: str) -> bool:
+        """✅ True första gången den aktuella besökaren ser `view_key` inom fönstret."""
+        digest = self._digest(self.visitor_id(), view_key)
+        return self.backend.claim(digest, time.time(), self.window)
+
+    def clear(self):
+        """Glöm alla sedda visningar (t.ex. vid `flask reset-stats`)."""
+        self.backend.clear()
+
+
+# 🧮 Delad instans – initieras i create_app()
+visitor_dedupe = VisitorDedupe()
@@ -17,6 +17,14 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///site.db") if DEBUG else os.getenv("DATABASE_URL")
 
+    # Läsrepliker för publika sidor (se app/utils/db_router.py), kommaseparerade URL:er
+    DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    SQLALCHEMY_BINDS = {f"replica{i}": url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    DB_REPLICA_BLUEPRINTS = tuple(os.getenv("DB_REPLICA_BLUEPRINTS", "blog,portfolio,pages").split(","))
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 30))  # läs från primären efter en skrivning, minst MAX_LAG
+    DB_REPLICA_HEALTH_INTERVAL = int(os.getenv("DB_REPLICA_HEALTH_INTERVAL", 30))  # sekunder mellan kontroller
+    DB_REPLICA_MAX_LAG = int(os.getenv("DB_REPLICA_MAX_LAG", 30))  # sekunder efter primären, 0 = kontrollera inte
+
     # Uploads
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10 MB
     UPLOAD_FOLDER = "uploads"
@@ -38,6 +46,94 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    SITE_URL = os.getenv("SITE_URL")  # Bas-URL för länkar i mail utanför en request och i sitemap
+
+    # Utskickskö för bloggmail (se app/utils/mail_outbox.py)
+    MAIL_OUTBOX_CONNECTIONS = int(os.getenv("MAIL_OUTBOX_CONNECTIONS", 4))  # SMTP-anslutningar/trådar
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", 20))  # mottagare per claim
+    MAIL_OUTBOX_RATE = float(os.getenv("MAIL_OUTBOX_RATE", 10))  # mail per sekund, 0 = obegränsat
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", 5))
+    MAIL_OUTBOX_RETRY_BASE = int(os.getenv("MAIL_OUTBOX_RETRY_BASE", 60))  # sekunder, dubblas per försök
+    MAIL_OUTBOX_STALE_AFTER = int(os.getenv("MAIL_OUTBOX_STALE_AFTER", 900))  # sekunder innan "sending" räknas som avbrutet
+
+    # Bildpipeline (se app/utils/image_pipeline.py)
+    IMAGE_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_WIDTHS", "320,640,1200").split(","))  # störst = huvudbild
+    IMAGE_AVIF = os.getenv("IMAGE_AVIF", "True").lower() == "true"  # kräver Pillow med AVIF-stöd
+    IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", 85))
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))  # processer för bildkonvertering, 0 = i requesten
+
+    # Mätning av queries och svarstider per request (se app/utils/profiling.py)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "True").lower() == "true"
+    PROFILING_SLOW_QUERY_MS = float(os.getenv("PROFILING_SLOW_QUERY_MS", 200))  # gräns för långsam query
+    PROFILING_SLOW_LOG = os.getenv("PROFILING_SLOW_LOG", "")  # JSON-rader, tom = av (t.ex. instance/slow_queries.log)
+    PROFILING_SAMPLE_SIZE = int(os.getenv("PROFILING_SAMPLE_SIZE", 500))  # mätningar per endpoint
+
+    # Schemalagda jobb (se app/scheduler.py)
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "True").lower() == "true"
+    SCHEDULER_LOCK_TTL = int(os.getenv("SCHEDULER_LOCK_TTL", 90))  # sekunder innan en annan worker tar över
+    SCHEDULER_MAIL_INTERVAL = int(os.getenv("SCHEDULER_MAIL_INTERVAL", 300))  # bloggmail
+    SCHEDULER_FLUSH_INTERVAL = int(os.getenv("SCHEDULER_FLUSH_INTERVAL", 60))  # visningsbufferten
+    SCHEDULER_STATS_INTERVAL = int(os.getenv("SCHEDULER_STATS_INTERVAL", 3600))  # rollup av igår och idag
+
+    # Rensning av oanvända bilder (se app/utils/image_cleanup.py)
+    IMAGE_CLEANUP_GRACE_HOURS = int(os.getenv("IMAGE_CLEANUP_GRACE_HOURS", 24))  # nya uppladdningar rörs inte
+    IMAGE_CLEANUP_BACKGROUND = os.getenv("IMAGE_CLEANUP_BACKGROUND", "True").lower() == "true"
+    IMAGE_CLEANUP_REPORT_LIMIT = int(os.getenv("IMAGE_CLEANUP_REPORT_LIMIT", 500))  # sökvägar i rapporten
+
+    # Backup och återställning (se app/utils/backup.py)
+    BACKUP_DIR = os.getenv("BACKUP_DIR")  # Default: instance/backups
+    BACKUP_CHUNK_SIZE = int(os.getenv("BACKUP_CHUNK_SIZE", 2000))  # rader per läsning/insert-batch
+    RESTORE_WORKERS = int(os.getenv("RESTORE_WORKERS", 4))  # parallella insert-trådar (SQLite: alltid 1)
+
+    # Adminpanelens nyckeltal (se app/utils/dashboard_metrics.py)
+    DASHBOARD_REFRESH_INTERVAL = int(os.getenv("DASHBOARD_REFRESH_INTERVAL", 900))  # full omräkning, sekunder
+    DASHBOARD_FLAGGED_PER_PAGE = int(os.getenv("DASHBOARD_FLAGGED_PER_PAGE", 5))  # flaggade kommentarer per sida
+    DASHBOARD_FLAGGED_MAX_PAGES = int(os.getenv("DASHBOARD_FLAGGED_MAX_PAGES", 10))  # resten i kommentarshanteringen
+
+    # Visningsräknare (write-behind-buffert, se app/utils/view_buffer.py)
+    VIEW_BUFFER_BACKEND = os.getenv("VIEW_BUFFER_BACKEND", "memory")  # "memory" eller "sqlite"
+    VIEW_BUFFER_PATH = os.getenv("VIEW_BUFFER_PATH")  # Default: instance/view_buffer.sqlite
+    VIEW_BUFFER_FLUSH_INTERVAL = int(os.getenv("VIEW_BUFFER_FLUSH_INTERVAL", 30))  # sekunder
+    VIEW_BUFFER_MAX_PENDING = int(os.getenv("VIEW_BUFFER_MAX_PENDING", 100))  # antal nycklar
+
+    # Unika visningar per besökare (se app/utils/visitor_dedupe.py)
+    VIEW_DEDUPE_BACKEND = os.getenv("VIEW_DEDUPE_BACKEND", "memory")  # "memory" eller "sqlite"
+    VIEW_DEDUPE_PATH = os.getenv("VIEW_DEDUPE_PATH")  # Default: instance/view_dedupe.sqlite
+    VIEW_DEDUPE_WINDOW = int(os.getenv("VIEW_DEDUPE_WINDOW", 86400))  # sekunder innan samma besökare räknas igen
+    VIEW_DEDUPE_MAX_ENTRIES = int(os.getenv("VIEW_DEDUPE_MAX_ENTRIES", 100_000))  # endast "memory"
+
+    # Händelselogg för visningar (se app/utils/stats.py)
+    VIEW_EVENTS_RETENTION_DAYS = int(os.getenv("VIEW_EVENTS_RETENTION_DAYS", 0))  # 0 = spara för alltid
+    STATS_TOP_N = int(os.getenv("STATS_TOP_N", 25))  # rader per topplista på /admin/views
+
+    # Botklassificering (se app/utils/user_agents.py)
+    UA_CACHE_SIZE = int(os.getenv("UA_CACHE_SIZE", 4096))  # antal UA-strängar i cachen
+    UA_COUNT_REQUESTS = os.getenv("UA_COUNT_REQUESTS", "True").lower() == "true"  # bottrafik på /admin/views
+
+    # Paginering (se app/utils/pagination.py)
+    PAGINATION_MODE = os.getenv("PAGINATION_MODE", "offset")  # "offset" eller "keyset"
+    PAGINATION_COUNT_TTL = int(os.getenv("PAGINATION_COUNT_TTL", 60))  # sekunder för cachade totaler
+
+    # Sidcache för publika sidor (se app/utils/page_cache.py)
+    PAGE_CACHE_BACKEND = os.getenv("PAGE_CACHE_BACKEND", "memory")  # "memory", "filesystem" eller "null"
+    PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR")  # Default: instance/page_cache
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", 300))  # sekunder
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", 512))  # endast "memory"
+
+    # Inloggade användare + roller per process (se app/utils/principal_cache.py)
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 30))  # sekunder, 0 = av
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 1024))
+
+    # Portfolioprojekt i datumordning per process (se app/utils/portfolio_order.py)
+    PORTFOLIO_ORDER_TTL = int(os.getenv("PORTFOLIO_ORDER_TTL", 300))  # sekunder
+
+    # Villkorade GET-svar med ETag/304 (se app/utils/conditional.py)
+    CONDITIONAL_GET_ENABLED = os.getenv("CONDITIONAL_GET_ENABLED", "True").lower() == "true"
+    CONDITIONAL_GET_VERSION = os.getenv("CONDITIONAL_GET_VERSION")  # t.ex. git-sha; tom = mallarnas ändringstid
+
+    # Sitemap (se app/utils/sitemap.py)
+    SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", 50_000))  # adresser per fil (max 50 000)
+    SITEMAP_CACHE_DIR = os.getenv("SITEMAP_CACHE_DIR")  # Default: instance/sitemap
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,42 @@
+# conftest.py
+import os
+
+# Testerna körs mot SQLite i minnet.
+# Måste sättas innan config.py importeras (URI:n läses vid import).
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Räknar SQL-queries i ett block och failar om de blir fler än budgeten.
+
+    ✅ Användning (inuti en app context):
+        with query_budget(6) as queries:
+            client.get("/blog/")
+    """
+    from sqlalchemy import event
+    from app.extensions import db
+
+    @contextmanager
+    def budget(max_queries: int):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries, budget {max_queries}:\n" + "\n\n".join(statements)
+        )
+
+    return budget
@@ -0,0 +1,49 @@
+"""Add view_events log and hourly_stats rollup table
+
+Revision ID: 3b7e1d9f0a52
+Revises: c2f9a6d4e815
+Create Date: 2026-10-18 16:02:11.504871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1d9f0a52'
+down_revision = 'c2f9a6d4e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'view_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('page', sa.String(length=255), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_view_events_hour_page', 'view_events', ['hour', 'page'], unique=False)
+
+    op.create_table(
+        'hourly_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('page', sa.String(length=255), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hour', 'page', name='_hour_page_uc')
+    )
+    with op.batch_alter_table('hourly_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_hourly_stats_hour'), ['hour'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('hourly_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_hourly_stats_hour'))
+    op.drop_table('hourly_stats')
+
+    op.drop_index('ix_view_events_hour_page', table_name='view_events')
+    op.drop_table('view_events')
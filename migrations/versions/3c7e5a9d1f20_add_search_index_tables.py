@@ -0,0 +1,45 @@
+"""Add search index tables
+
+Revision ID: 3c7e5a9d1f20
+Revises: fff6419dcbcd
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e5a9d1f20'
+down_revision = 'fff6419dcbcd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('search_documents',
+    sa.Column('doc_type', sa.String(length=20), nullable=False),
+    sa.Column('doc_id', sa.Integer(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('doc_type', 'doc_id')
+    )
+    op.create_table('search_terms',
+    sa.Column('doc_type', sa.String(length=20), nullable=False),
+    sa.Column('term', sa.String(length=64).with_variant(sa.String(length=64, collation='utf8mb4_bin'), 'mysql'), nullable=False),
+    sa.Column('doc_id', sa.Integer(), nullable=False),
+    sa.Column('tf', sa.Integer(), nullable=False),
+    sa.Column('doc_length', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('doc_type', 'term', 'doc_id')
+    )
+    with op.batch_alter_table('search_terms', schema=None) as batch_op:
+        batch_op.create_index('ix_search_terms_doc', ['doc_type', 'doc_id'], unique=False)
+
+    # Indexet fylls med: flask rebuild-search-index
+
+
+def downgrade():
+    with op.batch_alter_table('search_terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_search_terms_doc')
+
+    op.drop_table('search_terms')
+    op.drop_table('search_documents')
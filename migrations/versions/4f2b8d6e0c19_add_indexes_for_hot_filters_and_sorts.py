@@ -0,0 +1,49 @@
+"""Add composite indexes for the hot filter/sort columns on posts, comments and portfolio
+
+Revision ID: 4f2b8d6e0c19
+Revises: 9a1f6c2d8e47
+Create Date: 2026-10-18 21:05:12.402917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2b8d6e0c19'
+down_revision = '9a1f6c2d8e47'
+branch_labels = None
+depends_on = None
+
+
+# Kontrollera planerna före och efter med `flask db-audit`
+INDEXES = {
+    'blog_posts': [
+        ('ix_blog_posts_created_id', ['created_at', 'id']),            # publicerade, nyast först + keyset
+        ('ix_blog_posts_category_created', ['category_id', 'created_at']),  # kategorisidor
+        ('ix_blog_posts_email_sent_created', ['email_sent', 'created_at']),  # bloggmail att köa
+        ('ix_blog_posts_author', ['author_id']),
+    ],
+    'comments': [
+        ('ix_comments_post_created', ['post_id', 'date_created']),      # kommentarer per inlägg
+        ('ix_comments_author', ['author_id']),
+    ],
+    'portfolio_items': [
+        ('ix_portfolio_items_date_id', ['date', 'id']),
+        ('ix_portfolio_items_category_date', ['category_id', 'date']),
+    ],
+}
+
+
+def upgrade():
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indexes:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, _columns in reversed(indexes):
+                batch_op.drop_index(name)
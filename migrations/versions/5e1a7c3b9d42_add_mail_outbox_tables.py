@@ -0,0 +1,67 @@
+"""Add mail outbox tables (mail_jobs, mail_deliveries)
+
+Revision ID: 5e1a7c3b9d42
+Revises: 8b2d4f6a1c37
+Create Date: 2026-10-18 12:14:37.220914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1a7c3b9d42'
+down_revision = '8b2d4f6a1c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'mail_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('subject', sa.String(length=300), nullable=False),
+        sa.Column('post_title', sa.String(length=250), nullable=False),
+        sa.Column('post_subtitle', sa.String(length=250), nullable=True),
+        sa.Column('post_url', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('sent', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['blog_posts.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('post_id')
+    )
+    op.create_table(
+        'mail_deliveries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=1000), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['mail_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'user_id', name='_job_user_uc')
+    )
+    with op.batch_alter_table('mail_deliveries', schema=None) as batch_op:
+        batch_op.create_index('ix_mail_deliveries_status_next', ['status', 'next_attempt_at'], unique=False)
+        batch_op.create_index('ix_mail_deliveries_claim', ['claim_token'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('mail_deliveries', schema=None) as batch_op:
+        batch_op.drop_index('ix_mail_deliveries_claim')
+        batch_op.drop_index('ix_mail_deliveries_status_next')
+
+    op.drop_table('mail_deliveries')
+    op.drop_table('mail_jobs')
@@ -0,0 +1,52 @@
+"""Add media_assets table for the uploads library
+
+Revision ID: 5e8b3f1c7a94
+Revises: 7d4a2c9e1b63
+Create Date: 2026-10-18 18:05:12.640318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b3f1c7a94'
+down_revision = '7d4a2c9e1b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fylls med `flask reconcile-media` efter migreringen
+    op.create_table(
+        'media_assets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('folder', sa.String(length=100), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('reference_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('folder', 'filename', name='_media_folder_filename_uc')
+    )
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_assets_content_hash'), ['content_hash'], unique=False)
+        batch_op.create_index('ix_media_assets_folder_created', ['folder', 'created_at'], unique=False)
+        batch_op.create_index('ix_media_assets_folder_size', ['folder', 'size_bytes'], unique=False)
+        batch_op.create_index('ix_media_assets_filename', ['filename'], unique=False)
+        batch_op.create_index('ix_media_assets_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_media_assets_size_bytes', ['size_bytes'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_assets_size_bytes')
+        batch_op.drop_index('ix_media_assets_created_at')
+        batch_op.drop_index('ix_media_assets_filename')
+        batch_op.drop_index('ix_media_assets_folder_size')
+        batch_op.drop_index('ix_media_assets_folder_created')
+        batch_op.drop_index(batch_op.f('ix_media_assets_content_hash'))
+    op.drop_table('media_assets')
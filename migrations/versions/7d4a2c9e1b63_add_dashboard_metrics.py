@@ -0,0 +1,35 @@
+"""Add dashboard_metrics snapshot table and index for flagged comments
+
+Revision ID: 7d4a2c9e1b63
+Revises: 3b7e1d9f0a52
+Create Date: 2026-10-18 17:20:43.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4a2c9e1b63'
+down_revision = '3b7e1d9f0a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fylls vid första laddningen av adminpanelen eller av schemalagda jobbet "dashboard"
+    op.create_table(
+        'dashboard_metrics',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_flagged_id', ['flagged', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_comments_flagged_id')
+    op.drop_table('dashboard_metrics')
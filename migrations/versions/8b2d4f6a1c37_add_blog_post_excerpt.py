@@ -0,0 +1,28 @@
+"""Add excerpt column to blog_posts
+
+Revision ID: 8b2d4f6a1c37
+Revises: 3c7e5a9d1f20
+Create Date: 2026-10-18 11:02:14.508131
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d4f6a1c37'
+down_revision = '3c7e5a9d1f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blog_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=300), nullable=True))
+
+    # Befintliga inlägg fylls i med: flask backfill-excerpts
+
+
+def downgrade():
+    with op.batch_alter_table('blog_posts', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
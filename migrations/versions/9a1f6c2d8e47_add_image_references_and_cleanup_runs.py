@@ -0,0 +1,53 @@
+"""Add image_references and image_cleanup_runs
+
+Revision ID: 9a1f6c2d8e47
+Revises: 5e8b3f1c7a94
+Create Date: 2026-10-18 18:52:37.209114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1f6c2d8e47'
+down_revision = '5e8b3f1c7a94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fylls med `flask reconcile-media --rebuild-references` (eller av första rensningen)
+    op.create_table(
+        'image_references',
+        sa.Column('owner_type', sa.String(length=30), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('folder', sa.String(length=100), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('owner_type', 'owner_id', 'folder', 'filename')
+    )
+    op.create_index('ix_image_references_path', 'image_references', ['folder', 'filename'], unique=False)
+
+    op.create_table(
+        'image_cleanup_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('dry_run', sa.Boolean(), nullable=False),
+        sa.Column('grace_hours', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.String(length=100), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Integer(), nullable=False),
+        sa.Column('freed_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('report', sa.Text(), nullable=True),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('image_cleanup_runs')
+    op.drop_index('ix_image_references_path', table_name='image_references')
+    op.drop_table('image_references')
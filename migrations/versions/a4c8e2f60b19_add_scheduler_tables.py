@@ -0,0 +1,44 @@
+"""Add scheduler lock and job run tables
+
+Revision ID: a4c8e2f60b19
+Revises: 5e1a7c3b9d42
+Create Date: 2026-10-18 13:05:52.871340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e2f60b19'
+down_revision = '5e1a7c3b9d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scheduler_locks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('owner', sa.String(length=100), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table(
+        'scheduler_job_runs',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_duration_ms', sa.Float(), nullable=True),
+        sa.Column('last_status', sa.String(length=20), nullable=True),
+        sa.Column('last_result', sa.String(length=255), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('owner', sa.String(length=100), nullable=True),
+        sa.Column('runs', sa.Integer(), nullable=False),
+        sa.Column('failures', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_job_runs')
+    op.drop_table('scheduler_locks')
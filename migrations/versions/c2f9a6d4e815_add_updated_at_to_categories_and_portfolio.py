@@ -0,0 +1,30 @@
+"""Add updated_at to blog categories, portfolio categories and portfolio items
+
+Revision ID: c2f9a6d4e815
+Revises: a4c8e2f60b19
+Create Date: 2026-10-18 15:21:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f9a6d4e815'
+down_revision = 'a4c8e2f60b19'
+branch_labels = None
+depends_on = None
+
+TABLES = ('blog_categories', 'categories', 'portfolio_items')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
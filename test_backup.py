@@ -0,0 +1,124 @@
+# test_backup.py
+"""
+Tester för backup och återställning (flask backup / flask restore).
+
+Kör:
+    pytest test_backup.py
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Skapa en testapp med SQLite i minnet, static och backuper i temporära kataloger."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.backup import backup_manager
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    app.static_folder = str(tmp_path / "static")
+    backup_manager.directory = str(tmp_path / "backups")
+    backup_manager.chunk_size = 2  # Flera batchar även med få rader
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def reset_database():
+    """Som en ny server efter `flask db upgrade`."""
+    from app.extensions import db
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+@pytest.fixture
+def content(app, tmp_path):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Comment, Role, User
+
+    image = tmp_path / "static/uploads/blog/cover.png"
+    image.parent.mkdir(parents=True)
+    Image.new("RGB", (20, 10), (1, 2, 3)).save(image, format="PNG")
+
+    user = User(email='t@t.se', name='T', password='x')
+    user.roles.append(Role(name="admin"))
+    category = BlogCategory(name='k', title='K')
+    db.session.add_all([user, category])
+    db.session.commit()
+    posts = [BlogPost(title=f'Inlägg {i}', subtitle='S', body=f'<p>Text {i}</p>', img_url="uploads/blog/cover.png",
+                      created_at=datetime(2026, 1, i + 1, 12, tzinfo=timezone.utc),
+                      category_id=category.id, author_id=user.id) for i in range(5)]
+    db.session.add_all(posts)
+    db.session.commit()
+    db.session.add(Comment(text="Hej", post_id=posts[0].id, author_id=user.id))
+    db.session.commit()
+    return posts
+
+
+def test_full_backup_round_trip(app, content, tmp_path):
+    from app.models import BlogPost, Comment, MediaAsset, SearchDocument, User
+    from app.utils.backup import backup_manager
+
+    result = app.test_cli_runner().invoke(args=["backup"])
+    assert "1 bilder (1 nya)" in result.output
+    manifest = backup_manager.latest()
+    assert manifest["mode"] == "full" and manifest["tables"]["blog_posts"]["rows"] == 5
+    assert list(manifest["files"]) == ["uploads/blog/cover.png"]
+    with gzip.open(os.path.join(backup_manager.directory, manifest["name"], "blog_posts.ndjson.gz"), "rt") as f:
+        assert json.loads(f.readline())["title"] == "Inlägg 0"
+
+    reset_database()
+    os.remove(tmp_path / "static/uploads/blog/cover.png")
+    result = app.test_cli_runner().invoke(args=["restore"])
+    assert "1 bilder återställda" in result.output
+
+    assert [p.title for p in BlogPost.query.order_by(BlogPost.id)] == [f"Inlägg {i}" for i in range(5)]
+    assert BlogPost.query.first().created_at.replace(tzinfo=None) == datetime(2026, 1, 1, 12)
+    assert User.query.one().has_role("admin")
+    assert Comment.query.one().post.title == "Inlägg 0"
+    assert (tmp_path / "static/uploads/blog/cover.png").exists()
+    assert MediaAsset.query.one().reference_count == 5       # Härledda tabeller byggs om
+    assert SearchDocument.query.count() == 5
+
+    result = app.test_cli_runner().invoke(args=["restore"])   # Databasen är inte tom längre
+    assert "--replace" in result.output
+
+
+def test_incremental_chain(app, content):
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.backup import backup_manager
+
+    full = backup_manager.backup()
+    content[1].title = "Ändrad"
+    content[1].updated_at = datetime.now(timezone.utc)
+    db.session.delete(content[2])
+    db.session.add(BlogPost(title='Ny', subtitle='S', body='<p>x</p>', img_url="uploads/blog/cover.png",
+                            category_id=content[0].category_id, author_id=content[0].author_id))
+    db.session.commit()
+
+    incremental = backup_manager.backup(incremental=True)
+    assert incremental["base"] == full["name"]
+    posts = incremental["tables"]["blog_posts"]
+    assert (posts["mode"], posts["rows"]) == ("changed", 2)  # Ändrat + nytt; raderingen syns i keys-filen
+    assert incremental["tables"]["users"]["mode"] == "full"
+    assert incremental["new_files"] == 0                     # Bilden finns redan i blob-lagret
+
+    expected = sorted(p.title for p in BlogPost.query)
+    reset_database()
+    stats = backup_manager.restore("latest")
+    assert stats["tables"]["blog_posts"] == 5
+    assert sorted(p.title for p in BlogPost.query) == expected
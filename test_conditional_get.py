@@ -0,0 +1,131 @@
+# test_conditional_get.py
+"""
+Tester för villkorade GET-svar (ETag / Last-Modified / 304).
+
+Kör:
+    pytest test_conditional_get.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.view_buffer import view_buffer
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    view_buffer.max_pending = 10_000
+    view_buffer.flush_interval = 10_000
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def content(app):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, CVContent, PortfolioItem, User
+
+    user = User(email='test@test.com', name='Test', password='test123')
+    category = BlogCategory(name='kod', title='Kod')
+    web = Category(name='web', title='Webb')
+    db.session.add_all([user, category, web])
+    db.session.commit()
+
+    post = BlogPost(title='Inlägg', subtitle='S', body='<p>Text</p>', img_url='x.jpg',
+                    category_id=category.id, author_id=user.id,
+                    created_at=datetime.now(timezone.utc) - timedelta(days=1))
+    item = PortfolioItem(title='Projekt', description='<p>Beskrivning</p>', image='p.webp',
+                         category_id=web.id, date=datetime.now(timezone.utc) - timedelta(days=2))
+    db.session.add_all([post, item, CVContent(about='Om mig')])
+    db.session.commit()
+    return {"post": post, "item": item, "user": user}
+
+
+def test_not_modified_before_rendering(app, content, monkeypatch):
+    """Matchande If-None-Match/If-Modified-Since ger 304 utan att mallen renderas."""
+    import flask
+
+    client = app.test_client()
+    urls = ["/blog/", f"/blog/post/{content['post'].id}", f"/portfolio/portfolio/{content['item'].id}",
+            "/portfolio/portfolio/category/web", "/cv"]
+    first = {url: client.get(url) for url in urls}
+    for url, response in first.items():
+        assert response.status_code == 200, url
+        assert response.headers["ETag"] and response.headers["Last-Modified"], url
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("mallen ska inte renderas vid 304")
+
+    monkeypatch.setattr(flask.templating, "_render", _fail)
+    for url, response in first.items():
+        by_etag = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        by_date = client.get(url, headers={"If-Modified-Since": response.headers["Last-Modified"]})
+        assert by_etag.status_code == by_date.status_code == 304, url
+        assert by_etag.data == b""
+
+
+def test_etag_changes_with_content(app, content):
+    """Redigerat inlägg och ny kommentar ger ny ETag."""
+    from app.extensions import db
+    from app.models import Comment
+
+    client = app.test_client()
+    url = f"/blog/post/{content['post'].id}"
+    etag = client.get(url).headers["ETag"]
+
+    content["post"].title = "Ny titel"
+    content["post"].updated_at = datetime.now(timezone.utc)  # Som edit_post
+    db.session.commit()
+    edited = client.get(url, headers={"If-None-Match": etag})
+    assert edited.status_code == 200
+    assert "Ny titel" in edited.get_data(as_text=True)
+
+    etag = edited.headers["ETag"]
+    db.session.add(Comment(text='Hej', post_id=content["post"].id, author_id=content["user"].id))
+    db.session.commit()
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    assert client.get("/blog/post/999").status_code == 404
+
+
+def test_logged_in_users_get_full_response(app, content):
+    from flask import g
+
+    client = app.test_client()
+    etag = client.get("/cv").headers["ETag"]
+    g.pop("_login_user", None)  # Fixturens app-kontext delas mellan requests
+
+    with client.session_transaction() as session:
+        session["_user_id"] = str(content["user"].id)
+        session["_fresh"] = True
+    response = client.get("/cv", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_not_modified_still_counts_view(app, content):
+    """En ny besökare som får 304 räknas ändå som visning."""
+    from app.utils.conditional import conditional_get
+    from app.utils.view_buffer import view_buffer
+
+    post_id = content["post"].id
+    etag = app.test_client().get(f"/blog/post/{post_id}").headers["ETag"]
+    before = view_buffer.pending(f"post:{post_id}")
+
+    response = app.test_client().get(f"/blog/post/{post_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert view_buffer.pending(f"post:{post_id}") == before + 1
+    assert conditional_get.stats()["not_modified"] == 1
+
@@ -0,0 +1,101 @@
+# test_dashboard_metrics.py
+"""
+Tester för adminpanelens förberäknade nyckeltal och flaggade kommentarer.
+
+Kör:
+    pytest test_dashboard_metrics.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True, DASHBOARD_FLAGGED_PER_PAGE=2, DASHBOARD_FLAGGED_MAX_PAGES=2)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def content(app):
+    """En admin, två inlägg och sex kommentarer varav fem flaggade."""
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Comment, PageView, Role, User
+
+    admin = User(email='admin@test.se', name='Admin', password='x')
+    admin.roles.append(Role(name="admin"))
+    category = BlogCategory(name='k', title='K')
+    db.session.add_all([admin, category])
+    db.session.commit()
+
+    posts = [BlogPost(title=f'Inlägg {i}', subtitle='S', body='<p>x</p>', img_url='x.jpg',
+                      category_id=category.id, author_id=admin.id, views=10) for i in range(2)]
+    db.session.add_all(posts)
+    db.session.commit()
+    db.session.add_all([Comment(text=f'Kommentar {i}', post_id=posts[0].id, author_id=admin.id, flagged=i > 0)
+                        for i in range(6)] +
+                       [PageView(page="cv", views=3), PageView(page="portfolio_1", views=4)])
+    db.session.commit()
+    return {"admin": admin, "posts": posts}
+
+
+def test_snapshot_is_maintained_by_commits(app, content):
+    from app.extensions import db
+    from app.models import Comment
+    from app.utils.dashboard_metrics import dashboard_metrics
+    from app.utils.view_buffer import view_buffer
+
+    expected = {"users": 1, "posts": 2, "comments": 6, "flagged_comments": 5,
+                "post_views": 20, "page_views": 3, "portfolio_views": 4}
+    assert dashboard_metrics.compute() == expected
+    dashboard_metrics.refresh()
+
+    comment = Comment.query.filter_by(flagged=True).first()
+    comment.flagged = False
+    db.session.delete(content["posts"][1])
+    db.session.commit()
+
+    view_buffer.add_post(content["posts"][0].id, 5)
+    view_buffer.add_page("portfolio_1", 2)
+    view_buffer.flush()
+
+    snapshot = dashboard_metrics.snapshot()
+    assert snapshot["flagged_comments"] == 4
+    assert (snapshot["posts"], snapshot["post_views"], snapshot["portfolio_views"]) == (1, 15, 6)
+    assert {name: snapshot[name] for name in expected} == dashboard_metrics.compute()
+
+    # En rollback lämnar nyckeltalen orörda
+    db.session.add(Comment(text='Ångras', post_id=content["posts"][0].id, author_id=content["admin"].id))
+    db.session.flush()
+    db.session.rollback()
+    assert dashboard_metrics.snapshot()["comments"] == 6
+
+
+def test_dashboard_reads_snapshot_and_pages_flagged_comments(app, content, query_budget):
+    from app.utils.dashboard_metrics import dashboard_metrics
+
+    dashboard_metrics.refresh()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(content["admin"].id)
+        session["_fresh"] = True
+
+    # Inloggad användare + roller, nyckeltal, en sida flaggade kommentarer, jobbstatus, ledarlås
+    with query_budget(6) as queries:
+        html = client.get("/admin/").get_data(as_text=True)
+    assert not any("count(" in q.lower() or "sum(" in q.lower() for q in queries)
+    assert "Kommentar 5" in html and "Kommentar 4" in html and "Kommentar 3" not in html
+    assert "flagged_page=2" in html
+
+    html = client.get("/admin/?flagged_page=99").get_data(as_text=True)   # Begränsas till sista sidan
+    assert "Kommentar 3" in html and "Kommentar 1" not in html
+    assert "flagged_page=3" not in html
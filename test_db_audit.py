@@ -0,0 +1,90 @@
+# test_db_audit.py
+"""
+Tester för granskningen av frågeplaner (flask db-audit, app/utils/query_audit.py).
+
+Kör:
+    pytest test_db_audit.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def content(app):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, Comment, PortfolioItem, Role, User
+
+    admin = User(email='a@t.se', name='A', password='x')
+    admin.roles.append(Role(name="admin"))
+    blog_category = BlogCategory(name='garn', title='Garn')
+    category = Category(name='virkat', title='Virkat')
+    db.session.add_all([admin, blog_category, category])
+    db.session.flush()
+
+    now = datetime.now(timezone.utc)
+    for i in range(30):
+        post = BlogPost(title=f"Inlägg {i}", subtitle="S", body="<p>x</p>", img_url="uploads/blog/a.webp",
+                        category=blog_category, author=admin, created_at=now - timedelta(days=i))
+        db.session.add(post)
+        db.session.add(Comment(text="Fint!", post=post, comment_author=admin))
+    db.session.add(PortfolioItem(title="Mössa", description="<p>x</p>", image="uploads/portfolio/a.webp",
+                                 category_id=category.id, date=now))
+    db.session.commit()
+
+
+def test_audit_replays_routes_and_explains_queries(app, content):
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.query_audit import AUDIT_ROUTES, run_audit
+
+    views = db.session.execute(db.select(db.func.sum(BlogPost.views))).scalar() or 0
+    routes = run_audit()
+
+    pages = [r for r in routes if r.url]
+    assert len(pages) == len(AUDIT_ROUTES)               # Alla sidor har data, inga hoppas över
+    assert all(r.status == 200 for r in pages), [(r.name, r.status) for r in pages]
+    assert all(q.plan for r in routes for q in r.queries)
+
+    # Bloggmailjobbet använder (email_sent, created_at) i stället för att scanna blog_posts
+    job = next(r for r in routes if r.name.startswith("Jobb"))
+    assert job.queries and not job.flagged
+
+    # Uppspelningen räknas inte som visningar
+    assert (db.session.execute(db.select(db.func.sum(BlogPost.views))).scalar() or 0) == views
+
+
+def test_plan_flags():
+    from app.utils.query_audit import _mysql_plan, _sqlite_plan
+
+    _, flags = _sqlite_plan(["SCAN blog_posts", "SCAN roles", "SEARCH comments USING INDEX ix_comments_post_created (post_id=?)",
+                             "USE TEMP B-TREE FOR ORDER BY"])
+    assert flags == ["full scan: blog_posts", "filesort (ORDER BY)"]
+
+    _, flags = _mysql_plan([{"table": "blog_posts", "type": "ALL", "key": None, "rows": 900, "Extra": "Using where; Using filesort"},
+                            {"table": "blog_categories", "type": "ALL", "key": None, "rows": 5, "Extra": None}])
+    assert flags == ["full scan: blog_posts", "filesort: blog_posts"]
+
+
+def test_cli_prints_report(app, content):
+    result = app.test_cli_runner().invoke(args=["db-audit"])
+
+    assert result.exit_code == 0, result.output
+    assert "Blogg" in result.output and "unika queries" in result.output
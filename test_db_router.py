@@ -0,0 +1,115 @@
+# test_db_router.py
+"""
+Tester för läsrepliker (app/utils/db_router.py) med två SQLite-filer som primär och replika.
+
+Kör:
+    pytest test_db_router.py
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def forget_replica_bind():
+    yield
+    from app.extensions import db
+    db.metadatas.pop("replica0", None)  # db är global – nästa app i testsviten har ingen replika
+
+
+def make_app(monkeypatch, primary, replica):
+    from config import ProductionConfig
+
+    monkeypatch.setattr(ProductionConfig, "SQLALCHEMY_DATABASE_URI", primary)
+    monkeypatch.setattr(ProductionConfig, "SQLALCHEMY_BINDS", {"replica0": replica})
+    monkeypatch.setattr(ProductionConfig, "PAGE_CACHE_BACKEND", "null")  # Varje GET ska fråga databasen
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import BlogPost
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    @app.route("/_test/rename")
+    def rename():
+        """En skrivning utanför de publika blueprintarna (som en adminändring)."""
+        db.session.get(BlogPost, 1).title = "Ändrad på primären"
+        db.session.commit()
+        return "ok"
+
+    return app
+
+
+def seed(engine, title):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, User
+
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), {"id": 1, "email": "t@t.se", "name": "T", "password": "x"})
+        conn.execute(BlogCategory.__table__.insert(), {"id": 1, "name": "k", "title": "K"})
+        conn.execute(BlogPost.__table__.insert(), {"id": 1, "title": title, "subtitle": "S", "body": "<p>x</p>",
+                                                   "img_url": "uploads/blog/a.webp", "category_id": 1, "author_id": 1})
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from app.extensions import db
+
+    app = make_app(monkeypatch, f"sqlite:///{tmp_path / 'primary.db'}", f"sqlite:///{tmp_path / 'replica.db'}")
+    with app.app_context():
+        seed(db.engines[None], "Från primären")
+        seed(db.engines["replica0"], "Från replikan")
+    return app
+
+
+def test_public_reads_go_to_replica_until_own_write(app):
+    from app.utils.db_router import db_router
+
+    client = app.test_client()
+    assert "Från replikan" in client.get("/blog/").get_data(as_text=True)
+
+    client.get("/_test/rename")                       # Skriver till primären och sätter cookien
+    assert client.get_cookie("db_primary") is not None
+    html = client.get("/blog/").get_data(as_text=True)
+    assert "Ändrad på primären" in html               # Read-your-writes
+    assert db_router.sticky_reads == 1
+
+    other = app.test_client()                          # Cacharna fylls från primären under MAX_LAG
+    assert "Ändrad på primären" in other.get("/blog/").get_data(as_text=True)
+    assert db_router.fresh_reads == 1
+
+    db_router._primary_until = 0.0                     # Fönstret har gått ut
+    assert "Från replikan" in other.get("/blog/").get_data(as_text=True)
+
+    with app.app_context():
+        stats = {row["bind"]: row for row in db_router.pool_stats()}
+    assert stats["replica0"]["queries"] > 0 and stats["replica0"]["healthy"] is True
+
+
+def test_unhealthy_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    from app.extensions import db
+    from app.utils.db_router import db_router
+
+    app = make_app(monkeypatch, f"sqlite:///{tmp_path / 'primary.db'}", "sqlite:////nonexistent/dir/replica.db")
+    with app.app_context():
+        seed(db.engines[None], "Från primären")
+
+    client = app.test_client()
+    assert "Från primären" in client.get("/blog/").get_data(as_text=True)
+    assert "Från primären" in client.get("/blog/").get_data(as_text=True)
+    assert db_router.fallbacks == 2
+
+    with app.app_context():
+        replica = next(row for row in db_router.pool_stats() if row["bind"] == "replica0")
+    assert replica["healthy"] is False and replica["failures"] == 1   # Kontrolleras bara en gång per intervall
+    assert "unable to open" in replica["last_error"]
+
+
+def test_sticky_seconds_must_cover_max_lag(tmp_path, monkeypatch):
+    from config import ProductionConfig
+
+    monkeypatch.setattr(ProductionConfig, "DB_REPLICA_STICKY_SECONDS", 10)
+    monkeypatch.setattr(ProductionConfig, "DB_REPLICA_MAX_LAG", 30)
+    with pytest.raises(ValueError, match="DB_REPLICA_STICKY_SECONDS"):
+        make_app(monkeypatch, f"sqlite:///{tmp_path / 'primary.db'}", f"sqlite:///{tmp_path / 'replica.db'}")
@@ -0,0 +1,75 @@
+# test_excerpt.py
+"""
+Tester för förberäknade textutdrag (BlogPost.excerpt) och strip_and_truncate.
+
+Kör:
+    pytest test_excerpt.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_strip_and_truncate_html():
+    from app.utils.helpers import strip_and_truncate
+
+    html = '<p class="ql-align-center">Hej&nbsp;&amp; välkommen</p><p>till <strong>bloggen</strong></p>'
+    assert strip_and_truncate(html, 100) == "Hej & välkommen till bloggen"
+    assert strip_and_truncate(html, 3) == "Hej..."
+    assert strip_and_truncate(None) == ""
+
+
+def test_filter_prefers_precomputed_excerpt():
+    """Body ska inte parsas när inlägget har ett utdrag."""
+    from app.utils.helpers import strip_and_truncate
+
+    post = SimpleNamespace(body="<p>Gammal text</p>", excerpt="Förberäknad text")
+    assert strip_and_truncate(post, 11) == "Förberäknad..."
+
+    post.excerpt = None
+    assert strip_and_truncate(post, 100) == "Gammal text"
+
+
+def test_backfill_excerpts_command(app):
+    from app.cli import backfill_excerpts
+    from app.extensions import db
+    from app.models import BlogPost, BlogCategory, User, EXCERPT_LENGTH
+
+    category = BlogCategory(name='test', title='Test')
+    user = User(email='test@test.com', name='Test', password='test123')
+    db.session.add_all([category, user])
+    db.session.commit()
+    db.session.add_all([
+        BlogPost(title=f'T{i}', subtitle='S', body=f'<p>Inlägg {i} ' + 'ord ' * 200 + '</p>',
+                 img_url='x.jpg', category_id=category.id, author_id=user.id)
+        for i in range(5)
+    ])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(backfill_excerpts, ["--chunk-size", "2"])
+    assert "5 inlägg" in result.output
+
+    db.session.expire_all()
+    excerpts = [p.excerpt for p in BlogPost.query.order_by(BlogPost.id)]
+    assert excerpts[0].startswith("Inlägg 0 ord")
+    assert all(len(e) == EXCERPT_LENGTH for e in excerpts)
+
+    # Andra körningen hittar inget som saknas
+    assert "0 inlägg" in app.test_cli_runner().invoke(backfill_excerpts).output
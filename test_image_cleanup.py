@@ -0,0 +1,126 @@
+# test_image_cleanup.py
+"""
+Tester för bildreferenser (image_references) och rensning av oanvända bilder.
+
+Kör:
+    pytest test_image_cleanup.py
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Skapa en testapp med SQLite i minnet och static i en temporär katalog."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    app.static_folder = str(tmp_path)
+
+    with app.app_context():
+        db.create_all()
+        from app.utils.image_cleanup import image_cleanup
+        image_cleanup.background = False  # Kör klart i testprocessen
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def write_image(tmp_path, static_path, age_hours=48):
+    path = tmp_path / static_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (40, 20), (10, 20, 30)).save(path, format="PNG")
+    mtime = (datetime.now(timezone.utc) - timedelta(hours=age_hours)).timestamp()
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def owners(app):
+    from app.extensions import db
+    from app.models import BlogCategory, Category, User
+
+    user, blog_category, category = (User(email='t@t.se', name='T', password='x'),
+                                     BlogCategory(name='k', title='K'), Category(name='w', title='W'))
+    db.session.add_all([user, blog_category, category])
+    db.session.commit()
+    return {"user": user, "blog_category": blog_category, "category": category}
+
+
+def refs():
+    from app.models import ImageReference
+    return {(r.owner_type, f"{r.folder}/{r.filename}") for r in ImageReference.query.all()}
+
+
+def test_references_follow_saves(app, owners):
+    from app.extensions import db
+    from app.models import BlogPost, PortfolioItem
+
+    post = BlogPost(title='T', subtitle='S', img_url="uploads/blog/a.png", category_id=owners["blog_category"].id,
+                    author_id=owners["user"].id, body='<img src="/static/uploads/blog/b.png">')
+    item = PortfolioItem(title='P', description='<p>x</p>', image="c.png", category_id=owners["category"].id)
+    owners["category"].image = "portfolio_category_images/d.png"
+    db.session.add_all([post, item])
+    db.session.commit()
+    assert refs() == {("post", "uploads/blog/a.png"), ("post", "uploads/blog/b.png"),
+                      ("portfolio", "uploads/portfolio/c.png"), ("category", "portfolio_category_images/d.png")}
+
+    post.body = "<p>Ingen bild</p>"
+    db.session.delete(item)
+    db.session.commit()
+    assert refs() == {("post", "uploads/blog/a.png"), ("category", "portfolio_category_images/d.png")}
+
+    post.views = 5  # Andra kolumner skriver inte om referenserna
+    db.session.commit()
+    assert len(refs()) == 2
+
+
+def test_dry_run_then_delete(app, owners, tmp_path):
+    from app.extensions import db
+    from app.models import BlogPost, ImageCleanupRun, MediaAsset
+    from app.utils.image_cleanup import image_cleanup
+
+    write_image(tmp_path, "uploads/blog/used.png")
+    write_image(tmp_path, "uploads/blog/old.png")
+    write_image(tmp_path, "uploads/blog/old-320w.webp")
+    write_image(tmp_path, "uploads/portfolio/orphan.png")
+    write_image(tmp_path, "uploads/blog/fresh.png", age_hours=1)   # Inom respitiden
+    db.session.add(BlogPost(title='T', subtitle='S', img_url="uploads/blog/used.png", body='<p>x</p>',
+                            category_id=owners["blog_category"].id, author_id=owners["user"].id))
+    db.session.commit()
+
+    run = image_cleanup.start(dry_run=True)
+    assert (run.status, run.total, run.processed, run.deleted) == ("done", 2, 2, 0)
+    assert run.report.splitlines() == ["uploads/blog/old.png", "uploads/portfolio/orphan.png"]
+    assert (tmp_path / "uploads/blog/old.png").exists()
+
+    run = image_cleanup.start(dry_run=False)
+    assert run.deleted == 2
+    assert sorted(os.listdir(tmp_path / "uploads/blog")) == ["fresh.png", "used.png"]
+    assert {a.filename for a in MediaAsset.query.all()} == {"used.png", "fresh.png"}
+    assert ImageCleanupRun.query.count() == 2
+
+
+def test_admin_page_shows_progress(app, owners, query_budget):
+    from app.extensions import db
+    from app.models import ImageCleanupRun, Role
+
+    owners["user"].roles.append(Role(name="admin"))
+    db.session.add(ImageCleanupRun(status="running", dry_run=True, total=200, processed=50))
+    db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(owners["user"].id)
+        session["_fresh"] = True
+
+    with query_budget(4):  # Inloggad användare + roller, körningar
+        html = client.get("/admin/cleanup-images").get_data(as_text=True)
+    assert "50 / 200" in html
+    assert "window.location.reload" in html
@@ -0,0 +1,123 @@
+# test_image_pipeline.py
+"""
+Tester för bildpipelinen (hash-namn, responsiva storlekar och säker radering).
+
+Kör:
+    pytest test_image_pipeline.py
+"""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Skapa en testapp med SQLite i minnet och static i en temporär katalog."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.image_pipeline import image_pipeline
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    app.static_folder = str(tmp_path)
+    image_pipeline.workers = 0  # Bearbeta direkt i testprocessen
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_png(width=1600, height=900, color=(200, 80, 40)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_same_upload_is_stored_once(app, tmp_path):
+    from app.utils.image_pipeline import image_pipeline
+
+    data = make_png()
+    first = image_pipeline.save(data, folder="uploads/blog")
+    second = image_pipeline.save(data, folder="uploads/blog")
+
+    assert first == second
+    assert first.endswith(".webp")
+    files = sorted(os.listdir(tmp_path / "uploads" / "blog"))
+    stem = first[:-len(".webp")]
+    assert files == sorted([first, f"{stem}-320w.webp", f"{stem}-640w.webp"])
+    with Image.open(tmp_path / "uploads" / "blog" / first) as image:
+        assert image.width == 1200
+
+
+def test_editor_images_keep_original_size(app, tmp_path):
+    """Bilder i editorns texter skalas inte ner (som före pipelinen), men får mindre storlekar för srcset."""
+    from app.utils.image_utils import _handle_quill_upload
+
+    data = {"image": (io.BytesIO(make_png(2400, 1200)), "stor.png")}
+    with app.test_request_context(method="POST", data=data, content_type="multipart/form-data"):
+        url = _handle_quill_upload().get_json()["url"]
+
+    filename = url.rsplit("/", 1)[-1]
+    with Image.open(tmp_path / "uploads" / "blog" / filename) as image:
+        assert image.width == 2400
+    stem = filename[:-len(".webp")]
+    assert os.path.exists(tmp_path / "uploads" / "blog" / f"{stem}-1200w.webp")
+
+
+def test_srcset_lists_generated_widths(app):
+    from app.utils.image_pipeline import image_pipeline
+
+    filename = image_pipeline.save(make_png(), folder="uploads/blog")
+    with app.test_request_context():
+        srcset = image_pipeline.srcset(f"uploads/blog/{filename}")
+        small = image_pipeline.srcset(f"uploads/blog/{image_pipeline.save(make_png(200, 100), 'uploads/blog')}")
+
+    assert [entry.split()[-1] for entry in srcset.split(", ")] == ["320w", "640w", "1200w"]
+    assert small == ""  # Mindre än minsta bredden – bara src behövs
+
+
+def test_shared_image_is_kept_until_last_reference(app, tmp_path):
+    from app.extensions import db
+    from app.models import Category, PortfolioItem
+    from app.utils.image_pipeline import image_pipeline
+    from app.utils.image_utils import delete_existing_image
+
+    filename = image_pipeline.save(make_png(), folder="uploads/portfolio")
+    category = Category(name="test", title="Test")
+    db.session.add(category)
+    db.session.flush()
+    first = PortfolioItem(title="A", description="a", image=filename, category_id=category.id)
+    second = PortfolioItem(title="B", description="b", image=filename, category_id=category.id)
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    folder = tmp_path / "uploads" / "portfolio"
+    delete_existing_image(filename, folder="uploads/portfolio")
+    assert (folder / filename).exists()
+
+    db.session.delete(second)
+    category.image = f"uploads/portfolio/{filename}"     # Används nu av kategorin istället
+    db.session.commit()
+    delete_existing_image(filename, folder="uploads/portfolio")
+    assert (folder / filename).exists()
+
+    category.image = None
+    db.session.commit()
+    delete_existing_image(filename, folder="uploads/portfolio")
+    assert os.listdir(folder) == []
+
+
+def test_backfill_builds_missing_sizes(app, tmp_path):
+    folder = tmp_path / "uploads" / "portfolio"
+    folder.mkdir(parents=True)
+    Image.new("RGB", (900, 600), (10, 120, 200)).save(folder / "old.jpg", format="JPEG")
+
+    result = app.test_cli_runner().invoke(args=["build-image-derivatives"])
+
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(folder)) == ["old-320w.webp", "old-640w.webp", "old.jpg"]
@@ -0,0 +1,132 @@
+# test_mail_outbox.py
+"""
+Tester för utskickskön för bloggmail (köa, skicka, nya försök och avbrutna utskick).
+
+Kör:
+    pytest test_mail_outbox.py
+"""
+
+from datetime import datetime, timedelta, timezone
+from smtplib import SMTPServerDisconnected
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet och undertryckt mailutskick."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True, MAIL_DEFAULT_SENDER="test@majatingworks.se", SITE_URL="https://example.se")
+    app.extensions["mail"].suppress = True
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def post(app):
+    """Ett inlägg och fyra användare, varav två ska få mail."""
+    from app.extensions import db
+    from app.models import BlogPost, BlogCategory, Role, User
+
+    subscriber = Role(name="subscriber")
+    category = BlogCategory(name="test", title="Test")
+    users = [
+        User(email="anna@test.se", name="Anna", password="x"),
+        User(email="bo@test.se", name="Bo", password="x"),
+        User(email="dummy@example.com", name="Dummy", password="x"),
+        User(email="borta@test.se", name="Borta", password="x", is_deleted=True),
+    ]
+    for user in users:
+        user.roles.append(subscriber)
+    db.session.add_all([subscriber, category, *users])
+    db.session.commit()
+
+    post = BlogPost(title="Nytt", subtitle="S", body="<p>Hej</p>", img_url="x.jpg",
+                    category_id=category.id, author_id=users[0].id,
+                    created_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_enqueue_skips_dummy_and_deleted_users(app, post):
+    from app.blog.utils import check_and_send_blog_emails
+    from app.models import MailDelivery, MailJob
+
+    assert check_and_send_blog_emails() == 1
+    assert check_and_send_blog_emails() == 0  # email_sent är satt
+
+    job = MailJob.query.one()
+    assert job.total == 2
+    assert job.post_url == f"https://example.se/blog/post/{post.id}"
+    assert {d.email for d in MailDelivery.query} == {"anna@test.se", "bo@test.se"}
+
+
+def test_drain_sends_each_recipient_once(app, post):
+    from app.extensions import db, mail
+    from app.models import MailJob
+    from app.utils.mail_outbox import mail_outbox
+
+    mail_outbox.enqueue_post(post)
+    with mail.record_messages() as outbox:
+        stats = mail_outbox.drain(connections=1)
+        assert mail_outbox.drain(connections=1)["sent"] == 0
+
+    assert stats["sent"] == 2
+    assert sorted(m.recipients[0] for m in outbox) == ["anna@test.se", "bo@test.se"]
+    assert "Nytt" in outbox[0].subject
+    db.session.expire_all()
+    job = MailJob.query.one()
+    assert (job.status, job.sent) == ("done", 2)
+
+
+def test_failed_send_is_retried_with_backoff(app, post, monkeypatch):
+    from app.extensions import db
+    from app.models import MailDelivery
+    from app.utils.mail_outbox import mail_outbox
+
+    mail_outbox.enqueue_post(post)
+
+    def broken_send(self, message, envelope_from=None):
+        raise SMTPServerDisconnected("borta")
+
+    monkeypatch.setattr("flask_mail.Connection.send", broken_send)
+    stats = mail_outbox.drain(connections=1)
+    assert (stats["sent"], stats["retried"]) == (0, 2)
+
+    db.session.expire_all()
+    first = MailDelivery.query.order_by(MailDelivery.id).first()
+    assert (first.status, first.attempts) == ("pending", 1)
+    assert "borta" in first.last_error
+
+    # Inget skickas förrän backoff har passerat
+    monkeypatch.undo()
+    app.extensions["mail"].suppress = True
+    assert mail_outbox.drain(connections=1)["sent"] == 0
+
+    MailDelivery.query.update({"next_attempt_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.session.commit()
+    assert mail_outbox.drain(connections=1)["sent"] == 2
+
+def test_stale_sending_rows_become_unknown(app, post):
+    from app.extensions import db
+    from app.models import MailDelivery
+    from app.utils.mail_outbox import mail_outbox
+
+    mail_outbox.enqueue_post(post)
+    delivery = MailDelivery.query.first()
+    delivery.status = "sending"
+    delivery.claimed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.session.commit()
+
+    assert mail_outbox.recover_stale() == 1
+    assert mail_outbox.status() == {"pending": 1, "unknown": 1}
+    assert mail_outbox.requeue_unknown() == 1
+    assert mail_outbox.status() == {"pending": 2}
@@ -0,0 +1,120 @@
+# test_media_library.py
+"""
+Tester för mediabiblioteket (media_assets) och adminsidan för uppladdade bilder.
+
+Kör:
+    pytest test_media_library.py
+"""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Skapa en testapp med SQLite i minnet och static i en temporär katalog."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.image_pipeline import image_pipeline
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    app.static_folder = str(tmp_path)
+    image_pipeline.workers = 0  # Bearbeta direkt i testprocessen
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def write_image(tmp_path, static_path, width=100, height=50):
+    path = tmp_path / static_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (width, height), (10, 20, 30)).save(path, format="PNG")
+    return path
+
+
+def test_upload_registers_asset(app):
+    from app.extensions import db
+    from app.models import MediaAsset
+    from app.utils.image_utils import save_image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 900), (200, 80, 40)).save(buffer, format="PNG")
+    buffer.seek(0)
+    filename = save_image(buffer, folder="uploads/blog")
+    db.session.commit()
+
+    asset = MediaAsset.query.one()  # Genererade storlekar räknas inte som egna bilder
+    assert (asset.folder, asset.filename) == ("uploads/blog", filename)
+    assert (asset.width, asset.height) == (1200, 675)
+    assert asset.size_bytes == os.path.getsize(os.path.join(app.static_folder, asset.static_path))
+    assert len(asset.content_hash) == 64
+
+
+def test_reconcile_scans_disk_and_counts_references(app, tmp_path):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, MediaAsset, User
+
+    write_image(tmp_path, "uploads/blog/used.png")
+    write_image(tmp_path, "uploads/blog/inline.png")
+    write_image(tmp_path, "uploads/blog/unused.png", width=300)
+    write_image(tmp_path, "uploads/blog/unused-320w.webp")
+    write_image(tmp_path, "blog_category_images/cat.png")
+    db.session.add(MediaAsset(folder="uploads/portfolio", filename="gone.webp", size_bytes=1))
+
+    user, category = User(email='t@t.se', name='T', password='x'), BlogCategory(
+        name='k', title='K', image="blog_category_images/cat.png")
+    db.session.add_all([user, category])
+    db.session.commit()
+    db.session.add(BlogPost(title='T', subtitle='S', img_url="uploads/blog/used.png", category_id=category.id,
+                            author_id=user.id, body='<p><img src="/static/uploads/blog/inline.png"></p>'))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reconcile-media"])
+    assert "4 nya, 0 ändrade, 1 borttagna" in result.output
+    assert "3 bilder används" in result.output
+
+    counts = {a.static_path: a.reference_count for a in MediaAsset.query.all()}
+    assert counts == {"uploads/blog/used.png": 1, "uploads/blog/inline.png": 1,
+                      "uploads/blog/unused.png": 0, "blog_category_images/cat.png": 1}
+
+    result = app.test_cli_runner().invoke(args=["reconcile-media"])
+    assert "0 nya, 0 ändrade, 0 borttagna, 4 oförändrade" in result.output
+
+
+def test_uploads_page_is_sql_paginated(app, tmp_path, query_budget):
+    from datetime import datetime, timedelta, timezone
+
+    from app.extensions import db
+    from app.models import MediaAsset, Role, User
+
+    admin = User(email='admin@test.se', name='Admin', password='x')
+    admin.roles.append(Role(name="admin"))
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.session.add(admin)
+    db.session.add_all([MediaAsset(folder="uploads/blog" if i % 2 else "uploads/portfolio", filename=f"img{i:03}.webp",
+                                   size_bytes=i * 100, created_at=start + timedelta(days=i), reference_count=i % 3)
+                        for i in range(40)])
+    db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(admin.id)
+        session["_fresh"] = True
+
+    # Inloggad användare + roller, COUNT, sidan, mappar, kategorinamn (två modeller)
+    with query_budget(7):
+        html = client.get("/admin/manage-uploads?folder=uploads/blog&sort=largest").get_data(as_text=True)
+    assert "Visar 1–12 av totalt 20 bilder" in html
+    assert html.index("img039.webp") < html.index("img037.webp")
+    assert "img038.webp" not in html
+
+    html = client.get("/admin/manage-uploads?sort=oldest&unused=1&page=2").get_data(as_text=True)
+    assert "Visar 13–14 av totalt 14 bilder" in html
+    assert "img039.webp" in html and "img036.webp" in html
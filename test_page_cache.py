@@ -0,0 +1,112 @@
+# test_page_cache.py
+"""
+Tester för sidcachen (LRU/TTL, filsystem och invalidering vid commit).
+
+Kör:
+    pytest test_page_cache.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def post(app):
+    from app.models import BlogPost, BlogCategory, User
+    from app.extensions import db
+
+    category = BlogCategory(name='test', title='Test')
+    user = User(email='test@test.com', name='Test', password='test123')
+    db.session.add_all([category, user])
+    db.session.commit()
+
+    post = BlogPost(title='Första titeln', subtitle='S', body='<p>Hej</p>', img_url='x.jpg',
+                    category_id=category.id, author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    from app.utils import page_cache as module
+
+    backend = module.MemoryBackend(max_entries=2)
+    backend.set("blog:0:/a", "A", ttl=60)
+    backend.set("blog:0:/b", "B", ttl=60)
+    assert backend.get("blog:0:/a") == "A"  # /a blir senast använd
+    backend.set("blog:0:/c", "C", ttl=60)
+    assert backend.get("blog:0:/b") is None
+    assert backend.get("blog:0:/a") == "A"
+
+    now = module.time.monotonic()
+    monkeypatch.setattr(module.time, "monotonic", lambda: now + 61)
+    assert backend.get("blog:0:/a") is None
+
+
+def test_filesystem_backend_is_shared(tmp_path):
+    """Två workers med samma katalog ser varandras sidor och invalideringar."""
+    from app.utils.page_cache import FileSystemBackend
+
+    worker_a = FileSystemBackend(str(tmp_path))
+    worker_b = FileSystemBackend(str(tmp_path))
+
+    key = f"blog:{worker_a.generation('blog')}:/blog/?"
+    worker_a.set(key, (b"<html>", "text/html"), ttl=60)
+    assert worker_b.get(key) == (b"<html>", "text/html")
+
+    worker_b.bump("blog")
+    assert worker_a.generation("blog") == 1
+    assert worker_a.size() == 0
+
+
+def test_show_post_is_cached_and_invalidated_on_commit(app, post):
+    from app.extensions import db
+    from app.utils.page_cache import page_cache
+    from app.utils.view_buffer import view_buffer
+
+    view_buffer.max_pending = view_buffer.flush_interval = 10_000
+    client = app.test_client()
+    url = f"/blog/post/{post.id}"
+
+    assert "Första titeln" in client.get(url).get_data(as_text=True)
+    assert page_cache.stats()["misses"] == 1
+
+    # Träff: HTML:en kommer från cachen men visningen räknas ändå
+    db.session.execute(post.__table__.update().values(title="Ändrad utan ORM"))
+    db.session.commit()
+    html = app.test_client().get(url).get_data(as_text=True)
+    assert "Första titeln" in html
+    assert page_cache.stats()["hits"] == 1
+    assert view_buffer.pending(f"post:{post.id}") == 2
+
+    # Commit via ORM invaliderar taggen "blog"
+    db.session.expire_all()
+    post.title = "Andra titeln"
+    db.session.commit()
+    assert "Andra titeln" in client.get(url).get_data(as_text=True)
+    view_buffer.clear()
+
+
+def test_query_args_are_part_of_the_key(app, post):
+    from app.utils.page_cache import page_cache
+
+    client = app.test_client()
+    client.get("/blog/?sort=asc")
+    client.get("/blog/?sort=desc")
+    client.get("/blog/?sort=asc")
+    assert (page_cache.stats()["hits"], page_cache.stats()["misses"]) == (1, 2)
@@ -0,0 +1,192 @@
+# test_pagination.py
+"""
+Tester för keyset-paginering (cursor) och cachade totaler.
+
+Kör:
+    pytest test_pagination.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.pagination import clear_count_cache
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    clear_count_cache()
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def posts(app):
+    """25 inlägg där vissa delar publiceringstid (för att testa id som tie-breaker)."""
+    from app.extensions import db
+    from app.models import BlogPost, BlogCategory, User
+
+    category = BlogCategory(name='test', title='Test')
+    user = User(email='test@test.com', name='Test', password='test123')
+    db.session.add_all([category, user])
+    db.session.commit()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = [
+        BlogPost(title=f'Inlägg {i}', subtitle='S', body='<p>Hej</p>', img_url='x.jpg',
+                 created_at=start + timedelta(days=i // 3),
+                 category_id=category.id, author_id=user.id)
+        for i in range(25)
+    ]
+    db.session.add_all(posts)
+    db.session.commit()
+    return posts
+
+
+def _walk(query, direction_attr, cursor, **kwargs):
+    from app.models import BlogPost
+    from app.utils.pagination import paginate_keyset
+
+    seen = []
+    while True:
+        result = paginate_keyset(query, BlogPost.created_at, BlogPost.id,
+                                 cursor=cursor, per_page=10, **kwargs)
+        seen.append([p.id for p in result.items])
+        cursor = getattr(result, direction_attr)
+        if not cursor:
+            return seen, result
+
+
+def test_keyset_walks_forward_and_back(app, posts):
+    """Alla rader ska visas exakt en gång, i samma ordning som OFFSET-sortering."""
+    from app.models import BlogPost
+
+    expected = [p.id for p in BlogPost.query.order_by(BlogPost.created_at.desc(), BlogPost.id.desc())]
+
+    pages, last = _walk(BlogPost.query, "next_cursor", None)
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert sum(pages, []) == expected
+    assert last.has_prev and not last.has_next
+
+    back, first = _walk(BlogPost.query, "prev_cursor", last.prev_cursor)
+    assert back == [pages[1], pages[0]]
+    assert first.has_next and not first.has_prev
+
+
+def test_keyset_ascending(app, posts):
+    from app.models import BlogPost
+
+    expected = [p.id for p in BlogPost.query.order_by(BlogPost.created_at.asc(), BlogPost.id.asc())]
+    pages, _ = _walk(BlogPost.query, "next_cursor", None, descending=False)
+    assert sum(pages, []) == expected
+
+
+def test_invalid_cursor_is_404(app, posts):
+    from werkzeug.exceptions import NotFound
+    from app.models import BlogPost
+    from app.utils.pagination import paginate_keyset
+
+    with pytest.raises(NotFound):
+        paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id, cursor="inte-en-cursor")
+
+
+def test_crafted_cursors_are_404(app, posts):
+    """Cursorvärden av fel typ för kolumnerna ska ge 404, inte SQL-fel (500)."""
+    import base64
+    import json
+
+    client = app.test_client()
+    for key in ([{"dt": 5}, 1], [None, 1], [[1, 2], 1], [{"dt": "2024-01-01"}, "x"], ["2024-01-01", 1]):
+        cursor = base64.urlsafe_b64encode(json.dumps({"k": key}).encode()).decode().rstrip("=")
+        assert client.get(f"/blog/?cursor={cursor}").status_code == 404, key
+
+
+def test_keyset_with_null_sort_values(app):
+    """PortfolioItem.date får vara NULL – de raderna ska varken hoppas över eller dubbleras."""
+    from app.extensions import db
+    from app.models import Category, PortfolioItem
+    from app.utils.pagination import paginate_keyset
+
+    category = Category(name="web", title="Webb")
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        PortfolioItem(title=f"Projekt {i}", description="<p>Text</p>", category_id=category.id,
+                      date=None if i % 3 == 0 else datetime(2024, 1, 1) + timedelta(days=i // 2))
+        for i in range(14)
+    ])
+    db.session.commit()
+    all_ids = sorted(item.id for item in PortfolioItem.query)
+
+    for descending in (True, False):
+        seen, cursor, pages = [], None, []
+        while True:
+            result = paginate_keyset(PortfolioItem.query, PortfolioItem.date, PortfolioItem.id,
+                                     cursor=cursor, per_page=4, descending=descending)
+            pages.append([item.id for item in result.items])
+            seen += pages[-1]
+            cursor = result.next_cursor
+            if not cursor:
+                break
+        assert sorted(seen) == all_ids and len(seen) == len(all_ids)
+
+        back, cursor = [], result.prev_cursor
+        while cursor:
+            result = paginate_keyset(PortfolioItem.query, PortfolioItem.date, PortfolioItem.id,
+                                     cursor=cursor, per_page=4, descending=descending)
+            back.append([item.id for item in result.items])
+            cursor = result.prev_cursor
+        assert back == pages[-2::-1]
+
+
+def test_count_is_cached(app, posts):
+    """Totalen räknas en gång per nyckel och TTL, inte per sidvisning."""
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.pagination import paginate_keyset, clear_count_cache
+
+    result = paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id, count_key="alla")
+    assert (result.total, result.total_pages) == (25, 3)
+
+    # Direkt SQL går förbi ORM-händelserna → den cachade totalen används
+    db.session.execute(BlogPost.__table__.delete().where(BlogPost.id == posts[0].id))
+    db.session.commit()
+    assert paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id, count_key="alla").total == 25
+
+    clear_count_cache()
+    assert paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id, count_key="alla").total == 24
+
+    # En ORM-commit som ändrar inlägg tömmer totalerna (se page_cache.py)
+    db.session.delete(posts[1])
+    db.session.commit()
+    assert paginate_keyset(BlogPost.query, BlogPost.created_at, BlogPost.id, count_key="alla").total == 23
+
+
+def test_blog_index_opts_in_with_cursor(app, posts):
+    from app.utils.pagination import encode_cursor
+
+    client = app.test_client()
+    newest = max(posts, key=lambda p: (p.created_at, p.id))
+
+    app.config["PAGINATION_MODE"] = "keyset"
+    response = client.get("/blog/")
+    assert response.status_code == 200
+    assert "cursor=" in response.get_data(as_text=True)
+
+    app.config["PAGINATION_MODE"] = "offset"
+    cursor = encode_cursor(newest.created_at.replace(tzinfo=None), newest.id)
+    response = client.get(f"/blog/?cursor={cursor}")
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert newest.title not in html  # Cursorn pekar förbi det nyaste inlägget
+    assert posts[-2].title in html
+    assert client.get("/blog/category/test?cursor=" + cursor).status_code == 200
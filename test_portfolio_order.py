@@ -0,0 +1,107 @@
+# test_portfolio_order.py
+"""
+Tester för portfolioordningen (app/utils/portfolio_order.py) och projektsidan.
+
+Kör:
+    pytest test_portfolio_order.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.view_buffer import view_buffer
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    view_buffer.max_pending = view_buffer.flush_interval = 10_000  # Ingen flush mitt i en request
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    view_buffer.clear()
+
+
+@pytest.fixture
+def items(app):
+    """12 projekt, ett per dag – projekt 5 och 6 har samma datum."""
+    from app.extensions import db
+    from app.models import Category, PortfolioItem
+
+    category = Category(name="web", title="Webb")
+    db.session.add(category)
+    db.session.flush()
+    start = datetime(2024, 1, 1)
+    items = [
+        PortfolioItem(title=f"Projekt {i}", description="<p>Text</p>", image=f"p{i}.webp",
+                      category_id=category.id, date=start + timedelta(days=min(i, 5) if i == 6 else i))
+        for i in range(12)
+    ]
+    db.session.add_all(items)
+    db.session.commit()
+    return items
+
+
+def test_neighbours_and_pages(app, items):
+    from app.utils.portfolio_order import portfolio_order
+
+    ids = [entry.id for entry in portfolio_order.entries()]
+    assert ids == [items[i].id for i in (11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1, 0)]  # Samma datum: högst id först
+
+    older, newer = portfolio_order.neighbours(items[6].id)
+    assert (older.id, newer.id) == (items[5].id, items[7].id)
+    assert portfolio_order.neighbours(items[11].id)[1] is None
+    assert portfolio_order.neighbours(items[0].id)[0] is None
+    assert portfolio_order.neighbours(999) == (None, None)
+
+    page, total_pages = portfolio_order.page(2, per_page=10)
+    assert total_pages == 2 and [entry.title for entry in page] == ["Projekt 1", "Projekt 0"]
+
+
+def test_item_page_is_one_lookup(app, items, query_budget):
+    from app.extensions import db
+
+    client = app.test_client()
+    item_id = items[6].id
+    assert client.get(f"/portfolio/portfolio/{items[3].id}").status_code == 200  # Läser ordningen
+
+    db.session.expunge_all()
+    with query_budget(3):  # ETag-validatorer, projektet + kategori, visningar
+        response = client.get(f"/portfolio/portfolio/{item_id}?page=2")
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "Projekt 5" in html and "Projekt 7" in html and "Projekt 0" in html and "Webb" in html
+
+
+def test_commit_refreshes_order(app, items):
+    from app.extensions import db
+    from app.models import PortfolioItem
+    from app.utils.portfolio_order import portfolio_order
+
+    portfolio_order.entries()
+    newest = PortfolioItem(title="Nyast", description="<p>Text</p>", category_id=items[0].category_id,
+                           date=datetime(2025, 1, 1))
+    db.session.add(newest)
+    db.session.commit()
+    assert portfolio_order.entries()[0].id == newest.id
+
+    items[0].date = datetime(2026, 1, 1)
+    db.session.flush()
+    db.session.rollback()
+    assert portfolio_order.entries()[0].id == newest.id  # Rollback ändrar inget
+
+    items[0].date = datetime(2026, 1, 1)
+    db.session.commit()
+    assert portfolio_order.entries()[0].id == items[0].id
+
+    db.session.delete(newest)
+    db.session.commit()
+    assert newest.id not in [entry.id for entry in portfolio_order.entries()]
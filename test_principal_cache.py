@@ -0,0 +1,147 @@
+# test_principal_cache.py
+"""
+Tester för cachen av inloggade användare (app/utils/principal_cache.py).
+
+Kör:
+    pytest test_principal_cache.py
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """
+    Skapa en testapp med SQLite i minnet. Requests körs utanför fixturens app
+    context – annars delar de `g` och Flask-Login laddar aldrig om användaren.
+    """
+    from app import create_app
+    from app.extensions import db
+    from app.models import Role, User
+    from app.utils.principal_cache import principal_cache
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Role(name="admin"), Role(name="user")])
+        admin = User(email="admin@test.se", name="Admin", password="x")
+        member = User(email="member@test.se", name="Medlem", password="x")
+        db.session.add_all([admin, member])
+        admin.add_role("admin")
+        admin.add_role("user")
+        member.add_role("user")
+        db.session.commit()
+        app.user_ids = {"admin": admin.id, "member": member.id}
+        db.session.remove()
+
+    yield app
+
+    with app.app_context():
+        db.drop_all()
+    principal_cache.clear()
+
+
+@pytest.fixture
+def users(app):
+    return app.user_ids
+
+
+@contextmanager
+def sql_log(app):
+    """Alla queries i blocket, även från requests med egen app context."""
+    from sqlalchemy import event
+    from app.extensions import db
+
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def log(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", log)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", log)
+
+
+def login(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    return client
+
+
+def user_queries(statements):
+    return [s for s in statements if "FROM users" in s or "FROM roles" in s]
+
+
+def test_load_uses_one_query_then_cache(app, users, query_budget):
+    from app.extensions import db
+    from app.utils.principal_cache import principal_cache
+
+    with app.app_context(), query_budget(1):  # Användare + roller i samma query
+        user = principal_cache.load(users["admin"])
+        assert user.has_role("admin") and user.role_names == {"admin", "user"}
+
+    with app.app_context(), query_budget(0):
+        user = principal_cache.load(users["admin"])
+        assert user.has_role("admin") and not user.has_role("subscriber") and user.is_active
+        assert user in db.session and user.email == "admin@test.se"
+
+    with app.app_context():
+        assert principal_cache.load(999) is None
+
+
+def test_requests_skip_user_queries(app, users):
+    client = login(app, users["admin"])
+    with sql_log(app) as statements:
+        assert client.get("/admin/manage-posts").status_code == 200
+    assert len(user_queries(statements)) == 1
+
+    with sql_log(app) as statements:
+        assert client.get("/admin/manage-posts").status_code == 200
+    assert user_queries(statements) == []
+
+
+def test_admin_changes_invalidate(app, users):
+    from app.utils.principal_cache import principal_cache
+
+    admin, member = login(app, users["admin"]), login(app, users["member"])
+    assert member.get("/admin/manage-posts").status_code == 403
+
+    admin.get(f"/admin/promote/{users['member']}")
+    assert member.get("/admin/manage-posts").status_code == 200
+
+    admin.get(f"/admin/demote/{users['member']}")
+    assert member.get("/admin/manage-posts").status_code == 403
+
+    admin.post(f"/admin/toggle-user/{users['member']}")
+    with app.app_context():
+        assert principal_cache.load(users["member"]).is_active is False
+
+    admin.post(f"/admin/delete-user/{users['member']}")
+    with app.app_context():
+        assert principal_cache.load(users["member"]) is None
+
+
+def test_rollback_keeps_cache(app, users):
+    from app.extensions import db
+    from app.utils.principal_cache import principal_cache
+
+    with app.app_context():
+        user = principal_cache.load(users["member"])
+        user.is_active = False
+        db.session.flush()
+        db.session.rollback()
+        assert principal_cache.size() == 1
+
+        user.is_active = False
+        db.session.commit()
+        assert principal_cache.size() == 0
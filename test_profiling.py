@@ -0,0 +1,76 @@
+# test_profiling.py
+"""
+Tester för mätning per request (Server-Timing, långsamma queries och percentiler).
+
+Kör:
+    pytest test_profiling.py
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_percentile_nearest_rank():
+    from app.utils.profiling import percentile
+
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([7], 99) == 7
+    assert percentile([], 95) == 0.0
+
+
+def test_server_timing_header_and_endpoint_report(app):
+    from app.utils.profiling import profiler
+
+    client = app.test_client()
+    for _ in range(3):
+        response = client.get("/blog/?sort=asc")
+    header = response.headers["Server-Timing"]
+    assert header.startswith("db;dur=")
+    assert 'queries"' in header and "tpl;dur=" in header and "total;dur=" in header
+
+    report = {row["endpoint"]: row for row in profiler.endpoint_report()}
+    assert report["blog.index"]["requests"] == 3
+    assert report["blog.index"]["queries_max"] >= 2
+    assert report["blog.index"]["template_p95"] > 0
+
+
+def test_slow_queries_are_logged_as_json(app, tmp_path):
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.profiling import profiler
+
+    log_file = tmp_path / "slow.log"
+    profiler.slow_query_ms, profiler.slow_log_path = 0, str(log_file)
+    try:
+        with app.test_request_context("/blog/"):
+            BlogPost.query.count()
+            db.session.execute(db.text("SELECT :email"), {"email": "hemlig@example.se"})
+        db.session.execute(db.text("SELECT 1"))  # Utanför request
+    finally:
+        profiler.slow_query_ms, profiler.slow_log_path = 200, None
+
+    entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert entries[0]["path"] == "/blog/"
+    assert "blog_posts" in entries[0]["statement"]
+    assert entries[-1]["endpoint"] is None and entries[-1]["statement"] == "SELECT 1"
+    assert profiler.recent_slow[0]["statement"] == "SELECT 1"
+    assert "hemlig@example.se" not in log_file.read_text(encoding="utf-8")
+    assert ["str"] in [entry["parameters"] for entry in entries]  # Typen, inte värdet
@@ -0,0 +1,113 @@
+# test_query_budget.py
+"""
+Querybudgetar för blogglistor, inläggssidan och adminlistor (fångar N+1-regressioner).
+
+Budgeten gäller oavsett antal inlägg och kommentarer på sidan.
+
+Kör:
+    pytest test_query_budget.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.view_buffer import view_buffer
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    view_buffer.max_pending = view_buffer.flush_interval = 10_000  # Ingen flush mitt i en request
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    view_buffer.clear()
+
+
+@pytest.fixture
+def content(app):
+    """3 kategorier, 12 inlägg och 3 kommentarer per inlägg från olika användare."""
+    from app.extensions import db
+    from app.models import BlogPost, BlogCategory, Comment, Role, User
+
+    admin_role = Role(name="admin")
+    categories = [BlogCategory(name=f"kat{i}", title=f"Kategori {i}") for i in range(3)]
+    users = [User(email=f"u{i}@test.se", name=f"Användare {i}", password="x") for i in range(6)]
+    users[0].roles.append(admin_role)
+    db.session.add_all([admin_role, *categories, *users])
+    db.session.commit()
+
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    posts = [
+        BlogPost(title=f"Inlägg {i}", subtitle="S", body="<p>Text</p>", excerpt="Text", img_url="x.jpg",
+                 category_id=categories[i % 3].id, author_id=users[0].id,
+                 created_at=start + timedelta(days=i))
+        for i in range(12)
+    ]
+    db.session.add_all(posts)
+    db.session.flush()
+    db.session.add_all([
+        Comment(text=f"Kommentar {j}", post_id=post.id, author_id=users[(i + j) % 6].id)
+        for i, post in enumerate(posts) for j in range(3)
+    ])
+    db.session.commit()
+    return {"posts": posts, "admin": users[0]}
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
+
+
+def test_blog_index_budget(app, content, query_budget):
+    with query_budget(4):  # ETag-validatorer, kategorilista, antal, sida med kategorier (joinedload)
+        response = app.test_client().get("/blog/")
+    assert response.status_code == 200
+    assert "Kategori 2" in response.get_data(as_text=True)
+
+
+def test_posts_by_category_budget(app, content, query_budget):
+    with query_budget(3):
+        response = app.test_client().get("/blog/category/kat1")
+    assert response.status_code == 200
+
+
+def test_show_post_budget(app, content, query_budget):
+    post = content["posts"][5]
+    with query_budget(6):  # ETag-validatorer, inlägg + kategori, kommentarer + författare, senaste inlägg (antal + sida), visning
+        response = app.test_client().get(f"/blog/post/{post.id}")
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert html.count("Kommentar ") == 3
+
+
+def test_admin_lists_budget(app, content, query_budget):
+    client = app.test_client()
+    login(client, content["admin"])
+
+    with query_budget(4):  # inloggad användare + roller, antal, sida med kategorier, kategorilista
+        assert client.get("/admin/manage-posts").status_code == 200
+    with query_budget(4):  # inloggad användare, antal, sida med inlägg/författare, titlar
+        response = client.get("/admin/comments")
+    assert response.status_code == 200
+    assert "Användare 5" in response.get_data(as_text=True)
+
+
+def test_budget_catches_lazy_loading(app, content, query_budget):
+    """Utan profil laddas kategorin en gång per inlägg – budgeten ska slå larm."""
+    from app.extensions import db
+    from app.models import BlogPost
+
+    db.session.expunge_all()
+    with pytest.raises(AssertionError, match="budget 2"):
+        with query_budget(2):
+            [post.category.title for post in BlogPost.query.all()]
@@ -0,0 +1,95 @@
+# test_scheduler.py
+"""
+Tester för schemaläggaren (leader-lås mellan workers och körhistorik).
+
+Kör:
+    pytest test_scheduler.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_scheduler(app, owner):
+    from app.scheduler import JobScheduler
+
+    scheduler = JobScheduler(app)
+    scheduler.owner = owner
+    return scheduler
+
+
+def test_only_one_worker_holds_the_lock(app):
+    from app.extensions import db
+    from app.models import SchedulerLock
+
+    worker_a = make_scheduler(app, "a")
+    worker_b = make_scheduler(app, "b")
+
+    assert worker_a.acquire()
+    assert not worker_b.acquire()
+    assert worker_a.acquire()  # Förnyar sitt eget lås
+
+    # Ledaren dör: låset går ut och nästa worker tar över
+    lock = db.session.get(SchedulerLock, "scheduler")
+    lock.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+    assert worker_b.acquire()
+    assert not worker_a.acquire()
+
+    worker_b.release()
+    assert worker_a.acquire()
+
+
+def test_run_job_records_status_and_skips_when_not_leader(app):
+    from app.extensions import db
+    from app.models import SchedulerJobRun
+
+    leader = make_scheduler(app, "leader")
+    follower = make_scheduler(app, "follower")
+    calls = []
+    for scheduler in (leader, follower):
+        scheduler.add_job("demo", lambda: calls.append(1) or "klart", 60)
+        scheduler.add_job("broken", lambda: 1 / 0, 60)
+
+    assert leader.run_job("demo") == "klart"
+    assert follower.run_job("demo") is None
+    assert calls == [1]
+
+    leader.run_job("demo")
+    leader.run_job("broken")
+    db.session.expire_all()
+    demo = db.session.get(SchedulerJobRun, "demo")
+    broken = db.session.get(SchedulerJobRun, "broken")
+    assert (demo.runs, demo.failures, demo.last_status, demo.last_result) == (2, 0, "ok", "klart")
+    assert demo.last_duration_ms is not None
+    assert (broken.runs, broken.failures, broken.last_status) == (1, 1, "error")
+    assert "division" in broken.last_error
+
+
+def test_aggregate_job_is_idempotent(app):
+    from app.models import DailyStats
+    from app.utils.view_buffer import view_buffer
+
+    view_buffer.add_page("portfolio", 5)
+
+    scheduler = make_scheduler(app, "leader")
+    assert scheduler.run_job("aggregate_stats") == "0 sidor igår, 1 sidor idag"
+    assert scheduler.run_job("aggregate_stats") == "0 sidor igår, 1 sidor idag"
+    assert [(s.page, s.views) for s in DailyStats.query.all()] == [("portfolio", 5)]
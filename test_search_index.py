@@ -0,0 +1,139 @@
+# test_search_index.py
+"""
+Tester för fulltextindexet (tokenisering, stemming, BM25 och inkrementell uppdatering).
+
+Kör:
+    pytest test_search_index.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def author(app):
+    from app.models import BlogCategory, User
+    from app.extensions import db
+
+    category = BlogCategory(name='test', title='Test')
+    user = User(email='test@test.com', name='Test', password='test123')
+    db.session.add_all([category, user])
+    db.session.commit()
+    return user, category
+
+
+def _post(author, title, body, subtitle="Underrubrik"):
+    from app.models import BlogPost
+    user, category = author
+    return BlogPost(title=title, subtitle=subtitle, body=body, img_url='x.jpg',
+                    category_id=category.id, author_id=user.id)
+
+
+def test_analyze_strips_stopwords_and_stems():
+    from app.utils.search import analyze, stem_sv
+
+    assert stem_sv("bilarna") == "bil"
+    assert stem_sv("hundens") == "hund"
+    assert analyze("Hunden och bilarna") == ["hund", "bil"]
+
+
+def test_markup_is_not_indexed(app, author):
+    """Taggar och attribut i HTML får aldrig ge träffar."""
+    from app.extensions import db
+    from app.utils.search import search_ids
+
+    db.session.add(_post(author, "Titel", '<p class="ql-align-center">Trädgården</p>'))
+    db.session.commit()
+
+    assert search_ids("post", "align") == []
+    assert len(search_ids("post", "trädgård")) == 1
+
+
+def test_index_follows_create_edit_delete(app, author):
+    from app.extensions import db
+    from app.utils.search import search_ids
+
+    post = _post(author, "Flask i produktion", "<p>Om gunicorn</p>")
+    db.session.add(post)
+    db.session.commit()
+    assert [doc_id for doc_id, _ in search_ids("post", "gunicorn")] == [post.id]
+
+    post.body = "<p>Om nginx</p>"
+    db.session.commit()
+    assert search_ids("post", "gunicorn") == []
+    assert [doc_id for doc_id, _ in search_ids("post", "nginx")] == [post.id]
+
+    db.session.delete(post)
+    db.session.commit()
+    assert search_ids("post", "nginx") == []
+
+
+def test_ranking_and_prefix(app, author):
+    """Titelträffar rankas högre och ofullständiga ord matchar som prefix."""
+    from app.extensions import db
+    from app.utils.search import search_ids, rebuild_index
+
+    body_hit = _post(author, "Vardag", "<p>Lite om programmering i texten</p>")
+    title_hit = _post(author, "Programmering med Python", "<p>Text</p>")
+    db.session.add_all([body_hit, title_hit])
+    db.session.commit()
+
+    rebuild_index()  # Ska ge samma resultat som det inkrementella indexet
+    ranked = [doc_id for doc_id, _ in search_ids("post", "programmering")]
+    assert ranked == [title_hit.id, body_hit.id]
+
+    assert [doc_id for doc_id, _ in search_ids("post", "progr")] == ranked
+    assert [doc_id for doc_id, _ in search_ids("post", "python progr")] == [title_hit.id]
+    assert search_ids("post", "pyth programmering") == []  # Bara sista ordet är ett prefix
+
+
+def test_accent_only_different_terms(app, author):
+    """"mat"/"mät" och "las"/"läs" är olika termer – får inte krocka i primärnyckeln (binär kollation på MySQL)."""
+    from sqlalchemy.dialects import mysql
+    from sqlalchemy.schema import CreateTable
+    from app.extensions import db
+    from app.models import SearchTerm
+    from app.utils.search import analyze, search_ids
+
+    assert analyze("mat mät las läs") == ["mat", "mät", "las", "läs"]
+    post = _post(author, "Mat och mät", "<p>Las läs</p>")
+    db.session.add(post)
+    db.session.commit()
+
+    assert [doc_id for doc_id, _ in search_ids("post", "mät")] == [post.id]
+    assert SearchTerm.query.filter(SearchTerm.term.in_(["mat", "mät", "las", "läs"])).count() == 4
+    assert "COLLATE utf8mb4_bin" in str(CreateTable(SearchTerm.__table__).compile(dialect=mysql.dialect()))
+
+
+def test_cut_off_is_shown(app, author, monkeypatch):
+    """Fler träffar än MAX_HITS: de bästa listas och sidan säger att listan är kapad."""
+    from app.extensions import db
+    from app.utils.search import search_ranking
+
+    monkeypatch.setattr("app.utils.search.MAX_HITS", 2)
+    monkeypatch.setattr("app.blog.blog.MAX_HITS", 2)
+    db.session.add_all([_post(author, f"Flask {i}", "<p>Flask</p>") for i in range(3)])
+    db.session.commit()
+
+    ranking, truncated = search_ranking("post", "flask")
+    assert len(ranking) == 2 and truncated
+    assert search_ranking("post", "gunicorn") == ({}, False)
+
+    html = app.test_client().get("/blog/?search=flask").get_data(as_text=True)
+    assert "Visar de 2 mest relevanta träffarna" in html
+    assert "mest relevanta träffarna" not in app.test_client().get("/blog/?search=gunicorn").get_data(as_text=True)
@@ -0,0 +1,80 @@
+# test_seed.py
+"""
+Tester för syntetisk testdata (flask seed, app/utils/seed.py).
+
+Kör:
+    pytest test_seed.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def count(model):
+    from app.extensions import db
+    return db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+
+
+def test_seed_creates_consistent_data(app):
+    from app.extensions import db
+    from app.models import BlogPost, Comment, DailyStats, PortfolioItem, User
+    from app.utils.seed import seed_database
+    from werkzeug.security import check_password_hash
+
+    counts = seed_database(users=20, posts=300, comments=500, items=25, days=30, admin_password="hemligt")
+
+    assert (count(User), count(BlogPost), count(Comment), count(PortfolioItem)) == (20, 300, 500, 25)
+    assert count(DailyStats) == counts["daily_stats"] > 0
+    admin = db.session.get(User, 1)
+    assert admin.has_role("admin") and check_password_hash(admin.password, "hemligt")
+    item = PortfolioItem.query.first()
+    assert "/" not in item.image                       # Filnamn, som save_image – mallarna lägger till mappen
+    assert all(post.excerpt and len(post.body) > 1000 for post in BlogPost.query.limit(10))
+
+    client = app.test_client()
+    for url in ("/", "/blog/", "/blog/post/1", "/blog/category/stickning", "/portfolio/portfolio", "/sitemap.xml"):
+        assert client.get(url).status_code == 200, url
+
+
+def test_seed_is_deterministic_and_refuses_existing_data(app):
+    from app.models import BlogPost
+    from app.utils.seed import seed_database
+
+    seed_database(users=5, posts=50, items=5, days=10, seed=7)
+    titles = [post.title for post in BlogPost.query.order_by(BlogPost.id)]
+
+    with pytest.raises(ValueError):
+        seed_database(users=5, posts=50, items=5, days=10, seed=7)
+
+    seed_database(users=5, posts=50, items=5, days=10, seed=7, reset=True)
+    assert [post.title for post in BlogPost.query.order_by(BlogPost.id)] == titles
+
+
+def test_cli(app):
+    from app.extensions import db
+    from app.models import BlogPost, User
+    from werkzeug.security import check_password_hash
+
+    result = app.test_cli_runner().invoke(args=["seed", "--users", "5", "--posts", "40", "--items", "4",
+                                                "--days", "10"])
+
+    assert result.exit_code == 0, result.output
+    assert "blog_posts" in result.output and count(BlogPost) == 40
+
+    password = result.output.split("lösenord: ")[1].split()[0]   # Slumpat och utskrivet
+    assert password != "admin" and check_password_hash(db.session.get(User, 1).password, password)
@@ -0,0 +1,186 @@
+# test_sitemap.py
+"""
+Tester för sitemap: alla adresser fungerar, uppdelning, cache och 304.
+
+Kör:
+    pytest test_sitemap.py
+"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import pytest
+from sqlalchemy import event
+
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Skapa en testapp med SQLite i minnet och sitemap-cachen i en temporär katalog."""
+    from app import create_app
+    from app.extensions import db
+    from app.utils.sitemap import sitemap_generator
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    sitemap_generator.cache_dir = str(tmp_path / "sitemap")
+    sitemap_generator.max_urls = 50_000
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def content(app):
+    """Två bloggkategorier (en med mellanslag), publicerade och schemalagda inlägg, ett projekt."""
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, PortfolioItem, User
+
+    now = datetime.now(timezone.utc)
+    user = User(email='test@test.com', name='Test', password='test123')
+    travel = BlogCategory(name='resor & mat', title='Resor & mat')
+    code = BlogCategory(name='kod', title='Kod')
+    web = Category(name='web', title='Webb')
+    db.session.add_all([user, travel, code, web])
+    db.session.commit()
+
+    posts = [BlogPost(title=f'Inlägg {i}', subtitle='S', body='<p>Lång text</p>', img_url='x.jpg',
+                      category_id=travel.id, author_id=user.id, created_at=now - timedelta(days=i))
+             for i in range(1, 4)]
+    scheduled = BlogPost(title='Kommer snart', subtitle='S', body='<p>Hemligt</p>', img_url='x.jpg',
+                         category_id=code.id, author_id=user.id, created_at=now + timedelta(days=2))
+    item = PortfolioItem(title='Projekt', description='<p>Beskrivning</p>', image='p.webp',
+                         category_id=web.id, date=now - timedelta(days=5))
+    db.session.add_all(posts + [scheduled, item])
+    db.session.commit()
+    return {"posts": posts, "scheduled": scheduled, "item": item}
+
+
+def locs(xml_bytes):
+    root = ET.fromstring(xml_bytes)
+    return root.tag, [el.text for el in root.iterfind(".//sm:loc", NS)]
+
+
+def all_urls(client):
+    """Adresser från sitemap.xml, följer sitemapindex till delarna."""
+    tag, found = locs(client.get("/sitemap.xml").data)
+    if tag.endswith("sitemapindex"):
+        urls = []
+        for part in found:
+            response = client.get(urlsplit(part).path)
+            assert response.status_code == 200
+            urls += locs(response.data)[1]
+        return urls
+    return found
+
+
+def test_every_url_resolves(app, content):
+    """Varje adress i sitemap ska svara 200 – schemalagda inlägg ska inte vara med."""
+    client = app.test_client()
+    urls = all_urls(client)
+
+    assert f"http://localhost/blog/post/{content['scheduled'].id}" not in urls
+    assert "http://localhost/blog/category/resor%20&%20mat" in urls  # "&" escapas i XML-filen
+    assert len(urls) == len(set(urls)) == 4 + 2 + 3 + 2 + 1 + 1
+    for url in urls:
+        parts = urlsplit(url)
+        response = client.get(parts.path + (f"?{parts.query}" if parts.query else ""))
+        assert response.status_code == 200, url
+
+
+def test_split_into_index_above_limit(app, content):
+    from app.utils.sitemap import sitemap_generator
+
+    client = app.test_client()
+    single = all_urls(client)
+
+    sitemap_generator.max_urls = 4
+    tag, parts = locs(client.get("/sitemap.xml").data)
+
+    assert tag.endswith("sitemapindex")
+    assert len(parts) == 4  # 13 adresser, 4 per fil
+    assert all_urls(client) == single
+    assert client.get("/sitemap-5.xml").status_code == 404
+
+
+def test_conditional_get_and_rebuild_on_change(app, content):
+    from app.extensions import db
+    from app.models import BlogPost
+
+    client = app.test_client()
+    first = client.get("/sitemap.xml")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    assert client.get("/sitemap.xml", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/sitemap.xml", headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+
+    post = content["posts"][0]
+    db.session.add(BlogPost(title='Nytt', subtitle='S', body='<p>x</p>', img_url='x.jpg',
+                            category_id=post.category_id, author_id=post.author_id))
+    db.session.commit()
+
+    changed = client.get("/sitemap.xml", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_build_reads_no_bodies_and_caches(app, content):
+    """Bygget läser bara id/tidsstämplar; oförändrat innehåll ger bara fingeravtrycks-queryn."""
+    from app.extensions import db
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        client = app.test_client()
+        client.get("/sitemap.xml")
+        assert not any("body" in s or "description" in s for s in statements)
+
+        statements.clear()
+        assert client.get("/sitemap.xml").status_code == 200
+        assert len(statements) == 1
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+
+
+def test_host_header_does_not_change_the_sitemap(app, content, query_budget):
+    """Adresserna byggs på SITE_URL – en annan Host ger samma filer, inget nytt bygge; förra versionen sparas."""
+    import os
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.sitemap import sitemap_generator
+
+    client = app.test_client()
+    first = client.get("/sitemap.xml", base_url="http://localhost")
+    for host in ("www.localhost", "evil.example", "x" * 60 + ".example"):
+        with query_budget(1):  # Bara fingeravtrycket – ingen ombyggnad
+            response = client.get("/sitemap.xml", base_url=f"http://{host}")
+        assert response.data == first.data and host.encode() not in response.data
+    assert len(os.listdir(sitemap_generator.cache_dir)) == 1
+
+    post = content["posts"][0]
+    for i in range(2):
+        db.session.add(BlogPost(title=f'Nytt {i}', subtitle='S', body='<p>x</p>', img_url='x.jpg',
+                                category_id=post.category_id, author_id=post.author_id))
+        db.session.commit()
+        client.get("/sitemap.xml")
+    assert len(os.listdir(sitemap_generator.cache_dir)) == 2  # Aktuell + föregående, den äldsta är borttagen
+
+
+def test_urls_use_site_url(app, content):
+    from app.utils.sitemap import sitemap_generator
+
+    app.config["SITE_URL"] = "https://majatingworks.se/"
+    sitemap_generator.init_app(app)
+    sitemap_generator.cache_dir = sitemap_generator.cache_dir + "-site"
+    urls = locs(app.test_client().get("/sitemap.xml", base_url="http://www.localhost").data)[1]
+    assert urls and all(url.startswith("https://majatingworks.se/") for url in urls)
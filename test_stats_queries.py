@@ -0,0 +1,115 @@
+# test_stats_queries.py
+"""
+Tester för statistiksidans queries (topplistor, perioder och trender).
+
+Kör:
+    pytest test_stats_queries.py
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True, STATS_TOP_N=3)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+TODAY = date(2026, 10, 18)
+
+
+@pytest.fixture
+def content(app):
+    """6 inlägg, 4 projekt (ett raderat), räknare och 40 dagars daily_stats."""
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, DailyStats, PageView, PortfolioItem, Role, User
+
+    admin = User(email='admin@test.se', name='Admin', password='x')
+    admin.roles.append(Role(name="admin"))
+    category, web = BlogCategory(name='k', title='K'), Category(name='web', title='Webb')
+    db.session.add_all([admin, category, web])
+    db.session.commit()
+
+    posts = [BlogPost(title=f'Inlägg {i}', subtitle='S', body='<p>Lång text</p>' * 50, img_url='x.jpg',
+                      category_id=category.id, author_id=admin.id, views=i * 10) for i in range(6)]
+    items = [PortfolioItem(title=f'Projekt {i}', description='<p>x</p>', image='p.webp', category_id=web.id)
+             for i in range(3)]
+    db.session.add_all(posts + items)
+    db.session.commit()
+
+    db.session.add_all([PageView(page="cv", views=7), PageView(page="portfolio", views=4)] +
+                       [PageView(page=f"portfolio_{item.id}", views=item.id) for item in items] +
+                       [PageView(page="portfolio_999", views=100)])  # Raderat projekt
+    for offset in range(40):
+        day = TODAY - timedelta(days=offset)
+        db.session.add_all([DailyStats(date=day, page=f"post_{posts[1].id}", views=1),
+                            DailyStats(date=day, page="cv", views=2),
+                            DailyStats(date=day, page=f"portfolio_{items[0].id}", views=3)])
+    db.session.commit()
+    return {"posts": posts, "items": items, "admin": admin}
+
+
+def test_all_time_uses_counters(app, content):
+    from app.utils import stats_queries as sq
+
+    period = sq.resolve_period("all", today=TODAY)
+    posts = sq.top_posts(period, limit=3)
+
+    assert [row.title for row in posts] == ["Inlägg 5", "Inlägg 4", "Inlägg 3"]
+    assert [row.title for row in sq.top_portfolio(period, limit=10)] == ["Projekt 2", "Projekt 1", "Projekt 0"]
+    assert [(row.key, row.views) for row in sq.top_pages(period, limit=10)] == [("cv", 7), ("portfolio", 4)]
+
+    totals = sq.summaries(period)
+    assert totals["blog"] == (5, 150)      # Inlägg 0 har inga visningar
+    assert totals["portfolio"] == (3, 6)   # Raderade projekt räknas inte
+
+
+def test_date_range_and_trend(app, content):
+    from app.utils import stats_queries as sq
+
+    period = sq.resolve_period("7", today=TODAY)
+    assert period.start == TODAY - timedelta(days=6)
+    assert sq.top_posts(period, limit=3) == [sq.Row(str(content["posts"][1].id), "Inlägg 1", 7)]
+    assert sq.summaries(period)["pages"] == (1, 14)
+
+    days = sq.trend(period, "day")
+    assert len(days) == 7
+    assert days[-1] == {"start": TODAY, "blog": 1, "pages": 2, "portfolio": 3, "total": 6}
+
+    weeks = sq.trend(sq.resolve_period("30", today=TODAY), "week")
+    assert all(point["start"].weekday() == 0 for point in weeks)
+    assert sum(point["total"] for point in weeks) == 30 * 6
+
+    months = sq.trend(sq.resolve_period("all", today=TODAY), "month")
+    assert [point["start"] for point in months] == [date(2026, 9, 1), date(2026, 10, 1)]
+    assert sum(point["total"] for point in months) == 40 * 6
+
+
+def test_page_renders_with_constant_queries(app, content, query_budget):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(content["admin"].id)
+        session["_fresh"] = True
+
+    # Inloggad användare + roller, 3 topplistor, 3 summor, trend (+ första datum för automatisk upplösning)
+    with query_budget(10):
+        response = client.get("/admin/views")
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "Visar topp 3 av 5" in html
+    assert "Lång text" not in html
+
+    with query_budget(9):
+        assert client.get("/admin/views?days=30&bucket=week").status_code == 200
@@ -0,0 +1,70 @@
+# test_user_agents.py
+"""
+Tester för botklassificeringen av User-Agent och räknarna för bottrafik.
+
+Kör:
+    pytest test_user_agents.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize("user_agent, family", [
+    ("Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)", "google"),
+    ("Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko; compatible; GPTBot/1.2; +https://openai.com/gptbot)", "openai"),
+    ("facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)", "meta"),
+    ("Mozilla/5.0 (compatible; AhrefsBot/7.0; +http://ahrefs.com/robot/)", "ahrefs"),
+    ("curl/8.5.0", "script"),
+    ("Mozilla/5.0 (compatible; NyttligBot/0.3)", "other"),
+    ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36", None),
+    ("Mozilla/5.0 (Linux; Android 9; CUBOT X19) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Mobile Safari/537.36", None),
+    ("", None),
+])
+def test_match_family(user_agent, family):
+    from app.utils.user_agents import match_family
+
+    assert match_family(user_agent) == family
+
+
+def test_bot_traffic_is_counted_but_not_viewed(app):
+    """Botar syns i räknarna per familj men ökar aldrig visningarna."""
+    from app.utils.user_agents import ua_classifier
+    from app.utils.view_buffer import view_buffer
+    from app.utils.views import register_page_view
+
+    view_buffer.max_pending = 10_000
+    view_buffer.flush_interval = 10_000
+
+    @app.route("/_visit")
+    def _visit():
+        register_page_view("portfolio_1")
+        return "ok"
+
+    client = app.test_client()
+    googlebot = {"User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"}
+    for _ in range(3):
+        client.get("/_visit", headers=googlebot)
+    client.get("/_visit", headers={"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0"})
+
+    stats = ua_classifier.stats()
+    assert stats["requests"] == 4
+    assert stats["families"] == [("google", 3)]
+    assert stats["cache_hits"] >= 2   # Samma UA klassificeras bara en gång
+    assert view_buffer.pending("page:portfolio_1") == 1
+    view_buffer.clear()
@@ -0,0 +1,105 @@
+# test_view_buffer.py
+"""
+Tester för write-behind-bufferten för visningsräknare.
+
+Kör:
+    pytest test_view_buffer.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def post(app):
+    """Ett blogginlägg att räkna visningar på."""
+    from app.models import BlogPost, BlogCategory, User
+    from app.extensions import db
+
+    category = BlogCategory(name='test', title='Test')
+    user = User(email='test@test.com', name='Test', password='test123')
+    db.session.add_all([category, user])
+    db.session.commit()
+
+    post = BlogPost(title='T', subtitle='S', body='<p>Hej</p>', img_url='x.jpg',
+                    category_id=category.id, author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_views_are_buffered_until_flush(app, post):
+    """Visningar ska inte skrivas direkt utan först vid flush."""
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.view_buffer import view_buffer
+    from app.utils.views import increment_post_views
+
+    view_buffer.max_pending = 1000
+    view_buffer.flush_interval = 3600
+
+    with app.test_request_context('/'):
+        assert increment_post_views(post) == 1
+        assert increment_post_views(post) == 1  # Samma session räknas bara en gång
+
+    db.session.expire_all()
+    assert db.session.get(BlogPost, post.id).views == 0
+
+    assert view_buffer.flush() == 1
+    db.session.expire_all()
+    assert db.session.get(BlogPost, post.id).views == 1
+
+
+def test_flush_batches_and_creates_page_rows(app, post):
+    """Flera ökningar per nyckel skrivs som en summa och saknade sidrader skapas."""
+    from app.extensions import db
+    from app.models import BlogPost, PageView
+    from app.utils.view_buffer import view_buffer
+
+    view_buffer.max_pending = 1000
+    view_buffer.flush_interval = 3600
+
+    for _ in range(5):
+        view_buffer.add_post(post.id)
+    view_buffer.add_page("about", 3)
+
+    assert view_buffer.flush() == 8
+    db.session.expire_all()
+    assert db.session.get(BlogPost, post.id).views == 5
+    assert PageView.query.filter_by(page="about").one().views == 3
+
+    view_buffer.add_page("about", 2)
+    view_buffer.flush()
+    db.session.expire_all()
+    assert PageView.query.filter_by(page="about").one().views == 5
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    """Två buffertar med samma fil ska se varandras ökningar (som två workers)."""
+    from app.utils.view_buffer import SQLiteBackend
+
+    path = str(tmp_path / "views.sqlite")
+    worker_a = SQLiteBackend(path)
+    worker_b = SQLiteBackend(path)
+
+    worker_a.add("post:1", 2)
+    worker_b.add("post:1", 3)
+    assert worker_a.pending("post:1") == 5
+
+    assert worker_b.drain() == {"post:1": 5}
+    assert worker_a.drain() == {}
@@ -0,0 +1,133 @@
+# test_view_rollups.py
+"""
+Tester för händelseloggen (view_events) och rollups till hourly_stats/daily_stats.
+
+Kör:
+    pytest test_view_rollups.py
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True, VIEW_EVENTS_RETENTION_DAYS=0)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_events(hour, **pages):
+    from app.extensions import db
+    from app.utils.stats import append_view_events
+
+    with db.engine.begin() as conn:
+        append_view_events(conn, {f"page:{page}": n for page, n in pages.items()}, hour=hour)
+
+
+def daily(day):
+    from app.models import DailyStats
+    return {s.page: s.views for s in DailyStats.query.filter_by(date=day)}
+
+
+def test_flush_appends_events_with_counters(app):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, PageView, User, ViewEvent
+    from app.utils.view_buffer import view_buffer
+
+    user, category = User(email='t@t.se', name='T', password='x'), BlogCategory(name='k', title='K')
+    db.session.add_all([user, category])
+    db.session.commit()
+    post = BlogPost(title='T', subtitle='S', body='<p>x</p>', img_url='x.jpg',
+                    category_id=category.id, author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+
+    view_buffer.add_post(post.id, 3)
+    view_buffer.add_page("cv", 2)
+    view_buffer.flush()
+
+    db.session.expire_all()
+    events = {e.page: e.views for e in ViewEvent.query.all()}
+    assert events == {f"post_{post.id}": 3, "cv": 2}
+    assert db.session.get(BlogPost, post.id).views == 3
+    assert PageView.query.filter_by(page="cv").one().views == 2
+
+
+def test_rollup_uses_swedish_days_and_is_idempotent(app):
+    from app.models import HourlyStats
+    from app.utils.stats import rollup_day
+
+    day = date(2026, 6, 10)                              # Sommartid: dygnet börjar 22:00 UTC dagen innan
+    add_events(datetime(2026, 6, 9, 21), cv=100)          # 23:00 svensk tid den 9:e
+    add_events(datetime(2026, 6, 9, 22), cv=1, about=2)   # 00:00 den 10:e
+    add_events(datetime(2026, 6, 9, 22), cv=4)            # Annan flush samma timme
+    add_events(datetime(2026, 6, 10, 21), about=5)        # 23:00 den 10:e
+    add_events(datetime(2026, 6, 10, 22), cv=100)         # 00:00 den 11:e
+
+    assert rollup_day(day) == 2
+    assert daily(day) == {"cv": 5, "about": 7}
+    assert HourlyStats.query.filter_by(hour=datetime(2026, 6, 9, 22), page="cv").one().views == 5
+
+    assert rollup_day(day) == 2                           # Omkörning ger samma resultat
+    assert daily(day) == {"cv": 5, "about": 7}
+
+    add_events(datetime(2026, 6, 10, 12), cv=1)           # Sen flush från en annan worker
+    rollup_day(day)
+    assert daily(day) == {"cv": 6, "about": 7}
+    assert HourlyStats.query.count() == 4
+
+
+def test_backfill_command_and_retention(app):
+    from app.utils.stats import prune_events, rollup_day
+
+    add_events(datetime(2026, 3, 1, 10), cv=1)
+    add_events(datetime(2026, 3, 3, 10), cv=3)
+
+    result = app.test_cli_runner().invoke(args=["backfill-stats", "--end", "2026-03-03"])
+    assert "3 dagar, 2 sidrader" in result.output
+    assert daily(date(2026, 3, 1)) == {"cv": 1}
+    assert daily(date(2026, 3, 2)) == {}
+
+    app.config["VIEW_EVENTS_RETENTION_DAYS"] = 1
+    assert prune_events(today=date(2026, 3, 3)) == 1
+    with pytest.raises(ValueError):
+        rollup_day(date(2026, 3, 1))                      # Skulle annars nollställa dagen
+    assert daily(date(2026, 3, 1)) == {"cv": 1}
+
+
+def test_days_before_the_log_are_kept(app):
+    from app.extensions import db
+    from app.models import DailyStats
+    from app.utils.stats import rollup_recent
+
+    today = date(2026, 4, 2)
+    db.session.add(DailyStats(date=date(2026, 4, 1), page="cv", views=7))  # Från den gamla räknar-diffen
+    db.session.commit()
+
+    assert rollup_recent(today=today) == (0, 0)          # Tom logg direkt efter driftsättning
+    assert daily(date(2026, 4, 1)) == {"cv": 7}
+
+    add_events(datetime(2026, 4, 2, 10), cv=1)
+    assert rollup_recent(today=today) == (0, 1)          # Gårdagen är fortfarande före loggen
+    assert daily(date(2026, 4, 1)) == {"cv": 7}
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["aggregate-stats", "--date", "2026-04-01"])
+    assert "❌" in result.output and daily(date(2026, 4, 1)) == {"cv": 7}
+    result = runner.invoke(args=["backfill-stats", "--start", "2026-04-01", "--end", "2026-04-02"])
+    assert "1 dagar, 1 sidrader" in result.output         # Börjar vid loggens första dag
+    assert daily(date(2026, 4, 1)) == {"cv": 7}
+
+    runner.invoke(args=["aggregate-stats", "--date", "2026-04-01", "--force"])
+    assert daily(date(2026, 4, 1)) == {}
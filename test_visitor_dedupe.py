@@ -0,0 +1,82 @@
+# test_visitor_dedupe.py
+"""
+Tester för unika visningar per besökare (besökar-ID i sessionen, hashar på servern).
+
+Kör:
+    pytest test_visitor_dedupe.py
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """Skapa en testapp med SQLite i minnet."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_window_and_visitors(app, tmp_path, backend):
+    """Samma besökare räknas en gång per fönster, andra besökare räknas separat."""
+    from app.utils.visitor_dedupe import MemoryBackend, SQLiteBackend
+
+    store = MemoryBackend() if backend == "memory" else SQLiteBackend(str(tmp_path / "dedupe.sqlite"))
+
+    assert store.claim(1, now=1000, window=60) is True
+    assert store.claim(1, now=1030, window=60) is False
+    assert store.claim(2, now=1030, window=60) is True   # Annan besökare/sida
+    assert store.claim(1, now=1061, window=60) is True   # Fönstret har gått ut
+    assert store.claim(1, now=1062, window=60) is False
+
+
+def test_memory_backend_is_bounded():
+    from app.utils.visitor_dedupe import MemoryBackend
+
+    store = MemoryBackend(max_entries=3)
+    for digest in range(10):
+        store.claim(digest, now=0, window=60)
+
+    assert len(store) == 3
+    assert store.claim(9, now=1, window=60) is False   # Nyast finns kvar
+    assert store.claim(0, now=1, window=60) is True    # Äldst har trängts ut
+
+
+def test_cookie_size_stays_constant(app):
+    """Cookien innehåller bara besökar-ID:t, oavsett antal lästa sidor."""
+    from app.utils.view_buffer import view_buffer
+    from app.utils.views import register_page_view
+
+    view_buffer.max_pending = 10_000
+    view_buffer.flush_interval = 10_000
+
+    @app.route("/_visit/<int:n>")
+    def _visit(n):
+        register_page_view(f"portfolio_{n}")
+        return "ok"
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["viewed_posts"] = [f"post_{i}" for i in range(200)]  # Gammal sessionslista
+
+    client.get("/_visit/0")
+    size = len(client.get_cookie("session").value)
+    for n in range(1, 50):
+        client.get(f"/_visit/{n}")
+    client.get("/_visit/0")
+
+    assert len(client.get_cookie("session").value) == size
+    with client.session_transaction() as sess:
+        assert list(sess.keys()) == ["vid"]
+    assert view_buffer.pending("page:portfolio_0") == 1
+    assert view_buffer.pending("page:portfolio_49") == 1
+    view_buffer.clear()
@@ -0,0 +1,174 @@
+# tools/bench_backup.py
+"""
+Benchmark: backup och återställning (app/utils/backup.py) mot gamla backup_blog.py.
+
+Mäter:
+    legacy       – som backup_blog.py: BlogPost.query.all(), author/category per inlägg,
+                   ett json.dump med indent
+    full         – flask backup: strömmad NDJSON.gz i bitar, alla tabeller
+    incremental  – flask backup --incremental efter att 1 % av inläggen ändrats
+    restore      – flask restore till en tom databas (utan ombyggnad av härledda tabeller)
+    rebuild      – sökindex, bildreferenser, mediabibliotek och nyckeltal efteråt
+
+Kör från projektroten:
+    python tools/bench_backup.py                  # 100 000 inlägg
+    python tools/bench_backup.py --posts 20000
+
+Databasen är en temporär SQLite-fil (en skrivtråd), så siffrorna är relativa –
+mot MySQL skrivs batcharna parallellt (RESTORE_WORKERS).
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BATCH = 5000
+WORDS = ("katt hund skog sjö bok tråd garn sticka virka mönster färg ull bomull lin "
+         "vinter sommar höst vår kaffe bulle trädgård blomma").split()
+
+
+def seed(n_posts, rnd):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Comment, User
+
+    db.drop_all()
+    db.create_all()
+    with db.engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": i + 1, "email": f"user{i}@example.se", "name": f"Användare {i}", "password": "x"} for i in range(50)
+        ])
+        conn.execute(BlogCategory.__table__.insert(), [
+            {"id": i + 1, "name": f"kategori-{i}", "title": f"Kategori {i}"} for i in range(10)
+        ])
+        start = datetime(2010, 1, 1, tzinfo=timezone.utc)  # 100 000 timmar ≈ 11 år
+        for offset in range(0, n_posts, BATCH):
+            conn.execute(BlogPost.__table__.insert(), [{
+                "id": i + 1,
+                "title": f"Inlägg {i}",
+                "subtitle": " ".join(rnd.choices(WORDS, k=6)),
+                "body": "".join(f"<p>{' '.join(rnd.choices(WORDS, k=40))}</p>" for _ in range(6)),
+                "img_url": f"uploads/blog/{i % 500}.webp",
+                "created_at": start + timedelta(hours=i),
+                "views": rnd.randint(0, 5000),
+                "category_id": i % 10 + 1,
+                "author_id": i % 50 + 1,
+            } for i in range(offset, min(offset + BATCH, n_posts))])
+        for offset in range(0, n_posts // 2, BATCH):
+            conn.execute(Comment.__table__.insert(), [{
+                "text": " ".join(rnd.choices(WORDS, k=15)),
+                "post_id": rnd.randint(1, n_posts),
+                "author_id": rnd.randint(1, 50),
+                "date_created": start + timedelta(minutes=i),
+            } for i in range(offset, min(offset + BATCH, n_posts // 2))])
+
+
+def legacy_backup(path):
+    """Som backup_blog.py."""
+    from app.models import BlogPost
+
+    posts = BlogPost.query.all()
+    data = {"exported_at": datetime.utcnow().isoformat(), "total_posts": len(posts), "posts": []}
+    for post in posts:
+        data["posts"].append({
+            "id": post.id, "title": post.title, "subtitle": post.subtitle, "body": post.body,
+            "created_at": post.created_at.isoformat() if post.created_at else None,
+            "updated_at": post.updated_at.isoformat() if post.updated_at else None,
+            "img_url": post.img_url, "views": post.views or 0,
+            "author_email": post.author.email if post.author else None,
+            "author_name": post.author.name if post.author else None,
+            "category_name": post.category.name if post.category else None,
+            "category_title": post.category.title if post.category else None,
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return len(posts)
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+
+
+def size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024 / 1024
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 1024 / 1024
+
+
+def report(label, rows, seconds, mb, rss):
+    print(f"{label:<13}{rows:>10}{seconds:>9.1f}{rows / seconds:>12,.0f}{mb:>9.1f}{rss:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_backup.sqlite')}"
+    os.environ["PROFILING_ENABLED"] = "False"
+    os.environ["SCHEDULER_ENABLED"] = "False"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.backup import backup_manager
+
+    app = create_app()
+    backup_manager.directory = os.path.join(workdir, "backups")
+
+    with app.app_context():
+        started = time.perf_counter()
+        seed(args.posts, random.Random(42))
+        print(f"📥 {args.posts} inlägg, {args.posts // 2} kommentarer på {time.perf_counter() - started:.1f} s\n")
+        print(f"{'':<13}{'rader':>10}{'s':>9}{'rader/s':>12}{'MB':>9}{'+RSS MB':>10}")
+
+        # Strömmat först – RSS-toppen växer bara, så den gamla varianten mäts sist
+        rss = peak_mb()
+        started = time.perf_counter()
+        full = backup_manager.backup(include_files=False)
+        rows = sum(t["rows"] for t in full["tables"].values())
+        report("full", rows, time.perf_counter() - started,
+               size_mb(os.path.join(backup_manager.directory, full["name"])), peak_mb() - rss)
+
+        changed = max(1, args.posts // 100)
+        with db.engine.begin() as conn:
+            conn.execute(BlogPost.__table__.update().where(BlogPost.id <= changed)
+                         .values(updated_at=datetime.now(timezone.utc), views=BlogPost.views + 1))
+        rss = peak_mb()
+        started = time.perf_counter()
+        incremental = backup_manager.backup(incremental=True, include_files=False)
+        rows = sum(t["rows"] for t in incremental["tables"].values())
+        report("incremental", rows, time.perf_counter() - started,
+               size_mb(os.path.join(backup_manager.directory, incremental["name"])), peak_mb() - rss)
+        assert incremental["tables"]["blog_posts"]["rows"] == changed
+
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        rss = peak_mb()
+        stats = backup_manager.restore("latest", include_files=False, rebuild=False)
+        rows = sum(stats["tables"].values())
+        report("restore", rows, stats["seconds"], 0, peak_mb() - rss)
+        assert db.session.execute(db.select(db.func.count()).select_from(BlogPost)).scalar() == args.posts
+
+        started = time.perf_counter()
+        backup_manager._rebuild_derived()
+        print(f"{'rebuild':<13}{'':>10}{time.perf_counter() - started:>9.1f}")
+
+        rss = peak_mb()
+        started = time.perf_counter()
+        path = os.path.join(workdir, "legacy.json")
+        rows = legacy_backup(path)
+        report("legacy", rows, time.perf_counter() - started, size_mb(path), peak_mb() - rss)
+
+
+if __name__ == "__main__":
+    main()
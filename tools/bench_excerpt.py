@@ -0,0 +1,75 @@
+# tools/bench_excerpt.py
+"""
+Mikrobenchmark: utdrag för bloggkorten (12 per sida).
+
+Jämför:
+    before   – BeautifulSoup(body).get_text() per kort (gamla strip_and_truncate)
+    regex    – html_to_text(body) per kort (reserv när excerpt saknas)
+    excerpt  – förberäknat BlogPost.excerpt (inläggets body läses inte alls)
+
+Kör från projektroten:
+    python tools/bench_excerpt.py
+    python tools/bench_excerpt.py --words 5000 --repeat 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.utils.helpers import strip_and_truncate, make_excerpt  # noqa: E402
+
+CARDS_PER_PAGE = 12
+WORDS = ("trädgård python flask server databas kod projekt sommar resa bok musik "
+         "bilder design mallar formulär inlägg kategori statistik sökning").split()
+
+
+def make_body(rnd, n_words):
+    """Quill-liknande HTML: stycken, fetstil, länkar och listor."""
+    parts = []
+    for i in range(0, n_words, 40):
+        words = [rnd.choice(WORDS) for _ in range(40)]
+        words[3] = f"<strong>{words[3]}</strong>"
+        words[9] = f'<a href="https://example.com/{i}" target="_blank">{words[9]}</a>'
+        parts.append(f'<p class="ql-align-justify">{" ".join(words)}</p>')
+        if i % 200 == 0:
+            parts.append("<ul>" + "".join(f"<li>{rnd.choice(WORDS)} &amp; {rnd.choice(WORDS)}</li>"
+                                          for _ in range(5)) + "</ul>")
+    return "".join(parts)
+
+
+def old_strip_and_truncate(html, length=100):
+    text = BeautifulSoup(html, "html.parser").get_text()
+    return text[:length] + ("..." if len(text) > length else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[300, 2000, 8000], help="Ord per inlägg")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    print(f"{'ord/inlägg':>10}{'before (ms)':>14}{'regex (ms)':>14}{'excerpt (ms)':>14}{'x snabbare':>12}")
+    for n_words in args.words:
+        bodies = [make_body(rnd, n_words) for _ in range(CARDS_PER_PAGE)]
+        posts = [SimpleNamespace(body=b, excerpt=make_excerpt(b)) for b in bodies]
+        raw = [SimpleNamespace(body=b, excerpt=None) for b in bodies]
+
+        def per_page(fn):
+            return min(timeit.repeat(fn, number=1, repeat=args.repeat)) * 1000
+
+        before = per_page(lambda: [old_strip_and_truncate(b, 150) for b in bodies])
+        regex = per_page(lambda: [strip_and_truncate(p, 150) for p in raw])
+        excerpt = per_page(lambda: [strip_and_truncate(p, 150) for p in posts])
+        print(f"{n_words:>10}{before:>14.2f}{regex:>14.2f}{excerpt:>14.3f}{before / excerpt:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# tools/bench_indexes.py
+"""
+Benchmark: de sammansatta indexen för blogg, kommentarer och portfolio
+(migration 4f2b8d6e0c19) före och efter.
+
+Mäter:
+    1. Fångar varje sidas queries med samma uppspelning som `flask db-audit`
+    2. Utan de nya indexen: kör varje query --repeat gånger, räknar flaggor (EXPLAIN)
+    3. Med indexen + ANALYZE: samma sak
+    Tiden per sida är summan av dess unika queries (median av körningarna,
+    efter en uppvärmning).
+
+Kör från projektroten:
+    python tools/bench_indexes.py                 # 100 000 inlägg
+    python tools/bench_indexes.py --posts 20000 --repeat 5
+
+Databasen är en temporär SQLite-fil, så siffrorna är relativa – planerna
+(och flaggorna) visar samma sak som EXPLAIN mot MySQL.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BATCH = 5000
+NEW_INDEXES = {
+    "ix_blog_posts_created_id", "ix_blog_posts_category_created", "ix_blog_posts_email_sent_created",
+    "ix_blog_posts_author", "ix_comments_post_created", "ix_comments_author",
+    "ix_portfolio_items_date_id", "ix_portfolio_items_category_date",
+}
+
+
+def seed(n_posts, rnd):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, Comment, PortfolioItem, Role, User
+
+    db.drop_all()
+    db.create_all()
+    start = datetime(2010, 1, 1, tzinfo=timezone.utc)  # 100 000 timmar ≈ 11 år
+    with db.engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": i + 1, "email": f"user{i}@example.se", "name": f"Användare {i}", "password": "x"} for i in range(50)
+        ])
+        conn.execute(Role.__table__.insert(), {"id": 1, "name": "admin"})
+        conn.execute(db.metadata.tables["user_roles"].insert(), {"user_id": 1, "role_id": 1})
+        conn.execute(BlogCategory.__table__.insert(), [
+            {"id": i + 1, "name": f"kategori-{i}", "title": f"Kategori {i}"} for i in range(10)
+        ])
+        conn.execute(Category.__table__.insert(), [
+            {"id": i + 1, "name": f"portfolio-{i}", "title": f"Portfolio {i}"} for i in range(8)
+        ])
+        for offset in range(0, n_posts, BATCH):
+            conn.execute(BlogPost.__table__.insert(), [{
+                "id": i + 1,
+                "title": f"Inlägg {i}",
+                "subtitle": "Underrubrik",
+                "body": "<p>Text</p>",
+                "img_url": f"uploads/blog/{i % 500}.webp",
+                "created_at": start + timedelta(hours=i),
+                "email_sent": i < n_posts - 5,  # De senaste väntar på bloggmailet
+                "category_id": i % 10 + 1,
+                "author_id": i % 50 + 1,
+            } for i in range(offset, min(offset + BATCH, n_posts))])
+        for offset in range(0, n_posts // 2, BATCH):
+            conn.execute(Comment.__table__.insert(), [{
+                "text": "Fint!",
+                "post_id": rnd.randint(1, n_posts),
+                "author_id": rnd.randint(1, 50),
+                "date_created": start + timedelta(minutes=i),
+            } for i in range(offset, min(offset + BATCH, n_posts // 2))])
+        conn.execute(PortfolioItem.__table__.insert(), [{
+            "title": f"Projekt {i}",
+            "description": "<p>Text</p>",
+            "image": f"uploads/portfolio/{i}.webp",
+            "date": start + timedelta(days=i),
+            "category_id": i % 8 + 1,
+        } for i in range(n_posts // 20)])
+
+
+def set_indexes(create):
+    from app.extensions import db
+
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in NEW_INDEXES:
+                if create:
+                    index.create(db.engine, checkfirst=True)
+                else:
+                    index.drop(db.engine, checkfirst=True)
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    db.engine.dispose()  # Nya anslutningar ser indexen och statistiken, som efter en deploy
+
+
+def measure(routes, repeat):
+    """ms per sida (summa av medianerna) och antal flaggade queries."""
+    from app.extensions import db
+    from app.utils.query_audit import explain
+
+    result = {}
+    with db.engine.connect() as conn:
+        for route in routes:
+            total, flagged = 0.0, 0
+            for query in route.queries:
+                conn.exec_driver_sql(query.statement, query.parameters).all()  # Varm sidcache
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    conn.exec_driver_sql(query.statement, query.parameters).all()
+                    timings.append(time.perf_counter() - started)
+                total += statistics.median(timings) * 1000
+                flagged += bool(explain(query.engine, query.statement, query.parameters)[1])
+            result[route.name] = (total, flagged)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_indexes.sqlite')}"
+    os.environ["PROFILING_ENABLED"] = "False"
+    os.environ["SCHEDULER_ENABLED"] = "False"
+
+    from app import create_app
+    from app.utils.query_audit import run_audit
+
+    app = create_app()
+
+    with app.app_context():
+        started = time.perf_counter()
+        seed(args.posts, random.Random(42))
+        print(f"📥 {args.posts} inlägg, {args.posts // 2} kommentarer, {args.posts // 20} projekt "
+              f"på {time.perf_counter() - started:.1f} s\n")
+
+        routes = [r for r in run_audit(explain_queries=False) if r.queries]
+        set_indexes(create=False)
+        before = measure(routes, args.repeat)
+        set_indexes(create=True)
+        after = measure(routes, args.repeat)
+
+    print(f"{'':<28}{'utan ms':>10}{'med ms':>10}{'x':>8}{'flaggor':>12}")
+    for route in routes:
+        (ms_before, flags_before), (ms_after, flags_after) = before[route.name], after[route.name]
+        print(f"{route.name:<28}{ms_before:>10.2f}{ms_after:>10.2f}{ms_before / max(ms_after, 0.001):>8.1f}"
+              f"{flags_before:>7} → {flags_after}")
+    total_before = sum(ms for ms, _ in before.values())
+    total_after = sum(ms for ms, _ in after.values())
+    print(f"{'Totalt':<28}{total_before:>10.2f}{total_after:>10.2f}{total_before / max(total_after, 0.001):>8.1f}"
+          f"{sum(f for _, f in before.values()):>7} → {sum(f for _, f in after.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# tools/bench_routes.py
+"""
+Benchmark: alla publika sidor och adminsidor mot en seedad databas, jämfört med en baslinje.
+
+Mäter per sida (testklienten, sidcachen avstängd):
+    p50/p95/p99  – svarstid i ms över --requests anrop (efter en uppvärmning)
+    queries      – SQL-queries per anrop
+    peak KB      – högsta allokerade minne under ett anrop (tracemalloc, separat körning)
+
+Jämförelse med baslinjen (tools/bench_routes_baseline.json):
+    ❗ fler queries än baslinjen
+    ❗ p50 eller minnestopp mer än --tolerance över baslinjen (och över en liten
+      absolut gräns, så att brus på snabba sidor inte räknas). p95/p99 visas men
+      jämförs inte – med några tiotal anrop är de i praktiken det näst största värdet.
+Avslutar med felkod 1 vid regressioner.
+
+Kör från projektroten:
+    python tools/bench_routes.py                          # 10 000 inlägg, jämför med baslinjen
+    python tools/bench_routes.py --save-baseline          # Spara ny baslinje (samma maskin!)
+    python tools/bench_routes.py --posts 100000 --requests 10 --baseline /tmp/stor.json
+
+Databasen är en temporär SQLite-fil som fylls med app/utils/seed.py (samma data
+varje gång). Tiderna beror på maskinen – jämför bara mot en baslinje från samma
+maskin; antalet queries är detsamma överallt.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_routes_baseline.json")
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) bench_routes"
+MIN_MS = 3.0        # p50-skillnader under detta räknas som brus
+MIN_KB = 256        # likaså för minnestoppen
+
+# Sidor utöver de som `flask db-audit` spelar upp: (namn, endpoint, argument, kräver admin)
+EXTRA_ROUTES = [
+    ("Om", "pages.about", lambda s: {}, False),
+    ("Kontakt", "pages.contact", lambda s: {}, False),
+    ("Bloggkategori, sida 2", "blog.posts_by_category",
+     lambda s: {"slug": s.blog_category, "page": 2} if s.blog_category else None, False),
+    ("Portfoliokategori, sida 2", "portfolio.category_view",
+     lambda s: {"category": s.portfolio_category, "page": 2} if s.portfolio_category else None, False),
+    ("Logga in", "auth.login", lambda s: {}, False),
+    ("Registrera", "auth.register", lambda s: {}, False),
+    ("Glömt lösenord", "auth.request_reset", lambda s: {}, False),
+    ("Mitt konto", "auth.account", lambda s: {}, True),
+    ("Nytt inlägg", "blog.new_post", lambda s: {}, True),
+    ("Redigera inlägg", "blog.edit_post", lambda s: {"post_id": s.post_id} if s.post_id else None, True),
+    ("Nytt projekt", "portfolio.create_portfolio", lambda s: {}, True),
+    ("Redigera projekt", "portfolio.edit_portfolio", lambda s: {"item_id": s.item_id} if s.item_id else None, True),
+    ("Portfolio: hantera", "portfolio.manage_items", lambda s: {}, True),
+    ("Admin: bloggkategorier", "admin.manage_blog_categories", lambda s: {}, True),
+    ("Admin: portfoliokategorier", "admin.manage_portfolio_categories", lambda s: {}, True),
+    ("Admin: ny användare", "admin.create_user", lambda s: {}, True),
+    ("Admin: rensa bilder", "admin.cleanup_unused_images", lambda s: {}, True),
+    ("Admin: prestanda", "admin.performance", lambda s: {}, True),
+]
+
+# GET-adresser som inte mäts: ändrar data, kräver token, dubbletter eller statiska filer
+SKIPPED_ENDPOINTS = {"auth.logout", "auth.reset_password", "auth.set_password", "admin.promote_user",
+                     "admin.demote_user", "portfolio.debug_item", "portfolio.item", "pages.sitemap_part",
+                     "static", "bootstrap.static"}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class QueryCounter:
+    """Räknar queries på alla engines (primär och ev. repliker)."""
+
+    def __init__(self):
+        from app.extensions import db
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def routes_to_measure(app, sample):
+    """(namn, url, admin) för varje sida; varnar för GET-adresser som saknas i listan."""
+    from flask import url_for
+    from app.utils.query_audit import AUDIT_ROUTES
+
+    routes, covered = [], set()
+    for name, endpoint, build_args, admin_only in AUDIT_ROUTES + EXTRA_ROUTES:
+        covered.add(endpoint)
+        args = build_args(sample)
+        if args is None:
+            print(f"⏭️  {name}: ingen data")
+            continue
+        with app.test_request_context():
+            routes.append((name, url_for(endpoint, **args), admin_only))
+
+    missing = {rule.endpoint for rule in app.url_map.iter_rules() if "GET" in rule.methods} \
+        - covered - SKIPPED_ENDPOINTS
+    for endpoint in sorted(missing):
+        print(f"⚠️  {endpoint} mäts inte – lägg till den i EXTRA_ROUTES eller SKIPPED_ENDPOINTS")
+    return routes
+
+
+def measure(app, routes, admin_id, n_requests):
+    """Utanför app context – varje anrop får sin egen, som i produktion."""
+    public, admin = app.test_client(), app.test_client()
+    with admin.session_transaction() as session:
+        session["_user_id"] = str(admin_id)
+        session["_fresh"] = True
+    with app.app_context():
+        counter = QueryCounter()
+    headers = {"User-Agent": USER_AGENT}
+
+    results = {}
+    for name, url, admin_only in routes:
+        client = admin if admin_only else public
+        status = client.get(url, headers=headers).status_code  # Uppvärmning (mallar, anslutningar)
+        samples, queries = [], []
+        for _ in range(n_requests):
+            counter.count = 0
+            started = time.perf_counter()
+            client.get(url, headers=headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+
+        tracemalloc.start()
+        client.get(url, headers=headers)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            "url": url, "status": status,
+            "p50": round(percentile(samples, 50), 2), "p95": round(percentile(samples, 95), 2),
+            "p99": round(percentile(samples, 99), 2),
+            "queries": int(statistics.median(queries)), "peak_kb": round(peak / 1024),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Lista med (sida, beskrivning) för varje regression."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if now["queries"] > before["queries"]:
+            regressions.append((name, f"queries {before['queries']} → {now['queries']}"))
+        if now["p50"] > before["p50"] * (1 + tolerance) and now["p50"] - before["p50"] > MIN_MS:
+            regressions.append((name, f"p50 {before['p50']:.1f} → {now['p50']:.1f} ms "
+                                      f"(p95 {before['p95']:.1f} → {now['p95']:.1f})"))
+        if now["peak_kb"] > before["peak_kb"] * (1 + tolerance) and now["peak_kb"] - before["peak_kb"] > MIN_KB:
+            regressions.append((name, f"minne {before['peak_kb']} → {now['peak_kb']} KB"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=30, help="Anrop per sida")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Tillåten ökning, 0.5 = 50 %%")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_routes.sqlite")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["PROFILING_ENABLED"] = "False"
+    os.environ["SCHEDULER_ENABLED"] = "False"
+    os.environ["PAGE_CACHE_BACKEND"] = "null"  # Varje anrop ska rendera sidan
+
+    from app import create_app
+    from app.extensions import db
+    from app.utils.query_audit import sample_ids
+    from app.utils.seed import seed_database
+
+    app = create_app()
+    dataset = {"users": args.users, "posts": args.posts, "items": args.items}
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        counts = seed_database(**dataset)
+        print(f"🌱 {sum(counts.values())} rader på {time.perf_counter() - started:.1f} s\n")
+        sample = sample_ids()
+        routes = routes_to_measure(app, sample)
+
+    results = measure(app, routes, sample.admin_id, args.requests)
+
+    print(f"\n{'':<28}{'status':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'peak KB':>9}")
+    for name, row in results.items():
+        print(f"{name:<28}{row['status']:>7}{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+              f"{row['queries']:>9}{row['peak_kb']:>9}")
+    failed = [name for name, row in results.items() if row["status"] >= 500]
+    for name in failed:
+        print(f"❌ {name}: status {results[name]['status']}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                       "machine": f"{platform.machine()} / Python {platform.python_version()}",
+                       "dataset": dataset, "routes": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Baslinje sparad: {args.baseline}")
+        sys.exit(1 if failed else 0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  Ingen baslinje ({args.baseline}) – kör med --save-baseline")
+        sys.exit(1 if failed else 0)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("dataset") != dataset:
+        print(f"\n⚠️  Baslinjen gjordes med {baseline.get('dataset')} – jämför inte")
+        sys.exit(1 if failed else 0)
+
+    regressions = compare(results, baseline["routes"], args.tolerance)
+    print(f"\n📏 Jämfört med baslinjen från {baseline['created']} ({baseline['machine']}):")
+    for name, text in regressions:
+        print(f"   ❗ {name}: {text}")
+    if not regressions:
+        print("   ✅ Inga regressioner")
+    sys.exit(1 if regressions or failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# tools/bench_search.py
+"""
+Benchmark: ilike-sökning (search_posts) mot fulltextindexet (search_ids).
+
+Kör från projektroten:
+    python tools/bench_search.py                  # 10k och 100k inlägg
+    python tools/bench_search.py --sizes 10000    # bara 10k
+
+Databasen är en temporär SQLite-fil, så siffrorna är relativa – på MySQL
+är skillnaden större eftersom LONGTEXT-kolumner skannas från disk.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+COMMON = (
+    "flask python databas webbutveckling portfolio projekt design bilder kod server "
+    "mallar formulär inloggning användare kategori blogg inlägg kommentarer statistik "
+    "sökning prestanda index cache trädgård resa sommar vinter hösten våren bok musik"
+).split()
+QUERIES = ["flask", "kryptering", "hundarna bilarna", "progr", "migreringar molnet säkerhet"]
+RARE = ["programmering", "kryptering", "hundarna", "bilarna", "migreringar", "molnet", "säkerhet"]
+
+
+def make_vocabulary(rnd, size=20_000):
+    """Syntetiska ord med Zipf-fördelning – som riktig text är de flesta ord ovanliga."""
+    letters = "abcdefghijklmnoprstuvyåäö"
+    vocab = COMMON + ["".join(rnd.choice(letters) for _ in range(rnd.randint(4, 11))) for _ in range(size)]
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return vocab, weights
+
+
+def make_text(rnd, vocab, weights, n_words):
+    words = rnd.choices(vocab, weights=weights, k=n_words)
+    if rnd.random() < 0.02:
+        words[rnd.randrange(n_words)] = rnd.choice(RARE)
+    return words
+
+
+def make_body(rnd, vocab, weights, n_words=150):
+    words = make_text(rnd, vocab, weights, n_words)
+    paragraphs = [" ".join(words[i:i + 30]) for i in range(0, n_words, 30)]
+    return "".join(f"<p class=\"ql-align-left\">{p}</p>" for p in paragraphs)
+
+
+def seed(n_posts, rnd):
+    from app.extensions import db
+    from app.models import BlogPost, BlogCategory, User
+
+    db.drop_all()
+    db.create_all()
+    db.session.add_all([BlogCategory(id=1, name="b", title="B"),
+                        User(id=1, email="b@b.se", name="B", password="x")])
+    db.session.commit()
+
+    vocab, weights = make_vocabulary(rnd)
+    rows = [{
+        "title": " ".join(make_text(rnd, vocab, weights, 5)),
+        "subtitle": " ".join(make_text(rnd, vocab, weights, 8)),
+        "body": make_body(rnd, vocab, weights),
+        "img_url": "x.webp",
+        "views": 0,
+        "category_id": 1,
+        "author_id": 1,
+    } for _ in range(n_posts)]
+    with db.engine.begin() as conn:
+        conn.execute(BlogPost.__table__.insert(), rows)
+
+
+def timed(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(n_posts):
+    from app.extensions import db
+    from app.models import BlogPost
+    from app.utils.search import search_posts, search_ids, search_ranking, rebuild_index
+
+    rnd = random.Random(42)
+    seed(n_posts, rnd)
+
+    started = time.perf_counter()
+    rebuild_index(["post"])
+    build_s = time.perf_counter() - started
+
+    print(f"\n📊 {n_posts} inlägg – indexbygge {build_s:.1f} s")
+    print(f"{'sökning':<32}{'ilike (ms)':>12}{'index (ms)':>12}{'träffar':>10}")
+    for q in QUERIES:
+        # Samma arbete som blog.index: COUNT(*) + en sida med 12 inlägg
+        def ilike():
+            query = search_posts(BlogPost.query, BlogPost, q,
+                                 fields=["title", "subtitle", "body"], match_all_words=True)
+            query.count()
+            return query.order_by(BlogPost.created_at.desc()).limit(12).all()
+
+        def indexed():
+            ranking, _truncated = search_ranking("post", q)  # Högst MAX_HITS, som i vyerna
+            query = BlogPost.query.filter(BlogPost.id.in_(list(ranking) or [-1]))
+            query.count()
+            return query.limit(12).all()
+
+        ilike_ms = timed(ilike)
+        index_ms = timed(indexed)
+        print(f"{q:<32}{ilike_ms:>12.1f}{index_ms:>12.1f}{len(search_ids('post', q, limit=None)):>10}")
+        db.session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_search.sqlite")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        for n in args.sizes:
+            run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# tools/bench_view_rollups.py
+"""
+Benchmark: händelseloggen view_events och rollups till hourly_stats/daily_stats.
+
+Mäter:
+    ingest   – batchade INSERT i view_events (rader/s)
+    python   – läsa en dags händelser till Python och summera med Counter
+    sql      – rollup_day: INSERT ... SELECT ... GROUP BY (timmar + dag)
+    backfill – rollup för alla dagar, två gånger (ska ge identiska summor)
+
+Kör från projektroten:
+    python tools/bench_view_rollups.py                       # 2 miljoner händelser
+    python tools/bench_view_rollups.py --events 5000000 --days 60
+
+Databasen är en temporär SQLite-fil, så siffrorna är relativa.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BATCH = 50_000
+
+
+def seed(n_events, n_days, n_pages, first_day, rnd):
+    from app.extensions import db
+    from app.models import ViewEvent
+    from app.utils.stats import _day_bounds
+
+    db.drop_all()
+    db.create_all()
+
+    start, _ = _day_bounds(first_day)
+    _, end = _day_bounds(first_day + timedelta(days=n_days - 1))
+    pages = [f"post_{i}" for i in range(n_pages - 5)] + ["home", "about", "contact", "cv", "portfolio"]
+    weights = [1 / (rank + 1) for rank in range(len(pages))]  # Några sidor står för det mesta
+    hours = [start + timedelta(hours=h) for h in range(int((end - start).total_seconds()) // 3600)]
+
+    table = ViewEvent.__table__
+    started = time.perf_counter()
+    with db.engine.begin() as conn:
+        for offset in range(0, n_events, BATCH):
+            size = min(BATCH, n_events - offset)
+            chosen = rnd.choices(pages, weights=weights, k=size)
+            conn.execute(table.insert(), [
+                {"hour": rnd.choice(hours), "page": page, "views": 1} for page in chosen
+            ])
+    return time.perf_counter() - started
+
+
+def timed(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def python_rollup(day):
+    """Som en naiv rollup: alla händelser för dagen till Python."""
+    from sqlalchemy import select
+    from app.extensions import db
+    from app.models import ViewEvent
+    from app.utils.stats import _day_bounds
+
+    start, end = _day_bounds(day)
+    counts = Counter()
+    with db.engine.connect() as conn:
+        for page, views in conn.execute(
+            select(ViewEvent.page, ViewEvent.views).where(ViewEvent.hour >= start, ViewEvent.hour < end)
+        ):
+            counts[page] += views
+    return counts
+
+
+def totals():
+    from sqlalchemy import func, select
+    from app.extensions import db
+    from app.models import DailyStats, ViewEvent
+
+    return (db.session.execute(select(func.sum(ViewEvent.views))).scalar(),
+            db.session.execute(select(func.sum(DailyStats.views))).scalar())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_view_rollups.sqlite")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["PROFILING_ENABLED"] = "False"  # Rollups är långsamma queries med flit
+
+    from app import create_app
+    from app.utils.stats import backfill, rollup_day
+
+    app = create_app()
+    app.config["VIEW_EVENTS_RETENTION_DAYS"] = 0
+    first_day = date(2026, 3, 1)
+    last_day = first_day + timedelta(days=args.days - 1)
+    middle = first_day + timedelta(days=args.days // 2)
+
+    with app.app_context():
+        seconds = seed(args.events, args.days, args.pages, first_day, random.Random(42))
+        print(f"📥 {args.events} händelser, {args.days} dagar, {args.pages} sidor")
+        print(f"   ingest: {seconds:.1f} s ({args.events / seconds:,.0f} rader/s)\n")
+
+        print(f"{'en dag':<12}{'ms':>10}")
+        print(f"{'python':<12}{timed(lambda: python_rollup(middle)):>10.1f}")
+        print(f"{'sql':<12}{timed(lambda: rollup_day(middle, flush=False)):>10.1f}")
+
+        expected = python_rollup(middle)
+        rollup_day(middle, flush=False)
+        from app.models import DailyStats
+        assert {s.page: s.views for s in DailyStats.query.filter_by(date=middle)} == expected
+
+        for run in (1, 2):
+            started = time.perf_counter()
+            backfill(first_day, last_day)
+            events, daily = totals()
+            print(f"\n🔁 backfill {run}: {time.perf_counter() - started:.1f} s – "
+                  f"{events} visningar i loggen, {daily} i daily_stats")
+            assert events == daily, "Rollupen tappade eller dubblerade visningar"
+
+
+if __name__ == "__main__":
+    main()
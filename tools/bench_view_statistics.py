@@ -0,0 +1,138 @@
+# tools/bench_view_statistics.py
+"""
+Benchmark: /admin/views före och efter statistik-queries med projektion.
+
+Jämför:
+    before – alla BlogPost-objekt (med body) + en PortfolioItem.query.get per portfolioprojekt
+    after  – app/utils/stats_queries.py: topplistor med LIMIT, summor och trend i SQL
+
+Kör från projektroten:
+    python tools/bench_view_statistics.py                 # 50k inlägg, 2k projekt
+    python tools/bench_view_statistics.py --posts 100000
+
+Databasen är en temporär SQLite-fil, så siffrorna är relativa – på MySQL
+kostar det mer att läsa LONGTEXT-kolumnerna som den gamla vyn hämtade.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+TODAY = date(2026, 10, 18)
+BATCH = 10_000
+
+
+def seed(n_posts, n_items, rnd):
+    from app.extensions import db
+    from app.models import BlogCategory, BlogPost, Category, DailyStats, PageView, PortfolioItem, User
+
+    db.drop_all()
+    db.create_all()
+    db.session.add_all([BlogCategory(id=1, name="b", title="B"), Category(id=1, name="w", title="W"),
+                        User(id=1, email="b@b.se", name="B", password="x")])
+    db.session.commit()
+
+    body = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 50 + "</p>"
+    with db.engine.begin() as conn:
+        for offset in range(0, n_posts, BATCH):
+            conn.execute(BlogPost.__table__.insert(), [{
+                "title": f"Inlägg {i}", "subtitle": "S", "body": body, "img_url": "x.webp",
+                "views": rnd.randint(0, 5000), "category_id": 1, "author_id": 1,
+            } for i in range(offset, min(offset + BATCH, n_posts))])
+        conn.execute(PortfolioItem.__table__.insert(), [{
+            "title": f"Projekt {i}", "description": body, "image": "p.webp", "category_id": 1,
+        } for i in range(n_items)])
+        conn.execute(PageView.__table__.insert(),
+                     [{"page": p, "views": rnd.randint(1, 9000)} for p in ("home", "about", "cv", "contact", "portfolio")] +
+                     [{"page": f"portfolio_{i + 1}", "views": rnd.randint(1, 500)} for i in range(n_items)])
+        for offset in range(90):
+            day = TODAY - timedelta(days=offset)
+            pages = [f"post_{rnd.randint(1, n_posts)}" for _ in range(1000)] + \
+                    [f"portfolio_{rnd.randint(1, n_items)}" for _ in range(100)] + ["home", "cv"]
+            conn.execute(DailyStats.__table__.insert(),
+                         [{"date": day, "page": p, "views": rnd.randint(1, 40)} for p in set(pages)])
+
+
+def before():
+    """Den gamla vyn (utan mallen)."""
+    from app.models import BlogPost, PageView, PortfolioItem
+
+    blog_posts = BlogPost.query.order_by(BlogPost.views.desc()).all()
+    pages = PageView.query.filter(PageView.page.notlike("portfolio_%")).order_by(PageView.views.desc()).all()
+    portfolio_data, total = [], 0
+    for view in PageView.query.filter(PageView.page.like("portfolio_%")).order_by(PageView.views.desc()).all():
+        item = PortfolioItem.query.get(view.page.split("_")[1])
+        if item:
+            portfolio_data.append({"title": item.title, "views": view.views})
+            total += view.views
+    return blog_posts, pages, portfolio_data, total
+
+
+def after(days, bucket):
+    from app.utils import stats_queries as sq
+
+    period = sq.resolve_period(days, today=TODAY)
+    return (sq.top_posts(period, 25), sq.top_pages(period, 25), sq.top_portfolio(period, 25),
+            sq.summaries(period), sq.trend(period, bucket))
+
+
+def measure(fn, repeat=5):
+    from sqlalchemy import event
+    from app.extensions import db
+
+    queries = []
+
+    def count(*args):
+        queries.append(1)
+
+    samples = []
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        for _ in range(repeat):
+            queries.clear()
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+            db.session.remove()  # Ingen identity map mellan körningarna
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return statistics.median(samples), len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--items", type=int, default=2_000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_view_statistics.sqlite")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["PROFILING_ENABLED"] = "False"
+    warnings.filterwarnings("ignore", message=".*Query.get")  # Den gamla vyn använder Query.get
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        seed(args.posts, args.items, random.Random(42))
+        print(f"📊 {args.posts} inlägg, {args.items} projekt, 90 dagars daily_stats\n")
+        print(f"{'variant':<28}{'ms':>10}{'queries':>10}")
+        for name, fn in (
+            ("before (allt, sedan start)", before),
+            ("after  (sedan start)", lambda: after("all", "month")),
+            ("after  (30 dagar, dag)", lambda: after("30", "day")),
+            ("after  (90 dagar, vecka)", lambda: after("90", "week")),
+        ):
+            ms, queries = measure(fn)
+            print(f"{name:<28}{ms:>10.1f}{queries:>10}")
+
+
+if __name__ == "__main__":
+    main()